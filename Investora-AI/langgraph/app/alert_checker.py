@@ -27,54 +27,38 @@ def evaluate_price_alert(
 def check_user_alerts() -> List[Dict[str, Any]]:
     """Load active user alerts, fetch live prices, evaluate conditions.
 
-    Marks triggered alerts in SQLite and returns a list of triggered alert dicts
-    suitable for inclusion in the n8n notification payload.
+    Alerts are evaluated through an AlertIndex (one binary search per ticker
+    and condition) and every triggered alert is marked in a single UPDATE.
+    Returns a list of triggered alert dicts suitable for inclusion in the n8n
+    notification payload.
     """
-    from .event_store import get_active_alerts, init_db, mark_alert_triggered
+    from .alert_engine import build_alert_index
+    from .event_store import init_db, mark_alerts_triggered
     from .mcp_tools.yfinance_tool import YFinanceTool
 
     init_db()
-    alerts = get_active_alerts()
-    if not alerts:
+    index = build_alert_index()
+    if not index.tickers:
         return []
 
-    tickers = list({a["ticker"] for a in alerts})
     try:
-        quotes = YFinanceTool().get_quotes(tickers)
+        quotes = YFinanceTool().get_quotes(index.tickers)
     except Exception as exc:  # noqa: BLE001
         logger.warning("check_user_alerts: failed to fetch quotes: %s", exc)
         return []
 
-    triggered: List[Dict[str, Any]] = []
-    for alert in alerts:
-        ticker = alert["ticker"]
-        quote = quotes.get(ticker, {})
-        if not isinstance(quote, dict):
-            continue
-        price = quote.get("price")
-        if price is None:
-            continue
-        daily_chg = quote.get("change_pct") or 0.0
-        try:
-            if evaluate_price_alert(alert, float(price), float(daily_chg)):
-                mark_alert_triggered(alert["id"])
-                triggered.append(
-                    {
-                        "alert_id": alert["id"],
-                        "user_id": alert["user_id"],
-                        "ticker": ticker,
-                        "condition": alert["condition"],
-                        "value": alert["value"],
-                        "current_price": price,
-                        "daily_change_pct": daily_chg,
-                    }
-                )
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("check_user_alerts: error evaluating alert %s: %s", alert["id"], exc)
+    triggered = index.evaluate_quotes(quotes)
+    try:
+        claimed = set(mark_alerts_triggered([t["alert_id"] for t in triggered]))
+        # Alerts the alert monitor already claimed are delivered by it.
+        triggered = [t for t in triggered if t["alert_id"] in claimed]
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("check_user_alerts: failed to mark %d triggered alerts: %s", len(triggered), exc)
+        return []
 
     logger.info(
         "check_user_alerts: evaluated %d alerts, %d triggered",
-        len(alerts),
+        len(index),
         len(triggered),
     )
     return triggered
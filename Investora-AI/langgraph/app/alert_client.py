@@ -4,28 +4,27 @@ import logging
 import os
 from typing import Any, Dict, List
 
-import requests
-
 from .models import SignalEvent
+from .webhook_delivery import WebhookMessage, send_message
 
 logger = logging.getLogger(__name__)
 
 
-def post_alerts_to_n8n(
+def alert_webhook_url() -> str:
+    return os.environ.get(
+        "ALERT_WEBHOOK_URL",
+        "https://ai-experiementation.app.n8n.cloud/webhook/investora-alerts",
+    )
+
+
+def build_alert_payload(
     alert_signals: List[Dict[str, Any]] | List[SignalEvent],
     run_id: str,
     run_date: str,
     user_id: str = "",
     telegram_chat_id: str = "",
-    timeout: int = 15,
-) -> None:
-    """POST immediate alert signals to the n8n alert webhook."""
-    url = os.environ.get(
-        "ALERT_WEBHOOK_URL",
-        "https://ai-experiementation.app.n8n.cloud/webhook/investora-alerts",
-    )
-
-    payload: Dict[str, Any] = {
+) -> Dict[str, Any]:
+    return {
         "user_id": user_id,
         "telegram_chat_id": telegram_chat_id,
         "run_id": run_id,
@@ -46,31 +45,9 @@ def post_alerts_to_n8n(
         ],
     }
 
-    response = requests.post(url, json=payload, timeout=timeout)
-    logger.info(
-        "post_alerts_to_n8n",
-        extra={"status_code": response.status_code, "alert_count": len(alert_signals)},
-    )
-    if response.status_code >= 400:
-        raise RuntimeError(f"Alert webhook failed {response.status_code}: {response.text[:200]}")
-
-
-def post_user_alerts_to_n8n(
-    triggered_alerts: List[Dict[str, Any]],
-    run_id: str,
-    run_date: str,
-    timeout: int = 15,
-) -> None:
-    """POST user-defined triggered alerts to the n8n alert webhook.
-
-    Soft-fails when ALERT_WEBHOOK_URL is not configured.
-    """
-    url = os.environ.get(
-        "ALERT_WEBHOOK_URL",
-        "https://ai-experiementation.app.n8n.cloud/webhook/investora-alerts",
-    )
 
-    payload: Dict[str, Any] = {
+def build_user_alert_payload(triggered_alerts: List[Dict[str, Any]], run_id: str, run_date: str) -> Dict[str, Any]:
+    return {
         "run_id": run_id,
         "run_date": run_date,
         "type": "user_alerts",
@@ -89,10 +66,26 @@ def post_user_alerts_to_n8n(
         ],
     }
 
-    response = requests.post(url, json=payload, timeout=timeout)
-    logger.info(
-        "post_user_alerts_to_n8n",
-        extra={"status_code": response.status_code, "alert_count": len(triggered_alerts)},
-    )
-    if response.status_code >= 400:
-        raise RuntimeError(f"User alert webhook failed {response.status_code}: {response.text[:200]}")
+
+def post_alerts_to_n8n(
+    alert_signals: List[Dict[str, Any]] | List[SignalEvent],
+    run_id: str,
+    run_date: str,
+    user_id: str = "",
+    telegram_chat_id: str = "",
+    timeout: int = 15,
+) -> None:
+    """POST immediate alert signals to the n8n alert webhook."""
+    payload = build_alert_payload(alert_signals, run_id, run_date, user_id=user_id, telegram_chat_id=telegram_chat_id)
+    send_message(WebhookMessage("alerts", alert_webhook_url(), payload, key=user_id or "*"), timeout_s=timeout)
+
+
+def post_user_alerts_to_n8n(
+    triggered_alerts: List[Dict[str, Any]],
+    run_id: str,
+    run_date: str,
+    timeout: int = 15,
+) -> None:
+    """POST user-defined triggered alerts to the n8n alert webhook."""
+    payload = build_user_alert_payload(triggered_alerts, run_id, run_date)
+    send_message(WebhookMessage("user_alerts", alert_webhook_url(), payload), timeout_s=timeout)
@@ -0,0 +1,141 @@
+"""
+alert_engine.py
+---------------
+Threshold index over active price alerts.
+
+Alerts are grouped by ticker and condition family into threshold lists kept
+in ascending order. A quote then resolves every alert it triggers with one
+binary search per family:
+
+    price_above / above       triggered when price > threshold
+                               -> thresholds[:bisect_left(thresholds, price)]
+    price_below / below       triggered when price < threshold
+                               -> thresholds[bisect_right(thresholds, price):]
+    daily_move / change_pct_* triggered when |change_pct| > threshold
+                               -> thresholds[:bisect_left(thresholds, |change_pct|)]
+
+These are the same comparisons as alert_checker.evaluate_price_alert, which
+stays as the single-alert reference. Evaluating a quote costs O(log n + k) for
+k triggered alerts, not O(n) over every alert.
+"""
+
+from __future__ import annotations
+
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_FAMILIES: Dict[str, str] = {
+    "price_above": "above",
+    "above": "above",
+    "price_below": "below",
+    "below": "below",
+    "daily_move": "move",
+    "change_pct_up": "move",
+    "change_pct_down": "move",
+}
+
+
+class _ThresholdGroup:
+    """Alerts of one (ticker, family), ordered by threshold."""
+
+    __slots__ = ("thresholds", "alerts")
+
+    def __init__(self, thresholds: List[float], alerts: List[Tuple[int, Dict[str, Any]]]) -> None:
+        # Stable sort: equal thresholds keep input order.
+        order = sorted(range(len(thresholds)), key=thresholds.__getitem__)
+        self.thresholds = [thresholds[i] for i in order]
+        self.alerts = [alerts[i] for i in order]
+
+
+class AlertIndex:
+    """Active alerts indexed for per-quote evaluation.
+
+    Results keep the order of the alerts passed in (get_active_alerts sorts
+    by ticker), so callers see the same ordering as a linear scan.
+    """
+
+    def __init__(self, alerts: Iterable[Dict[str, Any]]) -> None:
+        buckets: Dict[Tuple[str, str], Tuple[List[float], List[Tuple[int, Dict[str, Any]]]]] = {}
+        families = _FAMILIES
+        self.size = 0
+        for position, alert in enumerate(alerts):
+            family = families.get(alert.get("condition"))
+            if family is None:
+                logger.warning("AlertIndex: unknown condition '%s' on alert %s", alert.get("condition"), alert.get("id"))
+                continue
+            try:
+                threshold = float(alert["value"])
+            except (KeyError, TypeError, ValueError):
+                logger.warning("AlertIndex: alert %s has a non-numeric value %r", alert.get("id"), alert.get("value"))
+                continue
+            key = (alert["ticker"].upper(), family)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = ([], [])
+            bucket[0].append(threshold)
+            bucket[1].append((position, alert))
+            self.size += 1
+        self._groups: Dict[Tuple[str, str], _ThresholdGroup] = {k: _ThresholdGroup(*v) for k, v in buckets.items()}
+        self.tickers = sorted({ticker for ticker, _ in self._groups})
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _hits(self, ticker: str, price: float, change_pct: float) -> List[Tuple[int, Dict[str, Any]]]:
+        hits: List[Tuple[int, Dict[str, Any]]] = []
+        group = self._groups.get((ticker, "above"))
+        if group is not None:
+            hits.extend(group.alerts[: bisect_left(group.thresholds, price)])
+        group = self._groups.get((ticker, "below"))
+        if group is not None:
+            hits.extend(group.alerts[bisect_right(group.thresholds, price) :])
+        group = self._groups.get((ticker, "move"))
+        if group is not None:
+            hits.extend(group.alerts[: bisect_left(group.thresholds, abs(change_pct))])
+        return hits
+
+    def evaluate(self, ticker: str, price: float, change_pct: float = 0.0) -> List[Dict[str, Any]]:
+        """Alerts on ticker triggered by this quote."""
+        return [alert for _, alert in sorted(self._hits(ticker.upper(), price, change_pct), key=lambda h: h[0])]
+
+    def evaluate_quotes(self, quotes: Mapping[str, Any]) -> List[Dict[str, Any]]:
+        """Triggered-alert payloads for a {ticker: {"price", "change_pct"}} quote map."""
+        hits: List[Tuple[int, Dict[str, Any], float, float]] = []
+        for ticker in self.tickers:
+            quote = quotes.get(ticker)
+            if not isinstance(quote, dict) or quote.get("price") is None:
+                continue
+            try:
+                price = float(quote["price"])
+                change_pct = float(quote.get("change_pct") or 0.0)
+            except (TypeError, ValueError):
+                logger.warning("AlertIndex: unusable quote for %s: %r", ticker, quote)
+                continue
+            for position, alert in self._hits(ticker, price, change_pct):
+                hits.append((position, alert, quote["price"], quote.get("change_pct") or 0.0))
+        hits.sort(key=lambda h: h[0])
+        return [triggered_payload(alert, price, change) for _, alert, price, change in hits]
+
+
+def triggered_payload(alert: Dict[str, Any], current_price: Any, daily_change_pct: Any) -> Dict[str, Any]:
+    return {
+        "alert_id": alert["id"],
+        "user_id": alert["user_id"],
+        "ticker": alert["ticker"],
+        "condition": alert["condition"],
+        "value": alert["value"],
+        "current_price": current_price,
+        "daily_change_pct": daily_change_pct,
+    }
+
+
+def build_alert_index(alerts: Optional[Iterable[Dict[str, Any]]] = None) -> AlertIndex:
+    """Index the given alerts, or every active alert in the event store."""
+    if alerts is None:
+        from .event_store import get_active_alerts
+
+        alerts = get_active_alerts()
+    return AlertIndex(alerts)
@@ -0,0 +1,355 @@
+"""
+alert_monitor.py
+----------------
+Long-running price-alert monitor.
+
+Instead of waiting for an analysis run to reach ``check_user_alerts_node``,
+the monitor polls quotes for exactly the tickers that have active alerts,
+every ``ALERT_MONITOR_INTERVAL_S`` seconds, on one background thread.
+
+Each poll:
+  1. Reloads the AlertIndex when alerts changed (``invalidate()``, called by
+     the alert endpoints) or every ``ALERT_MONITOR_REFRESH_S`` seconds.
+  2. Fetches quotes and re-evaluates only tickers whose price or daily move
+     changed since the previous poll. The last hits of unchanged tickers
+     are kept.
+  3. Debounces: an alert fires once its condition has held for
+     ``ALERT_MONITOR_DEBOUNCE_S`` seconds (0 = on the first hit).
+  4. Deduplicates: fired alerts are claimed with mark_alerts_triggered,
+     which only flips alerts that are still active. An alert already claimed
+     by a graph run (or by another monitor) is never delivered twice.
+  5. Delivers claimed alerts through webhook_delivery.dispatch in batches of
+     ``ALERT_MONITOR_BATCH_SIZE``. A failed batch goes to the durable SQLite
+     ``webhook_outbox`` and is retried by its drainer. Only when the outbox
+     cannot take it (disabled or unwritable) is it held in memory and retried
+     on the next poll; overflow of that buffer is counted as ``dropped``.
+
+Public API
+----------
+alert_monitor.start() / stop()    background thread lifecycle
+alert_monitor.poll_once()         → dict   (one cycle; used by tests)
+alert_monitor.invalidate()        reload alerts on the next poll
+alert_monitor.stats()             → dict
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from .alert_engine import AlertIndex
+from .metrics import record_error, time_provider_call
+from .settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Returns True when the batch was queued to the webhook outbox instead of being
+# delivered; None/False means delivered.
+DeliverFn = Callable[..., Optional[bool]]
+
+# Claimed alerts the durable outbox could not take; beyond this the oldest are dropped.
+_MAX_OUTBOX = 10_000
+
+
+def _default_quote_source() -> Any:
+    if get_settings().run.use_mock_data:
+        from .mcp_tools.mock_tools import MockQuoteTool
+
+        return MockQuoteTool()
+    from .mcp_tools.yfinance_tool import YFinanceTool
+
+    return YFinanceTool()
+
+
+def _default_deliver() -> DeliverFn:
+    if get_settings().run.skip_n8n_post:
+        def _log_only(triggered_alerts: List[Dict[str, Any]], run_id: str, run_date: str) -> None:
+            logger.info("alert_monitor: SKIP_N8N_POST set, not posting %d alerts", len(triggered_alerts))
+
+        return _log_only
+    return _dispatch_user_alerts
+
+
+def _user_alert_message(triggered_alerts: List[Dict[str, Any]], run_id: str, run_date: str) -> Any:
+    from .alert_client import alert_webhook_url, build_user_alert_payload
+    from .webhook_delivery import WebhookMessage
+
+    payload = build_user_alert_payload(triggered_alerts, run_id, run_date)
+    return WebhookMessage("user_alerts", alert_webhook_url(), payload)
+
+
+def _dispatch_user_alerts(triggered_alerts: List[Dict[str, Any]], run_id: str, run_date: str) -> bool:
+    """Post one batch; True if the send failed and dispatch queued it to the webhook outbox."""
+    from .webhook_delivery import WebhookError, dispatch
+
+    result = dispatch([_user_alert_message(triggered_alerts, run_id, run_date)])
+    if result.failures and not result.queued:
+        raise WebhookError(result.failures[0][1])
+    return bool(result.failures)
+
+
+class AlertMonitor:
+    """Polls quotes for alerted tickers and delivers newly triggered alerts."""
+
+    def __init__(
+        self,
+        quote_source: Any = None,
+        deliver: Optional[DeliverFn] = None,
+        poll_interval_s: Optional[float] = None,
+        debounce_s: Optional[float] = None,
+        refresh_alerts_s: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        cfg = get_settings().alerts
+        self._quote_source = quote_source
+        self._deliver = deliver
+        self.poll_interval_s = cfg.poll_interval_s if poll_interval_s is None else poll_interval_s
+        self.debounce_s = cfg.debounce_s if debounce_s is None else debounce_s
+        self.refresh_alerts_s = cfg.refresh_alerts_s if refresh_alerts_s is None else refresh_alerts_s
+        self.batch_size = max(1, cfg.delivery_batch_size if batch_size is None else batch_size)
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._index: Optional[AlertIndex] = None
+        self._index_loaded_at = 0.0
+        self._dirty = True
+        self._last_quotes: Dict[str, Tuple[Any, Any]] = {}
+        self._hits: Dict[str, Dict[str, Dict[str, Any]]] = {}  # ticker -> alert_id -> payload
+        self._pending_since: Dict[str, float] = {}
+        self._fired: Set[str] = set()
+        self._outbox: Deque[Dict[str, Any]] = deque(maxlen=_MAX_OUTBOX)
+        self._counters: Dict[str, int] = {
+            "polls": 0,
+            "index_reloads": 0,
+            "quote_errors": 0,
+            "tickers_evaluated": 0,
+            "tickers_unchanged": 0,
+            "triggered": 0,
+            "claimed": 0,
+            "delivered": 0,
+            "delivery_failures": 0,
+            "queued_for_retry": 0,
+            "dropped": 0,
+        }
+        self._last_poll_ms = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Start the polling thread. Returns False if it is already running."""
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="investora-alert-monitor", daemon=True)
+            self._thread.start()
+        logger.info("alert_monitor started", extra={"poll_interval_s": self.poll_interval_s})
+        return True
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join(timeout=timeout_s)
+
+    def invalidate(self) -> None:
+        """Reload active alerts on the next poll (alerts were created, edited or removed)."""
+        with self._lock:
+            self._dirty = True
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception:  # noqa: BLE001
+                logger.exception("alert_monitor: poll failed")
+                record_error("node", "alert_monitor")
+            self._stop.wait(self.poll_interval_s)
+
+    # ------------------------------------------------------------------
+    # One poll
+    # ------------------------------------------------------------------
+
+    def _quotes(self) -> Any:
+        if self._quote_source is None:
+            self._quote_source = _default_quote_source()
+        return self._quote_source
+
+    def _reload_index(self, now: float) -> AlertIndex:
+        from .event_store import get_active_alerts, init_db
+
+        init_db()
+        alerts = get_active_alerts()
+        index = AlertIndex(alerts)
+        with self._lock:
+            self._index, self._index_loaded_at, self._dirty = index, now, False
+        # Start from a clean slate: the store is the source of truth for which
+        # alerts are still active, and new alerts may sit on unchanged tickers.
+        self._last_quotes.clear()
+        self._hits.clear()
+        self._fired.clear()
+        active_ids = {a["id"] for a in alerts}
+        self._pending_since = {k: v for k, v in self._pending_since.items() if k in active_ids}
+        self._counters["index_reloads"] += 1
+        return index
+
+    def poll_once(self) -> Dict[str, Any]:
+        """Run one poll cycle and return what it did."""
+        with self._poll_lock:
+            started = time.perf_counter()
+            now = self._clock()
+            with self._lock:
+                index = self._index
+                stale = self._dirty or index is None or now - self._index_loaded_at >= self.refresh_alerts_s
+            if stale:
+                index = self._reload_index(now)
+            assert index is not None
+            self._counters["polls"] += 1
+
+            summary: Dict[str, Any] = {"tickers": len(index.tickers), "evaluated": 0, "claimed": 0, "delivered": 0}
+            if index.tickers:
+                changed = self._fetch_changed_quotes(index)
+                if changed is not None:
+                    summary["evaluated"] = len(changed)
+                    summary["claimed"] = self._evaluate(index, changed, now)
+            summary["delivered"] = self._flush_outbox()
+            self._last_poll_ms = (time.perf_counter() - started) * 1000.0
+            return summary
+
+    def _fetch_changed_quotes(self, index: AlertIndex) -> Optional[Dict[str, Dict[str, Any]]]:
+        try:
+            with time_provider_call("alert_quotes"):
+                quotes = self._quotes().get_quotes(index.tickers)
+        except Exception as exc:  # noqa: BLE001
+            self._counters["quote_errors"] += 1
+            logger.warning("alert_monitor: failed to fetch quotes: %s", exc)
+            return None
+        changed: Dict[str, Dict[str, Any]] = {}
+        for ticker in index.tickers:
+            quote = quotes.get(ticker)
+            if not isinstance(quote, dict) or quote.get("price") is None:
+                continue
+            key = (quote.get("price"), quote.get("change_pct"))
+            if self._last_quotes.get(ticker) == key:
+                self._counters["tickers_unchanged"] += 1
+                continue
+            self._last_quotes[ticker] = key
+            changed[ticker] = quote
+        self._counters["tickers_evaluated"] += len(changed)
+        return changed
+
+    def _evaluate(self, index: AlertIndex, changed: Dict[str, Dict[str, Any]], now: float) -> int:
+        for ticker in changed:
+            self._hits[ticker] = {}
+        for payload in index.evaluate_quotes(changed):
+            self._hits[payload["ticker"].upper()][payload["alert_id"]] = payload
+
+        live = {aid: p for hits in self._hits.values() for aid, p in hits.items() if aid not in self._fired}
+        # An alert whose condition stopped holding restarts its debounce window.
+        self._pending_since = {aid: self._pending_since.get(aid, now) for aid in live}
+        ready = [aid for aid, since in self._pending_since.items() if now - since >= self.debounce_s]
+        if not ready:
+            return 0
+        self._counters["triggered"] += len(ready)
+
+        from .event_store import mark_alerts_triggered
+
+        try:
+            claimed = set(mark_alerts_triggered(ready))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("alert_monitor: failed to claim %d alerts: %s", len(ready), exc)
+            record_error("tool", "alert_monitor_claim")
+            return 0
+        # Unclaimed ids were fired elsewhere or disabled since the last reload.
+        for aid in ready:
+            self._fired.add(aid)
+            self._pending_since.pop(aid, None)
+        fresh = [live[aid] for aid in ready if aid in claimed]
+        overflow = len(self._outbox) + len(fresh) - _MAX_OUTBOX
+        if overflow > 0:
+            self._counters["dropped"] += overflow
+            record_error("tool", "alert_monitor_dropped")
+            logger.error("alert_monitor: in-memory outbox full, dropping %d claimed alerts", overflow)
+        self._outbox.extend(fresh)
+        self._counters["claimed"] += len(claimed)
+        return len(claimed)
+
+    def _flush_outbox(self) -> int:
+        if not self._outbox:
+            return 0
+        if self._deliver is None:
+            self._deliver = _default_deliver()
+        delivered = 0
+        run_date = datetime.now(timezone.utc).date().isoformat()
+        while self._outbox:
+            batch = [self._outbox[i] for i in range(min(self.batch_size, len(self._outbox)))]
+            run_id = f"alert-monitor-{uuid.uuid4().hex[:12]}"
+            try:
+                with time_provider_call("alert_webhook"):
+                    queued = self._deliver(batch, run_id=run_id, run_date=run_date)
+                if queued:
+                    self._counters["delivery_failures"] += 1
+                    self._counters["queued_for_retry"] += len(batch)
+                    logger.warning("alert_monitor: delivery of %d alerts failed, queued to webhook outbox", len(batch))
+                else:
+                    delivered += len(batch)
+            except Exception as exc:  # noqa: BLE001
+                self._counters["delivery_failures"] += 1
+                if not self._queue_for_retry(batch, run_id, run_date, exc):
+                    logger.warning("alert_monitor: delivery of %d alerts failed, will retry: %s", len(batch), exc)
+                    break
+            for _ in batch:
+                self._outbox.popleft()
+        self._counters["delivered"] += delivered
+        return delivered
+
+    def _queue_for_retry(self, batch: List[Dict[str, Any]], run_id: str, run_date: str, error: Exception) -> bool:
+        """Hand a failed batch to the durable webhook outbox. False if it could not be queued."""
+        if not get_settings().webhooks.outbox_enabled:
+            return False
+        from .webhook_delivery import queue_failed
+
+        if not queue_failed([(_user_alert_message(batch, run_id, run_date), error)]):
+            return False
+        self._counters["queued_for_retry"] += len(batch)
+        logger.warning("alert_monitor: delivery of %d alerts failed, queued to webhook outbox: %s", len(batch), error)
+        return True
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._index
+        return {
+            "running": self.running,
+            "poll_interval_s": self.poll_interval_s,
+            "debounce_s": self.debounce_s,
+            "alerts": len(index) if index is not None else 0,
+            "tickers": len(index.tickers) if index is not None else 0,
+            "pending_debounce": len(self._pending_since),
+            "outbox": len(self._outbox),
+            "last_poll_ms": round(self._last_poll_ms, 2),
+            "counters": dict(self._counters),
+        }
+
+
+alert_monitor = AlertMonitor()
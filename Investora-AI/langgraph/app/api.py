@@ -1,34 +1,40 @@
 from __future__ import annotations
 
 import asyncio
-import base64
 import json
 import logging
 import os
-import hashlib
-import hmac
 import time
-import threading
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from zoneinfo import ZoneInfo
 
 from dotenv import load_dotenv
-from fastapi import Body, Depends, FastAPI, HTTPException, Header, Query, Request
+from fastapi import BackgroundTasks, Body, Depends, FastAPI, HTTPException, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.responses import StreamingResponse
+from fastapi.responses import PlainTextResponse
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 
+from .alert_monitor import alert_monitor
+from .auth import KdfBusy, decode_token, issue_token, kdf_pool, needs_rehash, normalize_username, token_cache
+from .dashboard_cache import dashboard_cache
 from .errors import DomainError, error_payload
-from .metrics import snapshot_metrics
+from .job_runner import JobRejected, job_runner
+from .metrics import render_prometheus, snapshot_metrics
 from .logging_utils import install_redaction_filter
 from .repositories import AlertRepository, BundleRepository, ProfileRepository
 from .run_limiter import run_limiter
+from .run_stages import tail_stage
 from .services import AnalysisService, NotificationService, PersonalizationService
 from .settings import get_settings
+from .webhook_delivery import outbox_drainer
 
 logger = logging.getLogger(__name__)
 install_redaction_filter()
@@ -70,7 +76,27 @@ def _verify_cron_secret(authorization: str = Header(default="")) -> None:
     if authorization != f"Bearer {secret}":
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-app = FastAPI(title="LangGraph Weekly Market Agent", version="1.0.0")
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    from .event_store import init_db
+
+    init_db()
+    tail_stage.recover_unfinished()
+    if settings.alerts.enabled:
+        alert_monitor.start()
+    if settings.webhooks.outbox_enabled:
+        outbox_drainer.start()
+    kdf_pool.start()
+    try:
+        yield
+    finally:
+        alert_monitor.stop()
+        outbox_drainer.stop()
+        tail_stage.shutdown(wait=False)
+        kdf_pool.shutdown()
+
+
+app = FastAPI(title="LangGraph Weekly Market Agent", version="1.0.0", lifespan=_lifespan)
 
 # CORS — allow localhost in dev + production origins from CORS_ORIGINS env var
 _explicit_origins = settings.providers.cors_origins
@@ -84,8 +110,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory registry of active streaming runs: run_id → asyncio.Queue
-_active_streams: Dict[str, asyncio.Queue] = {}
 _bundle_repo = BundleRepository()
 _profile_repo = ProfileRepository()
 _alert_repo = AlertRepository()
@@ -118,12 +142,16 @@ class RunWeeklyRequest(BaseModel):
     run_date: Optional[str] = None
     skip_synthesis: bool = False
     no_post: bool = False
+    split_phase: Optional[bool] = None  # None = SPLIT_PHASE_RUNS default
 
 
 class RunAnalysisRequest(BaseModel):
     tickers: Optional[List[str]] = None
     skip_synthesis: bool = True
     no_post: bool = False
+    wait: bool = True
+    incremental: Optional[bool] = None  # None = INCREMENTAL_RUNS default
+    split_phase: Optional[bool] = None  # None = SPLIT_PHASE_RUNS default
 
 
 class AuthRegisterRequest(BaseModel):
@@ -138,19 +166,6 @@ class AuthLoginRequest(BaseModel):
     password: str
 
 
-def _b64url_encode(data: bytes) -> str:
-    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
-
-
-def _b64url_decode(value: str) -> bytes:
-    padding = "=" * (-len(value) % 4)
-    return base64.urlsafe_b64decode((value + padding).encode("ascii"))
-
-
-def _normalize_username(username: str) -> str:
-    return username.strip().lower()
-
-
 def _get_auth_secret() -> str:
     return (
         os.environ.get("AUTH_SECRET")
@@ -159,63 +174,7 @@ def _get_auth_secret() -> str:
     )
 
 
-def _hash_password(password: str) -> str:
-    salt = os.urandom(16)
-    derived = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 120_000)
-    return "pbkdf2_sha256$120000$" + base64.b64encode(salt).decode("ascii") + "$" + base64.b64encode(derived).decode("ascii")
-
-
-def _verify_password(password: str, encoded_hash: str) -> bool:
-    try:
-        algorithm, iterations_raw, salt_b64, digest_b64 = encoded_hash.split("$", 3)
-        if algorithm != "pbkdf2_sha256":
-            return False
-        iterations = int(iterations_raw)
-        salt = base64.b64decode(salt_b64.encode("ascii"))
-        expected = base64.b64decode(digest_b64.encode("ascii"))
-    except Exception:
-        return False
-
-    candidate = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
-    return hmac.compare_digest(candidate, expected)
-
-
-def _issue_auth_token(user_id: str, username: str, expires_in_seconds: int = 60 * 60 * 24 * 7) -> str:
-    payload = {
-        "user_id": user_id,
-        "username": username,
-        "exp": int(time.time()) + expires_in_seconds,
-    }
-    payload_bytes = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
-    payload_b64 = _b64url_encode(payload_bytes)
-    signature = hmac.new(_get_auth_secret().encode("utf-8"), payload_b64.encode("ascii"), hashlib.sha256).digest()
-    return f"{payload_b64}.{_b64url_encode(signature)}"
-
-
-def _decode_auth_token(token: str) -> Optional[Dict[str, Any]]:
-    try:
-        payload_b64, signature_b64 = token.split(".", 1)
-        expected_sig = hmac.new(
-            _get_auth_secret().encode("utf-8"),
-            payload_b64.encode("ascii"),
-            hashlib.sha256,
-        ).digest()
-        provided_sig = _b64url_decode(signature_b64)
-        if not hmac.compare_digest(provided_sig, expected_sig):
-            return None
-        payload = json.loads(_b64url_decode(payload_b64).decode("utf-8"))
-        if int(payload.get("exp", 0)) < int(time.time()):
-            return None
-        user_id = str(payload.get("user_id", "")).strip()
-        username = _normalize_username(str(payload.get("username", "")))
-        if not user_id or not username:
-            return None
-        return {"user_id": user_id, "username": username}
-    except Exception:
-        return None
-
-
-def _extract_bearer_token(authorization: str = Header(default="")) -> str:
+async def _extract_bearer_token(authorization: str = Header(default="")) -> str:
     if not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing bearer token")
     token = authorization.removeprefix("Bearer ").strip()
@@ -224,13 +183,18 @@ def _extract_bearer_token(authorization: str = Header(default="")) -> str:
     return token
 
 
-def _require_auth(token: str = Depends(_extract_bearer_token)) -> Dict[str, Any]:
-    claims = _decode_auth_token(token)
+async def _require_auth(token: str = Depends(_extract_bearer_token)) -> Dict[str, Any]:
+    # async: a cached token costs a dict lookup, not a threadpool round-trip.
+    claims = decode_token(token, _get_auth_secret())
     if claims is None:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     return claims
 
 
+def _kdf_busy(exc: KdfBusy) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "1"})
+
+
 def _acquire_run_slot_or_raise(timeout_s: float = 90.0) -> None:
     status = run_limiter.acquire(timeout_s=timeout_s)
     if status == "acquired":
@@ -255,18 +219,19 @@ def run_weekly_endpoint(req: RunWeeklyRequest):
             run_date=req.run_date,
             skip_synthesis=req.skip_synthesis,
             skip_post=req.no_post,
+            split_phase=req.split_phase,
         )
     finally:
         run_limiter.release()
 
 
 @app.post("/auth/register")
-def register_endpoint(req: AuthRegisterRequest):
+async def register_endpoint(req: AuthRegisterRequest):
     from sqlite3 import IntegrityError
 
     from .event_store import create_user, init_db, load_user_by_username
 
-    username = _normalize_username(req.username)
+    username = normalize_username(req.username)
     password = req.password
     if not username:
         raise HTTPException(status_code=400, detail="Username is required")
@@ -274,40 +239,67 @@ def register_endpoint(req: AuthRegisterRequest):
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters")
 
     init_db()
-    if load_user_by_username(username) is not None:
+    if await run_in_threadpool(load_user_by_username, username) is not None:
         return {"ok": False, "error": "Username already taken"}
 
     user_id = req.userId or str(uuid.uuid4())
-    password_hash = _hash_password(password)
+    try:
+        password_hash = await kdf_pool.hash(password)
+    except KdfBusy as exc:
+        raise _kdf_busy(exc) from exc
     profile = dict(req.profile or {})
     profile.setdefault("email", username)
 
-    try:
+    def _create() -> None:
         create_user(user_id, username, password_hash)
         _profile_repo.save_profile_json(user_id, profile)
+
+    try:
+        await run_in_threadpool(_create)
     except IntegrityError:
         return {"ok": False, "error": "Username already taken"}
 
-    token = _issue_auth_token(user_id, username)
+    token = issue_token(user_id, username, _get_auth_secret())
     return {"ok": True, "userId": user_id, "token": token}
 
 
+async def _rehash_password(user_id: str, password: str) -> None:
+    """Move a verified password to the current AUTH_PBKDF2_ITERATIONS; best-effort, the login already succeeded."""
+    from .event_store import update_user_password_hash
+
+    try:
+        new_hash = await kdf_pool.hash(password)
+        await run_in_threadpool(update_user_password_hash, user_id, new_hash)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("login: password rehash for %s failed, will retry on next login: %s", user_id, exc)
+
+
 @app.post("/auth/login")
-def login_endpoint(req: AuthLoginRequest):
+async def login_endpoint(req: AuthLoginRequest, background_tasks: BackgroundTasks):
     from .event_store import init_db, load_user_by_username
 
-    username = _normalize_username(req.username)
+    username = normalize_username(req.username)
     if not username or not req.password:
         raise HTTPException(status_code=400, detail="Username and password are required")
 
     init_db()
-    user = load_user_by_username(username)
-    if user is None or not _verify_password(req.password, str(user["password_hash"])):
+    user = await run_in_threadpool(load_user_by_username, username)
+    if user is None:
         return {"ok": False, "error": "Invalid username or password"}
+    stored_hash = str(user["password_hash"])
+    try:
+        valid = await kdf_pool.verify(req.password, stored_hash)
+    except KdfBusy as exc:
+        raise _kdf_busy(exc) from exc
+    if not valid:
+        return {"ok": False, "error": "Invalid username or password"}
+    if needs_rehash(stored_hash):
+        # AUTH_PBKDF2_ITERATIONS changed since this hash was made; upgrade it after the response.
+        background_tasks.add_task(_rehash_password, str(user["user_id"]), req.password)
 
-    profile = _profile_repo.load_profile_json(str(user["user_id"])) or {}
+    profile = await run_in_threadpool(_profile_repo.load_profile_json, str(user["user_id"])) or {}
     profile.setdefault("email", username)
-    token = _issue_auth_token(str(user["user_id"]), username)
+    token = issue_token(str(user["user_id"]), username, _get_auth_secret())
     return {"ok": True, "userId": user["user_id"], "profile": profile, "token": token}
 
 
@@ -330,92 +322,113 @@ def me_endpoint(claims: Dict[str, Any] = Depends(_require_auth)):
     }
 
 
+def _submit_analysis_job(req: RunAnalysisRequest):
+    from .run_weekly import analysis_initial_state
+
+    initial = analysis_initial_state(
+        tickers=req.tickers,
+        skip_synthesis=req.skip_synthesis,
+        skip_post=req.no_post,
+        incremental=req.incremental,
+        split_phase=req.split_phase,
+    )
+    try:
+        return job_runner.submit(initial, kind="analysis")
+    except JobRejected as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+
+
 @app.post("/run-analysis", dependencies=[Depends(_verify_cron_secret)])
 def run_analysis_endpoint(req: RunAnalysisRequest):
+    if not req.wait:
+        job = _submit_analysis_job(req)
+        return JSONResponse(status_code=202, content=job.to_dict(include_result=False))
+
     _acquire_run_slot_or_raise(settings.run.run_queue_wait_seconds)
     try:
         return _analysis_service.run_targeted_analysis(
             tickers=req.tickers,
             skip_synthesis=req.skip_synthesis,
             skip_post=req.no_post,
+            incremental=req.incremental,
+            split_phase=req.split_phase,
         )
     finally:
         run_limiter.release()
 
 
-@app.post("/run-analysis-stream")
-async def run_analysis_stream_endpoint(req: RunAnalysisRequest):
-    """Start a run and stream LangGraph node-completion events as SSE."""
-    from .graph import build_graph
-
-    run_id = str(uuid.uuid4())
-    loop = asyncio.get_event_loop()
-    q: asyncio.Queue = asyncio.Queue()
-    _active_streams[run_id] = q
-
-    initial: Dict[str, Any] = {
-        "run_id": run_id,
-        "skip_synthesis": req.skip_synthesis,
-        "skip_post": req.no_post,
-        "scope": "fast" if req.skip_synthesis else "full",
-        "trigger_weekly_digest": False,
-    }
-    if req.tickers:
-        initial["tickers"] = [t.upper() for t in req.tickers]
-
-    recursion_limit = settings.run.graph_recursion_limit
-
-    def graph_thread() -> None:
-        acquired = False
-        try:
-            status = run_limiter.acquire(timeout_s=settings.run.run_queue_wait_seconds)
-            if status != "acquired":
-                msg = (
-                    "Run queue is full. Try again shortly."
-                    if status == "queue_full"
-                    else "Run queue wait timeout exceeded. Try again shortly."
-                )
-                loop.call_soon_threadsafe(
-                    q.put_nowait, json.dumps({"type": "error", "run_id": run_id, "message": msg})
-                )
-                return
-            acquired = True
-            graph = build_graph()
-            for chunk in graph.stream(initial, config={"recursion_limit": recursion_limit}):
-                for node_name in chunk:
-                    event = json.dumps({"type": "node_complete", "node": node_name, "run_id": run_id})
-                    loop.call_soon_threadsafe(q.put_nowait, event)
-            loop.call_soon_threadsafe(q.put_nowait, json.dumps({"type": "done", "run_id": run_id}))
-        except Exception as exc:  # noqa: BLE001
-            loop.call_soon_threadsafe(
-                q.put_nowait, json.dumps({"type": "error", "run_id": run_id, "message": str(exc)})
-            )
-        finally:
-            if acquired:
-                run_limiter.release()
-            loop.call_soon_threadsafe(q.put_nowait, None)  # sentinel
-
-    threading.Thread(target=graph_thread, daemon=True).start()
-
+def _job_event_stream(job_id: str, queue: asyncio.Queue):
     async def event_gen():
         try:
             while True:
                 try:
-                    data = await asyncio.wait_for(q.get(), timeout=300)
+                    event = await asyncio.wait_for(queue.get(), timeout=300)
                 except asyncio.TimeoutError:
                     yield "data: {\"type\": \"ping\"}\n\n"
                     continue
-                if data is None:
+                if event is None:
                     break
-                yield f"data: {data}\n\n"
+                yield f"data: {json.dumps(event)}\n\n"
         finally:
-            _active_streams.pop(run_id, None)
+            job_runner.unsubscribe(job_id, queue)
 
     return StreamingResponse(
         event_gen(),
         media_type="text/event-stream",
-        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Job-ID": job_id},
+    )
+
+
+@app.post("/run-analysis-stream")
+async def run_analysis_stream_endpoint(req: RunAnalysisRequest):
+    """Start a run as a background job and stream node-completion events as SSE."""
+    from .run_weekly import analysis_initial_state
+
+    run_id = str(uuid.uuid4())
+    initial = analysis_initial_state(
+        tickers=req.tickers,
+        skip_synthesis=req.skip_synthesis,
+        skip_post=req.no_post,
+        run_id=run_id,
+        incremental=req.incremental,
+        split_phase=req.split_phase,
     )
+    try:
+        job = job_runner.submit(initial, kind="analysis")
+    except JobRejected as exc:
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait({"type": "error", "run_id": run_id, "message": str(exc)})
+        queue.put_nowait(None)
+        return _job_event_stream(run_id, queue)
+
+    queue = job_runner.subscribe(job.job_id, asyncio.get_running_loop())
+    return _job_event_stream(job.job_id, queue)
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Poll a background analysis job; includes the run result once finished."""
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """SSE stream of a job's events, replaying those already emitted."""
+    queue = job_runner.subscribe(job_id, asyncio.get_running_loop())
+    if queue is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_event_stream(job_id, queue)
+
+
+@app.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    """Cancel a queued job, or stop a running one at the next node boundary."""
+    if job_runner.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"ok": job_runner.cancel(job_id), "job_id": job_id}
 
 
 # Resolve relative to this file so the path works regardless of uvicorn launch dir
@@ -444,6 +457,33 @@ def get_run_history(limit: int = 10):
     return load_recent_runs(limit=min(limit, 100))
 
 
+@app.get("/run-history/{run_id}/metrics")
+def get_run_metrics(run_id: str):
+    """Per-run metrics breakdown stored alongside the run's snapshot."""
+    from .event_store import init_db, load_run_metrics
+
+    init_db()
+    metrics = load_run_metrics(run_id)
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="No metrics recorded for this run.")
+    return metrics
+
+
+@app.get("/run-history/{run_id}/stages")
+def get_run_stages(run_id: str):
+    """Core / tail stage status of a split-phase run, with each stage's critical path."""
+    from .event_store import init_db, load_run_stages
+    from .graph_topology import critical_path
+
+    init_db()
+    stages = load_run_stages(run_id)
+    if not stages:
+        raise HTTPException(status_code=404, detail="No stage status recorded for this run.")
+    for stage in stages:
+        stage["critical_path"] = critical_path(stage["node_timings"], phase=stage["stage"])
+    return {"run_id": run_id, "stages": stages}
+
+
 @app.get("/ticker-history/{ticker}")
 def get_ticker_history(ticker: str, weeks: int = 6):
     """Return signal events for a ticker over the last N weeks."""
@@ -453,6 +493,26 @@ def get_ticker_history(ticker: str, weeks: int = 6):
     return load_history(ticker=ticker.upper(), lookback_weeks=min(weeks, 52))
 
 
+@app.get("/ticker-history/{ticker}/scores")
+def get_ticker_score_series(ticker: str, weeks: int = 6, signal_type: Optional[str] = None):
+    """Return a ticker's signal score series as parallel columns, newest first."""
+    from .history_store import get_history_store
+
+    symbol = ticker.upper()
+    lookback = min(weeks, 52)
+    store = get_history_store()
+    if store is not None:
+        series = store.score_history(symbol, lookback_weeks=lookback, signal_type=signal_type)
+        return {"ticker": symbol, "source": "columnar", **{k: v.tolist() for k, v in series.items()}}
+
+    from .event_store import init_db, load_history
+
+    init_db()
+    rows = load_history(ticker=symbol, lookback_weeks=lookback, signal_type=signal_type)
+    columns = ("run_date", "timestamp", "signal_type", "score", "confidence")
+    return {"ticker": symbol, "source": "sqlite", **{c: [r[c] for r in rows] for c in columns}}
+
+
 # ── Market Data Endpoints (Tasks 1.3–1.5) ─────────────────────────────────
 
 
@@ -787,7 +847,9 @@ def create_user_alert(user_id: str, req: CreateAlertRequest):
         raise HTTPException(status_code=400, detail="value must be positive")
 
     init_db()
-    return _alert_repo.create_user_alert(user_id, req.ticker, normalized_condition, req.value)
+    created = _alert_repo.create_user_alert(user_id, req.ticker, normalized_condition, req.value)
+    alert_monitor.invalidate()
+    return created
 
 
 @app.patch("/user/{user_id}/alerts/{alert_id}")
@@ -836,6 +898,7 @@ def patch_user_alert(user_id: str, alert_id: str, req: UpdateAlertRequest):
     )
     if updated is None:
         raise HTTPException(status_code=404, detail="Alert not found")
+    alert_monitor.invalidate()
     return updated
 
 
@@ -846,6 +909,7 @@ def delete_user_alert(user_id: str, alert_id: str):
     init_db()
     if not _alert_repo.delete_user_alert(alert_id):
         raise HTTPException(status_code=404, detail="Alert not found")
+    alert_monitor.invalidate()
 
 
 # ── v3 Personalization Endpoints (Iteration 1) ────────────────────────────
@@ -864,27 +928,45 @@ def put_user_profile(user_id: str, profile: Dict[str, Any] = Body(...)):
     return {"ok": True, "user_id": user_id}
 
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match", "")
+    if not header:
+        return False
+    candidates = {c.strip().removeprefix("W/") for c in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _cached_json_response(request: Request, body: str, etag: str) -> Response:
+    """Serve pre-serialized JSON; 304 when the client already has this version."""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.get("/user/{user_id}/dashboard")
-def get_user_dashboard(user_id: str):
+def get_user_dashboard(user_id: str, request: Request):
     """
     Return the most recent UserReportBundle for a user, or 404 if no
     personalized bundle exists yet (i.e., no analysis run has completed
     the personalization node).
+
+    Served from the dashboard cache with an ETag; If-None-Match gets a 304.
     """
     from .event_store import init_db
 
     init_db()
-    bundle = _personalization_service.get_user_dashboard(user_id)
-    if bundle is None:
+    view = _personalization_service.get_user_dashboard_view(user_id)
+    if view is None:
         raise HTTPException(
             status_code=404,
             detail="No dashboard data yet. Trigger an analysis run first.",
         )
-    return bundle
+    return _cached_json_response(request, view.dashboard_json, view.etag)
 
 
 @app.get("/user/{user_id}/personalized-signals")
-def get_user_personalized_signals(user_id: str):
+def get_user_personalized_signals(user_id: str, request: Request):
     """
     Lightweight alternative to /dashboard — returns only the watchlist and
     discovery signal buckets from the latest personalized bundle.
@@ -892,12 +974,45 @@ def get_user_personalized_signals(user_id: str):
     from .event_store import init_db
 
     init_db()
-    bundle = _personalization_service.get_user_personalized_signals(user_id)
-    if bundle is None:
+    view = _personalization_service.get_user_dashboard_view(user_id)
+    if view is None:
         raise HTTPException(status_code=404, detail="No personalized signals yet.")
-    return bundle
+    return _cached_json_response(request, view.signals_json, view.etag)
 
 
 @app.get("/debug/metrics")
 def get_debug_metrics():
     return snapshot_metrics()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_prometheus_metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/debug/jobs")
+def get_debug_jobs():
+    return {**job_runner.stats(), "tail_stage": tail_stage.stats()}
+
+
+@app.get("/debug/alert-monitor")
+def get_debug_alert_monitor():
+    return alert_monitor.stats()
+
+
+@app.get("/debug/auth")
+def get_debug_auth():
+    return {"kdf": kdf_pool.stats(), "token_cache": token_cache.stats()}
+
+
+@app.get("/debug/dashboard-cache")
+def get_debug_dashboard_cache():
+    return dashboard_cache.stats()
+
+
+@app.get("/debug/webhook-outbox")
+def get_debug_webhook_outbox():
+    from .event_store import init_db, webhook_outbox_counts
+
+    init_db()
+    return webhook_outbox_counts()
@@ -0,0 +1,310 @@
+"""
+auth.py
+-------
+Password hashing and bearer tokens for the /auth endpoints.
+
+* Password hashes are ``pbkdf2_sha256$<iterations>$<salt>$<digest>``. New
+  hashes use ``AUTH_PBKDF2_ITERATIONS`` (default 120 000). Existing hashes
+  keep verifying at their own cost and are re-hashed on the next successful
+  login (``needs_rehash``).
+* The KDF is CPU-bound, so the async auth endpoints never run it on the
+  event loop. ``kdf_pool`` runs it on ``AUTH_KDF_WORKERS`` processes (0 = the
+  loop's thread pool). At most ``AUTH_KDF_MAX_PENDING`` hashes may be queued
+  or running. Past that, ``KdfBusy`` is raised and the API answers 429
+  instead of letting a login storm queue unbounded work.
+* Tokens are ``<base64url payload>.<base64url HMAC-SHA256>``. ``decode_token``
+  keeps an LRU of the last ``AUTH_TOKEN_CACHE_SIZE`` verified tokens and their
+  claims, so a repeat request skips the HMAC and JSON parse. An entry is
+  served only until the token's own expiry, and the cache empties itself when
+  the signing secret changes.
+
+Public API
+----------
+hash_password(password, iterations)                 → str
+verify_password(password, encoded)                  → bool
+needs_rehash(encoded)                               → bool
+issue_token(user_id, username, secret)              → str
+decode_token(token, secret)                         → dict | None
+await kdf_pool.hash(password) / verify(...)         (raise KdfBusy when saturated)
+kdf_pool.stats(), token_cache.stats()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from .settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_ALGORITHM = "pbkdf2_sha256"
+TOKEN_TTL_S = 60 * 60 * 24 * 7
+
+
+# ---------------------------------------------------------------------------
+# Passwords (module-level so the process pool can pickle them)
+# ---------------------------------------------------------------------------
+
+
+def normalize_username(username: str) -> str:
+    return username.strip().lower()
+
+
+def hash_password(password: str, iterations: Optional[int] = None) -> str:
+    rounds = int(iterations or get_settings().auth.pbkdf2_iterations)
+    salt = os.urandom(16)
+    derived = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, rounds)
+    return f"{_ALGORITHM}${rounds}$" + base64.b64encode(salt).decode("ascii") + "$" + base64.b64encode(derived).decode("ascii")
+
+
+def _parse_hash(encoded_hash: str) -> Optional[Tuple[int, bytes, bytes]]:
+    try:
+        algorithm, iterations_raw, salt_b64, digest_b64 = encoded_hash.split("$", 3)
+        if algorithm != _ALGORITHM:
+            return None
+        return (
+            int(iterations_raw),
+            base64.b64decode(salt_b64.encode("ascii")),
+            base64.b64decode(digest_b64.encode("ascii")),
+        )
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def verify_password(password: str, encoded_hash: str) -> bool:
+    parsed = _parse_hash(encoded_hash)
+    if parsed is None:
+        return False
+    iterations, salt, expected = parsed
+    candidate = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return hmac.compare_digest(candidate, expected)
+
+
+def needs_rehash(encoded_hash: str) -> bool:
+    """True when a stored hash was made with a different iteration count than configured."""
+    parsed = _parse_hash(encoded_hash)
+    return parsed is not None and parsed[0] != get_settings().auth.pbkdf2_iterations
+
+
+# ---------------------------------------------------------------------------
+# KDF executor
+# ---------------------------------------------------------------------------
+
+
+class KdfBusy(RuntimeError):
+    """Raised when AUTH_KDF_MAX_PENDING hashes are already queued or running."""
+
+
+class KdfPool:
+    """Runs password hashing off the event loop with a cap on outstanding work."""
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = max(0, workers)
+        self.max_pending = max(1, max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._counters: Dict[str, int] = {"hashes": 0, "verifies": 0, "rejected": 0, "pool_restarts": 0}
+        self._durations_ms: Deque[float] = deque(maxlen=256)
+
+    def _pool(self) -> Optional[Executor]:
+        if self.workers == 0:
+            return None  # the running loop's default thread pool
+        with self._lock:
+            if self._executor is None:
+                # spawn: the API process has threads running, which fork does not handle safely.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def start(self) -> None:
+        """Create the pool and start its workers in the background (first logins skip the spawn)."""
+        pool = self._pool()
+        if pool is not None:
+            for _ in range(self.workers):
+                pool.submit(os.getpid)
+
+    async def _run(self, counter: str, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counters["rejected"] += 1
+                raise KdfBusy(f"Too many logins in progress ({self._pending}/{self.max_pending}). Try again shortly.")
+            self._pending += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), fn, *args)
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None
+                self._counters["pool_restarts"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._counters[counter] += 1
+                self._durations_ms.append((time.perf_counter() - started) * 1000.0)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hashes", hash_password, password, get_settings().auth.pbkdf2_iterations)
+
+    async def verify(self, password: str, encoded_hash: str) -> bool:
+        return await self._run("verifies", verify_password, password, encoded_hash)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            pending = self._pending
+            durations = sorted(self._durations_ms)
+        p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))] if durations else 0.0
+        return {
+            "executor": "process" if self.workers else "thread",
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": pending,
+            "iterations": get_settings().auth.pbkdf2_iterations,
+            "counters": counters,
+            "duration_ms": {
+                "samples": len(durations),
+                "avg": round(sum(durations) / len(durations), 2) if durations else 0.0,
+                "p95": round(p95, 2),
+            },
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------------------------------------------------------------------
+# Tokens
+# ---------------------------------------------------------------------------
+
+
+def _b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64url_decode(value: str) -> bytes:
+    padding = "=" * (-len(value) % 4)
+    return base64.urlsafe_b64decode((value + padding).encode("ascii"))
+
+
+def _sign(payload_b64: str, secret: str) -> bytes:
+    return hmac.new(secret.encode("utf-8"), payload_b64.encode("ascii"), hashlib.sha256).digest()
+
+
+def issue_token(user_id: str, username: str, secret: str, expires_in_seconds: int = TOKEN_TTL_S) -> str:
+    payload = {
+        "user_id": user_id,
+        "username": username,
+        "exp": int(time.time()) + expires_in_seconds,
+    }
+    payload_bytes = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    payload_b64 = _b64url_encode(payload_bytes)
+    return f"{payload_b64}.{_b64url_encode(_sign(payload_b64, secret))}"
+
+
+class TokenCache:
+    """LRU of verified token → (claims, exp); entries die with their token."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, str], int]]" = OrderedDict()
+        self._secret: Optional[str] = None
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def get(self, token: str, secret: str, now: int) -> Optional[Dict[str, str]]:
+        with self._lock:
+            if secret != self._secret:
+                self._entries.clear()
+                self._secret = secret
+            entry = self._entries.get(token)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            claims, exp = entry
+            if exp < now:
+                del self._entries[token]
+                self._counters["expired"] += 1
+                return None
+            self._entries.move_to_end(token)
+            self._counters["hits"] += 1
+            return claims
+
+    def put(self, token: str, secret: str, claims: Dict[str, str], exp: int) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            if secret != self._secret:
+                return
+            self._entries[token] = (claims, exp)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        lookups = counters["hits"] + counters["misses"] + counters["expired"]
+        return {
+            "entries": size,
+            "max_entries": self.max_entries,
+            **counters,
+            "hit_ratio": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _verify_token(token: str, secret: str) -> Optional[Tuple[Dict[str, str], int]]:
+    try:
+        payload_b64, signature_b64 = token.split(".", 1)
+        if not hmac.compare_digest(_b64url_decode(signature_b64), _sign(payload_b64, secret)):
+            return None
+        payload = json.loads(_b64url_decode(payload_b64).decode("utf-8"))
+        user_id = str(payload.get("user_id", "")).strip()
+        username = normalize_username(str(payload.get("username", "")))
+        if not user_id or not username:
+            return None
+        return {"user_id": user_id, "username": username}, int(payload.get("exp", 0))
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def decode_token(token: str, secret: str) -> Optional[Dict[str, str]]:
+    """Claims of a valid, unexpired token, or None."""
+    now = int(time.time())
+    claims = token_cache.get(token, secret, now)
+    if claims is None:
+        verified = _verify_token(token, secret)
+        if verified is None or verified[1] < now:
+            return None
+        claims, exp = verified
+        token_cache.put(token, secret, claims, exp)
+    return dict(claims)
+
+
+_auth_cfg = get_settings().auth
+kdf_pool = KdfPool(workers=_auth_cfg.kdf_workers, max_pending=_auth_cfg.kdf_max_pending)
+token_cache = TokenCache(max_entries=_auth_cfg.token_cache_size)
@@ -46,6 +46,30 @@ class BudgetManager:
             total = sum(self._run_counts[run_id].values())
             return total < self._max_calls_per_run
 
+    def try_reserve(self, action: str, run_id: str, calls: int) -> int:
+        """Atomically reserve up to `calls` calls for this run; returns how many were granted.
+
+        Used by the concurrent collection paths, where several workers draw on the same
+        run budget at once and a separate can_call/record_call pair would race.
+        """
+        if calls <= 0:
+            return 0
+        if self._is_mock():
+            return calls
+        provider = _PROVIDER_MAP.get(action, action)
+        with self._lock:
+            used = sum(self._run_counts[run_id].values())
+            granted = max(0, min(calls, self._max_calls_per_run - used))
+            self._run_counts[run_id][provider] += granted
+        if granted:
+            try:
+                from .event_store import record_api_call
+
+                record_api_call(date.today().isoformat(), provider, run_id, calls=granted)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("budget_manager: DB persist failed: %s", exc)
+        return granted
+
     def record_call(self, action: str, run_id: str) -> None:
         """Increment in-memory counter and persist to DB. No-op in mock mode."""
         if self._is_mock():
@@ -0,0 +1,133 @@
+"""
+dashboard_cache.py
+------------------
+Read-optimized serving layer for the per-user dashboard endpoints.
+
+``/user/{user_id}/dashboard`` and ``/user/{user_id}/personalized-signals``
+serve the user's latest UserReportBundle. Entries in an in-process LRU hold
+the bundle exactly as stored (JSON text) and the signals slice that
+save_bundles precomputed, so a cached request parses and re-serializes
+nothing. Each entry carries an ETag derived from the bundle version
+(run_id, created_at). A client sending that ETag back in If-None-Match gets
+a 304 and no body.
+
+Freshness:
+  * save_bundles invalidates the saved users' entries once its write commits.
+  * Every lookup also checks the latest version with one indexed query
+    (no blob read), so bundles written by another process (CLI runs) are
+    picked up on the next request.
+
+Public API
+----------
+dashboard_cache.get(user_id)           → DashboardEntry | None
+dashboard_cache.invalidate(user_ids)   → None
+dashboard_cache.stats()                → dict
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .settings import get_settings
+
+
+@dataclass(frozen=True)
+class DashboardEntry:
+    etag: str
+    run_id: str
+    dashboard_json: str
+    signals_json: str
+
+    def dashboard(self) -> Dict[str, Any]:
+        return json.loads(self.dashboard_json)
+
+    def signals(self) -> Dict[str, Any]:
+        return json.loads(self.signals_json)
+
+
+def _etag(run_id: str, created_at: str) -> str:
+    digest = hashlib.sha1(f"{run_id}|{created_at}".encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+class DashboardCache:
+    """LRU of DashboardEntry keyed by (database path, user_id)."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[Tuple[str, str], DashboardEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def get(self, user_id: str) -> Optional[DashboardEntry]:
+        from . import event_store
+
+        key = (str(event_store.DB_PATH), user_id)
+        version = event_store.latest_bundle_version(user_id)
+        if version is None:
+            self._drop(key)
+            return None
+        etag = _etag(*version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.etag == etag:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return entry
+            self._counters["misses"] += 1
+
+        record = event_store.load_latest_bundle_record(user_id)
+        if record is None:
+            self._drop(key)
+            return None
+        entry = DashboardEntry(
+            etag=_etag(record["run_id"], record["created_at"]),
+            run_id=record["run_id"],
+            dashboard_json=record["bundle_json"],
+            signals_json=record["signals_json"],
+        )
+        if self.max_entries:
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        return entry
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate(self, user_ids: Iterable[str]) -> None:
+        from . import event_store
+
+        db = str(event_store.DB_PATH)
+        with self._lock:
+            for user_id in user_ids:
+                if self._entries.pop((db, user_id), None) is not None:
+                    self._counters["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "entries": size,
+            "max_entries": self.max_entries,
+            **counters,
+            "hit_ratio": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+dashboard_cache = DashboardCache(max_entries=get_settings().caches.dashboard_cache_size)
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 import json
+import logging
 import sqlite3
+import threading
 from contextlib import contextmanager
 from datetime import date, timedelta
 from pathlib import Path
-from typing import Any, Dict, Generator, List, Optional
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Set, Tuple
 
 from .models import AnalysisSnapshot, SignalEvent, UserReportBundle
 
+logger = logging.getLogger(__name__)
+
 DB_PATH = Path(__file__).resolve().parent.parent / "data" / "investora.db"
 
 _DDL = """
@@ -89,6 +93,65 @@ CREATE TABLE IF NOT EXISTS user_report_bundles (
 
 CREATE INDEX IF NOT EXISTS idx_urb_user_id ON user_report_bundles(user_id, run_date);
 
+CREATE TABLE IF NOT EXISTS ticker_artifacts (
+    run_id          TEXT NOT NULL,
+    ticker          TEXT NOT NULL,
+    run_date        TEXT NOT NULL,
+    fingerprint     TEXT NOT NULL,
+    score_json      TEXT NOT NULL,
+    rag_json        TEXT,
+    synthesis_json  TEXT,
+    created_at      TEXT NOT NULL,
+    PRIMARY KEY (run_id, ticker)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ta_ticker_created ON ticker_artifacts(ticker, created_at);
+
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run_id        TEXT PRIMARY KEY,
+    run_date      TEXT NOT NULL,
+    metrics_json  TEXT NOT NULL,
+    created_at    TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS webhook_outbox (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind            TEXT NOT NULL,
+    url             TEXT NOT NULL,
+    delivery_key    TEXT NOT NULL,
+    payload_json    TEXT NOT NULL,
+    status          TEXT NOT NULL DEFAULT 'pending',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    last_error      TEXT,
+    next_attempt_at TEXT NOT NULL,
+    lease_until     TEXT,
+    created_at      TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_wo_due ON webhook_outbox(status, next_attempt_at);
+
+CREATE TABLE IF NOT EXISTS run_stage_status (
+    run_id       TEXT NOT NULL,
+    stage        TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    nodes_json   TEXT NOT NULL DEFAULT '[]',
+    error_count  INTEGER NOT NULL DEFAULT 0,
+    errors_json  TEXT NOT NULL DEFAULT '[]',
+    started_at   TEXT,
+    finished_at  TEXT,
+    updated_at   TEXT NOT NULL,
+    PRIMARY KEY (run_id, stage)
+);
+
+CREATE TABLE IF NOT EXISTS rag_ingest_checkpoint (
+    namespace    TEXT NOT NULL,
+    vector_id    TEXT NOT NULL,
+    ticker       TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    ingested_at  TEXT NOT NULL,
+    PRIMARY KEY (namespace, vector_id)
+);
+
 CREATE TABLE IF NOT EXISTS api_budget_log (
     date         TEXT NOT NULL,
     provider     TEXT NOT NULL,
@@ -99,39 +162,191 @@ CREATE TABLE IF NOT EXISTS api_budget_log (
 """
 
 
-@contextmanager
-def _conn() -> Generator[sqlite3.Connection, None, None]:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    con = sqlite3.connect(str(DB_PATH))
+# Statement cache size for pooled connections. sqlite3 keeps compiled
+# statements per connection, so reusing one connection per thread turns the
+# fixed SQL strings below into prepared statements.
+_STATEMENT_CACHE_SIZE = 256
+
+# Per-thread connection pool: {db_path: sqlite3.Connection}. Connections are
+# opened lazily, configured once (WAL, foreign keys) and kept for the life of
+# the thread, so API handlers and graph nodes no longer pay connect + PRAGMA
+# cost on every call.
+_local = threading.local()
+
+
+def _open_connection(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(path), cached_statements=_STATEMENT_CACHE_SIZE)
     con.row_factory = sqlite3.Row
     con.execute("PRAGMA journal_mode=WAL")
     con.execute("PRAGMA foreign_keys=ON")
+    # NORMAL is durable against corruption in WAL mode and avoids an fsync per commit.
+    con.execute("PRAGMA synchronous=NORMAL")
+    return con
+
+
+def _pooled_connection() -> sqlite3.Connection:
+    pool: Optional[Dict[str, sqlite3.Connection]] = getattr(_local, "pool", None)
+    if pool is None:
+        pool = {}
+        _local.pool = pool
+    key = str(DB_PATH)
+    con = pool.get(key)
+    if con is None:
+        con = _open_connection(DB_PATH)
+        pool[key] = con
+    return con
+
+
+def close_connections() -> None:
+    """Close every pooled connection owned by the calling thread."""
+    pool: Dict[str, sqlite3.Connection] = getattr(_local, "pool", None) or {}
+    for con in pool.values():
+        try:
+            con.close()
+        except sqlite3.Error:
+            pass
+    pool.clear()
+    _local.depth = 0
+    _local.after_commit = []
+
+
+def _after_commit(callback: Callable[[], None]) -> None:
+    """Run callback once the current write is committed.
+
+    Outside transaction() the caller's write has already committed, so the
+    callback runs immediately; inside it is deferred to the outermost commit
+    and dropped on rollback.
+    """
+    if getattr(_local, "depth", 0):
+        pending: List[Callable[[], None]] = getattr(_local, "after_commit", None) or []
+        pending.append(callback)
+        _local.after_commit = pending
+        return
+    callback()
+
+
+def _run_after_commit_callbacks() -> None:
+    pending: List[Callable[[], None]] = getattr(_local, "after_commit", None) or []
+    _local.after_commit = []
+    for callback in pending:
+        callback()
+
+
+@contextmanager
+def _conn() -> Generator[sqlite3.Connection, None, None]:
+    con = _pooled_connection()
+    if getattr(_local, "depth", 0):
+        # Inside transaction(): the outermost block owns commit/rollback.
+        yield con
+        return
     try:
         yield con
         con.commit()
     except Exception:
         con.rollback()
         raise
+
+
+@contextmanager
+def transaction() -> Generator[sqlite3.Connection, None, None]:
+    """Group several event_store writes on this thread into one SQLite transaction.
+
+    Nested blocks join the outermost transaction; only the outermost block
+    commits (or rolls back on error).
+    """
+    con = _pooled_connection()
+    outermost = not getattr(_local, "depth", 0)
+    _local.depth = getattr(_local, "depth", 0) + 1
+    try:
+        yield con
+        if outermost:
+            con.commit()
+    except Exception:
+        if outermost:
+            con.rollback()
+            _local.after_commit = []
+        raise
     finally:
-        con.close()
+        _local.depth -= 1
+    if outermost:
+        _run_after_commit_callbacks()
+
+
+# Columns added after a table first shipped: {table: [(column, declaration)]}.
+_ADDED_COLUMNS: Dict[str, List[tuple]] = {
+    "user_report_bundles": [("signals_json", "TEXT")],
+    "webhook_outbox": [("lease_until", "TEXT")],
+}
+
+# Database files whose schema is known to be current in this process.
+_initialized_paths: set = set()
+_init_lock = threading.Lock()
 
 
 def init_db() -> None:
-    """Create tables and indexes if they don't exist. Idempotent."""
-    with _conn() as con:
-        con.executescript(_DDL)
+    """Create tables and indexes if they don't exist. Idempotent.
+
+    The DDL script runs once per database file and process; later calls
+    (every API handler makes one) only check that the file still exists.
+    """
+    key = str(DB_PATH)
+    if key in _initialized_paths and DB_PATH.exists():
+        return
+    with _init_lock:
+        with _conn() as con:
+            con.executescript(_DDL)
+            for table, columns in _ADDED_COLUMNS.items():
+                existing = {row["name"] for row in con.execute(f"PRAGMA table_info({table})")}
+                for column, declaration in columns:
+                    if column not in existing:
+                        con.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+        _initialized_paths.add(key)
+
+
+_UPSERT_RUN_SQL = """
+    INSERT OR REPLACE INTO analysis_runs
+        (run_id, run_date, timestamp, scope, tickers_json,
+         scores_json, failed_tickers_json, error_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPSERT_SIGNAL_SQL = """
+    INSERT OR REPLACE INTO signal_events
+        (id, run_id, run_date, timestamp, ticker, signal_type,
+         direction, severity, confidence, score, narrative, route)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPSERT_BUNDLE_SQL = """
+    INSERT OR REPLACE INTO user_report_bundles
+        (user_id, run_id, run_date, bundle_json, signals_json, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+def _signal_row(ev: SignalEvent) -> tuple:
+    return (
+        ev["id"],
+        ev["run_id"],
+        ev["run_date"],
+        ev["timestamp"],
+        ev["ticker"],
+        ev["signal_type"],
+        ev["direction"],
+        ev["severity"],
+        ev["confidence"],
+        ev["score"],
+        ev.get("narrative"),
+        ev["route"],
+    )
 
 
 def persist_run(snapshot: AnalysisSnapshot) -> None:
-    """Insert or replace an analysis run and its signal events."""
+    """Insert or replace an analysis run and its signal events in one transaction."""
     with _conn() as con:
         con.execute(
-            """
-            INSERT OR REPLACE INTO analysis_runs
-                (run_id, run_date, timestamp, scope, tickers_json,
-                 scores_json, failed_tickers_json, error_count)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+            _UPSERT_RUN_SQL,
             (
                 snapshot["run_id"],
                 snapshot["run_date"],
@@ -143,29 +358,25 @@ def persist_run(snapshot: AnalysisSnapshot) -> None:
                 snapshot["error_count"],
             ),
         )
-        for ev in snapshot["signal_events"]:
-            con.execute(
-                """
-                INSERT OR REPLACE INTO signal_events
-                    (id, run_id, run_date, timestamp, ticker, signal_type,
-                     direction, severity, confidence, score, narrative, route)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    ev["id"],
-                    ev["run_id"],
-                    ev["run_date"],
-                    ev["timestamp"],
-                    ev["ticker"],
-                    ev["signal_type"],
-                    ev["direction"],
-                    ev["severity"],
-                    ev["confidence"],
-                    ev["score"],
-                    ev.get("narrative"),
-                    ev["route"],
-                ),
-            )
+        con.executemany(_UPSERT_SIGNAL_SQL, (_signal_row(ev) for ev in snapshot["signal_events"]))
+    _after_commit(lambda: _mirror_to_history(snapshot))
+
+
+def _mirror_to_history(snapshot: AnalysisSnapshot) -> None:
+    """Append a committed run to the optional columnar history store.
+
+    SQLite stays the source of truth: mirror failures are logged, never raised,
+    and the store can be rebuilt with ``python -m app.history_store rebuild``.
+    """
+    from .history_store import get_history_store
+
+    store = get_history_store()
+    if store is None:
+        return
+    try:
+        store.append_run(snapshot)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("history_store: failed to mirror run %s: %s", snapshot.get("run_id"), exc)
 
 
 def load_history(
@@ -253,6 +464,235 @@ def load_recent_runs(limit: int = 10) -> List[Dict[str, Any]]:
     ]
 
 
+def latest_run_id(exclude_run_id: Optional[str] = None) -> Optional[str]:
+    """run_id of the most recent persisted run other than exclude_run_id."""
+    with _conn() as con:
+        row = con.execute(
+            "SELECT run_id FROM analysis_runs WHERE run_id != ? ORDER BY timestamp DESC LIMIT 1",
+            (exclude_run_id or "",),
+        ).fetchone()
+    return row["run_id"] if row else None
+
+
+def load_signal_events_between(start_date: str, end_date: str, run_limit: int = 60) -> List[SignalEvent]:
+    """Signal events of the `run_limit` most recent runs dated within [start_date, end_date].
+
+    One query instead of load_recent_runs + load_run per run; events come back
+    newest run first, then by ticker and signal type, as load_run orders them.
+    """
+    with _conn() as con:
+        rows = con.execute(
+            """
+            SELECT s.*
+            FROM (
+                SELECT run_id, run_date AS r_date, timestamp AS r_ts
+                FROM analysis_runs
+                ORDER BY timestamp DESC
+                LIMIT ?
+            ) r
+            JOIN signal_events s ON s.run_id = r.run_id
+            WHERE r.r_date BETWEEN ? AND ?
+            ORDER BY r.r_ts DESC, s.ticker, s.signal_type
+            """,
+            (run_limit, start_date, end_date),
+        ).fetchall()
+    return [_row_to_signal(r) for r in rows]
+
+
+# ---------------------------------------------------------------------------
+# Per-ticker run artifacts (incremental runs)
+# ---------------------------------------------------------------------------
+
+_UPSERT_ARTIFACT_SQL = """
+    INSERT OR REPLACE INTO ticker_artifacts
+        (run_id, ticker, run_date, fingerprint, score_json, rag_json, synthesis_json, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _json_or_none(value: Any) -> Optional[str]:
+    return None if value is None else json.dumps(value)
+
+
+def save_ticker_artifacts(run_id: str, run_date: str, artifacts: List[Dict[str, Any]]) -> int:
+    """Store each ticker's input fingerprint, score, RAG context and synthesis for a run.
+
+    artifacts: [{ticker, fingerprint, score, rag_context|None, synthesis|None}]
+    """
+    from datetime import datetime, timezone
+
+    if not artifacts:
+        return 0
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [
+        (
+            run_id,
+            a["ticker"],
+            run_date,
+            a["fingerprint"],
+            json.dumps(a.get("score") or {}),
+            _json_or_none(a.get("rag_context")),
+            _json_or_none(a.get("synthesis")),
+            now,
+        )
+        for a in artifacts
+    ]
+    with _conn() as con:
+        con.executemany(_UPSERT_ARTIFACT_SQL, rows)
+    return len(rows)
+
+
+def save_run_metrics(run_id: str, run_date: str, metrics: Dict[str, Any]) -> None:
+    """Store a run's metrics breakdown (node timings, error counts, stage stats)."""
+    from datetime import datetime, timezone
+
+    now = datetime.now(timezone.utc).isoformat()
+    with _conn() as con:
+        con.execute(
+            "INSERT OR REPLACE INTO run_metrics (run_id, run_date, metrics_json, created_at) VALUES (?, ?, ?, ?)",
+            (run_id, run_date, json.dumps(metrics, default=str), now),
+        )
+
+
+def load_run_metrics(run_id: str) -> Optional[Dict[str, Any]]:
+    with _conn() as con:
+        row = con.execute(
+            "SELECT run_id, run_date, metrics_json, created_at FROM run_metrics WHERE run_id = ?", (run_id,)
+        ).fetchone()
+    if row is None:
+        return None
+    return {
+        "run_id": row["run_id"],
+        "run_date": row["run_date"],
+        "created_at": row["created_at"],
+        "metrics": json.loads(row["metrics_json"]),
+    }
+
+
+_UPSERT_STAGE_SQL = """
+INSERT INTO run_stage_status
+    (run_id, stage, status, nodes_json, error_count, errors_json, started_at, finished_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(run_id, stage) DO UPDATE SET
+    status      = excluded.status,
+    nodes_json  = excluded.nodes_json,
+    error_count = excluded.error_count,
+    errors_json = excluded.errors_json,
+    started_at  = COALESCE(excluded.started_at, run_stage_status.started_at),
+    finished_at = excluded.finished_at,
+    updated_at  = excluded.updated_at
+"""
+
+
+def save_run_stage(
+    run_id: str,
+    stage: str,
+    status: str,
+    *,
+    nodes: Optional[Dict[str, float]] = None,
+    errors: Optional[List[Dict[str, Any]]] = None,
+    started_at: Optional[str] = None,
+    finished_at: Optional[str] = None,
+) -> None:
+    """Upsert the status of one execution stage ('core' or 'tail') of a run."""
+    from datetime import datetime, timezone
+
+    errors = errors or []
+    now = datetime.now(timezone.utc).isoformat()
+    with _conn() as con:
+        con.execute(
+            _UPSERT_STAGE_SQL,
+            (
+                run_id,
+                stage,
+                status,
+                json.dumps(nodes or {}),
+                len(errors),
+                json.dumps(errors, default=str),
+                started_at,
+                finished_at,
+                now,
+            ),
+        )
+
+
+def fail_unfinished_run_stages(stage: str, error: str) -> List[str]:
+    """Mark every 'queued' or 'running' row of a stage as 'failed'. Returns the affected run_ids."""
+    from datetime import datetime, timezone
+
+    now = datetime.now(timezone.utc).isoformat()
+    errors = json.dumps([{"ticker": "*", "tool": f"{stage}_stage", "error": error}])
+    with _conn() as con:
+        rows = con.execute(
+            """
+            UPDATE run_stage_status
+            SET status = 'failed', error_count = 1, errors_json = ?, finished_at = ?, updated_at = ?
+            WHERE stage = ? AND status IN ('queued', 'running')
+            RETURNING run_id
+            """,
+            (errors, now, now, stage),
+        ).fetchall()
+    return sorted(r["run_id"] for r in rows)
+
+
+def load_run_stages(run_id: str) -> List[Dict[str, Any]]:
+    """Stage status rows for a run, core first."""
+    with _conn() as con:
+        rows = con.execute(
+            "SELECT * FROM run_stage_status WHERE run_id = ? ORDER BY started_at, stage", (run_id,)
+        ).fetchall()
+    return [
+        {
+            "run_id": r["run_id"],
+            "stage": r["stage"],
+            "status": r["status"],
+            "node_timings": json.loads(r["nodes_json"]),
+            "error_count": r["error_count"],
+            "errors": json.loads(r["errors_json"]),
+            "started_at": r["started_at"],
+            "finished_at": r["finished_at"],
+            "updated_at": r["updated_at"],
+        }
+        for r in rows
+    ]
+
+
+def load_latest_ticker_artifacts(tickers: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Most recent stored artifacts for each ticker: {ticker: {run_id, fingerprint, score, ...}}."""
+    wanted = sorted({t.upper() for t in tickers})
+    if not wanted:
+        return {}
+    out: Dict[str, Dict[str, Any]] = {}
+    with _conn() as con:
+        # Stay well under SQLite's bound-parameter limit on large universes.
+        for start in range(0, len(wanted), 500):
+            chunk = wanted[start : start + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            rows = con.execute(
+                f"""
+                SELECT a.*
+                FROM ticker_artifacts a
+                JOIN (
+                    SELECT ticker, MAX(created_at) AS latest
+                    FROM ticker_artifacts
+                    WHERE ticker IN ({placeholders})
+                    GROUP BY ticker
+                ) l ON l.ticker = a.ticker AND l.latest = a.created_at
+                """,
+                chunk,
+            ).fetchall()
+            for r in rows:
+                out[r["ticker"]] = {
+                    "run_id": r["run_id"],
+                    "run_date": r["run_date"],
+                    "fingerprint": r["fingerprint"],
+                    "score": json.loads(r["score_json"]),
+                    "rag_context": json.loads(r["rag_json"]) if r["rag_json"] is not None else None,
+                    "synthesis": json.loads(r["synthesis_json"]) if r["synthesis_json"] is not None else None,
+                }
+    return out
+
+
 import uuid as _uuid
 
 
@@ -385,6 +825,33 @@ def mark_alert_triggered(alert_id: str) -> None:
         )
 
 
+def mark_alerts_triggered(alert_ids: Iterable[str]) -> List[str]:
+    """Mark many alerts triggered in one transaction.
+
+    Only alerts still 'active' are updated, and their ids are returned. Two
+    evaluators racing on the same alert (a graph run and the alert monitor)
+    therefore never both get to deliver it.
+    """
+    from datetime import datetime, timezone
+
+    ids = list(dict.fromkeys(alert_ids))
+    if not ids:
+        return []
+    now = datetime.now(timezone.utc).isoformat()
+    claimed: List[str] = []
+    with _conn() as con:
+        # Chunked to stay under SQLite's bound-parameter limit.
+        for start in range(0, len(ids), 500):
+            chunk = ids[start : start + 500]
+            rows = con.execute(
+                f"UPDATE user_alerts SET status = 'triggered', last_triggered_at = ? "
+                f"WHERE status = 'active' AND id IN ({','.join('?' * len(chunk))}) RETURNING id",
+                (now, *chunk),
+            ).fetchall()
+            claimed.extend(r[0] for r in rows)
+    return claimed
+
+
 def _row_to_alert(row: sqlite3.Row) -> Dict[str, Any]:
     return {
         "id": row["id"],
@@ -479,6 +946,18 @@ def create_user(user_id: str, username: str, password_hash: str) -> None:
         )
 
 
+def update_user_password_hash(user_id: str, password_hash: str) -> None:
+    """Replace a user's password hash (re-hash after a KDF cost change)."""
+    from datetime import datetime, timezone
+
+    now = datetime.now(timezone.utc).isoformat()
+    with _conn() as con:
+        con.execute(
+            "UPDATE users SET password_hash = ?, updated_at = ? WHERE user_id = ?",
+            (password_hash, now, user_id),
+        )
+
+
 def load_user_by_username(username: str) -> Optional[Dict[str, Any]]:
     """Return a user record by normalized username, or None."""
     normalized_username = username.strip().lower()
@@ -508,41 +987,107 @@ def load_user_by_username(username: str) -> Optional[Dict[str, Any]]:
 
 def save_bundle(bundle: UserReportBundle) -> None:
     """Upsert a UserReportBundle to user_report_bundles."""
+    save_bundles([bundle])
+
+
+def bundle_signals(bundle: Dict[str, Any]) -> Dict[str, Any]:
+    """The watchlist/discovery slice served by /user/{user_id}/personalized-signals."""
+    return {
+        "watchlist_signals": bundle.get("watchlist_signals", []),
+        "discovery_signals": bundle.get("discovery_signals", []),
+    }
+
+
+def serialize_bundle(bundle: UserReportBundle) -> Tuple[str, str, str, str, str]:
+    """(user_id, run_id, run_date, bundle_json, signals_json) for save_serialized_bundles.
+
+    Raises if the bundle is not JSON-serializable, so callers can isolate the
+    failure to one user. The personalized-signals slice is serialized here
+    too, so the read path never has to parse the full bundle to serve it.
+    """
+    return (
+        bundle["user_id"],
+        bundle["run_id"],
+        bundle["run_date"],
+        json.dumps(bundle),
+        json.dumps(bundle_signals(bundle)),
+    )
+
+
+def save_bundles(bundles: Iterable[UserReportBundle]) -> int:
+    """Bulk-upsert UserReportBundles in a single transaction. Returns rows written.
+
+    Raises if any bundle is not serializable; use serialize_bundle per user
+    and save_serialized_bundles to write the rest anyway.
+    """
+    return save_serialized_bundles([serialize_bundle(bundle) for bundle in bundles])
+
+
+def save_serialized_bundles(serialized: Iterable[Tuple[str, str, str, str, str]]) -> int:
+    """Bulk-upsert rows from serialize_bundle in a single transaction. Returns rows written."""
     from datetime import datetime, timezone
     now = datetime.now(timezone.utc).isoformat()
-    bundle_str = json.dumps(bundle)  # will raise if not serializable — intentional
+    rows = [(*row, now) for row in serialized]
+    if not rows:
+        return 0
     with _conn() as con:
-        con.execute(
-            """
-            INSERT OR REPLACE INTO user_report_bundles
-                (user_id, run_id, run_date, bundle_json, created_at)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (
-                bundle["user_id"],
-                bundle["run_id"],
-                bundle["run_date"],
-                bundle_str,
-                now,
-            ),
-        )
+        con.executemany(_UPSERT_BUNDLE_SQL, rows)
+    user_ids = [row[0] for row in rows]
+    _after_commit(lambda: _invalidate_dashboard_cache(user_ids))
+    return len(rows)
+
+
+def _invalidate_dashboard_cache(user_ids: List[str]) -> None:
+    from .dashboard_cache import dashboard_cache
+
+    dashboard_cache.invalidate(user_ids)
+
+
+_LATEST_BUNDLE_ORDER = "WHERE user_id = ? ORDER BY run_date DESC, created_at DESC LIMIT 1"
 
 
 def load_latest_bundle(user_id: str) -> Optional[Dict[str, Any]]:
     """Return the most recent UserReportBundle for a user, or None."""
     with _conn() as con:
         row = con.execute(
-            """
-            SELECT bundle_json FROM user_report_bundles
-            WHERE user_id = ?
-            ORDER BY run_date DESC, created_at DESC
-            LIMIT 1
-            """,
+            f"SELECT bundle_json FROM user_report_bundles {_LATEST_BUNDLE_ORDER}",
             (user_id,),
         ).fetchone()
     return json.loads(row["bundle_json"]) if row else None
 
 
+def latest_bundle_version(user_id: str) -> Optional[tuple]:
+    """(run_id, created_at) of the user's latest bundle, without reading the blob."""
+    with _conn() as con:
+        row = con.execute(
+            f"SELECT run_id, created_at FROM user_report_bundles {_LATEST_BUNDLE_ORDER}",
+            (user_id,),
+        ).fetchone()
+    return (row["run_id"], row["created_at"]) if row else None
+
+
+def load_latest_bundle_record(user_id: str) -> Optional[Dict[str, Any]]:
+    """Latest bundle row as stored: raw bundle/signals JSON text plus its version."""
+    with _conn() as con:
+        row = con.execute(
+            "SELECT run_id, created_at, bundle_json, signals_json "
+            f"FROM user_report_bundles {_LATEST_BUNDLE_ORDER}",
+            (user_id,),
+        ).fetchone()
+    if row is None:
+        return None
+    signals_json = row["signals_json"]
+    if signals_json is None:
+        # Written before signals_json existed.
+        signals_json = json.dumps(bundle_signals(json.loads(row["bundle_json"])))
+    return {
+        "run_id": row["run_id"],
+        "created_at": row["created_at"],
+        "bundle_json": row["bundle_json"],
+        "signals_json": signals_json,
+    }
+
+
 def _row_to_signal(row: sqlite3.Row) -> SignalEvent:
     return SignalEvent(
         id=row["id"],
@@ -564,8 +1109,8 @@ def _row_to_signal(row: sqlite3.Row) -> SignalEvent:
 # API budget log helpers (v3 Iteration 2)
 # ---------------------------------------------------------------------------
 
-def record_api_call(date_str: str, provider: str, run_id: str) -> None:
-    """Upsert one API call into api_budget_log, incrementing call_count.
+def record_api_call(date_str: str, provider: str, run_id: str, calls: int = 1) -> None:
+    """Upsert API calls into api_budget_log, incrementing call_count by `calls`.
 
     Uses SQLite ON CONFLICT to atomically increment the counter for the
     (date, provider) primary key.  Called by BudgetManager.record_call().
@@ -574,12 +1119,12 @@ def record_api_call(date_str: str, provider: str, run_id: str) -> None:
         con.execute(
             """
             INSERT INTO api_budget_log (date, provider, call_count, run_id)
-            VALUES (?, ?, 1, ?)
+            VALUES (?, ?, ?, ?)
             ON CONFLICT(date, provider) DO UPDATE SET
-                call_count = call_count + 1,
+                call_count = call_count + excluded.call_count,
                 run_id     = excluded.run_id
             """,
-            (date_str, provider, run_id),
+            (date_str, provider, calls, run_id),
         )
 
 
@@ -594,3 +1139,149 @@ def get_api_budget_usage(date_str: str) -> Dict[str, int]:
             (date_str,),
         ).fetchall()
     return {r["provider"]: r["call_count"] for r in rows}
+
+
+# ---------------------------------------------------------------------------
+# Webhook retry outbox
+# ---------------------------------------------------------------------------
+
+def enqueue_webhooks(messages: Iterable[Dict[str, Any]]) -> int:
+    """Queue failed webhook sends for retry. Returns rows written.
+
+    Each message: kind, url, delivery_key, payload, error, next_attempt_at,
+    and optionally status ('pending' or 'dead') and attempts.
+    """
+    from datetime import datetime, timezone
+    now = datetime.now(timezone.utc).isoformat()
+    rows = [
+        (
+            m["kind"],
+            m["url"],
+            m["delivery_key"],
+            json.dumps(m["payload"]),
+            m.get("status", "pending"),
+            int(m.get("attempts", 1)),
+            m.get("error"),
+            m["next_attempt_at"],
+            now,
+        )
+        for m in messages
+    ]
+    if not rows:
+        return 0
+    with _conn() as con:
+        con.executemany(
+            """
+            INSERT INTO webhook_outbox
+                (kind, url, delivery_key, payload_json, status, attempts, last_error, next_attempt_at, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    return len(rows)
+
+
+def claim_due_webhooks(now_iso: str, lease_until_iso: str, limit: int = 200) -> List[Dict[str, Any]]:
+    """Atomically claim due outbox rows for sending, oldest first.
+
+    Pending rows whose retry time has come, plus 'sending' rows whose lease has
+    expired (a drainer that died mid-send), are moved to 'sending' until
+    ``lease_until_iso`` in a single UPDATE, so two drainers never post the same
+    row. The claimer finishes them with complete_webhooks.
+    """
+    with _conn() as con:
+        rows = con.execute(
+            """
+            UPDATE webhook_outbox SET status = 'sending', lease_until = ?
+            WHERE id IN (
+                SELECT id FROM webhook_outbox
+                WHERE (status = 'pending' AND next_attempt_at <= ?)
+                   OR (status = 'sending' AND lease_until <= ?)
+                ORDER BY next_attempt_at, id
+                LIMIT ?
+            )
+            RETURNING *
+            """,
+            (lease_until_iso, now_iso, now_iso, limit),
+        ).fetchall()
+    rows = sorted(rows, key=lambda r: (r["next_attempt_at"], r["id"]))
+    return [
+        {
+            "id": r["id"],
+            "kind": r["kind"],
+            "url": r["url"],
+            "delivery_key": r["delivery_key"],
+            "payload": json.loads(r["payload_json"]),
+            "attempts": r["attempts"],
+            "last_error": r["last_error"],
+        }
+        for r in rows
+    ]
+
+
+def complete_webhooks(
+    delivered_ids: Iterable[int],
+    retries: Iterable[Dict[str, Any]] = (),
+) -> None:
+    """Delete delivered outbox rows and reschedule failed ones in one transaction.
+
+    Each retry: id, attempts, error, next_attempt_at, status. Rescheduled rows
+    release their claim.
+    """
+    delivered = [(i,) for i in delivered_ids]
+    updates = [(r["status"], r["attempts"], r["error"], r["next_attempt_at"], r["id"]) for r in retries]
+    if not delivered and not updates:
+        return
+    with _conn() as con:
+        con.executemany("DELETE FROM webhook_outbox WHERE id = ?", delivered)
+        con.executemany(
+            "UPDATE webhook_outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?, lease_until = NULL "
+            "WHERE id = ?",
+            updates,
+        )
+
+
+def webhook_outbox_counts() -> Dict[str, int]:
+    """Outbox rows by status."""
+    with _conn() as con:
+        rows = con.execute("SELECT status, COUNT(*) AS n FROM webhook_outbox GROUP BY status").fetchall()
+    return {r["status"]: r["n"] for r in rows}
+
+
+# ---------------------------------------------------------------------------
+# RAG ingestion checkpoint
+# ---------------------------------------------------------------------------
+
+def record_ingested_vectors(namespace: str, rows: Iterable[Dict[str, Any]]) -> int:
+    """Mark vectors as present in the index. Each row: vector_id, ticker, content_hash."""
+    from datetime import datetime, timezone
+    now = datetime.now(timezone.utc).isoformat()
+    values = [(namespace, r["vector_id"], r["ticker"], r["content_hash"], now) for r in rows]
+    if not values:
+        return 0
+    with _conn() as con:
+        con.executemany(
+            """
+            INSERT OR REPLACE INTO rag_ingest_checkpoint
+                (namespace, vector_id, ticker, content_hash, ingested_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            values,
+        )
+    return len(values)
+
+
+def load_ingested_ids(namespace: str) -> Set[str]:
+    """Vector ids already recorded in the checkpoint for a namespace."""
+    with _conn() as con:
+        rows = con.execute(
+            "SELECT vector_id FROM rag_ingest_checkpoint WHERE namespace = ?", (namespace,)
+        ).fetchall()
+    return {r["vector_id"] for r in rows}
+
+
+def clear_ingested_vectors(namespace: str) -> int:
+    """Forget the checkpoint of a namespace (after the index itself was wiped)."""
+    with _conn() as con:
+        cur = con.execute("DELETE FROM rag_ingest_checkpoint WHERE namespace = ?", (namespace,))
+    return cur.rowcount
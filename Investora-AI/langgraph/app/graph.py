@@ -6,7 +6,7 @@ from functools import lru_cache
 from typing import Callable
 
 from .graph_constants import DEFAULT_UNIVERSE, REPORT_DIR, UNIVERSE_PATH
-from .metrics import record_node_timing
+from .metrics import record_error, record_node_timing
 from .node_registry import NODE_REGISTRY
 from .state import GraphState
 
@@ -20,7 +20,9 @@ _REPORT_DIR = REPORT_DIR
 init_state = NODE_REGISTRY["init_state"]
 plan_next_action = NODE_REGISTRY["plan_next_action"]
 execute_tool_action = NODE_REGISTRY["execute_tool_action"]
+collect_sharded_node = NODE_REGISTRY["collect_sharded"]
 compute_scores_node = NODE_REGISTRY["compute_scores"]
+reuse_prior_artifacts_node = NODE_REGISTRY["reuse_prior_artifacts"]
 detect_anomalies_node = NODE_REGISTRY["detect_anomalies"]
 retrieve_rag_context_node = NODE_REGISTRY["retrieve_rag_context"]
 synthesize_evidence_node = NODE_REGISTRY["synthesize_evidence"]
@@ -34,25 +36,36 @@ assemble_markdown_node = NODE_REGISTRY["assemble_markdown"]
 post_to_n8n_node = NODE_REGISTRY["post_to_n8n"]
 persist_report_node = NODE_REGISTRY["persist_report"]
 persist_snapshot_node = NODE_REGISTRY["persist_snapshot"]
+post_monitor_event_node = NODE_REGISTRY["post_monitor_event"]
 
 
 def planner_router(state: GraphState) -> str:
     action = state.get("action")
-    if action in {"market", "fundamentals", "news"}:
+    if action in {"market", "fundamentals", "news", "fetch_all"}:
         return "execute_tool_action"
+    if action == "collect_sharded":
+        return "collect_sharded"
     return "compute"
 
 
 def _timed_node(name: str, fn: Callable[[GraphState], GraphState]) -> Callable[[GraphState], GraphState]:
     def _wrapped(state: GraphState) -> GraphState:
+        errors_before = len(state.get("errors") or [])
         started = time.perf_counter()
-        out = fn(state)
+        try:
+            out = fn(state)
+        except Exception:
+            record_error("node", name)
+            raise
         duration_ms = round((time.perf_counter() - started) * 1000.0, 2)
         record_node_timing(name, duration_ms)
+        for error in (out.get("errors") or [])[errors_before:]:
+            record_error("tool", str(error.get("tool", "unknown")))
         timings = out.get("node_timings")
         if not isinstance(timings, dict):
             timings = {}
-        timings[name] = duration_ms
+        # Planner-loop nodes run many times per run; their entry is the total.
+        timings[name] = round(float(timings.get(name, 0.0)) + duration_ms, 2)
         out["node_timings"] = timings
         logger.info(
             "node_timing",
@@ -63,15 +76,19 @@ def _timed_node(name: str, fn: Callable[[GraphState], GraphState]) -> Callable[[
     return _wrapped
 
 
-@lru_cache(maxsize=1)
-def _compiled_graph_singleton():
+@lru_cache(maxsize=3)
+def _compiled_graph_singleton(phase: str = "full"):
     from .graph_builder import compile_graph
 
-    return compile_graph(timed_node=_timed_node, planner_router=planner_router)
+    return compile_graph(timed_node=_timed_node, planner_router=planner_router, phase=phase)  # type: ignore[arg-type]
 
 
-def build_graph(force_rebuild: bool = False):
-    """Return compiled graph app; cached singleton by default for performance."""
+def build_graph(force_rebuild: bool = False, phase: str = "full"):
+    """Return compiled graph app; cached singleton per phase by default for performance.
+
+    phase="full" is the single end-to-end graph. Split-phase runs use "core"
+    (through persist_snapshot) and then "tail" (delivery, report, monitor event).
+    """
     if force_rebuild:
         _compiled_graph_singleton.cache_clear()
-    return _compiled_graph_singleton()
+    return _compiled_graph_singleton(phase)
@@ -1,76 +1,104 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Callable
+from typing import Any, Callable, Dict, List, Literal, Union
 
-from langgraph.graph import END, StateGraph
+from langgraph.graph import END, START, StateGraph
 
+from .graph_topology import COLLECTION_NODES, phase_dependencies
 from .node_registry import NODE_REGISTRY
-from .state import GraphState
+from .state import STATE_REDUCERS, GraphState
+
+GraphPhase = Literal["full", "core", "tail"]
+
+# Linear order of each phase's nodes (topological; branches are interleaved).
+PHASE_SEQUENCES: Dict[str, List[str]] = {phase: list(phase_dependencies(phase)) for phase in ("full", "core", "tail")}
+
+_MISSING = object()
+
+
+def _branch_update(fn: Callable[[GraphState], GraphState]) -> Callable[[GraphState], Dict[str, Any]]:
+    """Run a node on its own copy of the reduced keys and return only what it changed.
+
+    Nodes mutate and return the whole state. Parallel branches would then
+    share the errors list and collide on every key, so each node gets private
+    copies of the reduced keys and the graph receives: the errors it added,
+    the reduced dicts, and only the keys the node re-assigned.
+    """
+
+    def _wrapped(state: GraphState) -> Dict[str, Any]:
+        view: Dict[str, Any] = dict(state)
+        view["errors"] = list(state.get("errors") or [])
+        for key in STATE_REDUCERS:
+            if key != "errors" and key in state:
+                view[key] = dict(state[key] or {})
+        before = dict(view)
+        errors_before = len(view["errors"])
+
+        out = fn(view)  # type: ignore[arg-type]
+        update = {k: v for k, v in out.items() if k not in STATE_REDUCERS and before.get(k, _MISSING) is not v}
+        update["errors"] = list(out.get("errors") or [])[errors_before:]
+        for key in STATE_REDUCERS:
+            if key != "errors" and key in out:
+                update[key] = out[key]
+        return update
+
+    return _wrapped
 
 
 def compile_graph(
     *,
     timed_node: Callable[[str, Callable[[GraphState], GraphState]], Callable[[GraphState], GraphState]],
     planner_router: Callable[[GraphState], str],
+    phase: GraphPhase = "full",
 ):
     graph = StateGraph(GraphState)
+    dependencies = phase_dependencies(phase)
+    roots = [node for node, preds in dependencies.items() if not preds]
+    with_collection = phase != "tail"
+
+    for node_name in (list(COLLECTION_NODES) if with_collection else []) + list(dependencies):
+        graph.add_node(node_name, _branch_update(timed_node(node_name, NODE_REGISTRY[node_name])))
+
+    if with_collection:
+        graph.set_entry_point("init_state")
+        graph.add_edge("init_state", "plan_next_action")
+
+        def _route(state: GraphState) -> Union[str, List[str]]:
+            # "compute" fans out to every branch that starts after collection.
+            route = planner_router(state)
+            return list(roots) if route == "compute" else route
+
+        graph.add_conditional_edges(
+            "plan_next_action",
+            _route,
+            {"execute_tool_action": "execute_tool_action", "collect_sharded": "collect_sharded", **{r: r for r in roots}},
+        )
+
+        graph.add_edge("execute_tool_action", "plan_next_action")
+        graph.add_edge("collect_sharded", "plan_next_action")
+    else:
+        for root in roots:
+            graph.add_edge(START, root)
 
-    for node_name in (
-        "init_state",
-        "plan_next_action",
-        "execute_tool_action",
-        "compute_scores",
-        "detect_anomalies",
-        "retrieve_rag_context",
-        "synthesize_evidence",
-        "emit_signals",
-        "personalize_signals",
-        "check_user_alerts",
-        "post_alerts",
-        "post_candidates",
-        "assemble_report_json",
-        "assemble_markdown",
-        "post_to_n8n",
-        "persist_report",
-        "persist_snapshot",
-    ):
-        graph.add_node(node_name, timed_node(node_name, NODE_REGISTRY[node_name]))
-
-    graph.set_entry_point("init_state")
-    graph.add_edge("init_state", "plan_next_action")
-
-    graph.add_conditional_edges(
-        "plan_next_action",
-        planner_router,
-        {
-            "execute_tool_action": "execute_tool_action",
-            "compute": "compute_scores",
-        },
-    )
-
-    graph.add_edge("execute_tool_action", "plan_next_action")
-    graph.add_edge("compute_scores", "detect_anomalies")
-    graph.add_edge("detect_anomalies", "retrieve_rag_context")
-    graph.add_edge("retrieve_rag_context", "synthesize_evidence")
-    graph.add_edge("synthesize_evidence", "emit_signals")
-    graph.add_edge("emit_signals", "personalize_signals")
-    graph.add_edge("personalize_signals", "check_user_alerts")
-    graph.add_edge("check_user_alerts", "post_alerts")
-    graph.add_edge("post_alerts", "post_candidates")
-    graph.add_edge("post_candidates", "assemble_report_json")
-    graph.add_edge("assemble_report_json", "assemble_markdown")
-    graph.add_edge("assemble_markdown", "post_to_n8n")
-    graph.add_edge("post_to_n8n", "persist_report")
-    graph.add_edge("persist_report", "persist_snapshot")
-    graph.add_edge("persist_snapshot", END)
+    for node_name, preds in dependencies.items():
+        if len(preds) == 1:
+            graph.add_edge(preds[0], node_name)
+        elif preds:
+            # Join: runs once, after every branch it waits for has finished.
+            graph.add_edge(list(preds), node_name)
+    waited_on = {p for preds in dependencies.values() for p in preds}
+    for node_name in dependencies:
+        if node_name not in waited_on:
+            graph.add_edge(node_name, END)
 
     return graph.compile()
 
 
-@lru_cache(maxsize=1)
+@lru_cache(maxsize=3)
 def compile_graph_singleton(
     timed_node: Callable[[str, Callable[[GraphState], GraphState]], Callable[[GraphState], GraphState]],
     planner_router: Callable[[GraphState], str],
+    phase: GraphPhase = "full",
 ):
-    return compile_graph(timed_node=timed_node, planner_router=planner_router)
+    return compile_graph(timed_node=timed_node, planner_router=planner_router, phase=phase)
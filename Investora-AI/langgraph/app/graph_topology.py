@@ -0,0 +1,133 @@
+"""
+graph_topology.py
+-----------------
+Branch structure of the analysis graph and the per-run critical-path report.
+
+After collection, the graph is a DAG rather than a chain. Each node lists the
+nodes it waits for; nodes without predecessors start as soon as their phase
+does. LangGraph runs the DAG in supersteps: a node runs one step after the
+last of its predecessors, and all nodes of a step run concurrently. A step
+takes as long as its slowest node.
+
+  core:  compute_scores ─┬─ reuse_prior_artifacts → retrieve_rag_context → synthesize_evidence ─┬─ emit_signals → personalize_signals
+                         └─ detect_anomalies ─────────────────────────────────────────────────┘
+         check_user_alerts  (needs no run state; overlaps scoring)
+  tail:  post_alerts | post_candidates | assemble_report_json ─┬─ assemble_markdown
+                                                               ├─ post_to_n8n
+                                                               └─ persist_report
+
+In the "full" graph the tail starts once every core branch has finished, and
+persist_snapshot → post_monitor_event close the run. In the "core" graph
+persist_snapshot joins the core branches; the "tail" graph ends in
+post_monitor_event.
+
+Public API
+----------
+COLLECTION_NODES, CORE_DEPENDENCIES, TAIL_DEPENDENCIES
+phase_dependencies(phase)              → {node: (predecessors, ...)} in topological order
+supersteps(phase)                      → [[node, ...], ...]
+critical_path(node_timings, phase)     → dict
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Tuple
+
+# Collection loop: init_state -> plan_next_action <-> (execute_tool_action | collect_sharded).
+COLLECTION_NODES: Tuple[str, ...] = ("init_state", "plan_next_action", "execute_tool_action", "collect_sharded")
+
+CORE_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "compute_scores": (),
+    "check_user_alerts": (),
+    "reuse_prior_artifacts": ("compute_scores",),
+    "detect_anomalies": ("compute_scores",),
+    "retrieve_rag_context": ("reuse_prior_artifacts",),
+    "synthesize_evidence": ("retrieve_rag_context",),
+    "emit_signals": ("detect_anomalies", "synthesize_evidence"),
+    "personalize_signals": ("emit_signals",),
+}
+
+TAIL_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "post_alerts": (),
+    "post_candidates": (),
+    "assemble_report_json": (),
+    "assemble_markdown": ("assemble_report_json",),
+    "post_to_n8n": ("assemble_report_json",),
+    "persist_report": ("assemble_report_json",),
+}
+
+PHASES = ("full", "core", "tail")
+
+
+def _sinks(dependencies: Mapping[str, Tuple[str, ...]]) -> Tuple[str, ...]:
+    waited_on = {p for preds in dependencies.values() for p in preds}
+    return tuple(n for n in dependencies if n not in waited_on)
+
+
+def phase_dependencies(phase: str = "full") -> Dict[str, Tuple[str, ...]]:
+    """Post-collection DAG of one phase, in topological order."""
+    if phase not in PHASES:
+        raise ValueError(f"Unknown graph phase {phase!r}; expected one of {PHASES}")
+    deps: Dict[str, Tuple[str, ...]] = {}
+    if phase in ("full", "core"):
+        deps.update(CORE_DEPENDENCIES)
+    if phase in ("full", "tail"):
+        core_sinks = _sinks(CORE_DEPENDENCIES) if phase == "full" else ()
+        deps.update({n: preds or core_sinks for n, preds in TAIL_DEPENDENCIES.items()})
+    if phase in ("full", "core"):
+        deps["persist_snapshot"] = _sinks(deps)
+    if phase in ("full", "tail"):
+        deps["post_monitor_event"] = _sinks(deps)
+    return deps
+
+
+def supersteps(phase: str = "full") -> List[List[str]]:
+    """Nodes grouped by the superstep they run in (relative to the end of collection)."""
+    step: Dict[str, int] = {}
+    for node, preds in phase_dependencies(phase).items():
+        step[node] = 1 + max((step[p] for p in preds), default=-1)
+    out: List[List[str]] = [[] for _ in range(max(step.values()) + 1)]
+    for node, index in step.items():
+        out[index].append(node)
+    return out
+
+
+def critical_path(node_timings: Mapping[str, float], phase: str = "full") -> Dict[str, object]:
+    """Which nodes bound a run's latency, from its node_timings.
+
+    Collection nodes run one after another, so all of them are on the path.
+    After that every superstep lasts as long as its slowest node; that node
+    is the step's bound. The other nodes of the step have slack: they could
+    take that much longer without slowing the run. Nodes missing from
+    node_timings (not run yet, e.g. the tail of a split-phase run) count as 0.
+    """
+    timings = {k: float(v) for k, v in node_timings.items()}
+    collection = [n for n in COLLECTION_NODES if n in timings] if phase != "tail" else []
+    path: List[str] = list(collection)
+    critical_ms = sum(timings[n] for n in collection)
+    steps: List[Dict[str, object]] = []
+    slack: Dict[str, float] = {}
+    for nodes in supersteps(phase):
+        ran = [n for n in nodes if n in timings]
+        if not ran:
+            continue
+        bound = max(ran, key=lambda n: timings[n])
+        step_ms = timings[bound]
+        path.append(bound)
+        critical_ms += step_ms
+        steps.append({"nodes": ran, "bound_by": bound, "ms": round(step_ms, 2)})
+        slack.update({n: round(step_ms - timings[n], 2) for n in ran if n != bound})
+
+    total_ms = sum(timings.values())
+    bottleneck = max(path, key=lambda n: timings[n]) if path else None
+    return {
+        "phase": phase,
+        "path": path,
+        "critical_ms": round(critical_ms, 2),
+        "total_node_ms": round(total_ms, 2),
+        "parallel_savings_ms": round(max(0.0, total_ms - critical_ms), 2),
+        "bottleneck": bottleneck,
+        "bottleneck_share": round(timings[bottleneck] / critical_ms, 4) if bottleneck and critical_ms else 0.0,
+        "steps": steps,
+        "slack_ms": slack,
+    }
@@ -0,0 +1,331 @@
+"""
+history_store.py
+----------------
+Optional append-only columnar mirror of analysis runs for time-series reads.
+
+SQLite (``event_store``) stays the source of truth. When
+``FEATURE_COLUMNAR_HISTORY=true`` every committed ``persist_run`` is also
+written here as one immutable segment of NumPy column files, partitioned by
+run date and memory-mapped on read:
+
+    data/history/<run_date>/<run_id>/
+        scores.ticker.npy    scores.quality.npy   scores.momentum.npy   scores.overall.npy
+        signals.ticker.npy   signals.signal_type.npy   signals.score.npy
+        signals.confidence.npy   signals.timestamp.npy
+        meta.json            (written last; a segment without it is ignored)
+
+Per-ticker score history and cross-run score deltas are answered with
+vectorised masks over the mapped columns instead of materialising one dict
+per SQLite row. The segment listing is cached per partition and re-read only
+when the partition directory's mtime changes (a segment was added or
+replaced, possibly by another process).
+
+Public API
+----------
+get_history_store()                               → ColumnarHistoryStore | None
+ColumnarHistoryStore.append_run(snapshot)         → None
+ColumnarHistoryStore.score_history(ticker, ...)   → {column: ndarray}
+ColumnarHistoryStore.latest_run_scores(...)       → {ticker: {quality, momentum, overall}}
+ColumnarHistoryStore.run_scores(run_id)           → {ticker: {...}} | None (run not mirrored)
+ColumnarHistoryStore.score_deltas(run_id, ...)    → {column: ndarray}
+ColumnarHistoryStore.rebuild_from_sqlite()        → int
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .models import AnalysisSnapshot
+from .settings import get_settings
+
+
+_SCORE_COLUMNS = ("quality", "momentum", "overall")
+_TICKER_DTYPE = "U16"
+_SIGNAL_TYPE_DTYPE = "U32"
+_TIMESTAMP_DTYPE = "U40"
+
+
+@dataclass(frozen=True)
+class _Segment:
+    run_id: str
+    run_date: str
+    timestamp: str
+    path: Path
+
+    def column(self, table: str, name: str) -> np.ndarray:
+        return np.load(self.path / f"{table}.{name}.npy", mmap_mode="r")
+
+
+class ColumnarHistoryStore:
+    """Append-only, run-date-partitioned column files mirroring analysis runs."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        # partition name -> (directory mtime_ns, its committed segments)
+        self._partitions: Dict[str, Tuple[int, List[_Segment]]] = {}
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append_run(self, snapshot: AnalysisSnapshot) -> None:
+        """Write one run as an immutable segment (replacing an existing run_id)."""
+        run_id = snapshot["run_id"]
+        partition = self.root / snapshot["run_date"]
+        partition.mkdir(parents=True, exist_ok=True)
+
+        staging = partition / f".{run_id}.{uuid.uuid4().hex[:8]}.tmp"
+        staging.mkdir()
+        try:
+            scores = snapshot.get("scores") or {}
+            tickers = sorted(scores.keys())
+            np.save(staging / "scores.ticker.npy", np.array(tickers, dtype=_TICKER_DTYPE))
+            for col in _SCORE_COLUMNS:
+                values = [float(scores[t].get(col, 0.0)) for t in tickers]
+                np.save(staging / f"scores.{col}.npy", np.array(values, dtype=np.float64))
+
+            events = snapshot.get("signal_events") or []
+            np.save(staging / "signals.ticker.npy", np.array([e["ticker"] for e in events], dtype=_TICKER_DTYPE))
+            np.save(
+                staging / "signals.signal_type.npy",
+                np.array([e["signal_type"] for e in events], dtype=_SIGNAL_TYPE_DTYPE),
+            )
+            np.save(staging / "signals.score.npy", np.array([float(e["score"]) for e in events], dtype=np.float64))
+            np.save(
+                staging / "signals.confidence.npy",
+                np.array([float(e["confidence"]) for e in events], dtype=np.float64),
+            )
+            np.save(
+                staging / "signals.timestamp.npy",
+                np.array([e["timestamp"] for e in events], dtype=_TIMESTAMP_DTYPE),
+            )
+            meta = {"run_id": run_id, "run_date": snapshot["run_date"], "timestamp": snapshot["timestamp"]}
+            (staging / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+            target = partition / run_id
+            with self._lock:
+                if target.exists():
+                    shutil.rmtree(target)
+                os.replace(staging, target)
+                self._partitions.pop(partition.name, None)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    def rebuild_from_sqlite(self) -> int:
+        """Drop the store and re-mirror every run from SQLite. Returns runs written."""
+        from .event_store import _conn, load_run
+
+        with self._lock:
+            if self.root.exists():
+                shutil.rmtree(self.root)
+            self._partitions.clear()
+        with _conn() as con:
+            run_ids = [r["run_id"] for r in con.execute("SELECT run_id FROM analysis_runs").fetchall()]
+        written = 0
+        for run_id in run_ids:
+            snapshot = load_run(run_id)
+            if snapshot:
+                self.append_run(snapshot)
+                written += 1
+        return written
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def segments(self, since: Optional[str] = None) -> List[_Segment]:
+        """Committed segments with run_date >= since, newest timestamp first."""
+        if not self.root.exists():
+            return []
+        out: List[_Segment] = []
+        seen: Set[str] = set()
+        for partition in os.scandir(self.root):
+            if not partition.is_dir():
+                continue
+            seen.add(partition.name)
+            if since and partition.name < since:
+                continue
+            out.extend(self._partition_segments(partition))
+        with self._lock:
+            for name in set(self._partitions) - seen:
+                del self._partitions[name]
+        out.sort(key=lambda s: s.timestamp, reverse=True)
+        return out
+
+    def _partition_segments(self, partition: os.DirEntry) -> List[_Segment]:
+        mtime = partition.stat().st_mtime_ns
+        with self._lock:
+            cached = self._partitions.get(partition.name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        segments: List[_Segment] = []
+        for entry in os.scandir(partition.path):
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            meta_path = Path(entry.path) / "meta.json"
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            segments.append(_Segment(meta["run_id"], meta["run_date"], meta["timestamp"], Path(entry.path)))
+        with self._lock:
+            self._partitions[partition.name] = (mtime, segments)
+        return segments
+
+    def score_history(
+        self,
+        ticker: str,
+        lookback_weeks: int = 6,
+        signal_type: Optional[str] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Signal score series for a ticker over the last N weeks, newest first."""
+        cutoff = (date.today() - timedelta(weeks=lookback_weeks)).isoformat()
+        parts: Dict[str, List[np.ndarray]] = {
+            "run_date": [],
+            "timestamp": [],
+            "signal_type": [],
+            "score": [],
+            "confidence": [],
+        }
+        for seg in self.segments(since=cutoff):
+            mask = seg.column("signals", "ticker") == ticker
+            if signal_type:
+                mask &= seg.column("signals", "signal_type") == signal_type
+            idx = np.flatnonzero(mask)
+            if not idx.size:
+                continue
+            parts["run_date"].append(np.full(idx.size, seg.run_date, dtype="U10"))
+            parts["timestamp"].append(np.asarray(seg.column("signals", "timestamp")[idx]))
+            parts["signal_type"].append(np.asarray(seg.column("signals", "signal_type")[idx]))
+            parts["score"].append(np.asarray(seg.column("signals", "score")[idx]))
+            parts["confidence"].append(np.asarray(seg.column("signals", "confidence")[idx]))
+
+        if not parts["score"]:
+            return {
+                "run_date": np.empty(0, dtype="U10"),
+                "timestamp": np.empty(0, dtype=_TIMESTAMP_DTYPE),
+                "signal_type": np.empty(0, dtype=_SIGNAL_TYPE_DTYPE),
+                "score": np.empty(0, dtype=np.float64),
+                "confidence": np.empty(0, dtype=np.float64),
+            }
+        merged = {k: np.concatenate(v) for k, v in parts.items()}
+        # Same ordering as event_store.load_history: run_date DESC, timestamp DESC.
+        order = np.lexsort((merged["timestamp"], merged["run_date"]))[::-1]
+        return {k: v[order] for k, v in merged.items()}
+
+    def _segment_for(self, run_id: Optional[str], exclude_run_id: Optional[str] = None) -> Optional[_Segment]:
+        for seg in self.segments():
+            if run_id is not None and seg.run_id != run_id:
+                continue
+            if exclude_run_id is not None and seg.run_id == exclude_run_id:
+                continue
+            return seg
+        return None
+
+    def latest_run_scores(self, exclude_run_id: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """Scores of the most recent mirrored run other than exclude_run_id."""
+        seg = self._segment_for(None, exclude_run_id=exclude_run_id)
+        return self._scores(seg) if seg is not None else {}
+
+    def run_scores(self, run_id: str) -> Optional[Dict[str, Dict[str, float]]]:
+        """Scores of one run, or None when the run is not mirrored (e.g. its write failed)."""
+        seg = self._segment_for(run_id)
+        return self._scores(seg) if seg is not None else None
+
+    @staticmethod
+    def _scores(seg: _Segment) -> Dict[str, Dict[str, float]]:
+        tickers = seg.column("scores", "ticker")
+        cols = {c: seg.column("scores", c) for c in _SCORE_COLUMNS}
+        return {
+            str(t): {c: float(cols[c][i]) for c in _SCORE_COLUMNS}
+            for i, t in enumerate(tickers)
+        }
+
+    def score_deltas(self, run_id: str, prior_run_id: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Per-ticker score deltas between run_id and a prior run (default: the one before it)."""
+        current = self._segment_for(run_id)
+        if current is None:
+            raise KeyError(f"run {run_id} is not in the history store")
+        if prior_run_id is not None:
+            prior = self._segment_for(prior_run_id)
+        else:
+            prior = next((s for s in self.segments() if s.timestamp < current.timestamp), None)
+
+        cur_tickers = current.column("scores", "ticker")
+        if prior is None:
+            out: Dict[str, np.ndarray] = {"ticker": np.asarray(cur_tickers[:0])}
+            for col in _SCORE_COLUMNS:
+                out[f"{col}_delta"] = np.empty(0, dtype=np.float64)
+            return out
+
+        # Both ticker columns are written sorted, so an intersect join aligns them.
+        common, cur_idx, prior_idx = np.intersect1d(
+            cur_tickers, prior.column("scores", "ticker"), assume_unique=True, return_indices=True
+        )
+        out = {"ticker": common}
+        for col in _SCORE_COLUMNS:
+            out[f"{col}_delta"] = (
+                np.asarray(current.column("scores", col))[cur_idx]
+                - np.asarray(prior.column("scores", col))[prior_idx]
+            )
+        return out
+
+
+_stores: Dict[str, ColumnarHistoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_history_store() -> Optional[ColumnarHistoryStore]:
+    """Return the store next to the active SQLite DB, or None when the feature is off."""
+    if not get_settings().features.columnar_history:
+        return None
+    from .event_store import DB_PATH
+
+    root = str(DB_PATH.parent / "history")
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = ColumnarHistoryStore(Path(root))
+            _stores[root] = store
+        return store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the columnar signal history store")
+    parser.add_argument("command", choices=["rebuild", "inspect"])
+    args = parser.parse_args()
+
+    from .event_store import DB_PATH
+
+    store = ColumnarHistoryStore(DB_PATH.parent / "history")
+    if args.command == "rebuild":
+        print(json.dumps({"runs_written": store.rebuild_from_sqlite(), "root": str(store.root)}))
+        return
+    segments = store.segments()
+    print(
+        json.dumps(
+            {
+                "root": str(store.root),
+                "segments": len(segments),
+                "run_dates": sorted({s.run_date for s in segments}),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+job_runner.py
+-------------
+Bounded background execution for analysis runs.
+
+Runs are submitted as jobs and executed on a fixed-size worker pool. Each
+worker takes a slot from the shared ``run_limiter`` before building the graph,
+so API-submitted jobs and the synchronous ``/run-weekly`` path share a single
+admission budget. Job IDs are the graph ``run_id``.
+
+Callers never own a thread: progress is published to per-subscriber
+``asyncio.Queue`` objects via ``loop.call_soon_threadsafe``, so any number of
+SSE clients can follow a job from the event loop. Events are also kept on the
+job (bounded) so late subscribers and pollers see what already happened.
+
+Cancellation is cooperative. A job that has not started (waiting for a
+worker or for a run_limiter slot) is marked cancelled at once, and its worker
+leaves the limiter queue without running anything. A running job stops at
+the next node boundary.
+
+Split-phase jobs (``initial["split_phase"]``) stream the core graph only and
+succeed once it is persisted; the delivery tail is handed to
+``run_stages.tail_stage`` and tracked per run_id in run_stage_status.
+
+Public API
+----------
+job_runner.submit(initial, kind)       → Job        (raises JobRejected on backpressure)
+job_runner.get(job_id)                 → Job | None
+job_runner.cancel(job_id)              → bool
+job_runner.subscribe(job_id, loop)     → asyncio.Queue | None
+job_runner.unsubscribe(job_id, queue)  → None
+job_runner.stats()                     → dict
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .run_limiter import run_limiter
+from .settings import get_settings
+from .state import merge_state_update
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = frozenset({"succeeded", "failed", "cancelled", "rejected"})
+
+_MAX_EVENTS_PER_JOB = 512
+
+
+class JobRejected(Exception):
+    """Raised by submit() when the runner is saturated."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when a running job observes its cancel flag."""
+
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    initial: Dict[str, Any]
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    events: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=_MAX_EVENTS_PER_JOB))
+    cancel_requested: threading.Event = field(default_factory=threading.Event)
+    future: Optional[Future] = None
+    subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = field(default_factory=list)
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        queue_wait_ms = None
+        if self.started_at is not None:
+            queue_wait_ms = round((self.started_at - self.created_at) * 1000.0, 2)
+        duration_ms = None
+        if self.started_at is not None and self.finished_at is not None:
+            duration_ms = round((self.finished_at - self.started_at) * 1000.0, 2)
+        payload: Dict[str, Any] = {
+            "job_id": self.job_id,
+            "run_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_wait_ms": queue_wait_ms,
+            "duration_ms": duration_ms,
+            "nodes_completed": [e["node"] for e in self.events if e.get("type") == "node_complete"],
+            "error": self.error,
+        }
+        if include_result:
+            payload["result"] = self.result
+        return payload
+
+
+class JobRunner:
+    """Fixed-size worker pool with job tracking and async fan-out of progress events."""
+
+    def __init__(self, max_workers: int, max_pending: int, retain_finished: int = 200) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(self.max_workers, max_pending)
+        self.retain_finished = max(0, retain_finished)
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+        self._counters: Dict[str, int] = {
+            "submitted": 0,
+            "rejected": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "cancelled": 0,
+        }
+        self._queue_wait_ms: Deque[float] = deque(maxlen=256)
+
+    # ------------------------------------------------------------------
+    # Submission / lifecycle
+    # ------------------------------------------------------------------
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="investora-job")
+        return self._executor
+
+    def submit(self, initial: Dict[str, Any], kind: str = "analysis") -> Job:
+        initial = dict(initial)
+        job_id = initial.setdefault("run_id", str(uuid.uuid4()))
+        with self._lock:
+            if self._in_flight >= self.max_pending:
+                self._counters["rejected"] += 1
+                raise JobRejected(
+                    f"Run queue is full (in_flight={self._in_flight}/{self.max_pending}). Try again shortly."
+                )
+            job = Job(job_id=job_id, kind=kind, initial=initial)
+            self._jobs[job_id] = job
+            self._in_flight += 1
+            self._counters["submitted"] += 1
+            self._evict_finished_locked()
+            job.future = self._pool().submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation. Returns False if the job is unknown or already finished."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.done:
+                return False
+            job.cancel_requested.set()
+            not_started = job.status == "queued"
+        if not_started:
+            # The worker may be waiting on run_limiter: finish the job now and
+            # wake the limiter so the worker gives up its place in the queue.
+            self._finish(job, "cancelled", error="Run cancelled")
+            run_limiter.interrupt()
+        return True
+
+    def _run(self, job: Job) -> None:
+        acquired = False
+        try:
+            if job.cancel_requested.is_set():
+                raise JobCancelled()
+            status = run_limiter.acquire(
+                timeout_s=get_settings().run.run_queue_wait_seconds, cancel=job.cancel_requested
+            )
+            if status == "cancelled":
+                raise JobCancelled()
+            if status != "acquired":
+                msg = (
+                    "Run queue is full. Try again shortly."
+                    if status == "queue_full"
+                    else "Run queue wait timeout exceeded. Try again shortly."
+                )
+                self._finish(job, "rejected", error=msg)
+                return
+            acquired = True
+            with self._lock:
+                # cancel() may have finished the job while we waited for the slot.
+                if job.cancel_requested.is_set():
+                    raise JobCancelled()
+                job.status = "running"
+                job.started_at = time.time()
+                self._queue_wait_ms.append((job.started_at - job.created_at) * 1000.0)
+            self._publish(job, {"type": "started", "run_id": job.job_id})
+
+            final_state = self._execute(job)
+            from .run_weekly import summarize_analysis
+
+            job.result = summarize_analysis(final_state)
+            self._finish(job, "succeeded")
+        except JobCancelled:
+            self._finish(job, "cancelled", error="Run cancelled")
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("job_runner: job %s failed", job.job_id)
+            self._finish(job, "failed", error=str(exc))
+        finally:
+            if acquired:
+                run_limiter.release()
+
+    def _execute(self, job: Job) -> Dict[str, Any]:
+        from .graph import build_graph
+
+        split_phase = bool(job.initial.get("split_phase"))
+        graph = build_graph(phase="core") if split_phase else build_graph()
+        final_state: Dict[str, Any] = dict(job.initial)
+        recursion_limit = get_settings().run.graph_recursion_limit
+        for chunk in graph.stream(job.initial, config={"recursion_limit": recursion_limit}):
+            for node_name, update in chunk.items():
+                if isinstance(update, dict):
+                    merge_state_update(final_state, update)
+                self._publish(job, {"type": "node_complete", "node": node_name, "run_id": job.job_id})
+            if job.cancel_requested.is_set():
+                raise JobCancelled()
+        if split_phase:
+            from datetime import datetime, timezone
+
+            from .run_stages import tail_stage
+
+            started_at = datetime.fromtimestamp(job.started_at or job.created_at, timezone.utc).isoformat()
+            tail_stage.complete_core(final_state, started_at=started_at)
+            self._publish(job, {"type": "tail_queued", "run_id": job.job_id})
+        return final_state
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            if job.done:
+                return
+            job.status = status
+            job.error = error
+            job.finished_at = time.time()
+            self._in_flight -= 1
+            self._counters["rejected" if status == "rejected" else status] += 1
+        if status == "succeeded":
+            self._publish(job, {"type": "done", "run_id": job.job_id})
+        else:
+            event: Dict[str, Any] = {"type": "error", "run_id": job.job_id, "message": error or status}
+            if status == "cancelled":
+                event["cancelled"] = True
+            self._publish(job, event)
+        self._publish(job, None)
+
+    def _evict_finished_locked(self) -> None:
+        finished = [jid for jid, j in self._jobs.items() if j.done]
+        for jid in finished[: max(0, len(finished) - self.retain_finished)]:
+            del self._jobs[jid]
+
+    # ------------------------------------------------------------------
+    # Event fan-out
+    # ------------------------------------------------------------------
+
+    def _publish(self, job: Job, event: Optional[Dict[str, Any]]) -> None:
+        """Record an event and hand it to every subscriber's loop. None closes streams."""
+        with self._lock:
+            if event is not None:
+                job.events.append(event)
+            subscribers = list(job.subscribers)
+            if event is None:
+                job.subscribers.clear()
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # Subscriber's loop already closed; nothing to deliver to.
+                pass
+
+    def subscribe(self, job_id: str, loop: asyncio.AbstractEventLoop) -> Optional[asyncio.Queue]:
+        """Queue pre-filled with the job's events so far; None marks the end of the stream."""
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            for event in job.events:
+                queue.put_nowait(event)
+            if job.done:
+                queue.put_nowait(None)
+            else:
+                job.subscribers.append((loop, queue))
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.subscribers = [(lp, q) for lp, q in job.subscribers if q is not queue]
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            subscribers = 0
+            for job in self._jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+                subscribers += len(job.subscribers)
+            waits = sorted(self._queue_wait_ms)
+            counters = dict(self._counters)
+            in_flight = self._in_flight
+        p95 = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": in_flight,
+            "queued": by_status.get("queued", 0),
+            "running": by_status.get("running", 0),
+            "subscribers": subscribers,
+            "tracked_jobs": sum(by_status.values()),
+            "counters": counters,
+            "queue_wait_ms": {
+                "samples": len(waits),
+                "avg": round(sum(waits) / len(waits), 2) if waits else 0.0,
+                "p95": round(p95, 2),
+            },
+            "run_limiter": run_limiter.stats(),
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# Every admitted job gets a worker; run_limiter still caps how many graphs run at once.
+job_runner = JobRunner(
+    max_workers=run_limiter.max_active + run_limiter.max_queued,
+    max_pending=run_limiter.max_active + run_limiter.max_queued,
+    retain_finished=int(os.environ.get("JOB_RETAIN_FINISHED", "200")),
+)
@@ -0,0 +1,40 @@
+"""
+llm_client.py
+-------------
+Process-wide OpenAI clients, one per API key.
+
+An ``OpenAI`` client owns an HTTP connection pool; building one per request
+(or per worker) throws that pool away and pays a fresh TLS handshake every
+time. Nodes fetch the shared client here instead. The client is thread-safe,
+so synthesis workers and the planner can all use it concurrently.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict
+
+from openai import OpenAI
+
+_clients: Dict[str, OpenAI] = {}
+_clients_lock = threading.Lock()
+
+
+def get_openai_client(api_key: str) -> OpenAI:
+    """Shared client for an API key (created on first use)."""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = OpenAI(api_key=api_key)
+            _clients[api_key] = client
+        return client
+
+
+def reset_openai_clients() -> None:
+    with _clients_lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception:  # noqa: BLE001
+                pass
+        _clients.clear()
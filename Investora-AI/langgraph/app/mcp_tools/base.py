@@ -8,6 +8,10 @@ from typing import Any, Dict, Optional
 
 import requests
 
+from ..metrics import time_provider_call
+from ..rate_limiter import get_rate_limiter
+from .cache import get_tool_cache
+
 
 class MCPToolError(Exception):
     pass
@@ -22,45 +26,47 @@ class MCPRetryableError(MCPToolError):
 
 
 class HTTPCachedTool:
-    def __init__(self, cache_dir: str = "data/cache", timeout: int = 30, min_sleep_s: float = 1.0) -> None:
+    def __init__(
+        self,
+        cache_dir: str = "data/cache",
+        timeout: int = 30,
+        min_sleep_s: float = 1.0,
+        provider: Optional[str] = None,
+    ) -> None:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.timeout = timeout
         self.min_sleep_s = min_sleep_s
-        self._last_call_ts = 0.0
+        # Tools hitting the same provider share one process-wide token bucket;
+        # min_sleep_s only seeds the rate for providers without a configured default.
+        self.provider = provider or type(self).__name__
 
     def _cache_key(self, namespace: str, payload: Dict[str, Any]) -> str:
         raw = json.dumps(payload, sort_keys=True, default=str)
         digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
-        return f"{namespace}_{digest}.json"
+        return f"{namespace}_{digest}"
 
     def _read_cache(self, namespace: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        path = self.cache_dir / self._cache_key(namespace, payload)
-        if path.exists():
-            return json.loads(path.read_text(encoding="utf-8"))
-        return None
+        return get_tool_cache(self.cache_dir).get(namespace, self._cache_key(namespace, payload))
 
     def _write_cache(self, namespace: str, payload: Dict[str, Any], data: Dict[str, Any]) -> None:
-        path = self.cache_dir / self._cache_key(namespace, payload)
-        path.write_text(json.dumps(data, ensure_ascii=True), encoding="utf-8")
+        get_tool_cache(self.cache_dir).set(namespace, self._cache_key(namespace, payload), data)
 
     def _respect_rate_limit(self) -> None:
-        now = time.time()
-        delta = now - self._last_call_ts
-        if delta < self.min_sleep_s:
-            time.sleep(self.min_sleep_s - delta)
-        self._last_call_ts = time.time()
+        default_rate = 1.0 / self.min_sleep_s if self.min_sleep_s > 0 else 0.0
+        get_rate_limiter(self.provider, default_rate_per_s=default_rate).acquire()
 
     def _get_with_retry(self, url: str, params: Dict[str, Any], retries: int = 3, backoff: float = 1.5) -> Dict[str, Any]:
         last_error: Optional[Exception] = None
         for attempt in range(1, retries + 1):
             try:
                 self._respect_rate_limit()
-                response = requests.get(url, params=params, timeout=self.timeout)
-                if response.status_code >= 500:
-                    raise MCPRetryableError(f"Server error {response.status_code}")
-                if response.status_code >= 400:
-                    raise MCPToolError(f"Client error {response.status_code}: {response.text[:200]}")
+                with time_provider_call(self.provider):
+                    response = requests.get(url, params=params, timeout=self.timeout)
+                    if response.status_code >= 500:
+                        raise MCPRetryableError(f"Server error {response.status_code}")
+                    if response.status_code >= 400:
+                        raise MCPToolError(f"Client error {response.status_code}: {response.text[:200]}")
                 return response.json()
             except (requests.Timeout, requests.ConnectionError, MCPRetryableError) as exc:
                 last_error = exc
@@ -0,0 +1,286 @@
+"""
+cache.py
+--------
+Tiered response cache shared by every HTTPCachedTool.
+
+Tier 1 is an in-process LRU of decoded values; tier 2 is a single SQLite file
+(``<cache_dir>/tool_cache.sqlite3``) replacing the old one-JSON-file-per-key
+layout. Every entry carries an expiry derived from its namespace TTL, and the
+disk tier is trimmed least-recently-used first whenever it grows past the size
+budget.
+
+Values handed out from the memory tier are shared objects: callers must treat
+them as read-only (the tools only ever store and return them).
+
+TTLs are per namespace and can be overridden with
+``TOOL_CACHE_TTL_<NAMESPACE>`` (seconds), e.g. ``TOOL_CACHE_TTL_NEWS=3600``.
+
+Environment (parsed by ``app.settings``; malformed values fall back to the default)
+-----------
+TOOL_CACHE_MAX_MB          disk budget before LRU eviction     (default 256)
+TOOL_CACHE_MEMORY_ENTRIES  tier-1 LRU capacity                 (default 2048)
+TOOL_CACHE_TTL_DEFAULT     TTL for namespaces not listed below (default 86400)
+
+CLI
+---
+python -m app.mcp_tools.cache stats [--cache-dir data/cache]
+python -m app.mcp_tools.cache prune [--namespace news] [--all] [--legacy]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ..metrics import record_cache_event
+from ..settings import get_settings
+
+_DB_NAME = "tool_cache.sqlite3"
+
+# Seconds. Quotes move constantly; fundamentals change with quarterly filings.
+DEFAULT_TTLS: Dict[str, float] = {
+    "yf_quotes": 15,
+    "yf_mkt_cap": 24 * 60 * 60,
+    "yf_snapshot": 60,
+    "yf_chart": 5 * 60,
+    "news": 2 * 60 * 60,
+    "rag": 6 * 60 * 60,
+    "market": 6 * 60 * 60,
+    "yf_search": 24 * 60 * 60,
+    "fundamentals": 7 * 24 * 60 * 60,
+    # Embeddings are a pure function of (model, text); the key includes the model.
+    "embeddings": 90 * 24 * 60 * 60,
+    # Synthesis is keyed on model + prompt hash + evidence bundle; identical input, identical answer.
+    "synthesis": 30 * 24 * 60 * 60,
+}
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key         TEXT PRIMARY KEY,
+    namespace   TEXT NOT NULL,
+    value       TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    expires_at  REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries(expires_at);
+CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache_entries(last_access);
+CREATE INDEX IF NOT EXISTS idx_cache_namespace ON cache_entries(namespace);
+"""
+
+
+def namespace_ttl(namespace: str) -> float:
+    cfg = get_settings().caches
+    default = DEFAULT_TTLS.get(namespace, cfg.tool_cache_ttl_default_s)
+    return cfg.tool_cache_ttls.get(namespace.lower(), default)
+
+
+class TieredCache:
+    """In-memory LRU over a size-bounded SQLite store, with per-namespace TTLs."""
+
+    def __init__(self, path: Path, max_bytes: int, memory_entries: int) -> None:
+        self.path = Path(path)
+        self.max_bytes = max(0, max_bytes)
+        self.memory_entries = max(0, memory_entries)
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by all threads; every use is serialised by _lock.
+        self._con = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.executescript(_DDL)
+        self._disk_bytes = int(self._con.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0])
+
+    # ------------------------------------------------------------------
+    # Read / write
+    # ------------------------------------------------------------------
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        started = time.perf_counter()
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    record_cache_event(namespace, "memory_hit", (time.perf_counter() - started) * 1000.0)
+                    return entry[1]
+                del self._memory[key]
+
+            row = self._con.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                record_cache_event(namespace, "miss", (time.perf_counter() - started) * 1000.0)
+                return None
+            self._con.execute("UPDATE cache_entries SET last_access = ? WHERE key = ?", (now, key))
+            value = json.loads(row[0])
+            self._remember(key, row[1], value)
+        record_cache_event(namespace, "disk_hit", (time.perf_counter() - started) * 1000.0)
+        return value
+
+    def set(self, namespace: str, key: str, value: Any, ttl_s: Optional[float] = None) -> None:
+        ttl = namespace_ttl(namespace) if ttl_s is None else ttl_s
+        if ttl <= 0:
+            return
+        started = time.perf_counter()
+        encoded = json.dumps(value, ensure_ascii=True)
+        size = len(encoded)
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            old = self._con.execute("SELECT size FROM cache_entries WHERE key = ?", (key,)).fetchone()
+            self._con.execute(
+                """
+                INSERT INTO cache_entries (key, namespace, value, size, created_at, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    namespace=excluded.namespace, value=excluded.value, size=excluded.size,
+                    created_at=excluded.created_at, expires_at=excluded.expires_at,
+                    last_access=excluded.last_access
+                """,
+                (key, namespace, encoded, size, now, expires_at, now),
+            )
+            self._disk_bytes += size - (old[0] if old else 0)
+            self._remember(key, expires_at, value)
+            evicted = self._enforce_size_locked() if self._disk_bytes > self.max_bytes else 0
+        record_cache_event(namespace, "write", (time.perf_counter() - started) * 1000.0, evictions=evicted)
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        if not self.memory_entries:
+            return
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _enforce_size_locked(self) -> int:
+        """Drop expired rows, then least-recently-used rows, until under ~90% of budget."""
+        evicted = self._con.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)).rowcount
+        self._disk_bytes = int(self._con.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0])
+        target = int(self.max_bytes * 0.9)
+        if self._disk_bytes > target:
+            doomed = []
+            freed = 0
+            for key, size in self._con.execute("SELECT key, size FROM cache_entries ORDER BY last_access ASC"):
+                doomed.append((key,))
+                freed += size
+                if self._disk_bytes - freed <= target:
+                    break
+            self._con.executemany("DELETE FROM cache_entries WHERE key = ?", doomed)
+            for (key,) in doomed:
+                self._memory.pop(key, None)
+            self._disk_bytes -= freed
+            evicted += len(doomed)
+        return evicted
+
+    def prune(self, namespace: Optional[str] = None, expired_only: bool = True) -> int:
+        """Delete expired entries (or everything) optionally limited to one namespace."""
+        clauses, params = [], []
+        if expired_only:
+            clauses.append("expires_at <= ?")
+            params.append(time.time())
+        if namespace:
+            clauses.append("namespace = ?")
+            params.append(namespace)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            removed = self._con.execute(f"DELETE FROM cache_entries {where}", params).rowcount
+            self._memory.clear()
+            self._disk_bytes = int(
+                self._con.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+            )
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            rows = self._con.execute(
+                """
+                SELECT namespace, COUNT(*), COALESCE(SUM(size), 0), SUM(CASE WHEN expires_at <= ? THEN 1 ELSE 0 END)
+                FROM cache_entries GROUP BY namespace ORDER BY namespace
+                """,
+                (now,),
+            ).fetchall()
+            memory_entries = len(self._memory)
+        return {
+            "path": str(self.path),
+            "disk_bytes": sum(r[2] for r in rows),
+            "max_bytes": self.max_bytes,
+            "memory_entries": memory_entries,
+            "namespaces": {
+                r[0]: {"entries": r[1], "bytes": r[2], "expired": r[3], "ttl_s": namespace_ttl(r[0])}
+                for r in rows
+            },
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
+
+
+_caches: Dict[str, TieredCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_tool_cache(cache_dir: Path | str) -> TieredCache:
+    """Process-wide cache for a cache directory (tools share one per directory)."""
+    path = (Path(cache_dir) / _DB_NAME).resolve()
+    key = str(path)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cfg = get_settings().caches
+            cache = TieredCache(
+                path,
+                max_bytes=int(cfg.tool_cache_max_mb * 1024 * 1024),
+                memory_entries=cfg.tool_cache_memory_entries,
+            )
+            _caches[key] = cache
+        return cache
+
+
+def reset_tool_caches() -> None:
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.close()
+        _caches.clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and prune the tool response cache")
+    parser.add_argument("command", choices=["stats", "prune"])
+    parser.add_argument("--cache-dir", default="data/cache")
+    parser.add_argument("--namespace", default=None, help="Limit prune to one namespace")
+    parser.add_argument("--all", action="store_true", help="Prune live entries too, not only expired ones")
+    parser.add_argument("--legacy", action="store_true", help="Also delete pre-SQLite per-key JSON files")
+    args = parser.parse_args()
+
+    cache = get_tool_cache(args.cache_dir)
+    if args.command == "stats":
+        print(json.dumps(cache.stats(), indent=2))
+        return
+
+    out: Dict[str, Any] = {"removed": cache.prune(namespace=args.namespace, expired_only=not args.all)}
+    if args.legacy:
+        legacy = [p for p in Path(args.cache_dir).glob("*_*.json") if len(p.stem.rsplit("_", 1)[-1]) == 64]
+        for path in legacy:
+            path.unlink(missing_ok=True)
+        out["legacy_files_removed"] = len(legacy)
+    print(json.dumps(out))
+
+
+if __name__ == "__main__":
+    main()
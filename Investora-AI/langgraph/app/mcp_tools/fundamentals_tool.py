@@ -14,7 +14,7 @@ class FundamentalsInput(BaseModel):
 
 class FundamentalsTool(HTTPCachedTool):
     def __init__(self) -> None:
-        super().__init__(cache_dir="data/cache", min_sleep_s=0.6)
+        super().__init__(cache_dir="data/cache", min_sleep_s=0.6, provider="fmp")
         self.base_url = os.environ.get("FUNDAMENTALS_API_BASE_URL", "https://financialmodelingprep.com")
         self.api_key = os.environ["FUNDAMENTALS_API_KEY"]
 
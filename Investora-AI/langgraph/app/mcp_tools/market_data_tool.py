@@ -15,7 +15,7 @@ class MarketDataInput(BaseModel):
 
 class MarketDataTool(HTTPCachedTool):
     def __init__(self) -> None:
-        super().__init__(cache_dir="data/cache", min_sleep_s=1.0)
+        super().__init__(cache_dir="data/cache", min_sleep_s=1.0, provider="marketstack")
         self.base_url = os.environ.get("MARKET_DATA_API_BASE_URL", "https://api.marketstack.com/v1")
         self.api_key = os.environ["MARKET_DATA_API_KEY"]
 
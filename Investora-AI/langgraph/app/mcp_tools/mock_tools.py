@@ -17,14 +17,19 @@ scores produce a meaningful ranking:
   Good quality     : AAPL, META, GOOGL
   Solid quality    : MA, AMZN
   Weak quality     : JPM, TSLA
+
+fake_embed and FakeVectorIndex stand in for OpenAI embeddings and Pinecone
+when testing or benchmarking app.rag_ingestion.
 """
 from __future__ import annotations
 
 import hashlib
 import json
+import threading
+import time
 from datetime import date, timedelta
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set
 
 from .base import MCPToolError
 
@@ -307,6 +312,60 @@ class MockNewsTool:
         }
 
 
+class MockQuoteTool:
+    """Local quote source with the YFinanceTool.get_quotes schema.
+
+    Prices start at the mock market closes (latest close vs the one before)
+    and can be moved with set_quote, so tests and demos can drive the alert
+    monitor without network access.
+    """
+
+    def __init__(self) -> None:
+        self._overrides: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def set_quote(self, ticker: str, price: float, change_pct: Optional[float] = None) -> None:
+        with self._lock:
+            self._overrides[ticker.upper()] = {"price": float(price), "change_pct": change_pct}
+
+    def _base_quote(self, ticker: str) -> Dict[str, Any]:
+        closes = _MARKET_CLOSES.get(ticker)
+        if closes is None:
+            row = _UNIVERSE_INDEX.get(ticker)
+            if row is None:
+                return {"error": f"MockQuoteTool: no mock data for ticker '{ticker}'"}
+            closes = _series_from_momentum_score(ticker, float(row.get("mock_momentum_score", 5.0)))
+        price, prev_close = closes[0], closes[1]
+        return {
+            "price": price,
+            "change": round(price - prev_close, 2),
+            "change_pct": round((price - prev_close) / prev_close * 100.0, 2),
+            "volume": None,
+            "mkt_cap": None,
+        }
+
+    def get_quotes(self, tickers: List[str]) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        with self._lock:
+            self.calls += 1
+            overrides = dict(self._overrides)
+        for ticker in dict.fromkeys(t.upper() for t in tickers if t):
+            quote = self._base_quote(ticker)
+            override = overrides.get(ticker)
+            if override is not None:
+                change_pct = override["change_pct"]
+                quote = {
+                    "price": override["price"],
+                    "change": None,
+                    "change_pct": quote.get("change_pct") if change_pct is None else change_pct,
+                    "volume": None,
+                    "mkt_cap": None,
+                }
+            out[ticker] = quote
+        return out
+
+
 class MockRAGRetrievalTool:
     def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         ticker = str(payload.get("ticker", "")).upper()
@@ -317,3 +376,85 @@ class MockRAGRetrievalTool:
             "retrieved_count": 0,
             "enabled": False,
         }
+
+
+# ── RAG ingestion fakes ───────────────────────────────────────────────────────
+
+def fake_embed(texts: List[str], dims: int = 8) -> List[List[float]]:
+    """Deterministic unit vectors derived from each text's sha256 (no API calls)."""
+    out: List[List[float]] = []
+    for text in texts:
+        digest = hashlib.sha256(" ".join(text.split()).encode("utf-8")).digest()
+        raw = [(digest[i % len(digest)] - 127.5) / 127.5 for i in range(dims)]
+        norm = sum(v * v for v in raw) ** 0.5 or 1.0
+        out.append([v / norm for v in raw])
+    return out
+
+
+class FakeVectorIndex:
+    """
+    In-memory stand-in for the Pinecone data plane used by rag_ingestion.
+
+    ``fail_upserts`` makes the next N upserts raise VectorIndexError with
+    ``fail_status`` (503 = retryable, 4xx = not). ``latency_s`` is slept in
+    every upsert so benchmarks can see concurrency; ``peak_concurrency``
+    records how many upserts overlapped.
+    """
+
+    def __init__(self, fail_upserts: int = 0, fail_status: int = 503, latency_s: float = 0.0) -> None:
+        self.vectors: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.fail_upserts = fail_upserts
+        self.fail_status = fail_status
+        self.latency_s = latency_s
+        self.counters: Dict[str, int] = {"upserts": 0, "fetches": 0, "queries": 0, "deletes": 0, "failures": 0}
+        self.peak_concurrency = 0
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = "") -> int:
+        from ..rag_ingestion import VectorIndexError
+
+        with self._lock:
+            self.counters["upserts"] += 1
+            if self.fail_upserts > 0:
+                self.fail_upserts -= 1
+                self.counters["failures"] += 1
+                raise VectorIndexError(f"fake upsert failed {self.fail_status}", self.fail_status)
+            self._active += 1
+            self.peak_concurrency = max(self.peak_concurrency, self._active)
+        try:
+            if self.latency_s:
+                time.sleep(self.latency_s)
+            with self._lock:
+                bucket = self.vectors.setdefault(namespace, {})
+                for vector in vectors:
+                    bucket[vector["id"]] = {"values": list(vector["values"]), "metadata": dict(vector.get("metadata") or {})}
+        finally:
+            with self._lock:
+                self._active -= 1
+        return len(vectors)
+
+    def fetch_ids(self, ids: List[str], namespace: str = "") -> Set[str]:
+        with self._lock:
+            self.counters["fetches"] += 1
+            bucket = self.vectors.get(namespace, {})
+            return {i for i in ids if i in bucket}
+
+    def delete_all(self, namespace: str = "") -> None:
+        with self._lock:
+            self.counters["deletes"] += 1
+            self.vectors.pop(namespace, None)
+
+    def query(self, vector: List[float], top_k: int = 5, namespace: str = "") -> List[Dict[str, Any]]:
+        with self._lock:
+            self.counters["queries"] += 1
+            items = list(self.vectors.get(namespace, {}).items())
+        scored = [
+            {"id": vid, "score": sum(a * b for a, b in zip(vector, row["values"])), "metadata": row["metadata"]}
+            for vid, row in items
+        ]
+        return sorted(scored, key=lambda m: m["score"], reverse=True)[:top_k]
+
+    def count(self, namespace: str = "") -> int:
+        with self._lock:
+            return len(self.vectors.get(namespace, {}))
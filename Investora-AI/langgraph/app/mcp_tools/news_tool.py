@@ -16,7 +16,7 @@ class NewsInput(BaseModel):
 
 class NewsTool(HTTPCachedTool):
     def __init__(self) -> None:
-        super().__init__(cache_dir="data/cache", min_sleep_s=0.4)
+        super().__init__(cache_dir="data/cache", min_sleep_s=0.4, provider="finnhub")
         self.base_url = os.environ.get("NEWS_API_BASE_URL", "https://finnhub.io/api/v1")
         self.api_key = os.environ["NEWS_API_KEY"]
 
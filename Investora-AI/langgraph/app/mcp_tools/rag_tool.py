@@ -1,16 +1,24 @@
 from __future__ import annotations
 
 import os
+import threading
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from openai import OpenAI
 from pydantic import BaseModel, Field
 import requests
 
+from ..metrics import record_provider_call, time_provider_call
+from ..rate_limiter import get_rate_limiter
+from ..settings import get_settings
 from .base import MCPToolError, MCPValidationError, HTTPCachedTool
 
 
+def _normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
 class RAGInput(BaseModel):
     ticker: str = Field(min_length=1, max_length=10)
     query: str = Field(min_length=3, max_length=1000)
@@ -24,19 +32,77 @@ class RAGRetrievalTool(HTTPCachedTool):
     """Query Pinecone for ticker-filtered evidence used in synthesis."""
 
     def __init__(self) -> None:
-        super().__init__(cache_dir="data/cache", min_sleep_s=0.2)
+        super().__init__(cache_dir="data/cache", min_sleep_s=0.2, provider="pinecone")
         self.pinecone_host = os.environ.get("PINECONE_HOST", "").rstrip("/")
         self.pinecone_api_key = os.environ.get("PINECONE_API_KEY", "")
         self.embedding_model = os.environ.get("RAG_EMBED_MODEL", "text-embedding-3-small")
         self._openai_api_key = os.environ.get("OPENAI_API_KEY", "")
+        self.embed_batch_size = get_settings().pipeline.rag_embed_batch_size
+        self._client: Optional[OpenAI] = None
+        self._client_lock = threading.Lock()
 
     def _enabled(self) -> bool:
         return bool(self.pinecone_host and self.pinecone_api_key and self._openai_api_key)
 
+    def _openai(self) -> OpenAI:
+        # One client (and its HTTP connection pool) for the lifetime of the tool.
+        with self._client_lock:
+            if self._client is None:
+                self._client = OpenAI(api_key=self._openai_api_key)
+            return self._client
+
+    def _embedding_payload(self, text: str) -> Dict[str, Any]:
+        return {"model": self.embedding_model, "text": text}
+
+    def embed_many(self, texts: List[str], cache: bool = True) -> List[List[float]]:
+        """Embed texts, serving repeats from the embeddings cache.
+
+        Texts are whitespace-normalised and de-duplicated; everything not cached
+        goes to the API in batches of RAG_EMBED_BATCH_SIZE inputs per request.
+        cache=False skips the embeddings cache both ways (bulk corpus ingestion,
+        whose vectors are never looked up again).
+        """
+        return self._embed_with_misses(texts, cache)[0]
+
+    def _embed_with_misses(self, texts: List[str], cache: bool = True) -> Tuple[List[List[float]], int]:
+        """embed_many plus the number of distinct texts that had to be embedded."""
+        normalized = [_normalize_text(t) for t in texts]
+        vectors: Dict[str, List[float]] = {}
+        missing: List[str] = []
+        for text in dict.fromkeys(normalized):
+            cached = self._read_cache("embeddings", self._embedding_payload(text)) if cache else None
+            if cached:
+                vectors[text] = cached["vector"]
+            else:
+                missing.append(text)
+
+        for start in range(0, len(missing), self.embed_batch_size):
+            batch = missing[start : start + self.embed_batch_size]
+            get_rate_limiter("openai").acquire()
+            record_provider_call("openai_embeddings")
+            with time_provider_call("openai_embeddings"):
+                resp = self._openai().embeddings.create(model=self.embedding_model, input=batch)
+            for item in resp.data:
+                text = batch[item.index]
+                vector = list(item.embedding)
+                vectors[text] = vector
+                if cache:
+                    self._write_cache("embeddings", self._embedding_payload(text), {"vector": vector})
+
+        return [vectors[text] for text in normalized], len(missing)
+
+    def prime_embeddings(self, queries: List[str]) -> int:
+        """Embed all queries up front in as few requests as possible.
+
+        Returns how many distinct queries were not already cached. A no-op when
+        retrieval is disabled.
+        """
+        if not self._enabled() or not queries:
+            return 0
+        return self._embed_with_misses(queries)[1]
+
     def _embed(self, text: str) -> List[float]:
-        client = OpenAI(api_key=self._openai_api_key)
-        resp = client.embeddings.create(model=self.embedding_model, input=text)
-        return list(resp.data[0].embedding)
+        return self.embed_many([text])[0]
 
     def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         model = RAGInput(**payload)
@@ -91,9 +157,10 @@ class RAGRetrievalTool(HTTPCachedTool):
             }
             endpoint = f"{self.pinecone_host}/query"
             self._respect_rate_limit()
-            post_resp = requests.post(endpoint, headers=headers, json=request_body, timeout=self.timeout)
-            if post_resp.status_code >= 400:
-                raise MCPToolError(f"Pinecone query failed {post_resp.status_code}: {post_resp.text[:200]}")
+            with time_provider_call("pinecone"):
+                post_resp = requests.post(endpoint, headers=headers, json=request_body, timeout=self.timeout)
+                if post_resp.status_code >= 400:
+                    raise MCPToolError(f"Pinecone query failed {post_resp.status_code}: {post_resp.text[:200]}")
             data = post_resp.json()
         except Exception as exc:  # noqa: BLE001
             raise MCPToolError(f"RAG retrieval failed for {ticker}: {exc}") from exc
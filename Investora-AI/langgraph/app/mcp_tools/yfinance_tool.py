@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any, Dict, List
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from .base import HTTPCachedTool, MCPToolError
+from .cache import get_tool_cache
+from ..settings import get_settings
+
+logger = logging.getLogger(__name__)
 
 # yfinance is imported lazily to avoid slow import times when not needed
 try:
@@ -22,73 +28,198 @@ _RANGE_MAP: Dict[str, tuple[str, str]] = {
 }
 
 
+def _clean(values: Iterable[Any]) -> List[float]:
+    return [float(v) for v in values if v is not None and v == v]
+
+
+def _build_quote(price: Optional[float], prev_close: Optional[float], volume: Any, mkt_cap: Any) -> Dict[str, Any]:
+    change = (price - prev_close) if (price is not None and prev_close is not None) else None
+    change_pct = (
+        (change / prev_close * 100)
+        if (change is not None and prev_close not in (None, 0))
+        else None
+    )
+    return {
+        "price": round(price, 4) if price is not None else None,
+        "change": round(change, 4) if change is not None else None,
+        "change_pct": round(change_pct, 4) if change_pct is not None else None,
+        "volume": volume,
+        "mkt_cap": mkt_cap,
+    }
+
+
 class YFinanceTool(HTTPCachedTool):
     """yfinance-based tool for real-time quotes, chart history, snapshots, and search."""
 
     def __init__(self) -> None:
         # No HTTP rate limiting needed — yfinance handles its own throttling
-        super().__init__(cache_dir="data/cache", min_sleep_s=0.0)
+        super().__init__(cache_dir="data/cache", min_sleep_s=0.0, provider="yfinance")
 
     # ------------------------------------------------------------------
     # Public methods
     # ------------------------------------------------------------------
 
+    # Quotes are cached per ticker in the shared tool cache ("yf_quotes",
+    # TOOL_CACHE_TTL_YF_QUOTES, default 15 s). Market cap needs its own
+    # per-ticker lookup, so it is cached separately ("yf_mkt_cap", default
+    # 24 h) and missing values are fetched on a background pool. A request
+    # waits up to YF_MKT_CAP_WAIT_S for those lookups; any still running then
+    # show up as mkt_cap=None until they land.
+    _fetch_workers = get_settings().concurrency.yf_quote_workers
+    _cap_pool = ThreadPoolExecutor(max_workers=_fetch_workers, thread_name_prefix="yf-mkt-cap")
+    _cap_pending: Dict[str, Future] = {}
+    _cap_lock = threading.Lock()
+
+    def _ticker_key(self, namespace: str, ticker: str) -> str:
+        return self._cache_key(namespace, {"tool": namespace, "ticker": ticker})
+
+    def _cached(self, namespace: str, tickers: Iterable[str]) -> Tuple[Dict[str, Any], List[str]]:
+        cache = get_tool_cache(self.cache_dir)
+        hits: Dict[str, Any] = {}
+        misses: List[str] = []
+        for ticker in tickers:
+            value = cache.get(namespace, self._ticker_key(namespace, ticker))
+            if value is None:
+                misses.append(ticker)
+            else:
+                hits[ticker] = value
+        return hits, misses
+
     def get_quotes(self, tickers: List[str]) -> Dict[str, Any]:
         """Return lightweight quote data for a list of tickers.
 
+        Cache misses are fetched with one bulk ``yf.download`` call; tickers the
+        bulk frame cannot price fall back to concurrent per-ticker lookups.
+
         Returns:
             {ticker: {price, change, change_pct, volume, mkt_cap}}
         """
-        upper = [t.upper() for t in tickers if t]
-        cache_payload = {"tool": "yf_quotes", "tickers": sorted(upper)}
-        cached = self._read_cache("yf_quotes", cache_payload)
-        if cached:
-            has_usable_value = any(
-                isinstance(v, dict) and v.get("change_pct") is not None
-                for v in cached.values()
+        upper = list(dict.fromkeys(t.upper() for t in tickers if t))
+        quotes, misses = self._cached("yf_quotes", upper)
+
+        if misses:
+            fetched: Dict[str, Any] = {}
+            bulk = self._bulk_quotes(misses)
+            for ticker, (price, prev_close, volume) in bulk.items():
+                fetched[ticker] = _build_quote(price, prev_close, volume, None)
+            fallback = [t for t in misses if t not in bulk]
+            if fallback:
+                with ThreadPoolExecutor(max_workers=min(self._fetch_workers, len(fallback))) as pool:
+                    fetched.update(zip(fallback, pool.map(self._single_quote, fallback)))
+
+            cache = get_tool_cache(self.cache_dir)
+            for ticker, quote in fetched.items():
+                cap = quote.pop("_mkt_cap", None)
+                if cap is not None:
+                    # fast_info already carried it; no background lookup needed.
+                    cache.set("yf_mkt_cap", self._ticker_key("yf_mkt_cap", ticker), {"mkt_cap": cap})
+                if "error" not in quote and quote.get("change_pct") is not None:
+                    cache.set("yf_quotes", self._ticker_key("yf_quotes", ticker), quote)
+            quotes.update(fetched)
+
+        caps, cap_misses = self._cached("yf_mkt_cap", [t for t in upper if "error" not in quotes[t]])
+        if cap_misses:
+            wait(self._refresh_market_caps(cap_misses), timeout=get_settings().concurrency.yf_mkt_cap_wait_s)
+            caps.update(self._cached("yf_mkt_cap", cap_misses)[0])
+        return {
+            t: quotes[t] if "error" in quotes[t] else {**quotes[t], "mkt_cap": (caps.get(t) or {}).get("mkt_cap")}
+            for t in upper
+        }
+
+    def _refresh_market_caps(self, tickers: List[str]) -> List[Future]:
+        """Fetch missing market caps in the background (one in-flight lookup per ticker)."""
+        futures: List[Future] = []
+        with self._cap_lock:
+            for ticker in tickers:
+                if ticker not in self._cap_pending:
+                    self._cap_pending[ticker] = self._cap_pool.submit(self._store_market_cap, ticker)
+                futures.append(self._cap_pending[ticker])
+        return futures
+
+    def _store_market_cap(self, ticker: str) -> None:
+        try:
+            cap = self._market_cap(ticker)
+            if cap is not None:
+                get_tool_cache(self.cache_dir).set(
+                    "yf_mkt_cap", self._ticker_key("yf_mkt_cap", ticker), {"mkt_cap": cap}
+                )
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("yfinance: market cap refresh failed for %s: %s", ticker, exc)
+        finally:
+            with self._cap_lock:
+                self._cap_pending.pop(ticker, None)
+
+    @classmethod
+    def wait_for_market_caps(cls, timeout_s: float = 10.0) -> None:
+        """Block until queued market-cap lookups finish (tests and benchmarks)."""
+        with cls._cap_lock:
+            pending = list(cls._cap_pending.values())
+        for future in pending:
+            future.result(timeout=timeout_s)
+
+    def _bulk_quotes(self, tickers: List[str]) -> Dict[str, Tuple[float, float, Any]]:
+        """One request for the whole set: {ticker: (price, prev_close, volume)} for priced tickers."""
+        try:
+            frame = yf.download(
+                tickers=tickers,
+                period="5d",
+                interval="1d",
+                group_by="ticker",
+                auto_adjust=True,
+                threads=True,
+                progress=False,
             )
-            if has_usable_value:
-                return cached
+        except Exception:  # noqa: BLE001
+            return {}
+        if frame is None or frame.empty:
+            return {}
 
-        result: Dict[str, Any] = {}
-        for ticker in upper:
+        out: Dict[str, Tuple[float, float, Any]] = {}
+        multi = getattr(frame.columns, "nlevels", 1) > 1
+        for ticker in tickers:
             try:
-                info = yf.Ticker(ticker).fast_info
-                price = getattr(info, "last_price", None)
-                if price is None:
-                    price = getattr(info, "regular_market_price", None)
-
-                prev_close = getattr(info, "previous_close", None)
-                if prev_close is None:
-                    prev_close = getattr(info, "regular_market_previous_close", None)
-
-                # Fallback when fast_info omits fields: derive from recent daily closes.
-                if price is None or prev_close is None:
-                    hist = yf.Ticker(ticker).history(period="5d", interval="1d", auto_adjust=True)
-                    if not hist.empty and "Close" in hist:
-                        closes = [float(v) for v in hist["Close"].tolist() if v == v]
-                        if len(closes) >= 2:
-                            price = closes[-1] if price is None else price
-                            prev_close = closes[-2] if prev_close is None else prev_close
-
-                change = (price - prev_close) if (price is not None and prev_close is not None) else None
-                change_pct = (
-                    (change / prev_close * 100)
-                    if (change is not None and prev_close not in (None, 0))
-                    else None
-                )
-                result[ticker] = {
-                    "price": round(price, 4) if price is not None else None,
-                    "change": round(change, 4) if change is not None else None,
-                    "change_pct": round(change_pct, 4) if change_pct is not None else None,
-                    "volume": getattr(info, "last_volume", None),
-                    "mkt_cap": getattr(info, "market_cap", None),
-                }
-            except Exception as exc:  # noqa: BLE001
-                result[ticker] = {"error": str(exc)}
-
-        self._write_cache("yf_quotes", cache_payload, result)
-        return result
+                sub = frame[ticker] if multi else frame
+                closes = _clean(sub["Close"].tolist())
+            except KeyError:
+                continue
+            if len(closes) < 2:
+                continue
+            volumes = _clean(sub["Volume"].tolist()) if "Volume" in sub else []
+            out[ticker] = (closes[-1], closes[-2], int(volumes[-1]) if volumes else None)
+        return out
+
+    def _single_quote(self, ticker: str) -> Dict[str, Any]:
+        try:
+            info = yf.Ticker(ticker).fast_info
+            price = getattr(info, "last_price", None)
+            if price is None:
+                price = getattr(info, "regular_market_price", None)
+
+            prev_close = getattr(info, "previous_close", None)
+            if prev_close is None:
+                prev_close = getattr(info, "regular_market_previous_close", None)
+
+            # Fallback when fast_info omits fields: derive from recent daily closes.
+            if price is None or prev_close is None:
+                hist = yf.Ticker(ticker).history(period="5d", interval="1d", auto_adjust=True)
+                if not hist.empty and "Close" in hist:
+                    closes = _clean(hist["Close"].tolist())
+                    if len(closes) >= 2:
+                        price = closes[-1] if price is None else price
+                        prev_close = closes[-2] if prev_close is None else prev_close
+
+            quote = _build_quote(price, prev_close, getattr(info, "last_volume", None), None)
+            quote["_mkt_cap"] = getattr(info, "market_cap", None)
+            return quote
+        except Exception as exc:  # noqa: BLE001
+            return {"error": str(exc)}
+
+    @staticmethod
+    def _market_cap(ticker: str) -> Any:
+        try:
+            return getattr(yf.Ticker(ticker).fast_info, "market_cap", None)
+        except Exception:  # noqa: BLE001
+            return None
 
     def get_chart(self, ticker: str, range_str: str = "1M") -> Dict[str, Any]:
         """Return OHLCV chart data for the given ticker and range.
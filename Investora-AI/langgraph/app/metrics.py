@@ -1,18 +1,148 @@
+"""
+metrics.py
+----------
+Process-wide metrics registry behind ``/debug/metrics`` and ``/metrics``.
+
+Latencies (per graph node and per provider) go into QuantileSketch series:
+log-bucketed histograms with a fixed relative error, so p50/p95/p99 come from
+bounded memory however long the API process lives. Each series has its own
+lock; the registry lock is only taken to create a series. Counters (provider
+calls, cache events, errors, rate-limit waits) are plain dicts behind _lock.
+"""
+
 from __future__ import annotations
 
+import math
 import threading
+import time
 from collections import defaultdict
-from statistics import mean
-from typing import Any, Dict, List
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
 
 _lock = threading.Lock()
-_node_timings: Dict[str, List[float]] = defaultdict(list)
 _provider_counters: Dict[str, int] = defaultdict(int)
+_cache_counters: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+_error_counters: Dict[Tuple[str, str], int] = defaultdict(int)
+
+# Upper bounds (ms) of the rate-limit wait histogram buckets; the last bucket is open-ended.
+_WAIT_BUCKETS_MS = (0.0, 10.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0)
+_rate_limit_waits: Dict[str, Dict[str, Any]] = {}
+
+_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """Streaming quantiles over positive values with bounded memory (DDSketch-style).
+
+    A value v lands in bucket ceil(log_gamma(v)) with gamma = (1 + a) / (1 - a),
+    so every quantile is reported within relative error ``a`` of a true sample.
+    Durations from 1 µs to a day need ~1,200 buckets at a=1%; past
+    ``max_buckets`` the lowest buckets are merged, which only blurs the fast tail.
+    """
+
+    _MIN_VALUE = 1e-3
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048) -> None:
+        self._gamma = (1.0 + relative_accuracy) / (1.0 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._max_buckets = max_buckets
+        self._buckets: Dict[int, int] = {}
+        self._zero = 0
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, value: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += value
+            self.last = value
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+            if value <= self._MIN_VALUE:
+                self._zero += 1
+                return
+            idx = math.ceil(math.log(value) / self._log_gamma)
+            self._buckets[idx] = self._buckets.get(idx, 0) + 1
+            if len(self._buckets) > self._max_buckets:
+                low, nxt = sorted(self._buckets)[:2]
+                self._buckets[nxt] += self._buckets.pop(low)
+
+    def quantile(self, q: float) -> float:
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q * (self.count - 1)
+            seen = self._zero
+            if rank < seen:
+                return max(0.0, self.min)
+            for idx in sorted(self._buckets):
+                seen += self._buckets[idx]
+                if rank < seen:
+                    value = 2.0 * self._gamma**idx / (self._gamma + 1.0)
+                    return min(max(value, self.min), self.max)
+            return self.max
+
+    def summary(self) -> Dict[str, float]:
+        count = self.count
+        out = {
+            "count": count,
+            "avg_ms": round(self.total / count, 2) if count else 0.0,
+            "last_ms": round(self.last, 2),
+            "max_ms": round(self.max, 2),
+        }
+        for q in _QUANTILES:
+            out[f"p{int(q * 100)}_ms"] = round(self.quantile(q), 2)
+        return out
+
+
+_node_sketches: Dict[str, QuantileSketch] = {}
+_provider_sketches: Dict[str, QuantileSketch] = {}
+_provider_errors: Dict[str, int] = defaultdict(int)
+
+
+def _series(registry: Dict[str, QuantileSketch], name: str) -> QuantileSketch:
+    sketch = registry.get(name)
+    if sketch is None:
+        with _lock:
+            sketch = registry.setdefault(name, QuantileSketch())
+    return sketch
 
 
 def record_node_timing(node_name: str, duration_ms: float) -> None:
+    _series(_node_sketches, node_name).add(duration_ms)
+
+
+def record_provider_latency(provider_name: str, duration_ms: float, ok: bool = True) -> None:
+    """Latency of one outbound request; failed attempts also count as provider errors."""
+    _series(_provider_sketches, provider_name).add(duration_ms)
+    if not ok:
+        with _lock:
+            _provider_errors[provider_name] += 1
+            _error_counters[("provider", provider_name)] += 1
+
+
+@contextmanager
+def time_provider_call(provider_name: str) -> Iterator[None]:
+    """Record the wrapped request's latency; an exception escaping the block marks it failed."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        record_provider_latency(provider_name, (time.perf_counter() - started) * 1000.0, ok=False)
+        raise
+    record_provider_latency(provider_name, (time.perf_counter() - started) * 1000.0)
+
+
+def record_error(kind: str, name: str, count: int = 1) -> None:
+    """Count errors by kind (node, tool, provider) and name."""
+    if count <= 0:
+        return
     with _lock:
-        _node_timings[node_name].append(duration_ms)
+        _error_counters[(kind, name)] += count
 
 
 def record_provider_call(provider_name: str) -> None:
@@ -20,24 +150,141 @@ def record_provider_call(provider_name: str) -> None:
         _provider_counters[provider_name] += 1
 
 
-def snapshot_metrics() -> Dict[str, Any]:
+def record_cache_event(namespace: str, outcome: str, duration_ms: float, evictions: int = 0) -> None:
+    """Count a tool-cache lookup/write; outcome is memory_hit, disk_hit, miss or write."""
     with _lock:
-        node_stats = {
-            name: {
-                "count": len(samples),
-                "avg_ms": round(mean(samples), 2) if samples else 0.0,
-                "last_ms": round(samples[-1], 2) if samples else 0.0,
-            }
-            for name, samples in _node_timings.items()
+        counters = _cache_counters[namespace]
+        counters[outcome] += 1
+        counters[f"{outcome}_ms"] += duration_ms
+        if evictions:
+            counters["evictions"] += evictions
+
+
+def record_rate_limit_wait(provider: str, wait_ms: float) -> None:
+    with _lock:
+        stats = _rate_limit_waits.get(provider)
+        if stats is None:
+            stats = {"count": 0, "throttled": 0, "total_ms": 0.0, "max_ms": 0.0, "buckets": [0] * (len(_WAIT_BUCKETS_MS) + 1)}
+            _rate_limit_waits[provider] = stats
+        stats["count"] += 1
+        if wait_ms > 0:
+            stats["throttled"] += 1
+        stats["total_ms"] += wait_ms
+        stats["max_ms"] = max(stats["max_ms"], wait_ms)
+        idx = next((i for i, bound in enumerate(_WAIT_BUCKETS_MS) if wait_ms <= bound), len(_WAIT_BUCKETS_MS))
+        stats["buckets"][idx] += 1
+
+
+def _rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    labels = [f"le_{int(b)}ms" for b in _WAIT_BUCKETS_MS] + [f"gt_{int(_WAIT_BUCKETS_MS[-1])}ms"]
+    return {
+        provider: {
+            "acquired": s["count"],
+            "throttled": s["throttled"],
+            "avg_wait_ms": round(s["total_ms"] / s["count"], 2) if s["count"] else 0.0,
+            "max_wait_ms": round(s["max_ms"], 2),
+            "wait_histogram": dict(zip(labels, s["buckets"])),
         }
-        provider_stats = dict(_provider_counters)
+        for provider, s in _rate_limit_waits.items()
+    }
+
+
+def _cache_stats() -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for namespace, c in _cache_counters.items():
+        lookups = c["memory_hit"] + c["disk_hit"] + c["miss"]
+        read_ms = c["memory_hit_ms"] + c["disk_hit_ms"] + c["miss_ms"]
+        out[namespace] = {
+            "memory_hits": int(c["memory_hit"]),
+            "disk_hits": int(c["disk_hit"]),
+            "misses": int(c["miss"]),
+            "writes": int(c["write"]),
+            "evictions": int(c["evictions"]),
+            "hit_ratio": round((c["memory_hit"] + c["disk_hit"]) / lookups, 4) if lookups else 0.0,
+            "avg_read_ms": round(read_ms / lookups, 3) if lookups else 0.0,
+            "avg_write_ms": round(c["write_ms"] / c["write"], 3) if c["write"] else 0.0,
+        }
+    return out
+
+
+def _provider_stats() -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for name in set(_provider_counters) | set(_provider_sketches):
+        sketch = _provider_sketches.get(name)
+        stats: Dict[str, Any] = {"calls": _provider_counters.get(name, 0), "errors": _provider_errors.get(name, 0)}
+        if sketch is not None:
+            stats["latency"] = sketch.summary()
+        out[name] = stats
+    return out
+
+
+def snapshot_metrics() -> Dict[str, Any]:
+    node_stats = {name: sketch.summary() for name, sketch in list(_node_sketches.items())}
+    with _lock:
+        provider_counts = dict(_provider_counters)
+        providers = _provider_stats()
+        errors = {f"{kind}:{name}": n for (kind, name), n in _error_counters.items()}
+        cache_stats = _cache_stats()
+        rate_limit_stats = _rate_limit_stats()
     return {
         "node_timings": node_stats,
-        "provider_counters": provider_stats,
+        "provider_counters": provider_counts,
+        "providers": providers,
+        "errors": errors,
+        "cache": cache_stats,
+        "rate_limits": rate_limit_stats,
     }
 
 
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _summary_lines(metric: str, label: str, series: Dict[str, QuantileSketch]) -> List[str]:
+    lines = [f"# TYPE {metric} summary"]
+    for name, sketch in sorted(series.items()):
+        lbl = f'{label}="{_label(name)}"'
+        for q in _QUANTILES:
+            lines.append(f'{metric}{{{lbl},quantile="{q}"}} {sketch.quantile(q):.3f}')
+        lines.append(f"{metric}_sum{{{lbl}}} {sketch.total:.3f}")
+        lines.append(f"{metric}_count{{{lbl}}} {sketch.count}")
+    return lines
+
+
+def render_prometheus(prefix: str = "investora") -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines: List[str] = []
+    lines += _summary_lines(f"{prefix}_node_duration_ms", "node", dict(_node_sketches))
+    lines += _summary_lines(f"{prefix}_provider_latency_ms", "provider", dict(_provider_sketches))
+    with _lock:
+        provider_counts = sorted(_provider_counters.items())
+        errors = sorted(_error_counters.items())
+        cache = {ns: dict(c) for ns, c in _cache_counters.items()}
+        waits = {p: dict(s) for p, s in _rate_limit_waits.items()}
+
+    lines.append(f"# TYPE {prefix}_provider_calls_total counter")
+    lines += [f'{prefix}_provider_calls_total{{provider="{_label(p)}"}} {n}' for p, n in provider_counts]
+    lines.append(f"# TYPE {prefix}_errors_total counter")
+    lines += [f'{prefix}_errors_total{{kind="{_label(k)}",name="{_label(n)}"}} {c}' for (k, n), c in errors]
+    lines.append(f"# TYPE {prefix}_cache_events_total counter")
+    for ns, counters in sorted(cache.items()):
+        for outcome in ("memory_hit", "disk_hit", "miss", "write", "evictions"):
+            value = int(counters.get(outcome, 0))
+            lines.append(f'{prefix}_cache_events_total{{namespace="{_label(ns)}",outcome="{outcome}"}} {value}')
+    lines.append(f"# TYPE {prefix}_rate_limit_wait_ms summary")
+    for provider, stats in sorted(waits.items()):
+        lbl = f'provider="{_label(provider)}"'
+        lines.append(f"{prefix}_rate_limit_wait_ms_sum{{{lbl}}} {stats['total_ms']:.3f}")
+        lines.append(f"{prefix}_rate_limit_wait_ms_count{{{lbl}}} {stats['count']}")
+    return "\n".join(lines) + "\n"
+
+
 def reset_metrics() -> None:
     with _lock:
-        _node_timings.clear()
+        _node_sketches.clear()
+        _provider_sketches.clear()
         _provider_counters.clear()
+        _provider_errors.clear()
+        _error_counters.clear()
+        _cache_counters.clear()
+        _rate_limit_waits.clear()
@@ -4,7 +4,7 @@ import logging
 import os
 from typing import Any, Dict
 
-import requests
+from .webhook_delivery import get_http_session
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +40,7 @@ def post_monitor_event(
     }
 
     try:
-        response = requests.post(url, json=payload, timeout=timeout)
+        response = get_http_session().post(url, json=payload, timeout=timeout)
         logger.info(
             "post_monitor_event",
             extra={"status_code": response.status_code, "run_status": status},
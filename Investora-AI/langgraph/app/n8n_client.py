@@ -1,29 +1,29 @@
 from __future__ import annotations
 
-import json
 import logging
 import os
-from typing import Any, Dict, List
-
-import requests
+from typing import Any, Dict
 
+from .webhook_delivery import WebhookMessage, send_message
 
 logger = logging.getLogger(__name__)
 
 
-def post_candidates_to_n8n(
-    weekly_digest: Dict[str, Any],
-    run_id: str,
-    run_date: str,
-    timeout: int = 15,
-) -> None:
-    """POST a user-specific weekly digest payload to the n8n candidates webhook."""
-    url = os.environ.get(
+def candidate_webhook_url() -> str:
+    return os.environ.get(
         "CANDIDATE_WEBHOOK_URL",
         "https://ai-experiementation.app.n8n.cloud/webhook/investora-candidates",
     )
 
-    payload: Dict[str, Any] = {
+
+def report_webhook_url() -> str:
+    return os.environ.get(
+        "N8N_WEBHOOK_URL", "https://ai-experiementation.app.n8n.cloud/webhook-test/langgraph-results"
+    )
+
+
+def build_candidate_payload(weekly_digest: Dict[str, Any], run_id: str, run_date: str) -> Dict[str, Any]:
+    return {
         "user_id": weekly_digest.get("user_id", ""),
         "email": weekly_digest.get("email", ""),
         "to": weekly_digest.get("email", ""),
@@ -42,30 +42,22 @@ def post_candidates_to_n8n(
         "next_actions": weekly_digest.get("next_actions", []),
     }
 
-    response = requests.post(url, json=payload, timeout=timeout)
-    logger.info(
-        "post_candidates_to_n8n",
-        extra={
-            "status_code": response.status_code,
-            "user_id": weekly_digest.get("user_id", ""),
-            "top_weekly_signals": len(weekly_digest.get("top_weekly_signals", [])),
-        },
-    )
-    if response.status_code >= 400:
-        raise RuntimeError(f"Candidate webhook failed {response.status_code}: {response.text[:200]}")
-
 
-def post_report_to_n8n(report_json: Dict[str, Any], timeout: int = 30) -> Dict[str, Any]:
-    url = os.environ.get(
-        "N8N_WEBHOOK_URL", "https://ai-experiementation.app.n8n.cloud/webhook-test/langgraph-results"
-    )
-    headers = {"Content-Type": "application/json"}
+def post_candidates_to_n8n(
+    weekly_digest: Dict[str, Any],
+    run_id: str,
+    run_date: str,
+    timeout: int = 15,
+) -> None:
+    """POST a user-specific weekly digest payload to the n8n candidates webhook."""
+    payload = build_candidate_payload(weekly_digest, run_id, run_date)
+    message = WebhookMessage("candidates", candidate_webhook_url(), payload, key=str(payload["user_id"]) or "*")
+    send_message(message, timeout_s=timeout)
 
-    response = requests.post(url, headers=headers, data=json.dumps(report_json), timeout=timeout)
-    logger.info("Posted report to n8n", extra={"status_code": response.status_code, "url": url})
 
-    if response.status_code >= 400:
-        raise RuntimeError(f"n8n webhook failed {response.status_code}: {response.text[:200]}")
+def post_report_to_n8n(report_json: Dict[str, Any], timeout: int = 30) -> Dict[str, Any]:
+    response = send_message(WebhookMessage("report", report_webhook_url(), report_json), timeout_s=timeout)
+    logger.info("Posted report to n8n", extra={"status_code": response.status_code})
 
     body: Any
     try:
@@ -13,16 +13,20 @@ from .nodes.delivery import (
     post_to_n8n_node,
 )
 from .nodes.evidence import retrieve_rag_context_node, synthesize_evidence_node
-from .nodes.persistence import persist_snapshot_node
+from .nodes.incremental import reuse_prior_artifacts_node
+from .nodes.persistence import persist_snapshot_node, post_monitor_event_node
 from .nodes.personalization import check_user_alerts_node, emit_signals_node, personalize_signals_node
 from .nodes.scoring import compute_scores_node
+from .nodes.sharded_collection import collect_sharded_node
 from .state import GraphState
 
 NODE_REGISTRY: Dict[str, Callable[[GraphState], GraphState]] = {
     "init_state": init_state,
     "plan_next_action": plan_next_action,
     "execute_tool_action": execute_tool_action,
+    "collect_sharded": collect_sharded_node,
     "compute_scores": compute_scores_node,
+    "reuse_prior_artifacts": reuse_prior_artifacts_node,
     "detect_anomalies": detect_anomalies_node,
     "retrieve_rag_context": retrieve_rag_context_node,
     "synthesize_evidence": synthesize_evidence_node,
@@ -36,4 +40,5 @@ NODE_REGISTRY: Dict[str, Callable[[GraphState], GraphState]] = {
     "post_to_n8n": post_to_n8n_node,
     "persist_report": persist_report_node,
     "persist_snapshot": persist_snapshot_node,
+    "post_monitor_event": post_monitor_event_node,
 }
@@ -12,7 +12,8 @@ logger = logging.getLogger(__name__)
 
 
 def detect_anomalies_node(state: GraphState) -> GraphState:
-    from ..event_store import load_recent_runs, load_run
+    from ..event_store import latest_run_id, load_run
+    from ..history_store import get_history_store
 
     run_id = state["run_id"]
     run_date = state["run_date"]
@@ -20,15 +21,33 @@ def detect_anomalies_node(state: GraphState) -> GraphState:
     anomaly_events: List[Dict[str, Any]] = []
 
     prior_scores_by_ticker: Dict[str, Dict[str, float]] = {}
+    prior_run_id = None
     try:
-        recent = load_recent_runs(limit=2)
-        prior_run_meta = next((r for r in recent if r["run_id"] != run_id), None)
-        if prior_run_meta:
-            prior_snapshot = load_run(prior_run_meta["run_id"])
+        prior_run_id = latest_run_id(exclude_run_id=run_id)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("detect_anomalies_node: could not look up the prior run: %s", exc)
+
+    mirrored = None
+    if prior_run_id:
+        # SQLite decides which run is the prior one; the mirror only serves its
+        # scores. If that run's mirror write failed, read SQLite instead of
+        # silently comparing against an older mirrored run.
+        try:
+            history = get_history_store()
+            if history is not None:
+                mirrored = history.run_scores(prior_run_id)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("detect_anomalies_node: columnar history read failed: %s", exc)
+
+    if mirrored is not None:
+        prior_scores_by_ticker = mirrored
+    elif prior_run_id:
+        try:
+            prior_snapshot = load_run(prior_run_id)
             if prior_snapshot:
                 prior_scores_by_ticker = prior_snapshot.get("scores", {})
-    except Exception as exc:  # noqa: BLE001
-        logger.warning("detect_anomalies_node: could not load prior run scores: %s", exc)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("detect_anomalies_node: could not load prior run scores: %s", exc)
 
     volume_by_ticker: Dict[str, Dict[str, float]] = {}
     try:
@@ -6,20 +6,23 @@ import uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Dict, List, Literal, Optional, Tuple
 
-from openai import OpenAI
-
 from ..budget_manager import budget_manager
+from ..event_store import init_db
 from ..graph_constants import DEFAULT_UNIVERSE, UNIVERSE_PATH
+from ..llm_client import get_openai_client
 from ..mcp_tools import MCPToolError, get_fundamentals_tool, get_market_tool, get_news_tool
-from ..metrics import record_provider_call
+from ..metrics import record_provider_call, time_provider_call
 from ..logging_utils import install_redaction_filter
 from ..profile_store import load_all_profiles
+from ..rate_limiter import get_rate_limiter
 from ..settings import get_settings
 from ..state import GraphState, today_iso
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_FETCH_ACTIONS = ("market", "fundamentals", "news")
+
 
 def _load_universe_tickers() -> List[str]:
     use_mock_data = settings.run.use_mock_data
@@ -52,8 +55,9 @@ def _parse_universe() -> List[str]:
         tickers = DEFAULT_UNIVERSE[:]
 
     tickers = sorted(set(tickers))
-    if len(tickers) > 50:
-        tickers = tickers[:50]
+    cap = settings.run.universe_cap
+    if cap and len(tickers) > cap:
+        tickers = tickers[:cap]
     return tickers
 
 
@@ -68,7 +72,9 @@ def init_state(state: GraphState) -> GraphState:
     skip_post = bool(state.get("skip_post", settings.run.skip_n8n_post))
     scope = state.get("scope") or ("fast" if skip_synthesis else "full")
     trigger_weekly_digest = bool(state.get("trigger_weekly_digest", False))
+    incremental = bool(state.get("incremental", settings.run.incremental_runs))
 
+    init_db()
     user_profiles = load_all_profiles()
     all_watchlist_tickers: List[str] = []
     for profile in user_profiles:
@@ -89,12 +95,23 @@ def init_state(state: GraphState) -> GraphState:
         "action": None,
         "action_reason": None,
         "done_collection": False,
+        "sharded_collection_done": False,
+        "collection_stats": {},
+        "planner_stats": _new_planner_stats(),
+        "incremental": incremental,
+        "split_phase": bool(state.get("split_phase", False)),
+        "input_fingerprints": {},
+        "prior_artifacts": {},
+        "carried_forward": {"rag": {}, "synthesis": {}},
+        "reuse_stats": {},
         "failed_tickers": [],
         "per_ticker_data": per_ticker_data,
         "scores": {},
         "per_ticker_rag_context": {},
         "rag_stats": {"retrieved_items": 0, "queries_run": 0},
         "per_ticker_synthesis": {},
+        "synthesis_stats": {},
+        "delivery_stats": {},
         "signal_events": [],
         "anomaly_signals": [],
         "personalized_bundles": {},
@@ -108,6 +125,17 @@ def init_state(state: GraphState) -> GraphState:
     }
 
 
+def _new_planner_stats() -> Dict[str, Any]:
+    return {
+        "mode": settings.run.planner_mode,
+        "iterations": 0,
+        "llm_calls": 0,
+        "dag_dispatches": 0,
+        "iterations_saved": 0,
+        "llm_calls_saved": 0,
+    }
+
+
 def _next_missing_for_ticker(data: Dict[str, Any]) -> Literal["market", "fundamentals", "news", "complete"]:
     if "market" not in data:
         return "market"
@@ -130,6 +158,23 @@ def _pending_action_candidates(state: GraphState) -> List[Tuple[str, str]]:
     return out
 
 
+def _fetch_plan(state: GraphState) -> Dict[str, List[str]]:
+    """Every outstanding fetch grouped by action: {action: [tickers missing it]}.
+
+    The whole plan is dispatched in one planner step instead of one ReAct step
+    per action: market first, then fundamentals and news side by side.
+    """
+    failed = set(state["failed_tickers"])
+    plan: Dict[str, List[str]] = {}
+    for action in _FETCH_ACTIONS:
+        targets = [
+            t for t in state["tickers"] if t not in failed and action not in state["per_ticker_data"].get(t, {})
+        ]
+        if targets:
+            plan[action] = targets
+    return plan
+
+
 def _validate_llm_choice(
     state: GraphState,
     ticker: Optional[str],
@@ -157,7 +202,7 @@ def _openai_react_plan(state: GraphState) -> Tuple[Optional[str], str, str]:
         raise RuntimeError("OPENAI_API_KEY is required for ReAct planning.")
 
     model = settings.providers.openai_model
-    client = OpenAI(api_key=api_key)
+    client = get_openai_client(api_key)
 
     universe_snapshot = []
     for ticker in state["tickers"]:
@@ -184,22 +229,24 @@ def _openai_react_plan(state: GraphState) -> Tuple[Optional[str], str, str]:
         "universe_status": universe_snapshot,
     }
 
-    response = client.responses.create(
-        model=model,
-        input=[
-            {
-                "role": "system",
-                "content": (
-                    "You are a data-fetch planner. pending_pairs contains items that still need fetching. "
-                    "Pick one item from pending_pairs and return ONLY compact JSON: "
-                    "{\"thought\": \"...\", \"action\": \"<market|fundamentals|news>\", \"ticker\": \"<TICKER>\", \"reason\": \"...\"}. "
-                    "Never choose action=compute while pending_pairs is non-empty."
-                ),
-            },
-            {"role": "user", "content": json.dumps(prompt)},
-        ],
-        temperature=0,
-    )
+    get_rate_limiter("openai").acquire()
+    with time_provider_call("openai_planner"):
+        response = client.responses.create(
+            model=model,
+            input=[
+                {
+                    "role": "system",
+                    "content": (
+                        "You are a data-fetch planner. pending_pairs contains items that still need fetching. "
+                        "Pick one item from pending_pairs and return ONLY compact JSON: "
+                        "{\"thought\": \"...\", \"action\": \"<market|fundamentals|news>\", \"ticker\": \"<TICKER>\", \"reason\": \"...\"}. "
+                        "Never choose action=compute while pending_pairs is non-empty."
+                    ),
+                },
+                {"role": "user", "content": json.dumps(prompt)},
+            ],
+            temperature=0,
+        )
 
     content = getattr(response, "output_text", "") or ""
     if not content.strip():
@@ -226,10 +273,46 @@ def _openai_react_plan(state: GraphState) -> Tuple[Optional[str], str, str]:
     return _validate_llm_choice(state, ticker, action, reason, pending=pending)
 
 
+def _should_shard(state: GraphState, pending: List[Tuple[str, str]]) -> bool:
+    if state.get("sharded_collection_done"):
+        return False
+    return len({t for t, _ in pending}) >= settings.run.sharded_collection_min_tickers
+
+
+def _should_dispatch_dag(state: GraphState, pending: List[Tuple[str, str]]) -> bool:
+    # One DAG pass per run. Anything still pending afterwards (e.g. a partial batch
+    # failure) is the ambiguous case and goes to the step-wise planner.
+    if settings.run.planner_mode != "dag" or not pending:
+        return False
+    return not state["planner_stats"].get("dag_dispatches")
+
+
 def plan_next_action(state: GraphState) -> GraphState:
     pending = _pending_action_candidates(state)
-
-    if settings.run.use_mock_data:
+    stats = state.get("planner_stats") or _new_planner_stats()
+    state["planner_stats"] = stats
+    stats["iterations"] += 1
+
+    if _should_shard(state, pending):
+        # Large universes skip the per-action ReAct loop: one pass collects everything in shards.
+        selected_ticker, selected_action, reason = (
+            None,
+            "collect_sharded",
+            f"{len({t for t, _ in pending})} tickers pending; collecting in parallel shards.",
+        )
+    elif _should_dispatch_dag(state, pending):
+        plan = _fetch_plan(state)
+        # The step-wise loop needs one planner round (and one LLM call outside mock
+        # mode) per action stage; the DAG pass covers them all in a single iteration.
+        stats["iterations_saved"] += len(plan) - 1
+        if not settings.run.use_mock_data:
+            stats["llm_calls_saved"] += len(plan)
+        selected_ticker, selected_action, reason = (
+            None,
+            "fetch_all",
+            f"Dispatching {sum(len(v) for v in plan.values())} fetch(es) across {', '.join(plan)} in one pass.",
+        )
+    elif settings.run.use_mock_data:
         if pending:
             selected_ticker, selected_action, reason = (
                 pending[0][0],
@@ -243,6 +326,8 @@ def plan_next_action(state: GraphState) -> GraphState:
                 "All required tool data collected; proceed to scoring.",
             )
     else:
+        if pending:
+            stats["llm_calls"] += 1
         try:
             selected_ticker, selected_action, reason = _openai_react_plan(state)
         except Exception as exc:  # noqa: BLE001
@@ -274,6 +359,8 @@ def plan_next_action(state: GraphState) -> GraphState:
     state["action"] = selected_action
     state["action_reason"] = reason
     state["done_collection"] = selected_action == "compute"
+    if state["done_collection"]:
+        logger.info("planner_stats", extra={"run_id": state.get("run_id", ""), **stats})
     state["react_history"].append(
         {
             "phase": "thought_action",
@@ -320,8 +407,63 @@ def _run_news_tool(state: GraphState, ticker: str) -> None:
     )
 
 
+def _stage_state(state: GraphState, tickers: List[str]) -> Dict[str, Any]:
+    """Private copy of the collection fields one DAG stage may touch, limited to `tickers`."""
+    return {
+        "run_id": state.get("run_id", "unknown"),
+        "run_date": state["run_date"],
+        "tickers": tickers,
+        "failed_tickers": list(state["failed_tickers"]),
+        "per_ticker_data": {t: dict(d) for t, d in state["per_ticker_data"].items()},
+        "errors": [],
+        "react_history": [],
+    }
+
+
+def _execute_fetch_plan(state: GraphState) -> GraphState:
+    plan = _fetch_plan(state)
+    state["planner_stats"]["dag_dispatches"] += 1
+    if not plan:
+        return state
+
+    if "market" in plan:
+        # Market goes first: a ticker without a quote is never scored, so its
+        # fundamentals/news calls (and budget) would be wasted.
+        _execute_action(state, "market")
+    quoted = [t for t in state["tickers"] if "market" in state["per_ticker_data"].get(t, {})]
+    followups = [action for action in plan if action != "market"]
+    if not followups or not quoted:
+        return state
+
+    # Each stage works on its own copy so the stages never share mutable state;
+    # results are merged back in fixed action order for a deterministic history.
+    # Tickers whose market fetch came back empty stay pending for the step-wise planner.
+    stages = {action: _stage_state(state, quoted) for action in followups}
+    with ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix="fetch-dag") as pool:
+        futures = [pool.submit(_execute_action, stage, action) for action, stage in stages.items()]
+        for future in futures:
+            future.result()
+
+    for action, stage in stages.items():
+        for ticker, data in stage["per_ticker_data"].items():
+            if action in data:
+                state["per_ticker_data"].setdefault(ticker, {})[action] = data[action]
+        for ticker in stage["failed_tickers"]:
+            if ticker not in state["failed_tickers"]:
+                state["failed_tickers"].append(ticker)
+        state["errors"].extend(stage["errors"])
+        state["react_history"].extend(stage["react_history"])
+    return state
+
+
 def execute_tool_action(state: GraphState) -> GraphState:
     action = state.get("action")
+    if action == "fetch_all":
+        return _execute_fetch_plan(state)
+    return _execute_action(state, action)
+
+
+def _execute_action(state: GraphState, action: Optional[str]) -> GraphState:
     if action not in {"market", "fundamentals", "news"}:
         return state
 
@@ -339,7 +481,7 @@ def execute_tool_action(state: GraphState) -> GraphState:
     if action == "market":
         tool = get_market_tool()
         if hasattr(tool, "run_many"):
-            if not budget_manager.can_call(action, run_id):
+            if not budget_manager.try_reserve(action, run_id, 1):
                 logger.warning(
                     "budget_manager: run %s exhausted API budget; skipping market batch for %d ticker(s)",
                     run_id,
@@ -358,7 +500,6 @@ def execute_tool_action(state: GraphState) -> GraphState:
                 )
                 return state
 
-            budget_manager.record_call(action, run_id)
             try:
                 batch = tool.run_many(targets)
                 for ticker in targets:
@@ -402,7 +543,7 @@ def execute_tool_action(state: GraphState) -> GraphState:
     if action in {"fundamentals", "news"}:
         admitted: List[str] = []
         for ticker in targets:
-            if not budget_manager.can_call(action, run_id):
+            if not budget_manager.try_reserve(action, run_id, 1):
                 logger.warning(
                     "budget_manager: run %s exhausted API budget; skipping remaining %s calls (%d ticker(s))",
                     run_id,
@@ -420,7 +561,6 @@ def execute_tool_action(state: GraphState) -> GraphState:
                     }
                 )
                 continue
-            budget_manager.record_call(action, run_id)
             admitted.append(ticker)
 
         if not admitted:
@@ -479,7 +619,7 @@ def execute_tool_action(state: GraphState) -> GraphState:
         return state
 
     for ticker in targets:
-        if not budget_manager.can_call(action, run_id):
+        if not budget_manager.try_reserve(action, run_id, 1):
             logger.warning(
                 "budget_manager: run %s exhausted API budget; skipping remaining %s calls (%d ticker(s))",
                 run_id,
@@ -498,7 +638,6 @@ def execute_tool_action(state: GraphState) -> GraphState:
             )
             continue
 
-        budget_manager.record_call(action, run_id)
         try:
             if action == "market":
                 _run_market_tool(state, ticker)
@@ -1,17 +1,38 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
 
-from ..alert_client import post_alerts_to_n8n, post_user_alerts_to_n8n
+from ..alert_client import alert_webhook_url, build_alert_payload, build_user_alert_payload
 from ..graph_constants import REPORT_DIR
-from ..n8n_client import post_candidates_to_n8n, post_report_to_n8n
+from ..n8n_client import build_candidate_payload, candidate_webhook_url, report_webhook_url
 from ..reporting import build_markdown, build_report, persist_report
+from ..settings import get_settings
 from ..state import GraphState
-from ..weekly_digest import build_weekly_user_digest
+from ..webhook_delivery import DispatchResult, WebhookMessage, dispatch
+from ..weekly_digest import WeeklyEventIndex, build_weekly_user_digest, digest_window
 from .shared import should_skip_post
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_ERROR_TOOLS = {
+    "alerts": "alert_webhook",
+    "user_alerts": "user_alert_webhook",
+    "candidates": "candidate_webhook",
+    "report": "n8n",
+}
+
+
+def _record_dispatch(state: GraphState, node: str, result: DispatchResult) -> None:
+    """Failed sends are queued for retry; they are still reported as run errors."""
+    for message, error in result.failures:
+        for key in message.key.split(","):
+            state["errors"].append({"ticker": key, "tool": _ERROR_TOOLS.get(message.kind, message.kind), "error": error})
+    stats = dict(state.get("delivery_stats") or {})
+    stats[node] = result.as_dict()
+    state["delivery_stats"] = stats
 
 
 def post_alerts_node(state: GraphState) -> GraphState:
@@ -20,6 +41,8 @@ def post_alerts_node(state: GraphState) -> GraphState:
 
     profiles_by_user = {str(p.get("user_id", "")): p for p in state.get("user_profiles", [])}
     bundles = state.get("personalized_bundles", {}) or {}
+    url = alert_webhook_url()
+    messages: List[WebhookMessage] = []
     for user_id, bundle in bundles.items():
         profile = profiles_by_user.get(user_id, {})
         if not profile or not bool(profile.get("alert_notifications", True)):
@@ -41,24 +64,22 @@ def post_alerts_node(state: GraphState) -> GraphState:
             deduped.append(s)
         if not deduped:
             continue
-        try:
-            post_alerts_to_n8n(
-                deduped,
-                run_id=state["run_id"],
-                run_date=state["run_date"],
-                user_id=user_id,
-                telegram_chat_id=chat_id,
-            )
-        except Exception as exc:  # noqa: BLE001
-            state["errors"].append({"ticker": user_id, "tool": "alert_webhook", "error": str(exc)})
+        payload = build_alert_payload(
+            deduped,
+            run_id=state["run_id"],
+            run_date=state["run_date"],
+            user_id=user_id,
+            telegram_chat_id=chat_id,
+        )
+        messages.append(WebhookMessage("alerts", url, payload, key=user_id))
 
     user_alerts = state.get("triggered_user_alerts", [])
     if user_alerts:
-        try:
-            post_user_alerts_to_n8n(user_alerts, run_id=state["run_id"], run_date=state["run_date"])
-        except Exception as exc:  # noqa: BLE001
-            state["errors"].append({"ticker": "*", "tool": "user_alert_webhook", "error": str(exc)})
+        payload = build_user_alert_payload(user_alerts, run_id=state["run_id"], run_date=state["run_date"])
+        messages.append(WebhookMessage("user_alerts", url, payload))
 
+    if messages:
+        _record_dispatch(state, "post_alerts", dispatch(messages))
     return state
 
 
@@ -74,6 +95,7 @@ def post_candidates_node(state: GraphState) -> GraphState:
 
     profiles_by_user = {str(p.get("user_id", "")): p for p in state.get("user_profiles", [])}
     bundles = state.get("personalized_bundles", {}) or {}
+    recipients: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = []
     for user_id, bundle in bundles.items():
         profile = profiles_by_user.get(user_id, {})
         if not profile:
@@ -83,11 +105,38 @@ def post_candidates_node(state: GraphState) -> GraphState:
         email = str(profile.get("email", "")).strip()
         if not email:
             continue
-        try:
-            digest = build_weekly_user_digest(profile, bundle, lookback_days=7)
-            post_candidates_to_n8n(digest, run_id=state["run_id"], run_date=state["run_date"])
-        except Exception as exc:  # noqa: BLE001
-            state["errors"].append({"ticker": user_id, "tool": "candidate_webhook", "error": str(exc)})
+        recipients.append((user_id, profile, bundle))
+    if not recipients:
+        return state
+
+    # Every digest in a run shares the same week; load its events once.
+    indexes: Dict[Tuple[str, str], WeeklyEventIndex] = {}
+    try:
+        for _, _, bundle in recipients:
+            _, week_start, week_end = digest_window(bundle, lookback_days=7)
+            if (week_start, week_end) not in indexes:
+                indexes[(week_start, week_end)] = WeeklyEventIndex.load(week_start, week_end)
+    except Exception as exc:  # noqa: BLE001
+        state["errors"].append({"ticker": "*", "tool": "candidate_webhook", "error": str(exc)})
+        return state
+
+    def _build(profile: Dict[str, Any], bundle: Dict[str, Any]) -> Dict[str, Any]:
+        _, week_start, week_end = digest_window(bundle, lookback_days=7)
+        digest = build_weekly_user_digest(profile, bundle, lookback_days=7, index=indexes[(week_start, week_end)])
+        return build_candidate_payload(digest, run_id=state["run_id"], run_date=state["run_date"])
+
+    url = candidate_webhook_url()
+    messages: List[WebhookMessage] = []
+    max_workers = max(1, min(settings.concurrency.digest_parallelism, len(recipients)))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weekly-digest") as pool:
+        futures = [(user_id, pool.submit(_build, profile, bundle)) for user_id, profile, bundle in recipients]
+        for user_id, future in futures:
+            try:
+                messages.append(WebhookMessage("candidates", url, future.result(), key=user_id))
+            except Exception as exc:  # noqa: BLE001
+                state["errors"].append({"ticker": user_id, "tool": "candidate_webhook", "error": str(exc)})
+    if messages:
+        _record_dispatch(state, "post_candidates", dispatch(messages))
     return state
 
 
@@ -104,6 +153,8 @@ def assemble_report_json_node(state: GraphState) -> GraphState:
     )
     if report is not None:
         report["anomaly_signals"] = state.get("anomaly_signals", [])  # type: ignore[typeddict-unknown-key]
+        report["system_metadata"]["incremental"] = state.get("reuse_stats", {})  # type: ignore[typeddict-unknown-key]
+        report["system_metadata"]["synthesis"] = state.get("synthesis_stats", {})  # type: ignore[typeddict-unknown-key]
     state["report_json"] = report
     return state
 
@@ -121,10 +172,9 @@ def post_to_n8n_node(state: GraphState) -> GraphState:
         state["errors"].append({"ticker": "*", "tool": "n8n", "error": "No report payload to post"})
         return state
 
-    try:
-        post_report_to_n8n(state["report_json"])
-    except Exception as exc:  # noqa: BLE001
-        state["errors"].append({"ticker": "*", "tool": "n8n", "error": str(exc)})
+    _record_dispatch(
+        state, "post_to_n8n", dispatch([WebhookMessage("report", report_webhook_url(), state["report_json"])])
+    )
     return state
 
 
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Dict, List, Optional
-
-from openai import OpenAI
+from typing import Any, Dict, List, Optional, Tuple
 
+from ..llm_client import get_openai_client
 from ..mcp_tools import get_rag_tool
+from ..mcp_tools.cache import get_tool_cache
+from ..metrics import record_provider_call, time_provider_call
+from ..rate_limiter import get_rate_limiter
 from ..reporting import DEFAULT_COMPANIES
 from ..scoring import momentum_weekly_return
 from ..settings import get_settings
@@ -16,6 +20,61 @@ from ..state import GraphState
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+SYNTHESIS_CACHE_DIR = "data/cache"
+_SYNTHESIS_NAMESPACE = "synthesis"
+
+SYNTHESIS_SYSTEM_PROMPT = (
+    "You are a financial analyst producing structured observations for a stock screening system. "
+    "Given evidence, return ONLY a JSON object with these exact keys: "
+    "quality_narrative (str), momentum_narrative (str), "
+    "news_catalyst ({present: bool, headline: str|null, impact: str, strength: str}), "
+    "risk_factors (list of str). "
+    "Use rag_context when present and prefer evidence-backed statements. "
+    "If rag_context is empty or weak, avoid overconfident claims. "
+    "Be factual and concise. Never make buy/sell recommendations."
+)
+
+SYNTHESIS_BATCH_SYSTEM_PROMPT = (
+    SYNTHESIS_SYSTEM_PROMPT
+    + " The user message holds a list of evidence bundles under 'tickers'. Return one object per bundle "
+    "in 'results', each with its 'ticker' and the keys above, judging every ticker only on its own evidence."
+)
+
+_SYNTHESIS_ITEM_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": ["ticker", "quality_narrative", "momentum_narrative", "news_catalyst", "risk_factors"],
+    "properties": {
+        "ticker": {"type": "string"},
+        "quality_narrative": {"type": "string"},
+        "momentum_narrative": {"type": "string"},
+        "news_catalyst": {
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["present", "headline", "impact", "strength"],
+            "properties": {
+                "present": {"type": "boolean"},
+                "headline": {"type": ["string", "null"]},
+                "impact": {"type": "string"},
+                "strength": {"type": "string"},
+            },
+        },
+        "risk_factors": {"type": "array", "items": {"type": "string"}},
+    },
+}
+
+_SYNTHESIS_BATCH_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "name": "synthesis_batch",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "additionalProperties": False,
+        "required": ["results"],
+        "properties": {"results": {"type": "array", "items": _SYNTHESIS_ITEM_SCHEMA}},
+    },
+}
+
 
 def _parse_synthesis_json(content: str) -> Dict[str, Any]:
     content = content.strip()
@@ -97,6 +156,14 @@ def _evidence_target_tickers(state: GraphState) -> List[str]:
     return selected
 
 
+def _rag_query(ticker: str) -> str:
+    # Kept stable week over week so the embedding for each ticker's query is cached.
+    return (
+        f"{ticker} catalysts, trend confirmation, risk factors and "
+        "fundamental context for this week's investment analysis"
+    )
+
+
 def retrieve_rag_context_node(state: GraphState) -> GraphState:
     if state.get("skip_synthesis"):
         state["per_ticker_rag_context"] = {}
@@ -118,13 +185,24 @@ def retrieve_rag_context_node(state: GraphState) -> GraphState:
         state["rag_stats"] = {"retrieved_items": 0, "queries_run": 0}
         return state
 
+    # Incremental runs: tickers with unchanged inputs keep last run's context.
+    carried = (state.get("carried_forward") or {}).get("rag", {})
+    context_map.update({t: list(carried[t]) for t in target_tickers if t in carried})
+    target_tickers = [t for t in target_tickers if t not in carried]
     max_workers = max(1, min(parallelism, len(target_tickers)))
 
+    # Embed every query in one batched request so the per-ticker lookups below
+    # only hit the embeddings cache.
+    embedded_queries = 0
+    prime = getattr(tool, "prime_embeddings", None)
+    if prime is not None and target_tickers:
+        try:
+            embedded_queries = prime([_rag_query(t) for t in target_tickers])
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("retrieve_rag_context_node: batched embedding failed; embedding per query: %s", exc)
+
     def _fetch_one(ticker: str) -> tuple[str, List[Dict[str, Any]], Optional[str]]:
-        query = (
-            f"{ticker} catalysts, trend confirmation, risk factors and "
-            "fundamental context for this week's investment analysis"
-        )
+        query = _rag_query(ticker)
         try:
             rag = tool.run(
                 {
@@ -161,15 +239,118 @@ def retrieve_rag_context_node(state: GraphState) -> GraphState:
                 state["errors"].append({"ticker": t, "tool": "rag_retrieval", "error": err})
 
     state["per_ticker_rag_context"] = context_map
-    state["rag_stats"] = {"retrieved_items": retrieved_items, "queries_run": queries_run}
+    state["rag_stats"] = {
+        "retrieved_items": retrieved_items,
+        "queries_run": queries_run,
+        "embedded_queries": embedded_queries,
+        "carried_forward": len(context_map) - queries_run,
+    }
     logger.info(
         "retrieve_rag_context_node",
-        extra={"run_id": state["run_id"], "retrieved_items": retrieved_items, "queries_run": queries_run},
+        extra={
+            "run_id": state["run_id"],
+            "retrieved_items": retrieved_items,
+            "queries_run": queries_run,
+            "embedded_queries": embedded_queries,
+        },
     )
     return state
 
 
+def synthesis_cache_key(model: str, system_prompt: str, bundle: Dict[str, Any]) -> str:
+    """Content address of a synthesis request: model, prompt hash and canonical bundle JSON."""
+    prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+    canonical = json.dumps(bundle, sort_keys=True, separators=(",", ":"), default=str)
+    raw = f"{model}\n{prompt_hash}\n{canonical}"
+    return f"{_SYNTHESIS_NAMESPACE}_{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English/JSON; only used to size batches.
+    return len(text) // 4 + 1
+
+
+def pack_synthesis_batches(
+    bundles: Dict[str, Dict[str, Any]], batch_size: int, token_budget: int
+) -> List[List[str]]:
+    """Group tickers into requests of at most batch_size bundles and ~token_budget input tokens.
+
+    A bundle larger than the budget on its own still gets a request to itself.
+    """
+    available = max(1, token_budget - estimate_tokens(SYNTHESIS_BATCH_SYSTEM_PROMPT))
+    batches: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for ticker, bundle in bundles.items():
+        cost = estimate_tokens(json.dumps(bundle))
+        if current and (len(current) >= batch_size or used + cost > available):
+            batches.append(current)
+            current, used = [], 0
+        current.append(ticker)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _synthesis_result(ticker: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    catalyst = payload.get("news_catalyst") or {}
+    return {
+        "ticker": ticker,
+        "quality_narrative": str(payload.get("quality_narrative", "")),
+        "momentum_narrative": str(payload.get("momentum_narrative", "")),
+        "news_catalyst": {
+            "present": bool(catalyst.get("present", False)),
+            "headline": catalyst.get("headline"),
+            "impact": str(catalyst.get("impact", "neutral")),
+            "strength": str(catalyst.get("strength", "low")),
+        },
+        "risk_factors": list(payload.get("risk_factors") or []),
+    }
+
+
+def _is_synthesis_item(item: Any) -> bool:
+    return (
+        isinstance(item, dict)
+        and isinstance(item.get("quality_narrative"), str)
+        and isinstance(item.get("momentum_narrative"), str)
+        and isinstance(item.get("news_catalyst"), dict)
+        and isinstance(item.get("risk_factors"), list)
+    )
+
+
+def _response_usage(response: Any) -> tuple[int, int]:
+    usage = getattr(response, "usage", None)
+    return int(getattr(usage, "input_tokens", 0) or 0), int(getattr(usage, "output_tokens", 0) or 0)
+
+
+# (per-ticker (ticker, result, error) triples, request/token counters) for one unit of work.
+_SynthesisOutcome = Tuple[List[Tuple[str, Dict[str, Any], Optional[str]]], Dict[str, int]]
+
+
+def _new_synthesis_stats(targets: int = 0) -> Dict[str, Any]:
+    return {
+        "mode": "single",
+        "targets": targets,
+        "carried_forward": 0,
+        "cache_hits": 0,
+        "api_calls": 0,
+        "batched_requests": 0,
+        "individual_retries": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_hit_ratio": 0.0,
+    }
+
+
 def synthesize_evidence_node(state: GraphState) -> GraphState:
+    """Produce a SynthesisResult per evidence target ticker.
+
+    With SYNTHESIS_BATCH_SIZE > 1, uncached bundles are packed into structured-
+    output requests of up to that many tickers (and SYNTHESIS_BATCH_MAX_TOKENS
+    estimated input tokens); tickers missing or malformed in a batch answer are
+    retried one request each.
+    """
     from ..models import empty_synthesis
 
     if state.get("skip_synthesis"):
@@ -186,84 +367,149 @@ def synthesize_evidence_node(state: GraphState) -> GraphState:
     model = settings.providers.synthesis_model
     synthesis: Dict[str, Any] = {}
     parallelism = settings.concurrency.synthesis_parallelism
+    batch_size = settings.pipeline.synthesis_batch_size
 
     target_tickers = _evidence_target_tickers(state)
     if not target_tickers:
         state["per_ticker_synthesis"] = {}
         return state
 
-    system_prompt = (
-        "You are a financial analyst producing structured observations for a stock screening system. "
-        "Given evidence, return ONLY a JSON object with these exact keys: "
-        "quality_narrative (str), momentum_narrative (str), "
-        "news_catalyst ({present: bool, headline: str|null, impact: str, strength: str}), "
-        "risk_factors (list of str). "
-        "Use rag_context when present and prefer evidence-backed statements. "
-        "If rag_context is empty or weak, avoid overconfident claims. "
-        "Be factual and concise. Never make buy/sell recommendations."
-    )
-
-    max_workers = max(1, min(parallelism, len(target_tickers)))
-
-    def _synthesize_one(ticker: str) -> tuple[str, Dict[str, Any], Optional[str]]:
+    carried = (state.get("carried_forward") or {}).get("synthesis", {})
+    synthesis.update({t: carried[t] for t in target_tickers if t in carried})
+    stats = _new_synthesis_stats(len(target_tickers))
+    stats["mode"] = "batch" if batch_size > 1 else "single"
+    stats["carried_forward"] = len(synthesis)
+    target_tickers = [t for t in target_tickers if t not in carried]
+
+    # Identical evidence under the same model and prompt gives the same answer
+    # at temperature 0, so it is answered from the cache instead of the API.
+    # Batch mode also accepts answers cached by single-ticker requests.
+    cache = get_tool_cache(SYNTHESIS_CACHE_DIR)
+    prompts = [SYNTHESIS_BATCH_SYSTEM_PROMPT, SYNTHESIS_SYSTEM_PROMPT] if batch_size > 1 else [SYNTHESIS_SYSTEM_PROMPT]
+    bundles: Dict[str, Dict[str, Any]] = {}
+    for ticker in target_tickers:
         bundle = _build_evidence_bundle(
             ticker,
             state["per_ticker_data"],
             state["scores"],
             rag_context=state.get("per_ticker_rag_context", {}).get(ticker, []),
         )
+        cached = None
+        for prompt in prompts:
+            cached = cache.get(_SYNTHESIS_NAMESPACE, synthesis_cache_key(model, prompt, bundle))
+            if cached is not None:
+                break
+        if cached is not None:
+            synthesis[ticker] = copy.deepcopy(cached)
+            stats["cache_hits"] += 1
+            continue
+        bundles[ticker] = bundle
+    target_tickers = list(bundles)
+    client = get_openai_client(api_key)
+
+    def _request(system_prompt: str, user_content: str, text_format: Optional[Dict[str, Any]] = None):
+        get_rate_limiter("openai").acquire()
+        record_provider_call("openai_synthesis")
+        kwargs: Dict[str, Any] = {
+            "model": model,
+            "input": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content},
+            ],
+            "temperature": 0,
+        }
+        if text_format is not None:
+            kwargs["text"] = {"format": text_format}
+        with time_provider_call("openai_synthesis"):
+            return client.responses.create(**kwargs)
+
+    def _synthesize_one(ticker: str) -> _SynthesisOutcome:
+        usage = {"api_calls": 1, "batched_requests": 0, "individual_retries": 0, "input_tokens": 0, "output_tokens": 0}
         try:
-            client = OpenAI(api_key=api_key)
-            response = client.responses.create(
-                model=model,
-                input=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": json.dumps(bundle)},
-                ],
-                temperature=0,
-            )
+            response = _request(SYNTHESIS_SYSTEM_PROMPT, json.dumps(bundles[ticker]))
+            usage["input_tokens"], usage["output_tokens"] = _response_usage(response)
             content = getattr(response, "output_text", "") or ""
-            payload = _parse_synthesis_json(content)
-            catalyst = payload.get("news_catalyst") or {}
-            return (
-                ticker,
-                {
-                    "ticker": ticker,
-                    "quality_narrative": str(payload.get("quality_narrative", "")),
-                    "momentum_narrative": str(payload.get("momentum_narrative", "")),
-                    "news_catalyst": {
-                        "present": bool(catalyst.get("present", False)),
-                        "headline": catalyst.get("headline"),
-                        "impact": str(catalyst.get("impact", "neutral")),
-                        "strength": str(catalyst.get("strength", "low")),
-                    },
-                    "risk_factors": list(payload.get("risk_factors") or []),
-                },
-                None,
+            result = _synthesis_result(ticker, _parse_synthesis_json(content))
+        except Exception as exc:  # noqa: BLE001
+            return [(ticker, empty_synthesis(ticker), str(exc))], usage
+        cache.set(_SYNTHESIS_NAMESPACE, synthesis_cache_key(model, SYNTHESIS_SYSTEM_PROMPT, bundles[ticker]), result)
+        return [(ticker, result, None)], usage
+
+    def _synthesize_batch(batch: List[str]) -> _SynthesisOutcome:
+        usage = {"api_calls": 1, "batched_requests": 1, "individual_retries": 0, "input_tokens": 0, "output_tokens": 0}
+        items: Dict[str, Any] = {}
+        try:
+            response = _request(
+                SYNTHESIS_BATCH_SYSTEM_PROMPT,
+                json.dumps({"tickers": [bundles[t] for t in batch]}),
+                _SYNTHESIS_BATCH_FORMAT,
             )
+            usage["input_tokens"], usage["output_tokens"] = _response_usage(response)
+            payload = _parse_synthesis_json(getattr(response, "output_text", "") or "")
+            for item in payload.get("results") or []:
+                if isinstance(item, dict):
+                    items[str(item.get("ticker", "")).upper()] = item
         except Exception as exc:  # noqa: BLE001
-            return ticker, empty_synthesis(ticker), str(exc)
+            logger.warning("synthesize_evidence_node: batch of %d failed (%s); retrying per ticker", len(batch), exc)
+
+        results: List[Tuple[str, Dict[str, Any], Optional[str]]] = []
+        for ticker in batch:
+            item = items.get(ticker)
+            if _is_synthesis_item(item):
+                result = _synthesis_result(ticker, item)
+                cache.set(
+                    _SYNTHESIS_NAMESPACE,
+                    synthesis_cache_key(model, SYNTHESIS_BATCH_SYSTEM_PROMPT, bundles[ticker]),
+                    result,
+                )
+                results.append((ticker, result, None))
+                continue
+            retried, retry_usage = _synthesize_one(ticker)
+            results.extend(retried)
+            usage["individual_retries"] += 1
+            for key in ("api_calls", "input_tokens", "output_tokens"):
+                usage[key] += retry_usage[key]
+        return results, usage
+
+    def _work(unit: List[str]) -> _SynthesisOutcome:
+        return _synthesize_batch(unit) if batch_size > 1 else _synthesize_one(unit[0])
+
+    if batch_size > 1:
+        units = pack_synthesis_batches(bundles, batch_size, settings.pipeline.synthesis_batch_max_tokens)
+    else:
+        units = [[t] for t in target_tickers]
+    max_workers = max(1, min(parallelism, len(units)))
 
-    futures: Dict[Any, str] = {}
+    futures: Dict[Any, List[str]] = {}
     with ThreadPoolExecutor(max_workers=max_workers) as pool:
-        for ticker in target_tickers:
-            futures[pool.submit(_synthesize_one, ticker)] = ticker
+        for unit in units:
+            futures[pool.submit(_work, unit)] = unit
 
         for future in as_completed(futures):
-            ticker = futures[future]
+            unit = futures[future]
             try:
-                t, payload, err = future.result()
+                outcomes, usage = future.result()
             except Exception as exc:  # noqa: BLE001
-                logger.warning("synthesize_evidence_node: %s failed: %s", ticker, exc)
-                state["errors"].append({"ticker": ticker, "tool": "synthesize_evidence", "error": str(exc)})
-                synthesis[ticker] = empty_synthesis(ticker)
+                for ticker in unit:
+                    logger.warning("synthesize_evidence_node: %s failed: %s", ticker, exc)
+                    state["errors"].append({"ticker": ticker, "tool": "synthesize_evidence", "error": str(exc)})
+                    synthesis[ticker] = empty_synthesis(ticker)
                 continue
 
-            synthesis[t] = payload
-            if err:
-                logger.warning("synthesize_evidence_node: %s failed: %s", t, err)
-                state["errors"].append({"ticker": t, "tool": "synthesize_evidence", "error": err})
+            for key, value in usage.items():
+                stats[key] += value
+            for t, payload, err in outcomes:
+                synthesis[t] = payload
+                if err:
+                    logger.warning("synthesize_evidence_node: %s failed: %s", t, err)
+                    state["errors"].append({"ticker": t, "tool": "synthesize_evidence", "error": err})
 
+    reusable = stats["targets"] - stats["carried_forward"]
+    stats["cache_hit_ratio"] = round(stats["cache_hits"] / reusable, 4) if reusable else 0.0
     state["per_ticker_synthesis"] = synthesis
-    logger.info("synthesize_evidence_node", extra={"run_id": state["run_id"], "count": len(synthesis)})
+    state["synthesis_stats"] = stats
+    logger.info(
+        "synthesize_evidence_node",
+        extra={"run_id": state["run_id"], "count": len(synthesis), **stats},
+    )
     return state
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List
+
+from ..repositories import RunRepository
+from ..state import GraphState
+
+logger = logging.getLogger(__name__)
+run_repo = RunRepository()
+
+_INPUT_KEYS = ("market", "fundamentals", "news")
+
+
+def fingerprint_inputs(data: Dict[str, Any]) -> str:
+    """Stable hash of a ticker's collected tool payloads (market/fundamentals/news)."""
+    payload = {key: data.get(key) for key in _INPUT_KEYS}
+    raw = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _empty_reuse_stats(enabled: bool, tickers: int = 0) -> Dict[str, Any]:
+    return {
+        "enabled": enabled,
+        "tickers": tickers,
+        "unchanged_inputs": 0,
+        "scores_unchanged": 0,
+        "rag_reused": 0,
+        "synthesis_reused": 0,
+        "input_reuse_ratio": 0.0,
+        "synthesis_reuse_ratio": 0.0,
+    }
+
+
+def reuse_prior_artifacts_node(state: GraphState) -> GraphState:
+    """Fingerprint scored tickers and, in incremental mode, carry forward prior work.
+
+    Tickers whose collected inputs hash the same as in the latest stored run get
+    that run's RAG context, so retrieval only runs for changed tickers. Scores are
+    always recomputed: they are normalised across the whole universe, so one
+    changed ticker moves everyone's score. The synthesis narrates the score, so it
+    is only carried forward when the recomputed score also matches the stored one.
+    """
+    scored = list(state.get("scores", {}))
+    fingerprints = {t: fingerprint_inputs(state["per_ticker_data"].get(t, {})) for t in scored}
+    state["input_fingerprints"] = fingerprints
+    state["carried_forward"] = {"rag": {}, "synthesis": {}}
+    state["prior_artifacts"] = {}
+    incremental = bool(state.get("incremental"))
+    stats = _empty_reuse_stats(incremental, len(scored))
+    state["reuse_stats"] = stats
+    if not scored:
+        return state
+
+    try:
+        prior = run_repo.latest_ticker_artifacts(scored)
+    except Exception as exc:  # noqa: BLE001
+        state["errors"].append({"ticker": "*", "tool": "incremental", "error": str(exc)})
+        return state
+
+    unchanged = {t: prior[t] for t in scored if t in prior and prior[t]["fingerprint"] == fingerprints[t]}
+    # Kept even outside incremental mode so persist_snapshot_node can carry
+    # RAG/synthesis forward in storage for tickers this run did not synthesise.
+    state["prior_artifacts"] = unchanged
+    stats["unchanged_inputs"] = len(unchanged)
+    same_score = {t for t, p in unchanged.items() if p["score"] == state["scores"][t]}
+    stats["scores_unchanged"] = len(same_score)
+    stats["input_reuse_ratio"] = round(len(unchanged) / len(scored), 4)
+
+    if incremental:
+        carried = state["carried_forward"]
+        carried["rag"] = {t: p["rag_context"] for t, p in unchanged.items() if p["rag_context"] is not None}
+        carried["synthesis"] = {
+            t: p["synthesis"] for t, p in unchanged.items() if t in same_score and p["synthesis"] is not None
+        }
+        stats["rag_reused"] = len(carried["rag"])
+        stats["synthesis_reused"] = len(carried["synthesis"])
+        stats["synthesis_reuse_ratio"] = round(len(carried["synthesis"]) / len(scored), 4)
+
+    logger.info("reuse_prior_artifacts_node", extra={"run_id": state.get("run_id", ""), **stats})
+    return state
+
+
+def ticker_artifacts(state: GraphState) -> List[Dict[str, Any]]:
+    """Rows for event_store.save_ticker_artifacts describing this run's per-ticker work.
+
+    Failed retrievals/syntheses are not stored, so a later run redoes them
+    instead of carrying forward an empty placeholder. A stored synthesis is only
+    kept for a ticker this run did not synthesise if its score has not moved.
+    """
+    failed_rag = {e.get("ticker") for e in state["errors"] if e.get("tool") == "rag_retrieval"}
+    failed_synthesis = {e.get("ticker") for e in state["errors"] if e.get("tool") == "synthesize_evidence"}
+    rag = {t: v for t, v in (state.get("per_ticker_rag_context") or {}).items() if t not in failed_rag}
+    synthesis = {t: v for t, v in (state.get("per_ticker_synthesis") or {}).items() if t not in failed_synthesis}
+    prior = state.get("prior_artifacts", {}) or {}
+    rows: List[Dict[str, Any]] = []
+    for ticker, fingerprint in (state.get("input_fingerprints") or {}).items():
+        carried = prior.get(ticker, {})
+        score = state["scores"].get(ticker, {})
+        carried_synthesis = carried.get("synthesis") if carried.get("score") == score else None
+        rows.append(
+            {
+                "ticker": ticker,
+                "fingerprint": fingerprint,
+                "score": score,
+                "rag_context": rag[ticker] if ticker in rag else carried.get("rag_context"),
+                "synthesis": synthesis[ticker] if ticker in synthesis else carried_synthesis,
+            }
+        )
+    return rows
@@ -1,19 +1,42 @@
 from __future__ import annotations
 
 import logging
+from collections import Counter
 from datetime import datetime, timezone
+from typing import Any, Dict
 
+from ..graph_topology import critical_path
 from ..repositories import RunRepository
 from ..state import GraphState
+from .incremental import ticker_artifacts
 
 logger = logging.getLogger(__name__)
 run_repo = RunRepository()
 
 
+def run_metrics_breakdown(state: GraphState) -> Dict[str, Any]:
+    """Per-run metrics stored next to the snapshot (timings cover nodes before persist_snapshot)."""
+    timings = dict(state.get("node_timings") or {})
+    errors_by_tool = Counter(str(e.get("tool", "unknown")) for e in state["errors"])
+    return {
+        "node_timings_ms": timings,
+        "total_node_ms": round(sum(timings.values()), 2),
+        "critical_path": critical_path(timings, phase="core" if state.get("split_phase") else "full"),
+        "tickers": len(state["tickers"]),
+        "failed_tickers": len(state["failed_tickers"]),
+        "signal_events": len(state["signal_events"]),
+        "errors_by_tool": dict(errors_by_tool),
+        "planner": state.get("planner_stats") or {},
+        "collection": state.get("collection_stats") or {},
+        "rag": state.get("rag_stats") or {},
+        "synthesis": state.get("synthesis_stats") or {},
+        "incremental": state.get("reuse_stats") or {},
+    }
+
+
 def persist_snapshot_node(state: GraphState) -> GraphState:
-    from ..event_store import init_db
+    from ..event_store import init_db, transaction
     from ..models import AnalysisSnapshot
-    from ..monitor_client import post_monitor_event
 
     snapshot = AnalysisSnapshot(
         run_id=state["run_id"],
@@ -28,10 +51,19 @@ def persist_snapshot_node(state: GraphState) -> GraphState:
     )
     try:
         init_db()
-        run_repo.save_snapshot(snapshot)
+        with transaction():
+            run_repo.save_snapshot(snapshot)
+            run_repo.save_ticker_artifacts(state["run_id"], state["run_date"], ticker_artifacts(state))
+            run_repo.save_run_metrics(state["run_id"], state["run_date"], run_metrics_breakdown(state))
         logger.info("persist_snapshot_node", extra={"run_id": state["run_id"]})
     except Exception as exc:  # noqa: BLE001
         state["errors"].append({"ticker": "*", "tool": "event_store", "error": str(exc)})
+    return state
+
+
+def post_monitor_event_node(state: GraphState) -> GraphState:
+    """Report run completion to MONITOR_WEBHOOK_URL (last node of the run)."""
+    from ..monitor_client import post_monitor_event
 
     run_status = "error" if state["errors"] else "ok"
     post_monitor_event(
@@ -4,7 +4,7 @@ import logging
 from typing import Any, Dict, List
 
 from ..alert_checker import check_user_alerts
-from ..personalization import build_user_bundle
+from ..personalization import PersonalizationEngine, build_user_bundle
 from ..repositories import BundleRepository
 from ..state import GraphState
 
@@ -43,29 +43,56 @@ def personalize_signals_node(state: GraphState) -> GraphState:
         state["personalized_bundles"] = {}
         return state
 
-    for profile in users:
+    rows: List[tuple] = []
+    engine = None
+    try:
+        engine = PersonalizationEngine(
+            profiles=users,
+            signal_events=state.get("signal_events", []),
+            scores=state.get("scores", {}),
+            run_id=state["run_id"],
+            run_date=state["run_date"],
+            per_ticker_data=state.get("per_ticker_data", {}),
+        )
+    except Exception as exc:  # noqa: BLE001
+        # Malformed signals: fall back to per-user bundles so errors are reported per user.
+        logger.warning("personalize_signals_node: engine compile failed, building per user: %s", exc)
+
+    for user_index, profile in enumerate(users):
         user_id = profile.get("user_id", "")
         if not user_id:
             continue
         try:
-            bundle = build_user_bundle(
-                user_profile=profile,
-                signal_events=state.get("signal_events", []),
-                scores=state.get("scores", {}),
-                run_id=state["run_id"],
-                run_date=state["run_date"],
-                per_ticker_data=state.get("per_ticker_data", {}),
-            )
-            bundle_repo.save_user_bundle(bundle)
+            if engine is not None:
+                bundle = engine.build_bundle(user_index)
+            else:
+                bundle = build_user_bundle(
+                    user_profile=profile,
+                    signal_events=state.get("signal_events", []),
+                    scores=state.get("scores", {}),
+                    run_id=state["run_id"],
+                    run_date=state["run_date"],
+                    per_ticker_data=state.get("per_ticker_data", {}),
+                )
+            # Serialize per user so one bad bundle cannot fail the bulk write.
+            rows.append(bundle_repo.serialize_user_bundle(bundle))
             bundles[user_id] = bundle
         except Exception as exc:  # noqa: BLE001
             state["errors"].append({"ticker": user_id, "tool": "personalize_signals", "error": str(exc)})
             logger.warning("personalize_signals_node: user %s failed: %s", user_id, exc)
 
+    saved = 0
+    try:
+        saved = bundle_repo.save_serialized_user_bundles(rows)
+    except Exception as exc:  # noqa: BLE001
+        # Bundles stay in state so alerts and digests still go out for this run.
+        state["errors"].append({"ticker": "*", "tool": "personalize_signals", "error": str(exc)})
+        logger.warning("personalize_signals_node: bulk bundle save failed: %s", exc)
+
     state["personalized_bundles"] = bundles
     logger.info(
         "personalize_signals_node",
-        extra={"run_id": state["run_id"], "user_count": len(users), "saved_bundles": len(bundles)},
+        extra={"run_id": state["run_id"], "user_count": len(users), "saved_bundles": saved},
     )
     return state
 
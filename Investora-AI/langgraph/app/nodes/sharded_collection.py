@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from ..budget_manager import budget_manager
+from ..mcp_tools import get_fundamentals_tool, get_market_tool, get_news_tool
+from ..metrics import record_provider_call
+from ..settings import get_settings
+from ..state import GraphState
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_ACTIONS = ("market", "fundamentals", "news")
+
+
+@dataclass
+class _ShardResult:
+    """What one shard worker collected; merged into graph state on the calling thread."""
+
+    index: int
+    data: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    errors: List[Dict[str, str]] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    budget_skipped: Dict[str, int] = field(default_factory=dict)
+    duration_ms: float = 0.0
+
+
+def _collect_shard(
+    index: int,
+    tickers: List[str],
+    existing: Dict[str, Dict[str, Any]],
+    run_id: str,
+    run_date: str,
+) -> _ShardResult:
+    """Collect one shard: market first, then fundamentals and news side by side.
+
+    Market runs first so a ticker without a quote is not fetched further. The
+    fundamentals and news passes hit different providers and do not depend on
+    each other, so they run concurrently; each is still one request per ticker,
+    paced by that provider's shared rate limiter.
+    """
+    started = time.perf_counter()
+    result = _ShardResult(index=index)
+    data = {t: {} for t in tickers}
+    failed: set[str] = set()
+    lock = threading.Lock()
+
+    def _fail(ticker: str, action: str, error: str) -> None:
+        with lock:
+            result.errors.append({"ticker": ticker, "tool": action, "error": error})
+            failed.add(ticker)
+
+    def _skip(action: str, skipped: List[str]) -> None:
+        if not skipped:
+            return
+        with lock:
+            result.budget_skipped[action] = result.budget_skipped.get(action, 0) + len(skipped)
+            failed.update(skipped)
+
+    def _fetch_one(tool: Any, action: str, ticker: str) -> None:
+        record_provider_call(action)
+        payload: Dict[str, Any] = {"ticker": ticker}
+        if action == "news":
+            payload["end_date"] = run_date
+        try:
+            data[ticker][action] = tool.run(payload)
+        except Exception as exc:  # noqa: BLE001
+            _fail(ticker, action, str(exc))
+
+    def _collect_action(action: str) -> None:
+        with lock:
+            needed = [t for t in tickers if t not in failed and action not in existing.get(t, {})]
+        if not needed:
+            return
+
+        market_tool = get_market_tool() if action == "market" else None
+        if market_tool is not None and hasattr(market_tool, "run_many"):
+            # A market batch costs one call for the whole shard.
+            if not budget_manager.try_reserve(action, run_id, 1):
+                _skip(action, needed)
+                return
+            record_provider_call(action)
+            try:
+                batch = market_tool.run_many(needed)
+            except Exception as exc:  # noqa: BLE001
+                # One bad symbol can fail the whole batch; retry per ticker, which
+                # costs one call each on top of the batch call already spent.
+                logger.warning("collect_sharded: shard %d market batch failed (%s); retrying per ticker", index, exc)
+                granted = budget_manager.try_reserve(action, run_id, len(needed))
+                _skip(action, needed[granted:])
+                for ticker in needed[:granted]:
+                    _fetch_one(market_tool, action, ticker)
+                return
+            for ticker in needed:
+                payload = batch.get(ticker)
+                if isinstance(payload, dict):
+                    data[ticker]["market"] = payload
+                else:
+                    _fail(ticker, action, "No market payload returned from batch fetch")
+            return
+
+        tool = market_tool or (get_fundamentals_tool() if action == "fundamentals" else get_news_tool())
+        granted = budget_manager.try_reserve(action, run_id, len(needed))
+        _skip(action, needed[granted:])
+        for ticker in needed[:granted]:
+            _fetch_one(tool, action, ticker)
+
+    _collect_action("market")
+    with ThreadPoolExecutor(max_workers=len(_ACTIONS) - 1, thread_name_prefix=f"collect-shard-{index}") as pool:
+        for future in [pool.submit(_collect_action, action) for action in _ACTIONS[1:]]:
+            future.result()
+
+    result.data = {t: d for t, d in data.items() if d}
+    result.failed = [t for t in tickers if t in failed]
+    result.duration_ms = round((time.perf_counter() - started) * 1000.0, 2)
+    return result
+
+
+def collect_sharded_node(state: GraphState) -> GraphState:
+    """Collect market/fundamentals/news for every pending ticker in parallel shards.
+
+    Shards are processed by a bounded worker pool; provider pacing comes from the
+    shared rate limiter and budget is reserved per shard through budget_manager.
+    Every pending ticker ends up either fully collected or in failed_tickers, so
+    the planner moves straight on to scoring afterwards.
+    """
+    run_id = state.get("run_id", "unknown")
+    failed_before = set(state["failed_tickers"])
+    pending = [
+        t
+        for t in state["tickers"]
+        if t not in failed_before and any(a not in state["per_ticker_data"].get(t, {}) for a in _ACTIONS)
+    ]
+    shard_size = settings.run.shard_size
+    shards = [pending[i : i + shard_size] for i in range(0, len(pending), shard_size)]
+    workers = max(1, min(settings.concurrency.shard_parallelism, len(shards)))
+
+    started = time.perf_counter()
+    results: List[_ShardResult] = []
+    if shards:
+        existing = {t: dict(state["per_ticker_data"].get(t, {})) for t in pending}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="collect-shard") as pool:
+            futures = [
+                pool.submit(_collect_shard, i, shard, existing, run_id, state["run_date"])
+                for i, shard in enumerate(shards)
+            ]
+            results = [f.result() for f in futures]
+
+    budget_skipped: Dict[str, int] = {}
+    for res in sorted(results, key=lambda r: r.index):
+        for ticker, collected in res.data.items():
+            state["per_ticker_data"].setdefault(ticker, {}).update(collected)
+        state["errors"].extend(res.errors)
+        for ticker in res.failed:
+            if ticker not in state["failed_tickers"]:
+                state["failed_tickers"].append(ticker)
+        for action, count in res.budget_skipped.items():
+            budget_skipped[action] = budget_skipped.get(action, 0) + count
+
+    # Anything still incomplete would send the planner back into the slow loop.
+    for ticker in pending:
+        data = state["per_ticker_data"].get(ticker, {})
+        if ticker not in state["failed_tickers"] and not all(a in data for a in _ACTIONS):
+            state["failed_tickers"].append(ticker)
+
+    if budget_skipped:
+        logger.warning(
+            "budget_manager: run %s exhausted API budget during sharded collection: %s", run_id, budget_skipped
+        )
+
+    wall_ms = round((time.perf_counter() - started) * 1000.0, 2)
+    state["sharded_collection_done"] = True
+    state["collection_stats"] = {
+        "mode": "sharded",
+        "tickers": len(pending),
+        "shards": len(shards),
+        "shard_size": shard_size,
+        "workers": workers,
+        "wall_ms": wall_ms,
+        "shard_ms": [r.duration_ms for r in sorted(results, key=lambda r: r.index)],
+        "failed": len([t for t in pending if t in set(state["failed_tickers"])]),
+        "budget_skipped": budget_skipped,
+    }
+    state["react_history"].append(
+        {
+            "phase": "observation",
+            "ticker": "",
+            "action": "collect_sharded",
+            "message": f"Collected {len(pending)} tickers in {len(shards)} shard(s) across {workers} worker(s).",
+        }
+    )
+    logger.info(
+        "collect_sharded",
+        extra={"run_id": run_id, "tickers": len(pending), "shards": len(shards), "wall_ms": wall_ms},
+    )
+    return state
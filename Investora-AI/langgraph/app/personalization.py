@@ -2,17 +2,36 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from .models import PersonalizedSignal, SignalEvent, UserProfileContext, UserReportBundle
 from .scoring import momentum_weekly_return
 
 _UNIVERSE_PATH = Path(__file__).resolve().parent.parent / "data" / "universe_mock.json"
+_CRYPTO_TICKERS = {"BTC", "BTC-USD", "ETH", "ETH-USD", "SOL", "SOL-USD"}
+
+_universe_lock = threading.Lock()
+_universe_cache: Tuple[Optional[Tuple[str, float]], Dict[str, Dict[str, Any]]] = (None, {})
 
 
 def _load_universe_meta() -> Dict[str, Dict[str, Any]]:
+    """Universe metadata by ticker, re-read only when the file's mtime changes.
+
+    The returned mapping is shared; callers must not mutate it.
+    """
+    global _universe_cache
+    try:
+        stamp = (str(_UNIVERSE_PATH), _UNIVERSE_PATH.stat().st_mtime)
+    except OSError:
+        return {}
+    with _universe_lock:
+        if _universe_cache[0] == stamp:
+            return _universe_cache[1]
     try:
         with _UNIVERSE_PATH.open("r", encoding="utf-8") as f:
             payload = json.load(f)
@@ -21,9 +40,11 @@ def _load_universe_meta() -> Dict[str, Dict[str, Any]]:
             t = str(row.get("ticker", "")).upper()
             if t:
                 out[t] = row
-        return out
     except Exception:
         return {}
+    with _universe_lock:
+        _universe_cache = (stamp, out)
+    return out
 
 
 def compute_profile_fit(
@@ -42,7 +63,7 @@ def compute_profile_fit(
     themes = {str(x).lower() for x in (meta.get("themes") or [])}
 
     if "no_crypto" in constraints and (
-        asset_class == "crypto" or ticker.endswith("-USD") or ticker in {"BTC", "BTC-USD", "ETH", "ETH-USD", "SOL", "SOL-USD"}
+        asset_class == "crypto" or ticker.endswith("-USD") or ticker in _CRYPTO_TICKERS
     ):
         return 0.0
 
@@ -298,3 +319,304 @@ def build_user_bundle(
         "mismatch_alerts": mismatch_alerts,
     }
     return bundle
+
+
+# ── Precompiled engine ────────────────────────────────────────────────────────
+#
+# compute_profile_fit / compute_risk_mismatch only ever produce a handful of
+# distinct values, determined by a few small integers per (signal, user) pair:
+#   interest matches (capped at 2), preferred-asset match, horizon case,
+#   crypto exclusion, and severity level for low-risk users.
+# The engine compiles those integers for every pair with NumPy and reads the
+# scores out of lookup tables filled in by the reference formulas above, so the
+# results are identical to build_user_bundle.
+
+_HORIZON_CASES = ("short", "long", "other")  # momentum+short, momentum+long, anything else
+_EXCLUDED_FIT = 3 * 2 * 3
+_MISMATCH_VALUES = (0.0, 0.2, 0.4)
+
+
+def _fit_value(interest_matches: int, asset_match: bool, horizon_case: str) -> float:
+    score = 0.0
+    score += min(0.4, 0.2 * interest_matches)
+    if asset_match:
+        score += 0.2
+    if horizon_case == "short":
+        score += 0.2
+    elif horizon_case == "long":
+        score -= 0.2
+    else:
+        score += 0.05
+    return max(0.0, min(1.0, round(score, 3)))
+
+
+_FIT_TABLE = np.array(
+    [
+        _fit_value(k, bool(a), h)
+        for k in range(3)
+        for a in range(2)
+        for h in _HORIZON_CASES
+    ]
+    + [0.0]
+)
+_FIT_SCORE_TABLE = np.array(
+    [
+        [
+            [round((wl * 0.4) + (float(pf) * 0.4) - (mm * 0.2), 3) for mm in _MISMATCH_VALUES]
+            for pf in _FIT_TABLE
+        ]
+        for wl in (0.0, 1.0)
+    ]
+)
+
+
+def _severity_level(severity: str) -> int:
+    s = severity.lower()
+    if s in {"critical", "high"}:
+        return 2
+    if s == "medium":
+        return 1
+    return 0
+
+
+class _CompiledProfile:
+    __slots__ = ("profile", "column", "horizon", "risk_low", "watchlist", "error")
+
+    def __init__(self, profile: UserProfileContext, column: int) -> None:
+        self.profile = profile
+        self.column = column
+        self.error: Optional[Exception] = None
+        self.watchlist: List[str] = []
+        self.horizon = "medium"
+        self.risk_low = False
+        try:
+            self.watchlist = [t.upper() for t in profile.get("watchlist", [])]
+            self.horizon = str(profile.get("horizon", "medium")).lower()
+            self.risk_low = str(profile.get("risk_tolerance", "medium")).lower() == "low"
+        except Exception as exc:  # noqa: BLE001
+            self.error = exc
+
+
+class PersonalizationEngine:
+    """Builds every user's bundle for one run from state compiled once.
+
+    On construction the signals are reduced to per-signal constants (narrative,
+    urgency, ticker features) and the profiles to inverted indexes from
+    interest token / asset class / watchlist ticker to user columns. Those feed
+    ticker x user matrices, so scoring one user is a few array lookups over the
+    signals instead of rebuilding sets and re-reading the universe per pair.
+    Only signals that land in a bundle are turned into PersonalizedSignal dicts.
+
+    Output matches build_user_bundle for the same inputs (except generated_at).
+    """
+
+    def __init__(
+        self,
+        profiles: List[UserProfileContext],
+        signal_events: List[SignalEvent],
+        scores: Dict[str, Dict[str, float]],
+        run_id: str,
+        run_date: str,
+        per_ticker_data: Dict[str, Dict[str, Any]],
+        universe_meta: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> None:
+        self.run_id = run_id
+        self.run_date = run_date
+        self.scores = scores
+        self.per_ticker_data = per_ticker_data
+        self.market_regime = compute_market_regime(scores)
+        self.thresholds = _discovery_thresholds()
+        universe_meta = _load_universe_meta() if universe_meta is None else universe_meta
+
+        self._compile_signals(signal_events, universe_meta)
+        self._compile_profiles(profiles)
+
+    # -- compilation -----------------------------------------------------------
+
+    def _compile_signals(self, signal_events: List[SignalEvent], universe_meta: Dict[str, Dict[str, Any]]) -> None:
+        self.signals = signal_events
+        tickers: Dict[str, int] = {}
+        sig_ticker: List[int] = []
+        momentum: List[bool] = []
+        severity: List[int] = []
+        confidence: List[float] = []
+        self._base: List[Dict[str, Any]] = []
+        for ev in signal_events:
+            ticker = ev["ticker"].upper()
+            sig_ticker.append(tickers.setdefault(ticker, len(tickers)))
+            momentum.append("momentum" in ev.get("signal_type", ""))
+            severity.append(_severity_level(str(ev.get("severity", "low"))))
+            confidence.append(float(ev.get("confidence", 0.0)))
+            self._base.append(
+                {
+                    "ticker": ticker,
+                    "narrative": _fallback_narrative(ev, self.scores),
+                    "urgency": _urgency_from_severity(ev.get("severity", "low")),
+                    "frame_watchlist": assign_action_frame(ev, in_watchlist=True),
+                    "frame_discovery": assign_action_frame(ev, in_watchlist=False),
+                    "risk_flags": [ev.get("signal_type", "signal")] if ev.get("severity") in {"high", "critical"} else [],
+                }
+            )
+
+        self._tickers = list(tickers)
+        # Small codes and row indices: these arrays are built once per run but read per user.
+        self._sig_ticker = np.asarray(sig_ticker, dtype=np.int32)
+        self._momentum = np.asarray(momentum, dtype=bool)
+        self._severity = np.asarray(severity, dtype=np.int8)
+        self._confidence = np.asarray(confidence, dtype=np.float64)
+        self._high_severity = np.flatnonzero(self._severity == 2)
+
+        self._ticker_tokens: List[List[str]] = []
+        self._ticker_asset: List[str] = []
+        crypto: List[bool] = []
+        for ticker in self._tickers:
+            meta = universe_meta.get(ticker, {})
+            asset_class = str(meta.get("asset_class", "stocks")).lower()
+            sector = str(meta.get("sector", "")).lower()
+            themes = {str(x).lower() for x in (meta.get("themes") or [])}
+            self._ticker_tokens.append(([sector] if sector else []) + sorted(themes))
+            self._ticker_asset.append(asset_class)
+            crypto.append(asset_class == "crypto" or ticker.endswith("-USD") or ticker in _CRYPTO_TICKERS)
+        self._ticker_crypto = np.asarray(crypto, dtype=bool)
+
+    def _compile_profiles(self, profiles: List[UserProfileContext]) -> None:
+        self.profiles = [_CompiledProfile(p, j) for j, p in enumerate(profiles)]
+        by_interest: Dict[str, List[int]] = {}
+        by_asset: Dict[str, List[int]] = {}
+        by_watch: Dict[str, List[int]] = {}
+        no_crypto = np.zeros(len(profiles), dtype=bool)
+        for cp in self.profiles:
+            if cp.error is not None:
+                continue
+            try:
+                interests = {x.lower() for x in cp.profile.get("interests", [])}
+                preferred = {x.lower() for x in cp.profile.get("preferred_assets", [])}
+                constraints = {x.lower() for x in cp.profile.get("constraints", [])}
+            except Exception as exc:  # noqa: BLE001
+                cp.error = exc
+                continue
+            for token in interests:
+                by_interest.setdefault(token, []).append(cp.column)
+            for asset in preferred:
+                by_asset.setdefault(asset, []).append(cp.column)
+            for ticker in set(cp.watchlist):
+                by_watch.setdefault(ticker, []).append(cp.column)
+            no_crypto[cp.column] = "no_crypto" in constraints
+
+        shape = (len(self._tickers), len(profiles))
+        interest_matches = np.zeros(shape, dtype=np.int8)
+        asset_match = np.zeros(shape, dtype=bool)
+        in_watchlist = np.zeros(shape, dtype=bool)
+        for i, ticker in enumerate(self._tickers):
+            for token in self._ticker_tokens[i]:
+                users = by_interest.get(token)
+                if users:
+                    interest_matches[i, users] += 1
+            users = by_asset.get(self._ticker_asset[i])
+            if users:
+                asset_match[i, users] = True
+            users = by_watch.get(ticker)
+            if users:
+                in_watchlist[i, users] = True
+        np.minimum(interest_matches, 2, out=interest_matches)
+
+        # Everything but the horizon term; that depends on the signal, added per user.
+        # _FIT_TABLE has 19 entries, so the tickers x users matrix fits in uint8.
+        self._fit_base = ((interest_matches * 2 + asset_match) * 3).astype(np.uint8)
+        self._excluded = np.outer(self._ticker_crypto, no_crypto)
+        self._in_watchlist = in_watchlist
+
+    # -- per-user scoring ------------------------------------------------------
+
+    def _personalized(self, i: int, wl: bool, pf: float, mm: float, fs: float) -> PersonalizedSignal:
+        ev = self.signals[i]
+        base = self._base[i]
+        return {
+            "signal_id": ev["id"],
+            "ticker": base["ticker"],
+            "signal_type": ev["signal_type"],
+            "direction": ev["direction"],
+            "severity": ev["severity"],
+            "narrative": base["narrative"],
+            "confidence": float(self._confidence[i]),
+            "watchlist_relevance": 1.0 if wl else 0.0,
+            "profile_fit_score": pf,
+            "risk_mismatch_penalty": mm,
+            "bucket": "in_watchlist" if wl else "discovery",
+            "action_frame": base["frame_watchlist"] if wl else base["frame_discovery"],
+            "urgency": base["urgency"],  # type: ignore[typeddict-item]
+            "catalyst_window": None,
+            "risk_flags": list(base["risk_flags"]),
+            "fit_score": fs,
+        }
+
+    def build_bundle(self, user_index: int) -> UserReportBundle:
+        """Bundle for the profile at `user_index` in the list given to the engine."""
+        cp = self.profiles[user_index]
+        if cp.error is not None:
+            raise cp.error
+        j = cp.column
+        rows = self._sig_ticker
+
+        if cp.horizon == "short":
+            horizon_case = np.where(self._momentum, np.uint8(0), np.uint8(2))
+        elif cp.horizon == "long":
+            horizon_case = np.where(self._momentum, np.uint8(1), np.uint8(2))
+        else:
+            horizon_case = np.full(len(self.signals), 2, dtype=np.uint8)
+        fit_idx = self._fit_base[rows, j] + horizon_case
+        fit_idx[self._excluded[rows, j]] = _EXCLUDED_FIT
+        mm_idx = self._severity if cp.risk_low else np.zeros(len(self.signals), dtype=np.int8)
+        wl = self._in_watchlist[rows, j]
+
+        profile_fit = _FIT_TABLE[fit_idx]
+        fit_score = _FIT_SCORE_TABLE[wl.astype(np.intp), fit_idx, mm_idx]
+
+        built: Dict[int, PersonalizedSignal] = {}
+
+        def _signal(i: int) -> PersonalizedSignal:
+            ps = built.get(i)
+            if ps is None:
+                ps = self._personalized(
+                    i, bool(wl[i]), float(profile_fit[i]), _MISMATCH_VALUES[mm_idx[i]], float(fit_score[i])
+                )
+                built[i] = ps
+            return ps
+
+        conf_min, profile_fit_min, fit_score_min = self.thresholds
+        watchlist_signals = [_signal(int(i)) for i in np.flatnonzero(wl)]
+        discovery_mask = (
+            ~wl & (self._confidence >= conf_min) & (profile_fit >= profile_fit_min) & (fit_score >= fit_score_min)
+        )
+        discovery_idx = np.flatnonzero(discovery_mask)
+        discovery_idx = discovery_idx[np.argsort(-fit_score[discovery_idx], kind="stable")]
+        discovery_signals = [_signal(int(i)) for i in discovery_idx]
+        top_idx = np.argsort(-fit_score, kind="stable")[:3]
+        top_conviction = [_signal(int(i)) for i in top_idx]
+
+        mismatch_alerts: List[Dict[str, Any]] = []
+        if cp.risk_low:
+            mismatch_alerts = [
+                {
+                    "ticker": self._base[i]["ticker"],
+                    "issue": "High-risk signal for low-risk profile",
+                    "recommendation": "Review position sizing and risk controls.",
+                }
+                for i in self._high_severity
+            ]
+
+        watchlist_signals.sort(key=lambda x: (x["urgency"], x["fit_score"]), reverse=True)
+
+        return {
+            "user_id": cp.profile["user_id"],
+            "run_id": self.run_id,
+            "run_date": self.run_date,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "watchlist_performance": _watchlist_performance(cp.watchlist, self.per_ticker_data),
+            "market_regime": self.market_regime,  # type: ignore[typeddict-item]
+            "risk_alignment": compute_risk_alignment(cp.watchlist, cp.profile, self.scores),  # type: ignore[typeddict-item]
+            "watchlist_signals": watchlist_signals,
+            "discovery_signals": discovery_signals,
+            "top_conviction": top_conviction,
+            "mismatch_alerts": mismatch_alerts,
+        }
@@ -0,0 +1,444 @@
+"""
+rag_ingestion.py
+----------------
+Bulk ingestion of news articles into the Pinecone index that
+``RAGRetrievalTool`` queries.
+
+* Vector ids are content-addressed: ``article_<TICKER>_<sha256[:16]>`` of the
+  ticker and the embedded text. The same article fetched twice maps to the
+  same id, so duplicates within one fetch collapse and reruns are idempotent.
+* A checkpoint in the SQLite ``rag_ingest_checkpoint`` table records every id
+  once its upsert succeeded. Reruns skip those ids. Ids missing from the
+  checkpoint are checked against the index (``fetch``) before embedding, so a
+  lost checkpoint costs a few fetches, not a full re-embed.
+* New articles are embedded ``RAG_INGEST_CHUNK_SIZE`` texts per call. The
+  default embedder is ``RAGRetrievalTool.embed_many(cache=False)``, which
+  sends ``RAG_EMBED_BATCH_SIZE`` inputs per OpenAI request and keeps corpus
+  vectors out of the shared tool cache.
+* Upserts of ``RAG_UPSERT_BATCH_SIZE`` vectors run on
+  ``RAG_UPSERT_PARALLELISM`` threads while the next chunk is embedded. At
+  most two batches per thread are in flight: embedding waits for an upload
+  slot, so memory stays bounded on large corpora, and each batch is
+  checkpointed as soon as its upsert finishes. Retryable failures (transport errors, 408/429/5xx) back off exponentially
+  from ``RAG_UPSERT_BACKOFF_S`` for up to ``RAG_UPSERT_MAX_ATTEMPTS`` tries.
+  A batch that still fails is left out of the checkpoint and goes out again
+  on the next run.
+* ``reset=True`` wipes the namespace and its checkpoint first (opt-in).
+  Indexes loaded before content-addressed ids still hold the old positional
+  ``article_<TICKER>_<NNNN>`` vectors, which no rerun overwrites; run once
+  with ``reset=True`` (``upload_to_pinecone.py --reset``) to drop them.
+
+``mock_tools.FakeVectorIndex`` and ``mock_tools.fake_embed`` stand in for
+Pinecone and OpenAI in tests and benchmarks.
+
+Public API
+----------
+fetch_company_news(tickers, from_date, to_date)     → (articles, errors)
+build_records(articles)                             → [ArticleRecord, ...]
+PineconeIndex(host, api_key)                        (upsert / fetch_ids / delete_all / query)
+IngestionPipeline(index, embed).run(articles)       → IngestReport
+ingest(articles, index=None, embed=None)            → IngestReport
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Sequence, Set, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import event_store
+from .settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+_DESCRIPTION_CHARS = 300  # of the summary that goes into the embedded text
+_CONNECT_TIMEOUT_S = 3.05
+
+
+class VectorIndexError(RuntimeError):
+    """An index request failed; retryable is False for client errors."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code is None or self.status_code >= 500 or self.status_code in (408, 429)
+
+
+class VectorIndex(Protocol):
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = "") -> int: ...
+
+    def fetch_ids(self, ids: Sequence[str], namespace: str = "") -> Set[str]: ...
+
+    def delete_all(self, namespace: str = "") -> None: ...
+
+    def query(self, vector: List[float], top_k: int = 5, namespace: str = "") -> List[Dict[str, Any]]: ...
+
+
+# ---------------------------------------------------------------------------
+# Articles
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class ArticleRecord:
+    vector_id: str
+    ticker: str
+    content_hash: str
+    text: str
+    metadata: Dict[str, Any]
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def content_hash(ticker: str, text: str) -> str:
+    return hashlib.sha256(f"{ticker.upper()}\n{_normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+def _timestamp(day: str) -> int:
+    try:
+        return int(datetime.strptime(day, "%Y-%m-%d").timestamp()) if day else 0
+    except ValueError:
+        return 0
+
+
+def build_records(articles: Iterable[Dict[str, Any]]) -> List[ArticleRecord]:
+    """Embeddable records with content-addressed ids; untitled articles and duplicates are dropped.
+
+    Each article: ticker, title, and optionally description, source, url, date (YYYY-MM-DD).
+    """
+    records: Dict[str, ArticleRecord] = {}
+    for article in articles:
+        title = _normalize_text(str(article.get("title") or ""))
+        ticker = str(article.get("ticker") or "").strip().upper()
+        if not title or not ticker:
+            continue
+        description = str(article.get("description") or "").strip()
+        text = title
+        if description:
+            text += " " + description[:_DESCRIPTION_CHARS]
+        digest = content_hash(ticker, text)
+        vector_id = f"article_{ticker}_{digest[:16]}"
+        if vector_id in records:
+            continue
+        day = str(article.get("date") or "")
+        records[vector_id] = ArticleRecord(
+            vector_id=vector_id,
+            ticker=ticker,
+            content_hash=digest,
+            text=_normalize_text(text),
+            metadata={
+                "title": title[:200],
+                "description": description[:500],
+                "source": str(article.get("source") or ""),
+                "url": str(article.get("url") or ""),
+                "date": day,
+                "timestamp": _timestamp(day),
+                "ticker": ticker,
+            },
+        )
+    return list(records.values())
+
+
+def _checkpoint_rows(records: Iterable[ArticleRecord]) -> List[Dict[str, str]]:
+    return [{"vector_id": r.vector_id, "ticker": r.ticker, "content_hash": r.content_hash} for r in records]
+
+
+def fetch_company_news(
+    tickers: Sequence[str],
+    from_date: date,
+    to_date: date,
+    *,
+    per_ticker_limit: int = 0,
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+    """Finnhub company news for each ticker in the window; per_ticker_limit 0 = no cap."""
+    api_key = api_key if api_key is not None else os.environ.get("NEWS_API_KEY", "")
+    base_url = (base_url or os.environ.get("NEWS_API_BASE_URL", "https://finnhub.io/api/v1")).rstrip("/")
+    articles: List[Dict[str, Any]] = []
+    errors: List[Dict[str, str]] = []
+    session = requests.Session()
+    for ticker in tickers:
+        ticker = ticker.strip().upper()
+        params = {"symbol": ticker, "from": from_date.isoformat(), "to": to_date.isoformat(), "token": api_key}
+        try:
+            resp = session.get(f"{base_url}/company-news", params=params, timeout=(_CONNECT_TIMEOUT_S, 20))
+            items = resp.json() if resp.status_code == 200 else None
+        except Exception as exc:  # noqa: BLE001
+            errors.append({"ticker": ticker, "tool": "news", "error": str(exc)})
+            continue
+        if not isinstance(items, list):
+            errors.append({"ticker": ticker, "tool": "news", "error": f"unexpected response ({resp.status_code})"})
+            continue
+        if per_ticker_limit > 0:
+            items = items[:per_ticker_limit]
+        for item in items:
+            articles.append(
+                {
+                    "ticker": ticker,
+                    "title": (item.get("headline") or "").strip(),
+                    "description": (item.get("summary") or "").strip(),
+                    "source": (item.get("source") or "Finnhub").strip(),
+                    "url": item.get("url", ""),
+                    "date": datetime.fromtimestamp(item["datetime"]).strftime("%Y-%m-%d") if item.get("datetime") else "",
+                }
+            )
+    session.close()
+    return articles, errors
+
+
+# ---------------------------------------------------------------------------
+# Pinecone
+# ---------------------------------------------------------------------------
+
+
+class PineconeIndex:
+    """Data-plane calls against one Pinecone index host over a pooled session."""
+
+    def __init__(self, host: str, api_key: str, *, pool_size: int = 8, timeout_s: float = 30.0) -> None:
+        self.host = host.rstrip("/")
+        self.timeout_s = timeout_s
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), max_retries=0)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update(
+            {"Api-Key": api_key, "Content-Type": "application/json", "X-Pinecone-API-Version": "2024-07"}
+        )
+
+    def _request(self, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        try:
+            resp = self._session.request(
+                method, f"{self.host}{path}", timeout=(_CONNECT_TIMEOUT_S, self.timeout_s), **kwargs
+            )
+        except requests.RequestException as exc:
+            raise VectorIndexError(f"Pinecone {path} failed: {exc}") from exc
+        if resp.status_code >= 400:
+            raise VectorIndexError(f"Pinecone {path} failed {resp.status_code}: {resp.text[:200]}", resp.status_code)
+        return resp.json() if resp.content else {}
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = "") -> int:
+        data = self._request("POST", "/vectors/upsert", json={"vectors": vectors, "namespace": namespace})
+        return int(data.get("upsertedCount", len(vectors)))
+
+    def fetch_ids(self, ids: Sequence[str], namespace: str = "") -> Set[str]:
+        if not ids:
+            return set()
+        data = self._request("GET", "/vectors/fetch", params={"ids": list(ids), "namespace": namespace})
+        return set((data.get("vectors") or {}).keys())
+
+    def delete_all(self, namespace: str = "") -> None:
+        self._request("POST", "/vectors/delete", json={"deleteAll": True, "namespace": namespace})
+
+    def query(self, vector: List[float], top_k: int = 5, namespace: str = "") -> List[Dict[str, Any]]:
+        body: Dict[str, Any] = {"vector": vector, "topK": top_k, "includeMetadata": True}
+        if namespace:
+            body["namespace"] = namespace
+        return list(self._request("POST", "/query", json=body).get("matches", []))
+
+    def close(self) -> None:
+        self._session.close()
+
+
+def default_index() -> PineconeIndex:
+    host = os.environ.get("PINECONE_HOST", "")
+    api_key = os.environ.get("PINECONE_API_KEY", "")
+    if not host or not api_key:
+        raise RuntimeError("PINECONE_HOST and PINECONE_API_KEY must be set")
+    return PineconeIndex(host, api_key, pool_size=get_settings().rag_ingest.upsert_parallelism)
+
+
+def default_embedder() -> EmbedFn:
+    """Batched OpenAI embeddings that bypass the shared tool cache.
+
+    Corpus vectors are never looked up again (the checkpoint skips them on
+    reruns), and caching them would evict the query embeddings and provider
+    responses that share the cache's size budget.
+    """
+    from .mcp_tools.rag_tool import RAGRetrievalTool
+
+    return functools.partial(RAGRetrievalTool().embed_many, cache=False)
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class IngestReport:
+    namespace: str = ""
+    articles: int = 0
+    unique: int = 0
+    skipped_checkpoint: int = 0
+    skipped_indexed: int = 0
+    embedded: int = 0
+    embed_calls: int = 0
+    upserted: int = 0
+    upsert_requests: int = 0
+    retries: int = 0
+    failed: int = 0
+    peak_in_flight: int = 0
+    reset: bool = False
+    elapsed_s: float = 0.0
+    errors: List[Dict[str, str]] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        out = dict(self.__dict__)
+        out["errors"] = list(self.errors)
+        return out
+
+
+class IngestionPipeline:
+    """Embed new articles in large batches and upsert them concurrently with retry."""
+
+    def __init__(
+        self,
+        index: VectorIndex,
+        embed: EmbedFn,
+        *,
+        namespace: str = "",
+        chunk_size: Optional[int] = None,
+        upsert_batch_size: Optional[int] = None,
+        parallelism: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        backoff_s: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        cfg = get_settings().rag_ingest
+        self.index = index
+        self.embed = embed
+        self.namespace = namespace
+        self.chunk_size = max(1, chunk_size or cfg.chunk_size)
+        self.upsert_batch_size = max(1, upsert_batch_size or cfg.upsert_batch_size)
+        self.parallelism = max(1, parallelism or cfg.upsert_parallelism)
+        self.max_attempts = max(1, max_attempts or cfg.upsert_max_attempts)
+        self.backoff_s = cfg.upsert_backoff_s if backoff_s is None else max(0.0, backoff_s)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def _upsert_with_retry(self, batch: List[Tuple[ArticleRecord, List[float]]], report: IngestReport) -> None:
+        vectors = [{"id": r.vector_id, "values": values, "metadata": r.metadata} for r, values in batch]
+        for attempt in range(1, self.max_attempts + 1):
+            with self._lock:
+                report.upsert_requests += 1
+            try:
+                self.index.upsert(vectors, namespace=self.namespace)
+                return
+            except VectorIndexError as exc:
+                if not exc.retryable or attempt == self.max_attempts:
+                    raise
+                with self._lock:
+                    report.retries += 1
+                delay = self.backoff_s * (2 ** (attempt - 1))
+                self._sleep(delay + random.uniform(0, delay / 2) if delay else 0.0)
+
+    def _already_indexed(self, records: List[ArticleRecord], report: IngestReport) -> Set[str]:
+        found: Set[str] = set()
+        ids = [r.vector_id for r in records]
+        for start in range(0, len(ids), self.upsert_batch_size):
+            try:
+                found |= self.index.fetch_ids(ids[start : start + self.upsert_batch_size], namespace=self.namespace)
+            except VectorIndexError as exc:
+                # Not fatal: the batch is embedded and upserted again (ids are stable).
+                report.errors.append({"ticker": "*", "tool": "index_fetch", "error": str(exc)})
+        return found
+
+    def run(self, articles: Iterable[Dict[str, Any]], *, reset: bool = False) -> IngestReport:
+        started = time.perf_counter()
+        articles = list(articles)
+        records = build_records(articles)
+        report = IngestReport(namespace=self.namespace, articles=len(articles), unique=len(records), reset=reset)
+
+        if reset:
+            self.index.delete_all(namespace=self.namespace)
+            event_store.clear_ingested_vectors(self.namespace)
+
+        done = event_store.load_ingested_ids(self.namespace)
+        pending = [r for r in records if r.vector_id not in done]
+        report.skipped_checkpoint = len(records) - len(pending)
+
+        if pending and not reset:
+            indexed = self._already_indexed(pending, report)
+            if indexed:
+                event_store.record_ingested_vectors(
+                    self.namespace, _checkpoint_rows(r for r in pending if r.vector_id in indexed)
+                )
+                pending = [r for r in pending if r.vector_id not in indexed]
+                report.skipped_indexed = len(indexed)
+
+        in_flight: Dict[Future, List[ArticleRecord]] = {}
+        max_in_flight = 2 * self.parallelism
+
+        def _finish(done: Iterable[Future]) -> None:
+            for future in done:
+                batch = in_flight.pop(future)
+                try:
+                    future.result()
+                except Exception as exc:  # noqa: BLE001
+                    report.failed += len(batch)
+                    report.errors.append({"ticker": batch[0].ticker, "tool": "upsert", "error": str(exc)})
+                    continue
+                event_store.record_ingested_vectors(self.namespace, _checkpoint_rows(batch))
+                report.upserted += len(batch)
+
+        with ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix="rag-upsert") as pool:
+            for start in range(0, len(pending), self.chunk_size):
+                chunk = pending[start : start + self.chunk_size]
+                try:
+                    vectors = self.embed([r.text for r in chunk])
+                except Exception as exc:  # noqa: BLE001
+                    # The chunk stays out of the checkpoint; the next run embeds it.
+                    report.failed += len(chunk)
+                    report.errors.append({"ticker": "*", "tool": "embed", "error": str(exc)})
+                    continue
+                report.embed_calls += 1
+                report.embedded += len(chunk)
+                embedded = list(zip(chunk, vectors))
+                for offset in range(0, len(embedded), self.upsert_batch_size):
+                    if len(in_flight) >= max_in_flight:
+                        _finish(wait(in_flight, return_when=FIRST_COMPLETED).done)
+                    batch = embedded[offset : offset + self.upsert_batch_size]
+                    in_flight[pool.submit(self._upsert_with_retry, batch, report)] = [r for r, _ in batch]
+                    report.peak_in_flight = max(report.peak_in_flight, len(in_flight))
+                # Checkpoint whatever already landed before embedding the next chunk.
+                _finish([f for f in in_flight if f.done()])
+
+            _finish(list(as_completed(in_flight)))
+
+        report.elapsed_s = round(time.perf_counter() - started, 3)
+        logger.info("rag_ingest_done", extra={k: v for k, v in report.as_dict().items() if k != "errors"})
+        return report
+
+
+def ingest(
+    articles: Iterable[Dict[str, Any]],
+    *,
+    index: Optional[VectorIndex] = None,
+    embed: Optional[EmbedFn] = None,
+    namespace: str = "",
+    reset: bool = False,
+    **options: Any,
+) -> IngestReport:
+    """Run the pipeline against Pinecone and OpenAI unless an index / embedder is given."""
+    event_store.init_db()
+    pipeline = IngestionPipeline(index or default_index(), embed or default_embedder(), namespace=namespace, **options)
+    return pipeline.run(articles, reset=reset)
@@ -0,0 +1,110 @@
+"""
+rate_limiter.py
+---------------
+Per-provider token buckets shared by every tool instance and worker thread.
+
+Each outbound provider (marketstack, FMP, Finnhub, Pinecone, OpenAI) has one
+bucket for the whole process. A bucket refills at ``rate_per_s`` and holds at
+most ``burst`` tokens. ``acquire()`` reserves a token under the lock and
+sleeps for the computed deficit *outside* it. Concurrent callers therefore
+queue up at the configured rate: they neither burst past it nor oversleep.
+
+Defaults can be overridden per provider:
+    RATE_LIMIT_<PROVIDER>_PER_S   refill rate (tokens/second; 0 disables limiting)
+    RATE_LIMIT_<PROVIDER>_BURST   bucket capacity
+
+Every acquisition records its wait in ``metrics`` (count + histogram).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from .metrics import record_rate_limit_wait
+from .settings import get_settings
+
+# provider -> (rate_per_s, burst). Rates mirror the previous per-tool min_sleep_s.
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    "marketstack": (1.0, 1.0),
+    "fmp": (1 / 0.6, 3.0),
+    "finnhub": (1 / 0.4, 5.0),
+    "pinecone": (5.0, 10.0),
+    "openai": (8.0, 8.0),
+    "yfinance": (0.0, 1.0),
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket; rate_per_s <= 0 means unlimited.
+
+    ``clock`` and ``sleep`` default to ``time.monotonic``/``time.sleep`` and are
+    injectable so tests can check pacing without a wall clock.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_s: float,
+        burst: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.name = name
+        self.rate_per_s = max(0.0, rate_per_s)
+        self.burst = max(1.0, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Take tokens (possibly going into debt) and return how long to wait."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_s)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_s
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available; returns seconds waited."""
+        if self.rate_per_s <= 0:
+            record_rate_limit_wait(self.name, 0.0)
+            return 0.0
+        wait_s = self._reserve(tokens)
+        if wait_s > 0:
+            self._sleep(wait_s)
+        record_rate_limit_wait(self.name, wait_s * 1000.0)
+        return wait_s
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, default_rate_per_s: Optional[float] = None) -> TokenBucket:
+    """Process-wide bucket for a provider (created on first use)."""
+    key = provider.lower()
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            rate, burst = DEFAULT_LIMITS.get(key, (default_rate_per_s or 0.0, 1.0))
+            overrides = get_settings().rate_limits
+            env_key = key.replace("-", "_")
+            bucket = TokenBucket(
+                key,
+                rate_per_s=overrides.per_s.get(env_key, rate),
+                burst=overrides.burst.get(env_key, burst),
+            )
+            _buckets[key] = bucket
+        return bucket
+
+
+def reset_rate_limiters() -> None:
+    with _buckets_lock:
+        _buckets.clear()
@@ -1,21 +1,32 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from .dashboard_cache import DashboardEntry, dashboard_cache
 from .event_store import (
     create_alert,
     delete_alert,
     get_active_alerts,
     get_alerts,
     load_latest_bundle,
+    load_latest_ticker_artifacts,
     load_recent_runs,
     load_run,
+    load_run_metrics,
+    load_run_stages,
     load_user_profile_json,
     mark_alert_triggered,
+    mark_alerts_triggered,
     persist_run,
     save_bundle,
+    save_bundles,
+    save_serialized_bundles,
+    save_run_metrics,
+    save_run_stage,
+    save_ticker_artifacts,
     save_user_profile,
+    serialize_bundle,
     update_alert,
 )
 from .models import AnalysisSnapshot, UserReportBundle
@@ -32,6 +43,24 @@ class RunRepository:
     def list_recent_runs(self, limit: int = 10) -> List[Dict[str, Any]]:
         return load_recent_runs(limit=limit)
 
+    def save_ticker_artifacts(self, run_id: str, run_date: str, artifacts: List[Dict[str, Any]]) -> int:
+        return save_ticker_artifacts(run_id, run_date, artifacts)
+
+    def latest_ticker_artifacts(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        return load_latest_ticker_artifacts(tickers)
+
+    def save_run_metrics(self, run_id: str, run_date: str, metrics: Dict[str, Any]) -> None:
+        save_run_metrics(run_id, run_date, metrics)
+
+    def get_run_metrics(self, run_id: str) -> Optional[Dict[str, Any]]:
+        return load_run_metrics(run_id)
+
+    def save_run_stage(self, run_id: str, stage: str, status: str, **fields: Any) -> None:
+        save_run_stage(run_id, stage, status, **fields)
+
+    def get_run_stages(self, run_id: str) -> List[Dict[str, Any]]:
+        return load_run_stages(run_id)
+
 
 @dataclass
 class ProfileRepository:
@@ -47,9 +76,21 @@ class BundleRepository:
     def save_user_bundle(self, bundle: UserReportBundle) -> None:
         save_bundle(bundle)
 
+    def save_user_bundles(self, bundles: List[UserReportBundle]) -> int:
+        return save_bundles(bundles)
+
+    def serialize_user_bundle(self, bundle: UserReportBundle) -> Tuple[str, str, str, str, str]:
+        return serialize_bundle(bundle)
+
+    def save_serialized_user_bundles(self, rows: List[Tuple[str, str, str, str, str]]) -> int:
+        return save_serialized_bundles(rows)
+
     def load_latest_user_bundle(self, user_id: str) -> Optional[Dict[str, Any]]:
         return load_latest_bundle(user_id)
 
+    def load_latest_user_bundle_view(self, user_id: str) -> Optional[DashboardEntry]:
+        return dashboard_cache.get(user_id)
+
 
 @dataclass
 class AlertRepository:
@@ -84,3 +125,6 @@ class AlertRepository:
 
     def mark_triggered(self, alert_id: str) -> None:
         mark_alert_triggered(alert_id)
+
+    def mark_many_triggered(self, alert_ids: List[str]) -> List[str]:
+        return mark_alerts_triggered(alert_ids)
@@ -3,9 +3,9 @@ from __future__ import annotations
 import os
 import time
 import threading
-from typing import Literal
+from typing import Literal, Optional
 
-AcquireStatus = Literal["acquired", "queue_full", "timeout"]
+AcquireStatus = Literal["acquired", "queue_full", "timeout", "cancelled"]
 
 
 class RunLimiter:
@@ -18,8 +18,15 @@ class RunLimiter:
         self._queued = 0
         self._cv = threading.Condition()
 
-    def acquire(self, timeout_s: float) -> AcquireStatus:
+    def acquire(self, timeout_s: float, cancel: Optional[threading.Event] = None) -> AcquireStatus:
+        """Take a run slot, waiting up to timeout_s in the queue.
+
+        A waiter returns "cancelled" as soon as ``cancel`` is set and
+        ``interrupt()`` is called (or within its next wake-up).
+        """
         with self._cv:
+            if cancel is not None and cancel.is_set():
+                return "cancelled"
             if self._active < self.max_active:
                 self._active += 1
                 return "acquired"
@@ -31,6 +38,10 @@ class RunLimiter:
             deadline = time.monotonic() + max(0.0, timeout_s)
             try:
                 while self._active >= self.max_active:
+                    if cancel is not None and cancel.is_set():
+                        # Pass on a release() notification this waiter may have consumed.
+                        self._cv.notify()
+                        return "cancelled"
                     remaining = deadline - time.monotonic()
                     if remaining <= 0:
                         return "timeout"
@@ -46,6 +57,11 @@ class RunLimiter:
                 self._active -= 1
             self._cv.notify()
 
+    def interrupt(self) -> None:
+        """Wake every waiter so cancelled ones can leave the queue."""
+        with self._cv:
+            self._cv.notify_all()
+
     def stats(self) -> dict[str, int]:
         with self._cv:
             return {
@@ -0,0 +1,221 @@
+"""
+run_stages.py
+-------------
+Split-phase execution of analysis runs.
+
+In split-phase mode (``SPLIT_PHASE_RUNS=true``, or ``split_phase`` on
+/run-analysis) a run invokes the "core" graph, which ends at
+persist_snapshot. By the time it returns, scores, signals, user bundles
+and triggered alerts are saved. The caller hands the final core state to
+``tail_stage``, which runs the "tail" graph on ``TAIL_PARALLELISM``
+background workers. Webhook and report latency then no longer adds to the
+response time the caller sees. The tail is not a chain: post_alerts,
+post_candidates and assemble_report_json start together, assemble_markdown,
+post_to_n8n and persist_report branch off the report JSON, and
+post_monitor_event joins them (``graph_topology.TAIL_DEPENDENCIES``).
+
+Each stage's status is stored in ``run_stage_status`` against the run_id:
+  core: ok | error                                  (written when the core graph returns)
+  tail: queued → running → ok | error | failed | cancelled
+'error' means the stage finished with entries in state["errors"]; 'failed'
+means the tail graph raised. GET /run-history/{run_id}/stages returns them.
+
+Tails are at-most-once. Their input is the in-memory core state, and a
+partly run tail may already have posted webhooks, so nothing re-queues
+them. Tails that were queued or running when the process stopped (a
+restart, or ``shutdown(wait=False)`` abandoning a running tail) are marked
+'failed' by ``recover_unfinished()`` when the API starts. This assumes a
+single API process owns the tail pool, as it does the job runner.
+
+Public API
+----------
+invoke_split(initial, recursion_limit)   → (core_state, Future | None)
+tail_stage.complete_core(state)          → Future | None   (record core status, queue the tail)
+tail_stage.recover_unfinished()          → [run_id, ...]   (on startup)
+tail_stage.stats()                       → dict
+tail_stage.shutdown(wait)
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .metrics import record_error
+from .settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _record(run_id: str, stage: str, status: str, **fields: Any) -> None:
+    from .event_store import init_db, save_run_stage
+
+    try:
+        init_db()
+        save_run_stage(run_id, stage, status, **fields)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("run_stages: failed to record %s stage of %s: %s", stage, run_id, exc)
+
+
+class TailStageExecutor:
+    """Runs the tail graph for finished core states on a small worker pool."""
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max(1, max_workers)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._counters: Dict[str, int] = {"submitted": 0, "ok": 0, "error": 0, "failed": 0, "cancelled": 0}
+        self._durations_ms: Deque[float] = deque(maxlen=256)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="investora-tail")
+        return self._executor
+
+    def complete_core(self, state: Dict[str, Any], started_at: Optional[str] = None) -> Optional[Future]:
+        """Record the core stage of a finished core state and queue its tail.
+
+        Returns the tail Future (its result is the final run state), or None
+        when the core state has no run_id.
+        """
+        run_id = state.get("run_id")
+        if not run_id:
+            return None
+        core_errors: List[Dict[str, Any]] = list(state.get("errors") or [])
+        core_timings: Dict[str, float] = dict(state.get("node_timings") or {})
+        _record(
+            run_id,
+            "core",
+            "error" if core_errors else "ok",
+            nodes=core_timings,
+            errors=core_errors,
+            started_at=started_at,
+            finished_at=_now(),
+        )
+        _record(run_id, "tail", "queued")
+
+        # The caller keeps its core state; the tail works on its own lists.
+        tail_state = dict(state)
+        tail_state["errors"] = list(core_errors)
+        tail_state["node_timings"] = dict(core_timings)
+        with self._lock:
+            self._counters["submitted"] += 1
+            future = self._pool().submit(self._run_tail, tail_state)
+            self._pending[run_id] = future
+        future.add_done_callback(lambda _f, rid=run_id: self._forget(rid))
+        return future
+
+    def _forget(self, run_id: str) -> None:
+        with self._lock:
+            self._pending.pop(run_id, None)
+
+    def _run_tail(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        from .graph import build_graph
+
+        run_id = state["run_id"]
+        errors_before = len(state["errors"])
+        core_nodes = set(state["node_timings"])
+        started = time.perf_counter()
+        _record(run_id, "tail", "running", started_at=_now())
+        try:
+            result = build_graph(phase="tail").invoke(
+                state, config={"recursion_limit": get_settings().run.graph_recursion_limit}
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("run_stages: tail stage of %s failed", run_id)
+            record_error("node", "tail_stage")
+            errors = list(state["errors"][errors_before:])
+            errors.append({"ticker": "*", "tool": "tail_stage", "error": str(exc)})
+            _record(run_id, "tail", "failed", errors=errors, finished_at=_now())
+            self._count("failed", started)
+            raise
+
+        tail_errors = list((result.get("errors") or [])[errors_before:])
+        timings = {k: v for k, v in (result.get("node_timings") or {}).items() if k not in core_nodes}
+        status = "error" if tail_errors else "ok"
+        _record(run_id, "tail", status, nodes=timings, errors=tail_errors, finished_at=_now())
+        self._count(status, started)
+        logger.info("tail_stage_complete", extra={"run_id": run_id, "status": status})
+        return result
+
+    def recover_unfinished(self) -> List[str]:
+        """Mark tails left 'queued' or 'running' by a previous process as 'failed'.
+
+        Call once on startup, before any tail is queued. Returns the affected run_ids.
+        """
+        from .event_store import fail_unfinished_run_stages, init_db
+
+        try:
+            init_db()
+            run_ids = fail_unfinished_run_stages("tail", "interrupted: the process stopped before the tail finished")
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("run_stages: failed to recover unfinished tails: %s", exc)
+            return []
+        if run_ids:
+            logger.warning("run_stages: marked %d unfinished tail stage(s) as failed: %s", len(run_ids), run_ids)
+            with self._lock:
+                self._counters["failed"] += len(run_ids)
+        return run_ids
+
+    def _count(self, status: str, started: float) -> None:
+        with self._lock:
+            self._counters[status] += 1
+            self._durations_ms.append((time.perf_counter() - started) * 1000.0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            pending = len(self._pending)
+            durations = sorted(self._durations_ms)
+        p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))] if durations else 0.0
+        return {
+            "max_workers": self.max_workers,
+            "pending": pending,
+            "counters": counters,
+            "duration_ms": {
+                "samples": len(durations),
+                "avg": round(sum(durations) / len(durations), 2) if durations else 0.0,
+                "p95": round(p95, 2),
+            },
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop the pool; tails that never started are recorded as cancelled.
+
+        With wait=False a running tail is abandoned; its row stays 'running'
+        until recover_unfinished() runs in the next process.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            pending = dict(self._pending)
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        for run_id, future in pending.items():
+            if future.cancelled():
+                _record(run_id, "tail", "cancelled", finished_at=_now())
+                with self._lock:
+                    self._counters["cancelled"] += 1
+
+
+def invoke_split(initial: Dict[str, Any], recursion_limit: int) -> Tuple[Dict[str, Any], Optional[Future]]:
+    """Invoke the core graph, then queue the tail. Returns (core_state, tail Future)."""
+    from .graph import build_graph
+
+    started_at = _now()
+    state = build_graph(phase="core").invoke(
+        {**initial, "split_phase": True}, config={"recursion_limit": recursion_limit}
+    )
+    return state, tail_stage.complete_core(state, started_at=started_at)
+
+
+tail_stage = TailStageExecutor(max_workers=get_settings().concurrency.tail_parallelism)
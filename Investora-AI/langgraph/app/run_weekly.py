@@ -18,15 +18,35 @@ else:
     from .settings import get_settings
 
 
+def _split_phase(split_phase: Optional[bool]) -> bool:
+    return get_settings().run.split_phase_runs if split_phase is None else bool(split_phase)
+
+
+def _invoke(initial: Dict[str, Any], recursion_limit: int) -> Dict[str, Any]:
+    """Run the full graph, or only the core graph when initial["split_phase"] is set."""
+    if initial.get("split_phase"):
+        if __package__ in (None, ""):
+            from app.run_stages import invoke_split
+        else:
+            from .run_stages import invoke_split
+
+        result, _ = invoke_split(initial, recursion_limit)
+        return result
+    return build_graph().invoke(initial, config={"recursion_limit": recursion_limit})
+
+
 def run_weekly(
     run_date: str | None = None,
     skip_synthesis: bool = False,
     skip_post: bool = False,
+    incremental: Optional[bool] = None,
+    split_phase: Optional[bool] = None,
 ) -> Dict[str, Any]:
+    """Run the weekly digest. With split_phase (default SPLIT_PHASE_RUNS), returns once
+    the core stage is persisted; report_json is then produced by the background tail."""
     load_dotenv()
     recursion_limit = get_settings().run.graph_recursion_limit
 
-    app = build_graph()
     initial: Dict[str, Any] = {
         "skip_synthesis": skip_synthesis,
         "skip_post": skip_post,
@@ -35,26 +55,31 @@ def run_weekly(
     }
     if run_date:
         initial["run_date"] = run_date
-    result = app.invoke(initial, config={"recursion_limit": recursion_limit})
+    if incremental is not None:
+        initial["incremental"] = incremental
+    if _split_phase(split_phase):
+        initial["split_phase"] = True
+    result = _invoke(initial, recursion_limit)
     return {
         "report_json": result.get("report_json"),
         "report_markdown": result.get("report_markdown", ""),
         "errors": result.get("errors", []),
         "run_date": result.get("run_date"),
         "tickers": result.get("tickers", []),
+        "reuse_stats": result.get("reuse_stats", {}),
+        "split_phase": bool(result.get("split_phase", False)),
     }
 
 
-def run_analysis(
+def analysis_initial_state(
     tickers: Optional[List[str]] = None,
     skip_synthesis: bool = True,
     skip_post: bool = False,
     run_id: Optional[str] = None,
+    incremental: Optional[bool] = None,
+    split_phase: Optional[bool] = None,
 ) -> Dict[str, Any]:
-    """Run a targeted analysis — optionally on a subset of tickers, optionally skipping LLM synthesis."""
-    load_dotenv()
-    recursion_limit = get_settings().run.graph_recursion_limit
-
+    """Initial graph state for a targeted (non-digest) analysis run."""
     initial: Dict[str, Any] = {
         "skip_synthesis": skip_synthesis,
         "skip_post": skip_post,
@@ -65,9 +90,15 @@ def run_analysis(
         initial["tickers"] = [t.upper() for t in tickers]
     if run_id:
         initial["run_id"] = run_id
+    if incremental is not None:
+        initial["incremental"] = incremental
+    if _split_phase(split_phase):
+        initial["split_phase"] = True
+    return initial
+
 
-    app = build_graph()
-    result = app.invoke(initial, config={"recursion_limit": recursion_limit})
+def summarize_analysis(result: Dict[str, Any]) -> Dict[str, Any]:
+    """API response shape for a finished targeted analysis run."""
     return {
         "run_id": result.get("run_id"),
         "scope": result.get("scope", "full"),
@@ -76,16 +107,48 @@ def run_analysis(
         "errors": result.get("errors", []),
         "run_date": result.get("run_date"),
         "tickers": result.get("tickers", []),
+        "reuse_stats": result.get("reuse_stats", {}),
+        "split_phase": bool(result.get("split_phase", False)),
     }
 
 
+def run_analysis(
+    tickers: Optional[List[str]] = None,
+    skip_synthesis: bool = True,
+    skip_post: bool = False,
+    run_id: Optional[str] = None,
+    incremental: Optional[bool] = None,
+    split_phase: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Run a targeted analysis — optionally on a subset of tickers, optionally skipping LLM synthesis."""
+    load_dotenv()
+    recursion_limit = get_settings().run.graph_recursion_limit
+
+    initial = analysis_initial_state(tickers, skip_synthesis, skip_post, run_id, incremental, split_phase)
+    result = _invoke(initial, recursion_limit)
+    return summarize_analysis(result)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run weekly LangGraph stock report")
     parser.add_argument("--date", dest="run_date", help="Run date YYYY-MM-DD", default=None)
     parser.add_argument("--no-post", action="store_true", help="Skip posting payload to n8n webhook")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=None,
+        help="Reuse the previous run's RAG context and synthesis for tickers whose inputs did not change",
+    )
     args = parser.parse_args()
 
-    result = run_weekly(run_date=args.run_date, skip_synthesis=False, skip_post=args.no_post)
+    # The CLI prints the finished report, so it always runs the full graph in-process.
+    result = run_weekly(
+        run_date=args.run_date,
+        skip_synthesis=False,
+        skip_post=args.no_post,
+        incremental=args.incremental,
+        split_phase=False,
+    )
     print(json.dumps(result, ensure_ascii=True, indent=2))
 
 
@@ -2,6 +2,10 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
+_METRIC_FIELDS = ("roe", "operating_margin", "debt_to_equity", "revenue_growth", "eps_growth")
+
 
 def _clip(value: float, low: float = 0.0, high: float = 10.0) -> float:
     return max(low, min(high, value))
@@ -102,9 +106,168 @@ def momentum_rating(score: float) -> str:
     return "Negative"
 
 
+# ---------------------------------------------------------------------------
+# Vectorised engine
+#
+# The helpers below mirror the scalar functions above element-wise and keep
+# their exact float semantics (operation order, None handling, and the way
+# Python's min()/max() treat NaN), so compute_all_scores returns the same
+# values as the per-ticker loop it replaced.
+# ---------------------------------------------------------------------------
+
+
+def _clip_vec(values: np.ndarray, low: float = 0.0, high: float = 10.0) -> np.ndarray:
+    # Same as _clip: max(low, min(high, v)), including NaN -> high.
+    capped = np.where(values < high, values, high)
+    return np.where(capped > low, capped, low)
+
+
+def _to_pct_if_ratio_vec(values: np.ndarray) -> np.ndarray:
+    return np.where((values > -2.0) & (values < 2.0), values * 100.0, values)
+
+
+def _column(values: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """(float64 values, present mask) with _safe_float semantics; None is absent."""
+    try:
+        # None converts to NaN here; real NaNs are told apart from None below.
+        arr = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        converted = [_safe_float(v) for v in values]
+        present = np.array([v is not None for v in converted], dtype=bool)
+        return np.array([0.0 if v is None else v for v in converted], dtype=np.float64), present
+    present = np.ones(arr.shape[0], dtype=bool)
+    for i in np.flatnonzero(np.isnan(arr)):
+        if values[i] is None:
+            present[i] = False
+            arr[i] = 0.0
+    return arr, present
+
+
+def _pack_universe(
+    per_ticker_data: Dict[str, Dict[str, Any]]
+) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Convert the universe to arrays in one pass.
+
+    Returns (tickers, closes[n, 2], closes_ok[n], metrics[n, 5], metrics_present[n, 5]).
+    """
+    tickers = list(per_ticker_data.keys())
+    n = len(tickers)
+    entries = list(per_ticker_data.values())
+
+    price_lists = [d.get("market", {}).get("prices", []) for d in entries]
+    windows = [(p[0].get("close"), p[4].get("close")) if len(p) >= 5 else (None, None) for p in price_lists]
+    latest, latest_ok = _column([w[0] for w in windows])
+    oldest, oldest_ok = _column([w[1] for w in windows])
+    closes = np.stack([latest, oldest], axis=1) if n else np.zeros((0, 2), dtype=np.float64)
+    # Same guard as momentum_weekly_return: `close_oldest in (None, 0)`.
+    closes_ok = latest_ok & oldest_ok & (oldest != 0)
+
+    metrics = [d.get("fundamentals", {}).get("metrics", {}) for d in entries]
+    metric_values = np.zeros((n, len(_METRIC_FIELDS)), dtype=np.float64)
+    metric_present = np.zeros((n, len(_METRIC_FIELDS)), dtype=bool)
+    for j, field in enumerate(_METRIC_FIELDS):
+        metric_values[:, j], metric_present[:, j] = _column([m.get(field) for m in metrics])
+
+    return tickers, closes, closes_ok, metric_values, metric_present
+
+
+def _momentum_raw_vec(closes: np.ndarray, closes_ok: np.ndarray) -> np.ndarray:
+    safe_oldest = np.where(closes_ok, closes[:, 1], 1.0)
+    return np.where(closes_ok, ((closes[:, 0] / safe_oldest) - 1.0) * 100.0, 0.0)
+
+
+def _quality_raw_vec(values: np.ndarray, present: np.ndarray) -> np.ndarray:
+    roe = _to_pct_if_ratio_vec(values[:, 0])
+    op_margin = _to_pct_if_ratio_vec(values[:, 1])
+    debt_to_equity = values[:, 2]
+    rev_growth = _to_pct_if_ratio_vec(values[:, 3])
+    eps_growth = _to_pct_if_ratio_vec(values[:, 4])
+    has_roe, has_op, has_de, has_rev, has_eps = (present[:, j] for j in range(5))
+
+    roe_component = np.where(has_roe, _clip_vec((roe / 30.0) * 10.0), 0.0)
+    op_component = np.where(has_op, _clip_vec((op_margin / 40.0) * 10.0), 0.0)
+    component_count = has_roe.astype(np.float64) + has_op.astype(np.float64)
+    profitability = np.where(
+        component_count > 0,
+        (roe_component + op_component) / np.where(component_count > 0, component_count, 1.0),
+        5.0,
+    )
+
+    balance = np.where(has_de, _clip_vec(10.0 - (debt_to_equity / 3.0) * 10.0), 5.0)
+
+    growth_proxy = np.where(has_rev, rev_growth, eps_growth)
+    growth = np.where(has_rev | has_eps, _clip_vec(((growth_proxy + 10.0) / 40.0) * 10.0), 5.0)
+
+    return (0.4 * profitability) + (0.3 * balance) + (0.3 * growth)
+
+
+def _normalize_vec(raw: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Vector form of normalize_to_0_10: invalid entries score 0.0."""
+    if not valid.any():
+        return np.zeros(raw.shape[0], dtype=np.float64)
+    present = raw[valid]
+    if np.isnan(present).any():
+        # Python's min()/max() are order-dependent around NaN; reproduce them exactly.
+        values = present.tolist()
+        min_v, max_v = min(values), max(values)
+    else:
+        min_v, max_v = float(present.min()), float(present.max())
+    if max_v == min_v:
+        return np.where(valid, 5.0, 0.0)
+    return np.where(valid, ((raw - min_v) / (max_v - min_v)) * 10.0, 0.0)
+
+
+def _round_vec(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """Element-wise equivalent of Python's round(v, ndigits).
+
+    rint(v * 10**n) / 10**n is the correctly rounded result unless v * 10**n sits
+    (within float error) on a .5 boundary; only those elements go through round().
+    """
+    scale = 10.0 ** ndigits
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = values * scale
+        out = np.rint(scaled) / scale
+        near_half = np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) <= 1e-9 * np.maximum(1.0, np.abs(scaled))
+    for i in np.flatnonzero(near_half):
+        out[i] = round(float(values[i]), ndigits)
+    return out
+
+
 def compute_all_scores(
     per_ticker_data: Dict[str, Dict[str, Any]], quality_weight: float = 0.55, momentum_weight: float = 0.45
 ) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict[str, float]]]:
+    tickers, closes, closes_ok, metric_values, metric_present = _pack_universe(per_ticker_data)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        raw_momentum = _momentum_raw_vec(closes, closes_ok)
+        raw_quality = _quality_raw_vec(metric_values, metric_present)
+        quality_valid = np.ones(len(tickers), dtype=bool)
+        momentum_scores = _normalize_vec(raw_momentum, closes_ok)
+        quality_scores = _normalize_vec(raw_quality, quality_valid)
+
+    q_rounded = _round_vec(quality_scores, 1)
+    m_rounded = _round_vec(momentum_scores, 1)
+    overall = _round_vec((quality_weight * q_rounded) + (momentum_weight * m_rounded), 1)
+
+    combined: Dict[str, Dict[str, float]] = {
+        ticker: {"quality": q, "momentum": m, "overall": o}
+        for ticker, q, m, o in zip(tickers, q_rounded.tolist(), m_rounded.tolist(), overall.tolist())
+    }
+
+    raw_components = {
+        "raw_momentum": {
+            t: (v if ok else None)
+            for t, v, ok in zip(tickers, _round_vec(raw_momentum, 4).tolist(), closes_ok.tolist())
+        },
+        "raw_quality": dict(zip(tickers, _round_vec(raw_quality, 4).tolist())),
+    }
+    return combined, raw_components
+
+
+def _compute_all_scores_scalar(
+    per_ticker_data: Dict[str, Dict[str, Any]], quality_weight: float = 0.55, momentum_weight: float = 0.45
+) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict[str, float]]]:
+    """Reference per-ticker implementation; kept for parity tests and benchmarks."""
     raw_momentum: Dict[str, Optional[float]] = {}
     raw_quality: Dict[str, Optional[float]] = {}
 
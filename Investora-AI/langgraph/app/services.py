@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+from .dashboard_cache import DashboardEntry
 from .repositories import AlertRepository, BundleRepository
 from .run_weekly import run_analysis, run_weekly
 
@@ -15,8 +16,11 @@ class AnalysisService:
         run_date: Optional[str],
         skip_synthesis: bool,
         skip_post: bool,
+        split_phase: Optional[bool] = None,
     ) -> Dict[str, Any]:
-        return run_weekly(run_date=run_date, skip_synthesis=skip_synthesis, skip_post=skip_post)
+        return run_weekly(
+            run_date=run_date, skip_synthesis=skip_synthesis, skip_post=skip_post, split_phase=split_phase
+        )
 
     def run_targeted_analysis(
         self,
@@ -24,8 +28,16 @@ class AnalysisService:
         tickers: Optional[List[str]],
         skip_synthesis: bool,
         skip_post: bool,
+        incremental: Optional[bool] = None,
+        split_phase: Optional[bool] = None,
     ) -> Dict[str, Any]:
-        return run_analysis(tickers=tickers, skip_synthesis=skip_synthesis, skip_post=skip_post)
+        return run_analysis(
+            tickers=tickers,
+            skip_synthesis=skip_synthesis,
+            skip_post=skip_post,
+            incremental=incremental,
+            split_phase=split_phase,
+        )
 
 
 @dataclass
@@ -44,6 +56,10 @@ class PersonalizationService:
             "discovery_signals": bundle.get("discovery_signals", []),
         }
 
+    def get_user_dashboard_view(self, user_id: str) -> Optional[DashboardEntry]:
+        """Serialized dashboard and signals slice with their ETag (served from the LRU)."""
+        return self.bundle_repository.load_latest_user_bundle_view(user_id)
+
 
 @dataclass
 class NotificationService:
@@ -4,7 +4,7 @@ import logging
 import os
 from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Literal, Tuple
 
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field, ValidationError
@@ -19,6 +19,12 @@ class RunBehaviorConfig(BaseModel):
     skip_n8n_post: bool = False
     use_mock_data: bool = True
     stock_universe: str = ""
+    universe_cap: int = Field(default=0, ge=0, le=100_000)  # 0 = no cap
+    shard_size: int = Field(default=100, ge=1, le=10_000)
+    sharded_collection_min_tickers: int = Field(default=200, ge=1)
+    planner_mode: Literal["dag", "react"] = "dag"
+    incremental_runs: bool = False
+    split_phase_runs: bool = False
 
 
 class ProviderConfig(BaseModel):
@@ -34,11 +40,17 @@ class ConcurrencyConfig(BaseModel):
     tool_parallelism: int = Field(default=8, ge=1, le=64)
     rag_parallelism: int = Field(default=6, ge=1, le=64)
     synthesis_parallelism: int = Field(default=4, ge=1, le=64)
+    shard_parallelism: int = Field(default=4, ge=1, le=64)
+    digest_parallelism: int = Field(default=8, ge=1, le=64)
+    tail_parallelism: int = Field(default=2, ge=1, le=64)
+    yf_quote_workers: int = Field(default=8, ge=1, le=64)
+    yf_mkt_cap_wait_s: float = Field(default=1.0, ge=0.0, le=30.0)
 
 
 class FeatureToggles(BaseModel):
     trigger_weekly_digest: bool = True
     enable_post_candidates: bool = True
+    columnar_history: bool = False
 
 
 class PipelineTuningConfig(BaseModel):
@@ -47,6 +59,58 @@ class PipelineTuningConfig(BaseModel):
     evidence_top_n: int = 25
     rag_lookback_days: int = Field(default=42, ge=1, le=3650)
     rag_top_k: int = Field(default=5, ge=1, le=50)
+    rag_embed_batch_size: int = Field(default=256, ge=1, le=2048)  # inputs per OpenAI embeddings request
+    synthesis_batch_size: int = Field(default=1, ge=1, le=50)  # 1 = one request per ticker
+    synthesis_batch_max_tokens: int = Field(default=12_000, ge=500, le=200_000)
+
+
+class AlertMonitorConfig(BaseModel):
+    enabled: bool = False
+    poll_interval_s: float = Field(default=60.0, ge=1.0, le=3600.0)
+    debounce_s: float = Field(default=0.0, ge=0.0, le=86_400.0)  # 0 = fire on first hit
+    refresh_alerts_s: float = Field(default=300.0, ge=1.0, le=86_400.0)
+    delivery_batch_size: int = Field(default=100, ge=1, le=10_000)
+
+
+class WebhookDeliveryConfig(BaseModel):
+    parallelism: int = Field(default=8, ge=1, le=64)
+    timeout_s: float = Field(default=10.0, ge=0.5, le=120.0)
+    report_timeout_s: float = Field(default=30.0, ge=0.5, le=300.0)  # the n8n report workflow answers slowly
+    batch_kinds: List[str] = Field(default_factory=list)  # e.g. ["alerts"] when the receiver accepts batches
+    batch_size: int = Field(default=50, ge=1, le=1000)
+    outbox_enabled: bool = True
+    outbox_max_attempts: int = Field(default=8, ge=1, le=100)
+    outbox_retry_base_s: float = Field(default=60.0, ge=1.0, le=86_400.0)
+    outbox_drain_interval_s: float = Field(default=60.0, ge=1.0, le=86_400.0)
+
+
+class AuthConfig(BaseModel):
+    pbkdf2_iterations: int = Field(default=120_000, ge=1_000, le=10_000_000)
+    kdf_workers: int = Field(default=2, ge=0, le=64)  # 0 = hash on a thread instead of a process pool
+    kdf_max_pending: int = Field(default=64, ge=1, le=10_000)
+    token_cache_size: int = Field(default=4096, ge=0, le=1_000_000)
+
+
+class RagIngestConfig(BaseModel):
+    chunk_size: int = Field(default=512, ge=1, le=10_000)  # texts handed to one embed call
+    upsert_batch_size: int = Field(default=100, ge=1, le=1000)
+    upsert_parallelism: int = Field(default=4, ge=1, le=32)
+    upsert_max_attempts: int = Field(default=5, ge=1, le=20)
+    upsert_backoff_s: float = Field(default=1.0, ge=0.0, le=300.0)
+
+
+class CacheConfig(BaseModel):
+    tool_cache_max_mb: float = Field(default=256.0, ge=0.0, le=1_000_000.0)
+    tool_cache_memory_entries: int = Field(default=2048, ge=0, le=10_000_000)
+    tool_cache_ttl_default_s: float = Field(default=86_400.0, ge=0.0)
+    tool_cache_ttls: Dict[str, float] = Field(default_factory=dict)  # namespace -> TTL from TOOL_CACHE_TTL_<NS>
+    dashboard_cache_size: int = Field(default=2048, ge=0, le=1_000_000)
+
+
+class RateLimitConfig(BaseModel):
+    # provider -> override from RATE_LIMIT_<PROVIDER>_PER_S / _BURST; defaults live in rate_limiter.
+    per_s: Dict[str, float] = Field(default_factory=dict)
+    burst: Dict[str, float] = Field(default_factory=dict)
 
 
 class AppSettings(BaseModel):
@@ -55,6 +119,12 @@ class AppSettings(BaseModel):
     concurrency: ConcurrencyConfig
     features: FeatureToggles
     pipeline: PipelineTuningConfig
+    alerts: AlertMonitorConfig = Field(default_factory=AlertMonitorConfig)
+    webhooks: WebhookDeliveryConfig = Field(default_factory=WebhookDeliveryConfig)
+    auth: AuthConfig = Field(default_factory=AuthConfig)
+    rag_ingest: RagIngestConfig = Field(default_factory=RagIngestConfig)
+    caches: CacheConfig = Field(default_factory=CacheConfig)
+    rate_limits: RateLimitConfig = Field(default_factory=RateLimitConfig)
 
 
 
@@ -89,6 +159,22 @@ def _as_int(name: str, default: int) -> int:
         return default
 
 
+def _as_float_family(prefix: str, suffix: str = "", exclude: Tuple[str, ...] = ()) -> Dict[str, float]:
+    """Floats from every <prefix><NAME><suffix> variable, keyed by lower-cased NAME."""
+    out: Dict[str, float] = {}
+    for name, raw in os.environ.items():
+        if not (name.startswith(prefix) and name.endswith(suffix)) or len(name) <= len(prefix) + len(suffix):
+            continue
+        key = name[len(prefix) : len(name) - len(suffix)].lower()
+        if key in exclude:
+            continue
+        try:
+            out[key] = float(raw)
+        except ValueError:
+            logger.warning("Invalid float for %s=%r; ignoring it", name, raw)
+    return out
+
+
 @lru_cache(maxsize=1)
 def get_settings() -> AppSettings:
     # Ensure .env is loaded before reading env variables in any import order.
@@ -104,6 +190,12 @@ def get_settings() -> AppSettings:
                 skip_n8n_post=_as_bool("SKIP_N8N_POST", False),
                 use_mock_data=_as_bool("USE_MOCK_DATA", True),
                 stock_universe=os.environ.get("STOCK_UNIVERSE", ""),
+                universe_cap=_as_int("UNIVERSE_CAP", 0),
+                shard_size=_as_int("COLLECTION_SHARD_SIZE", 100),
+                sharded_collection_min_tickers=_as_int("SHARDED_COLLECTION_MIN_TICKERS", 200),
+                planner_mode=os.environ.get("PLANNER_MODE", "dag").strip().lower(),
+                incremental_runs=_as_bool("INCREMENTAL_RUNS", False),
+                split_phase_runs=_as_bool("SPLIT_PHASE_RUNS", False),
             ),
             providers=ProviderConfig(
                 openai_api_key=os.environ.get("OPENAI_API_KEY", ""),
@@ -117,10 +209,16 @@ def get_settings() -> AppSettings:
                 tool_parallelism=_as_int("TOOL_PARALLELISM", 8),
                 rag_parallelism=_as_int("RAG_PARALLELISM", 6),
                 synthesis_parallelism=_as_int("SYNTHESIS_PARALLELISM", 4),
+                shard_parallelism=_as_int("SHARD_PARALLELISM", 4),
+                digest_parallelism=_as_int("DIGEST_PARALLELISM", 8),
+                tail_parallelism=_as_int("TAIL_PARALLELISM", 2),
+                yf_quote_workers=_as_int("YF_QUOTE_WORKERS", 8),
+                yf_mkt_cap_wait_s=_as_float("YF_MKT_CAP_WAIT_S", 1.0),
             ),
             features=FeatureToggles(
                 trigger_weekly_digest=_as_bool("FEATURE_WEEKLY_DIGEST", True),
                 enable_post_candidates=_as_bool("FEATURE_POST_CANDIDATES", True),
+                columnar_history=_as_bool("FEATURE_COLUMNAR_HISTORY", False),
             ),
             pipeline=PipelineTuningConfig(
                 quality_weight=_as_float("QUALITY_WEIGHT", 0.55),
@@ -128,6 +226,51 @@ def get_settings() -> AppSettings:
                 evidence_top_n=_as_int("EVIDENCE_TOP_N", 25),
                 rag_lookback_days=_as_int("RAG_LOOKBACK_DAYS", 42),
                 rag_top_k=_as_int("RAG_TOP_K", 5),
+                rag_embed_batch_size=_as_int("RAG_EMBED_BATCH_SIZE", 256),
+                synthesis_batch_size=_as_int("SYNTHESIS_BATCH_SIZE", 1),
+                synthesis_batch_max_tokens=_as_int("SYNTHESIS_BATCH_MAX_TOKENS", 12_000),
+            ),
+            alerts=AlertMonitorConfig(
+                enabled=_as_bool("ALERT_MONITOR_ENABLED", False),
+                poll_interval_s=_as_float("ALERT_MONITOR_INTERVAL_S", 60.0),
+                debounce_s=_as_float("ALERT_MONITOR_DEBOUNCE_S", 0.0),
+                refresh_alerts_s=_as_float("ALERT_MONITOR_REFRESH_S", 300.0),
+                delivery_batch_size=_as_int("ALERT_MONITOR_BATCH_SIZE", 100),
+            ),
+            webhooks=WebhookDeliveryConfig(
+                parallelism=_as_int("WEBHOOK_PARALLELISM", 8),
+                timeout_s=_as_float("WEBHOOK_TIMEOUT_S", 10.0),
+                report_timeout_s=_as_float("WEBHOOK_REPORT_TIMEOUT_S", 30.0),
+                batch_kinds=[k.strip() for k in os.environ.get("WEBHOOK_BATCH_KINDS", "").split(",") if k.strip()],
+                batch_size=_as_int("WEBHOOK_BATCH_SIZE", 50),
+                outbox_enabled=_as_bool("WEBHOOK_OUTBOX_ENABLED", True),
+                outbox_max_attempts=_as_int("WEBHOOK_OUTBOX_MAX_ATTEMPTS", 8),
+                outbox_retry_base_s=_as_float("WEBHOOK_OUTBOX_RETRY_BASE_S", 60.0),
+                outbox_drain_interval_s=_as_float("WEBHOOK_OUTBOX_DRAIN_S", 60.0),
+            ),
+            auth=AuthConfig(
+                pbkdf2_iterations=_as_int("AUTH_PBKDF2_ITERATIONS", 120_000),
+                kdf_workers=_as_int("AUTH_KDF_WORKERS", 2),
+                kdf_max_pending=_as_int("AUTH_KDF_MAX_PENDING", 64),
+                token_cache_size=_as_int("AUTH_TOKEN_CACHE_SIZE", 4096),
+            ),
+            rag_ingest=RagIngestConfig(
+                chunk_size=_as_int("RAG_INGEST_CHUNK_SIZE", 512),
+                upsert_batch_size=_as_int("RAG_UPSERT_BATCH_SIZE", 100),
+                upsert_parallelism=_as_int("RAG_UPSERT_PARALLELISM", 4),
+                upsert_max_attempts=_as_int("RAG_UPSERT_MAX_ATTEMPTS", 5),
+                upsert_backoff_s=_as_float("RAG_UPSERT_BACKOFF_S", 1.0),
+            ),
+            caches=CacheConfig(
+                tool_cache_max_mb=_as_float("TOOL_CACHE_MAX_MB", 256.0),
+                tool_cache_memory_entries=_as_int("TOOL_CACHE_MEMORY_ENTRIES", 2048),
+                tool_cache_ttl_default_s=_as_float("TOOL_CACHE_TTL_DEFAULT", 86_400.0),
+                tool_cache_ttls=_as_float_family("TOOL_CACHE_TTL_", exclude=("default",)),
+                dashboard_cache_size=_as_int("DASHBOARD_CACHE_SIZE", 2048),
+            ),
+            rate_limits=RateLimitConfig(
+                per_s=_as_float_family("RATE_LIMIT_", "_PER_S"),
+                burst=_as_float_family("RATE_LIMIT_", "_BURST"),
             ),
         )
     except ValidationError as exc:
@@ -138,6 +281,12 @@ def get_settings() -> AppSettings:
             concurrency=ConcurrencyConfig(),
             features=FeatureToggles(),
             pipeline=PipelineTuningConfig(),
+            alerts=AlertMonitorConfig(),
+            webhooks=WebhookDeliveryConfig(),
+            auth=AuthConfig(),
+            rag_ingest=RagIngestConfig(),
+            caches=CacheConfig(),
+            rate_limits=RateLimitConfig(),
         )
 
     if not settings.providers.openai_api_key and not settings.run.use_mock_data:
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import operator
 from datetime import date
-from typing import Any, Dict, List, Literal, Optional, TypedDict
+from typing import Annotated, Any, Dict, List, Literal, Mapping, Optional, TypedDict
 
 from .models import SignalEvent, SynthesisResult, UserProfileContext, UserReportBundle
 
@@ -78,6 +79,29 @@ class ReportPayload(TypedDict):
     anomaly_signals: List[Dict[str, Any]]  # SignalEvent dicts produced by detect_anomalies_node
 
 
+def merge_dicts(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reducer for per-node dicts written by parallel branches (later keys win)."""
+    return {**(left or {}), **(right or {})}
+
+
+# Keys that parallel branches may write in the same superstep, and how their
+# writes are combined. Nodes return only the errors they added (see
+# graph_builder._branch_update); everything else is last-writer-wins.
+STATE_REDUCERS = {
+    "errors": operator.add,
+    "delivery_stats": merge_dicts,
+    "node_timings": merge_dicts,
+}
+
+
+def merge_state_update(state: Dict[str, Any], update: Mapping[str, Any]) -> Dict[str, Any]:
+    """Apply one node's update to a state dict the way the graph does (used when streaming)."""
+    for key, value in update.items():
+        reducer = STATE_REDUCERS.get(key)
+        state[key] = reducer(state[key], value) if reducer is not None and key in state else value
+    return state
+
+
 class GraphState(TypedDict):
     run_id: str                          # UUID generated at init; links all DB records for this run
     run_date: str
@@ -90,22 +114,33 @@ class GraphState(TypedDict):
     action: Optional[str]
     action_reason: Optional[str]
     done_collection: bool
+    sharded_collection_done: bool        # set once collect_sharded_node has run for this universe
+    collection_stats: Dict[str, Any]     # shard counts / timings reported by collect_sharded_node
+    planner_stats: Dict[str, Any]        # planner iterations / LLM calls made and saved this run
+    incremental: bool                    # reuse prior RAG/synthesis for tickers with unchanged inputs
+    split_phase: bool                    # core graph only; delivery tail runs on the background stage executor
+    input_fingerprints: Dict[str, str]   # {ticker: sha256 of market/fundamentals/news payloads}
+    prior_artifacts: Dict[str, Dict[str, Any]]  # latest stored artifacts of tickers with unchanged inputs
+    carried_forward: Dict[str, Dict[str, Any]]  # {"rag": {ticker: ...}, "synthesis": {ticker: ...}} reused this run
+    reuse_stats: Dict[str, Any]          # incremental reuse counts and ratios, reported in system_metadata
     failed_tickers: List[str]
     per_ticker_data: Dict[str, Dict[str, Any]]
     scores: Dict[str, Dict[str, float]]
     per_ticker_rag_context: Dict[str, List[Dict[str, Any]]]  # {ticker: retrieved evidence chunks}
-    rag_stats: Dict[str, int]               # {"retrieved_items": int, "queries_run": int}
+    rag_stats: Dict[str, int]               # {"retrieved_items", "queries_run", "embedded_queries", "carried_forward"}
     per_ticker_synthesis: Dict[str, Any]  # {ticker: SynthesisResult}; populated by synthesize_evidence_node
+    synthesis_stats: Dict[str, Any]       # mode, cache hits, API requests, batch retries and token usage
+    delivery_stats: Annotated[Dict[str, Any], merge_dicts]  # webhook sends per delivery node: sent, requests, queued for retry
     signal_events: List[SignalEvent]      # populated by emit_signals_node after scoring
     anomaly_signals: List[SignalEvent]    # populated by detect_anomalies_node; subset of signal_events
     personalized_bundles: Dict[str, UserReportBundle]  # populated by personalize_signals_node
     triggered_user_alerts: List[Dict[str, Any]]  # user-defined price alerts that fired
     report_json: Optional[ReportPayload]
     report_markdown: str
-    errors: List[Dict[str, str]]
+    errors: Annotated[List[Dict[str, str]], operator.add]
     react_history: List[Dict[str, str]]
     user_profiles: List[UserProfileContext]  # loaded in init_state; used in Iteration 4 personalisation
-    node_timings: Dict[str, float]           # per-node durations (ms) for observability
+    node_timings: Annotated[Dict[str, float], merge_dicts]  # per-node durations (ms), summed over loop iterations
 
 
 def today_iso() -> str:
@@ -0,0 +1,363 @@
+"""
+webhook_delivery.py
+-------------------
+Outbound webhook delivery for the graph tail (n8n alerts, digests, report).
+
+* One pooled keep-alive ``requests.Session`` per process, so repeated posts
+  to the same n8n host reuse connections instead of re-doing TCP + TLS.
+* ``dispatch`` sends a list of messages on ``WEBHOOK_PARALLELISM`` workers,
+  each with a ``WEBHOOK_TIMEOUT_S`` read timeout (``WEBHOOK_REPORT_TIMEOUT_S``
+  for the report). One slow receiver then costs one timeout, not one per user.
+* Every post carries an ``Idempotency-Key`` header derived from its kind, URL
+  and payload, so a retried send repeats the key and receivers can dedupe.
+* Kinds listed in ``WEBHOOK_BATCH_KINDS`` are merged per URL into
+  ``{"type": "batch", "kind", "count", "items": [...]}`` payloads of up to
+  ``WEBHOOK_BATCH_SIZE`` items (only for receivers that accept batches).
+* Failed sends go to the SQLite ``webhook_outbox`` and are retried with
+  exponential backoff by ``drain_outbox``. The API runs it on a background
+  thread; otherwise run ``python -m app.webhook_delivery drain``. Client
+  errors (4xx other than 408/429) are not retried and are kept as 'dead'.
+  So is a read timeout on a non-idempotent kind (the report): the receiver
+  may already have run its workflow, and re-posting would run it twice.
+  Each drain claims its rows ('sending' with a lease) before posting, so
+  concurrent drainers do not double-send; a lease left by a crashed drainer
+  expires and the rows are picked up again.
+
+Public API
+----------
+get_http_session()                  → requests.Session
+send_message(message, timeout_s)    → requests.Response   (raises WebhookError)
+timeout_for(kind)                   → float
+dispatch(messages)                  → DispatchResult
+queue_failed(failures)              → int   (rows queued to the outbox)
+drain_outbox(limit)                 → dict
+outbox_drainer.start() / stop()
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import record_error, time_provider_call
+from .settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Connect timeout stays short; the read timeout comes from settings.
+_CONNECT_TIMEOUT_S = 3.05
+
+_FAILURE_LABELS: Dict[str, str] = {
+    "alerts": "Alert webhook",
+    "user_alerts": "User alert webhook",
+    "candidates": "Candidate webhook",
+    "report": "n8n webhook",
+    "monitor": "Monitor webhook",
+}
+
+# Receivers that run a workflow per post; a timed-out post may already have run it.
+_NON_IDEMPOTENT_KINDS = frozenset({"report"})
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class WebhookError(RuntimeError):
+    """A webhook send failed; retryable is False for client errors.
+
+    read_timeout is True when the request went out but no answer came back
+    in time, i.e. the receiver may have processed it.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None, read_timeout: bool = False) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.read_timeout = read_timeout
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code is None or self.status_code >= 500 or self.status_code in (408, 429)
+
+
+@dataclass
+class WebhookMessage:
+    kind: str
+    url: str
+    payload: Dict[str, Any]
+    key: str = "*"  # user id (or "*"), used in errors and the outbox
+
+
+@dataclass
+class DispatchResult:
+    sent: int = 0
+    requests: int = 0
+    queued: int = 0
+    failures: List[Tuple[WebhookMessage, str]] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"sent": self.sent, "requests": self.requests, "queued": self.queued, "failed": len(self.failures)}
+
+
+def get_http_session() -> requests.Session:
+    """Process-wide keep-alive session (created on first use)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            pool = max(10, get_settings().webhooks.parallelism)
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def reset_http_session() -> None:
+    global _session
+    with _session_lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
+
+
+def timeout_for(kind: str) -> float:
+    """Read timeout for a message kind."""
+    cfg = get_settings().webhooks
+    return cfg.report_timeout_s if kind == "report" else cfg.timeout_s
+
+
+def _idempotency_key(message: WebhookMessage) -> str:
+    raw = json.dumps([message.kind, message.url, message.payload], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def _retry_status(kind: str, error: Exception) -> str:
+    """Outbox status for a failed send: 'pending' to retry it, 'dead' to keep it for inspection."""
+    if not isinstance(error, WebhookError):
+        return "pending"
+    if not error.retryable or (error.read_timeout and kind in _NON_IDEMPOTENT_KINDS):
+        return "dead"
+    return "pending"
+
+
+def send_message(message: WebhookMessage, timeout_s: Optional[float] = None) -> requests.Response:
+    """POST one message as JSON; raises WebhookError on transport errors and HTTP >= 400."""
+    timeout = timeout_for(message.kind) if timeout_s is None else timeout_s
+    label = _FAILURE_LABELS.get(message.kind, f"{message.kind} webhook")
+    try:
+        with time_provider_call(f"webhook_{message.kind}"):
+            response = get_http_session().post(
+                message.url,
+                json=message.payload,
+                headers={"Idempotency-Key": _idempotency_key(message)},
+                timeout=(min(_CONNECT_TIMEOUT_S, timeout), timeout),
+            )
+    except requests.ReadTimeout as exc:
+        raise WebhookError(f"{label} timed out after {timeout:g}s: {exc}", read_timeout=True) from exc
+    except requests.RequestException as exc:
+        raise WebhookError(f"{label} failed: {exc}") from exc
+    logger.info(
+        "webhook_sent",
+        extra={"kind": message.kind, "status_code": response.status_code, "delivery_key": message.key},
+    )
+    if response.status_code >= 400:
+        raise WebhookError(f"{label} failed {response.status_code}: {response.text[:200]}", response.status_code)
+    return response
+
+
+def _batched(messages: List[WebhookMessage], kinds: List[str], size: int) -> List[Tuple[WebhookMessage, int]]:
+    """Merge batchable kinds per URL; returns (message, items it carries)."""
+    out: List[Tuple[WebhookMessage, int]] = []
+    groups: Dict[Tuple[str, str], List[WebhookMessage]] = {}
+    for message in messages:
+        if message.kind in kinds:
+            groups.setdefault((message.kind, message.url), []).append(message)
+        else:
+            out.append((message, 1))
+    for (kind, url), group in groups.items():
+        for start in range(0, len(group), size):
+            chunk = group[start : start + size]
+            payload = {"type": "batch", "kind": kind, "count": len(chunk), "items": [m.payload for m in chunk]}
+            out.append((WebhookMessage(kind, url, payload, key=",".join(m.key for m in chunk)), len(chunk)))
+    return out
+
+
+def _retry_at(attempts: int) -> str:
+    base = get_settings().webhooks.outbox_retry_base_s
+    delay = min(base * (2 ** max(0, attempts - 1)), 86_400.0)
+    return (datetime.now(timezone.utc) + timedelta(seconds=delay)).isoformat()
+
+
+def dispatch(messages: List[WebhookMessage], outbox: Optional[bool] = None) -> DispatchResult:
+    """Send messages concurrently; failures are queued to the outbox (when enabled)."""
+    cfg = get_settings().webhooks
+    use_outbox = cfg.outbox_enabled if outbox is None else outbox
+    result = DispatchResult()
+    sends = _batched(messages, cfg.batch_kinds, cfg.batch_size)
+    if not sends:
+        return result
+
+    def _send(message: WebhookMessage) -> Optional[WebhookError]:
+        try:
+            send_message(message)
+            return None
+        except WebhookError as exc:
+            return exc
+
+    workers = max(1, min(cfg.parallelism, len(sends)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="webhook") as pool:
+        outcomes = list(pool.map(_send, [m for m, _ in sends]))
+
+    failed: List[Tuple[WebhookMessage, Exception]] = []
+    for (message, items), error in zip(sends, outcomes):
+        result.requests += 1
+        if error is None:
+            result.sent += items
+            continue
+        record_error("tool", f"webhook_{message.kind}")
+        result.failures.append((message, str(error)))
+        failed.append((message, error))
+    if failed and use_outbox:
+        result.queued = queue_failed(failed)
+    return result
+
+
+def queue_failed(failures: List[Tuple[WebhookMessage, Exception]]) -> int:
+    """Queue failed sends to the outbox for retry. Returns rows queued (0 if the store is unavailable)."""
+    from .event_store import enqueue_webhooks, init_db
+
+    rows = [
+        {
+            "kind": message.kind,
+            "url": message.url,
+            "delivery_key": message.key,
+            "payload": message.payload,
+            "error": str(error)[:500],
+            "status": _retry_status(message.kind, error),
+            "next_attempt_at": _retry_at(1),
+        }
+        for message, error in failures
+    ]
+    try:
+        init_db()
+        return enqueue_webhooks(rows)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("webhook_delivery: failed to queue %d sends for retry: %s", len(rows), exc)
+        return 0
+
+
+def drain_outbox(limit: int = 200) -> Dict[str, int]:
+    """Retry due outbox rows once each. Returns delivered / rescheduled / dead counts."""
+    from .event_store import claim_due_webhooks, complete_webhooks, init_db
+
+    cfg = get_settings().webhooks
+    init_db()
+    now = datetime.now(timezone.utc)
+    # Long enough for every claimed row to time out once on the worker pool.
+    rounds = -(-limit // max(1, cfg.parallelism))
+    slowest = max(cfg.timeout_s, cfg.report_timeout_s)
+    lease_until = now + timedelta(seconds=rounds * (slowest + _CONNECT_TIMEOUT_S) + 60.0)
+    due = claim_due_webhooks(now.isoformat(), lease_until.isoformat(), limit=limit)
+    if not due:
+        return {"due": 0, "delivered": 0, "rescheduled": 0, "dead": 0}
+
+    def _send(row: Dict[str, Any]) -> Optional[WebhookError]:
+        try:
+            send_message(WebhookMessage(row["kind"], row["url"], row["payload"], row["delivery_key"]))
+            return None
+        except WebhookError as exc:
+            return exc
+
+    with ThreadPoolExecutor(max_workers=max(1, min(cfg.parallelism, len(due))), thread_name_prefix="webhook") as pool:
+        outcomes = list(pool.map(_send, due))
+
+    delivered: List[int] = []
+    retries: List[Dict[str, Any]] = []
+    for row, error in zip(due, outcomes):
+        if error is None:
+            delivered.append(row["id"])
+            continue
+        attempts = row["attempts"] + 1
+        dead = _retry_status(row["kind"], error) == "dead" or attempts >= cfg.outbox_max_attempts
+        retries.append(
+            {
+                "id": row["id"],
+                "attempts": attempts,
+                "error": str(error)[:500],
+                "next_attempt_at": _retry_at(attempts),
+                "status": "dead" if dead else "pending",
+            }
+        )
+    complete_webhooks(delivered, retries)
+    summary = {
+        "due": len(due),
+        "delivered": len(delivered),
+        "rescheduled": sum(1 for r in retries if r["status"] == "pending"),
+        "dead": sum(1 for r in retries if r["status"] == "dead"),
+    }
+    logger.info("webhook_outbox_drained", extra=summary)
+    return summary
+
+
+class OutboxDrainer:
+    """Background thread that calls drain_outbox every WEBHOOK_OUTBOX_DRAIN_S seconds."""
+
+    def __init__(self) -> None:
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="investora-webhook-outbox", daemon=True)
+            self._thread.start()
+        return True
+
+    def stop(self, timeout_s: float = 5.0) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join(timeout=timeout_s)
+
+    def _loop(self) -> None:
+        interval = get_settings().webhooks.outbox_drain_interval_s
+        while not self._stop.wait(interval):
+            try:
+                drain_outbox()
+            except Exception:  # noqa: BLE001
+                logger.exception("webhook_delivery: outbox drain failed")
+
+
+outbox_drainer = OutboxDrainer()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect or drain the webhook retry outbox")
+    parser.add_argument("command", choices=["stats", "drain"])
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+    from .event_store import init_db, webhook_outbox_counts
+
+    init_db()
+    if args.command == "drain":
+        print(json.dumps(drain_outbox(limit=args.limit), indent=2))
+    else:
+        print(json.dumps(webhook_outbox_counts(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from .event_store import load_recent_runs, load_run
+from .event_store import load_signal_events_between
+
+# How many of the most recent runs a digest window may draw events from.
+_RECENT_RUN_LIMIT = 60
 
 
 def _iso_today() -> str:
@@ -20,44 +23,68 @@ def _safe_narrative(ev: Dict[str, Any]) -> str:
     return f"{ticker} emitted a {severity} {signal_type} signal this week."
 
 
+def digest_window(latest_bundle: Dict[str, Any], lookback_days: int = 7) -> Tuple[str, str, str]:
+    """(run_date, week_start, week_end) of the digest for this bundle."""
+    run_date = str(latest_bundle.get("run_date") or _iso_today())
+    run_day = date.fromisoformat(run_date)
+    week_start = (run_day - timedelta(days=lookback_days - 1)).isoformat()
+    return run_date, week_start, run_date
+
+
+class WeeklyEventIndex:
+    """The signal events of one digest window, loaded once and shared by every user.
+
+    Events are indexed by ticker and by route so a user's relevant events are
+    gathered from their watchlist entries instead of a scan over the whole week.
+    The index is read-only after construction and safe to share across threads.
+    """
+
+    def __init__(self, week_start: str, week_end: str, events: List[Dict[str, Any]]) -> None:
+        self.week_start = week_start
+        self.week_end = week_end
+        self.events = events
+        self._by_ticker: Dict[str, List[int]] = {}
+        self._alerts: List[int] = []
+        for pos, ev in enumerate(events):
+            self._by_ticker.setdefault(str(ev.get("ticker", "")).upper(), []).append(pos)
+            if str(ev.get("route", "")) == "ALERT_EVENT":
+                self._alerts.append(pos)
+
+    @classmethod
+    def load(cls, week_start: str, week_end: str, run_limit: int = _RECENT_RUN_LIMIT) -> "WeeklyEventIndex":
+        return cls(week_start, week_end, list(load_signal_events_between(week_start, week_end, run_limit)))
+
+    def covers(self, week_start: str, week_end: str) -> bool:
+        return (self.week_start, self.week_end) == (week_start, week_end)
+
+    def relevant_events(self, watchlist: Iterable[str]) -> List[Dict[str, Any]]:
+        """Events on a watchlist ticker or routed as alerts, in load order."""
+        positions = set(self._alerts)
+        for ticker in watchlist:
+            positions.update(self._by_ticker.get(ticker, ()))
+        return [self.events[pos] for pos in sorted(positions)]
+
+
 def build_weekly_user_digest(
     user_profile: Dict[str, Any],
     latest_bundle: Dict[str, Any],
     lookback_days: int = 7,
+    index: Optional[WeeklyEventIndex] = None,
 ) -> Dict[str, Any]:
     """
     Build a weekly user digest from recent runs + latest personalized bundle.
 
     This is intentionally deterministic/rule-based for reliability in notification
     delivery and to avoid adding LLM latency/cost to the weekly mail path.
+    Pass a WeeklyEventIndex when building digests for many users so the week's
+    events are loaded once; without one (or for another window) it is loaded here.
     """
-    run_date = str(latest_bundle.get("run_date") or _iso_today())
-    run_day = date.fromisoformat(run_date)
-    week_start = (run_day - timedelta(days=lookback_days - 1)).isoformat()
-    week_end = run_date
+    run_date, week_start, week_end = digest_window(latest_bundle, lookback_days)
+    if index is None or not index.covers(week_start, week_end):
+        index = WeeklyEventIndex.load(week_start, week_end)
 
     watchlist = {str(t).upper() for t in user_profile.get("watchlist", [])}
-    recent_runs = load_recent_runs(limit=60)
-    weekly_events: List[Dict[str, Any]] = []
-
-    for meta in recent_runs:
-        d = str(meta.get("run_date", ""))
-        if not d or d < week_start or d > week_end:
-            continue
-        run_id = str(meta.get("run_id", ""))
-        if not run_id:
-            continue
-        snap = load_run(run_id)
-        if not snap:
-            continue
-        weekly_events.extend(snap.get("signal_events", []))
-
-    relevant_events = [
-        ev
-        for ev in weekly_events
-        if str(ev.get("ticker", "")).upper() in watchlist
-        or str(ev.get("route", "")) == "ALERT_EVENT"
-    ]
+    relevant_events = index.relevant_events(watchlist)
 
     high_events = [ev for ev in relevant_events if str(ev.get("severity", "")).lower() in {"high", "critical"}]
     alert_events = [ev for ev in relevant_events if str(ev.get("route", "")) == "ALERT_EVENT"]
@@ -0,0 +1,4 @@
+"""Offline benchmarks for the Investora LangGraph backend.
+
+Run from the ``langgraph/`` directory, e.g. ``python -m benchmarks.bench_event_store``.
+"""
@@ -0,0 +1,140 @@
+"""
+bench_alerts.py
+---------------
+Compare the per-alert linear scan (alert_checker.evaluate_price_alert plus
+one UPDATE per triggered alert) with the AlertIndex engine and the bulk
+mark_alerts_triggered UPDATE, on synthetic alerts in a temp SQLite file.
+
+Usage:
+    python -m benchmarks.bench_alerts --alerts 100000 --tickers 500
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app import event_store
+from app.alert_checker import evaluate_price_alert
+from app.alert_engine import AlertIndex, triggered_payload
+
+_CONDITIONS = ["price_above", "price_below", "daily_move"]
+
+
+def _alerts(n: int, prices: Dict[str, float], rng: random.Random) -> List[Dict[str, Any]]:
+    # Users set thresholds a few percent to a few tens of percent away from
+    # the price they saw, so only a small share fires on any one check.
+    tickers = list(prices)
+    alerts = []
+    for i in range(n):
+        condition = rng.choice(_CONDITIONS)
+        ticker = rng.choice(tickers)
+        if condition == "daily_move":
+            value = rng.uniform(2.0, 10.0)
+        elif condition == "price_above":
+            value = prices[ticker] * rng.uniform(1.0, 1.3)
+        else:
+            value = prices[ticker] * rng.uniform(0.7, 1.0)
+        alerts.append(
+            {"id": f"alert-{i}", "user_id": f"user-{i % 1000}", "ticker": ticker, "condition": condition, "value": value}
+        )
+    return alerts
+
+
+def _linear(alerts: List[Dict[str, Any]], quotes: Dict[str, Dict[str, float]]) -> List[str]:
+    """The pre-index check_user_alerts loop, without the per-alert UPDATE."""
+    hits = []
+    for alert in alerts:
+        quote = quotes[alert["ticker"]]
+        if evaluate_price_alert(alert, quote["price"], quote["change_pct"]):
+            hits.append(triggered_payload(alert, quote["price"], quote["change_pct"]))
+    return [h["alert_id"] for h in hits]
+
+
+def _seed(alerts: List[Dict[str, Any]]) -> None:
+    with event_store._conn() as con:
+        con.execute("DELETE FROM user_alerts")
+        con.executemany(
+            "INSERT INTO user_alerts (id, user_id, ticker, condition, value, status, created_at) "
+            "VALUES (?, ?, ?, ?, ?, 'active', '2026-01-01T00:00:00+00:00')",
+            [(a["id"], a["user_id"], a["ticker"], a["condition"], a["value"]) for a in alerts],
+        )
+
+
+def run(n_alerts: int, n_tickers: int, rounds: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    base = {f"T{i:04d}": rng.uniform(20.0, 500.0) for i in range(n_tickers)}
+    alerts = _alerts(n_alerts, base, rng)
+    quotes = {}
+    for ticker, price in base.items():
+        change_pct = rng.gauss(0.0, 2.0)
+        quotes[ticker] = {"price": price * (1.0 + change_pct / 100.0), "change_pct": change_pct}
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        expected = _linear(alerts, quotes)
+    linear_ms = (time.perf_counter() - started) * 1000.0 / rounds
+
+    started = time.perf_counter()
+    index = AlertIndex(alerts)
+    build_ms = (time.perf_counter() - started) * 1000.0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        triggered = [t["alert_id"] for t in index.evaluate_quotes(quotes)]
+    indexed_ms = (time.perf_counter() - started) * 1000.0 / rounds
+    if triggered != expected:
+        raise SystemExit("AlertIndex disagrees with the linear scan")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        event_store.DB_PATH = Path(tmp) / "bench_alerts.db"
+        event_store.init_db()
+        _seed(alerts)
+        started = time.perf_counter()
+        for alert_id in triggered:
+            event_store.mark_alert_triggered(alert_id)
+        per_alert_update_ms = (time.perf_counter() - started) * 1000.0
+        _seed(alerts)
+        started = time.perf_counter()
+        marked = event_store.mark_alerts_triggered(triggered)
+        bulk_update_ms = (time.perf_counter() - started) * 1000.0
+        event_store.close_connections()
+
+    return {
+        "alerts": n_alerts,
+        "tickers": n_tickers,
+        "triggered": len(triggered),
+        "evaluate": {
+            "linear_ms": round(linear_ms, 2),
+            "index_build_ms": round(build_ms, 2),
+            "indexed_ms": round(indexed_ms, 2),
+            "speedup": round(linear_ms / indexed_ms, 1) if indexed_ms else None,
+        },
+        "mark_triggered": {
+            "per_alert_ms": round(per_alert_update_ms, 2),
+            "bulk_ms": round(bulk_update_ms, 2),
+            "bulk_rows": marked,
+            "speedup": round(per_alert_update_ms / bulk_update_ms, 1) if bulk_update_ms else None,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark linear vs indexed alert evaluation")
+    parser.add_argument("--alerts", type=int, default=100_000)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    print(json.dumps(run(args.alerts, args.tickers, args.rounds, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
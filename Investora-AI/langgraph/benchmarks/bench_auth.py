@@ -0,0 +1,173 @@
+"""
+bench_auth.py
+-------------
+Login and authenticated-request throughput of the /auth endpoints, driven
+in-process through httpx's ASGI transport against a temp SQLite file.
+
+  decode        token verification alone: HMAC + JSON parse on every call vs
+                the verified-token LRU
+  login         --logins concurrent POST /auth/login, once per KDF executor
+                (threads on the loop's pool vs the process pool). While the
+                storm runs, a probe keeps calling GET /auth/me; its p95 shows
+                whether authenticated requests stall behind the KDF.
+  me            --requests concurrent GET /auth/me with the token cache on vs off
+
+Usage:
+    python -m benchmarks.bench_auth --logins 200 --concurrency 32 --requests 5000 --iterations 120000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import httpx
+
+from app import auth, event_store
+from app.settings import get_settings
+
+_PASSWORD = "correct horse battery"
+
+
+def _p95(samples: List[float]) -> float:
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2) if ordered else 0.0
+
+
+def bench_decode(n: int) -> Dict[str, Any]:
+    token = auth.issue_token("user-1", "user-1@example.com", "bench-secret")
+    started = time.perf_counter()
+    for _ in range(n):
+        auth._verify_token(token, "bench-secret")
+    uncached_s = time.perf_counter() - started
+    auth.decode_token(token, "bench-secret")
+    started = time.perf_counter()
+    for _ in range(n):
+        auth.decode_token(token, "bench-secret")
+    cached_s = time.perf_counter() - started
+    return {
+        "calls": n,
+        "uncached_ops_s": round(n / uncached_s),
+        "cached_ops_s": round(n / cached_s),
+        "speedup": round(uncached_s / cached_s, 2),
+    }
+
+
+async def _timed(fn, *args, **kwargs) -> float:
+    started = time.perf_counter()
+    await fn(*args, **kwargs)
+    return (time.perf_counter() - started) * 1000.0
+
+
+async def bench_login(client: httpx.AsyncClient, token: str, logins: int, concurrency: int) -> Dict[str, Any]:
+    gate = asyncio.Semaphore(concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+    probe_ms: List[float] = []
+    done = asyncio.Event()
+
+    async def _login(i: int) -> None:
+        async with gate:
+            response = await client.post("/auth/login", json={"username": f"user-{i % 8}@example.com", "password": _PASSWORD})
+            if response.status_code != 200 or not response.json().get("ok"):
+                raise RuntimeError(f"login failed: {response.status_code} {response.text[:200]}")
+
+    async def _probe() -> None:
+        while not done.is_set():
+            probe_ms.append(await _timed(client.get, "/auth/me", headers=headers))
+            await asyncio.sleep(0.005)
+
+    probe = asyncio.create_task(_probe())
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(_timed(_login, i) for i in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe
+    return {
+        "logins": logins,
+        "logins_s": round(logins / elapsed, 1),
+        "login_p50_ms": round(statistics.median(latencies), 2),
+        "login_p95_ms": _p95(latencies),
+        "me_probe_p95_ms_during_storm": _p95(probe_ms),
+        "me_probe_samples": len(probe_ms),
+    }
+
+
+async def bench_me(client: httpx.AsyncClient, token: str, requests: int, concurrency: int) -> Dict[str, Any]:
+    gate = asyncio.Semaphore(concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def _me() -> None:
+        async with gate:
+            response = await client.get("/auth/me", headers=headers)
+            if response.status_code != 200:
+                raise RuntimeError(f"/auth/me failed: {response.status_code}")
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(_timed(_me) for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {"requests": requests, "requests_s": round(requests / elapsed, 1), "p95_ms": _p95(latencies)}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from app import api
+
+    settings = get_settings()
+    settings.auth.pbkdf2_iterations = args.iterations
+    results: Dict[str, Any] = {"iterations": args.iterations, "decode": bench_decode(args.decode_calls)}
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(8):
+            response = await client.post("/auth/register", json={"username": f"user-{i}@example.com", "password": _PASSWORD})
+            response.raise_for_status()
+        login = await client.post("/auth/login", json={"username": "user-0@example.com", "password": _PASSWORD})
+        token = login.json()["token"]
+
+        results["login"] = {}
+        for workers in args.kdf_workers:
+            auth.kdf_pool.shutdown()
+            auth.kdf_pool.workers = workers
+            auth.kdf_pool.max_pending = max(args.concurrency, auth.kdf_pool.max_pending)
+            auth.kdf_pool.start()
+            await client.post("/auth/login", json={"username": "user-0@example.com", "password": _PASSWORD})
+            label = f"process x{workers}" if workers else "thread"
+            results["login"][label] = await bench_login(client, token, args.logins, args.concurrency)
+        auth.kdf_pool.shutdown()
+
+        results["me"] = {}
+        for label, size in (("token_cache_off", 0), ("token_cache_on", settings.auth.token_cache_size)):
+            auth.token_cache.max_entries = size
+            auth.token_cache.clear()
+            results["me"][label] = await bench_me(client, token, args.requests, args.concurrency)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=120_000, help="PBKDF2 iterations for new hashes")
+    parser.add_argument("--kdf-workers", type=int, nargs="+", default=[0, 2], help="0 = thread executor")
+    parser.add_argument("--decode-calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        event_store.DB_PATH = Path(tmp) / "bench.db"
+        event_store.init_db()
+        results = asyncio.run(run(args))
+        event_store.close_connections()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
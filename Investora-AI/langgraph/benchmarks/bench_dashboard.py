@@ -0,0 +1,142 @@
+"""
+bench_dashboard.py
+------------------
+Latency of the /user/{user_id}/dashboard read path, measured in-process on a
+temp SQLite file (no HTTP server, so the numbers are the handler's own cost).
+
+  uncached   init_db DDL script + SELECT bundle_json + json.loads + JSONResponse
+             (the path before the dashboard cache)
+  cached     init_db (no-op) + version check + LRU hit + raw JSON Response
+  304        cached lookup whose ETag matches If-None-Match (no body)
+
+Usage:
+    python -m benchmarks.bench_dashboard --users 2000 --signals 40 --requests 20000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.responses import JSONResponse, Response
+
+from app import event_store
+from app.dashboard_cache import dashboard_cache
+
+
+def _signal(user: int, i: int, bucket: str) -> Dict[str, Any]:
+    return {
+        "signal_id": f"run-1-{user}-{i}",
+        "ticker": f"T{i:03d}",
+        "signal_type": "quality",
+        "direction": "up",
+        "severity": "medium",
+        "narrative": "Margins expanded for a third straight quarter while leverage fell." * 2,
+        "confidence": 0.7,
+        "watchlist_relevance": 1.0 if bucket == "in_watchlist" else 0.0,
+        "profile_fit_score": 0.62,
+        "risk_mismatch_penalty": 0.0,
+        "bucket": bucket,
+        "action_frame": "Review",
+        "urgency": "Medium",
+        "catalyst_window": None,
+        "risk_flags": ["rate_sensitivity"],
+        "fit_score": 6.4,
+    }
+
+
+def _bundle(user: int, n_signals: int) -> Dict[str, Any]:
+    half = n_signals // 2
+    return {
+        "user_id": f"user-{user}",
+        "run_id": "run-1",
+        "run_date": "2026-03-02",
+        "generated_at": "2026-03-02T00:00:00+00:00",
+        "watchlist_performance": {f"T{i:03d}": {"1d": 0.4, "1w": 1.2, "1m": 3.1} for i in range(10)},
+        "market_regime": "Neutral",
+        "risk_alignment": "Aligned",
+        "watchlist_signals": [_signal(user, i, "in_watchlist") for i in range(half)],
+        "discovery_signals": [_signal(user, i, "discovery") for i in range(half, n_signals)],
+        "top_conviction": [_signal(user, i, "discovery") for i in range(3)],
+        "mismatch_alerts": [],
+    }
+
+
+def _uncached(user_id: str) -> Any:
+    with event_store._conn() as con:
+        con.executescript(event_store._DDL)
+    return JSONResponse(event_store.load_latest_bundle(user_id))
+
+
+def _cached(user_id: str) -> Any:
+    event_store.init_db()
+    entry = dashboard_cache.get(user_id)
+    return Response(content=entry.dashboard_json, media_type="application/json", headers={"ETag": entry.etag})
+
+
+def _not_modified(user_id: str) -> Any:
+    event_store.init_db()
+    entry = dashboard_cache.get(user_id)
+    assert entry.etag
+    return Response(status_code=304, headers={"ETag": entry.etag})
+
+
+def _measure(fn: Callable[[str], Any], users: List[str]) -> Dict[str, float]:
+    samples = []
+    for user_id in users:
+        started = time.perf_counter()
+        fn(user_id)
+        samples.append((time.perf_counter() - started) * 1000.0)
+    samples.sort()
+    return {
+        "p50_ms": round(samples[len(samples) // 2], 4),
+        "p95_ms": round(samples[int(len(samples) * 0.95)], 4),
+        "p99_ms": round(samples[int(len(samples) * 0.99)], 4),
+    }
+
+
+def run(n_users: int, n_signals: int, n_requests: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        event_store.DB_PATH = Path(tmp) / "bench_dashboard.db"
+        event_store.init_db()
+        event_store.save_bundles(_bundle(u, n_signals) for u in range(n_users))
+        bundle_bytes = len(json.dumps(_bundle(0, n_signals)))
+        users = [f"user-{rng.randrange(n_users)}" for _ in range(n_requests)]
+
+        dashboard_cache.clear()
+        for user_id in set(users):  # warm: one miss per user
+            dashboard_cache.get(user_id)
+        results = {
+            "users": n_users,
+            "requests": n_requests,
+            "bundle_bytes": bundle_bytes,
+            "uncached": _measure(_uncached, users),
+            "cached": _measure(_cached, users),
+            "not_modified": _measure(_not_modified, users),
+            "cache": dashboard_cache.stats(),
+        }
+        event_store.close_connections()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard read path")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--signals", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.users, args.signals, args.requests, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+bench_event_store.py
+--------------------
+Compare the legacy event_store write path (fresh connection + PRAGMA per
+call, one INSERT per signal event / bundle) with the pooled path
+(per-thread connection, cached statements, executemany in one transaction).
+
+Usage:
+    python -m benchmarks.bench_event_store --events 10000 --bundles 500
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app import event_store
+from app.models import AnalysisSnapshot, SignalEvent
+
+
+def _make_snapshot(run_id: str, n_events: int) -> AnalysisSnapshot:
+    events: List[SignalEvent] = []
+    for i in range(n_events):
+        events.append(
+            SignalEvent(
+                id=f"{run_id}-{i:06d}",
+                run_id=run_id,
+                run_date="2026-03-02",
+                timestamp="2026-03-02T00:00:00+00:00",
+                ticker=f"T{i % 1000:04d}",
+                signal_type="quality" if i % 2 else "momentum",
+                direction="up",
+                severity="medium",
+                confidence=0.6,
+                score=6.0,
+                narrative=None,
+                route="UI_UPDATE",
+            )
+        )
+    return AnalysisSnapshot(
+        run_id=run_id,
+        run_date="2026-03-02",
+        timestamp="2026-03-02T00:00:00+00:00",
+        scope="full",
+        tickers=[],
+        scores={},
+        signal_events=events,
+        failed_tickers=[],
+        error_count=0,
+    )
+
+
+def _make_bundles(run_id: str, n_bundles: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "user_id": f"user-{i:05d}",
+            "run_id": run_id,
+            "run_date": "2026-03-02",
+            "watchlist_signals": [],
+            "discovery_signals": [],
+        }
+        for i in range(n_bundles)
+    ]
+
+
+# ── Legacy path (pre-pooling behaviour, reproduced for comparison) ────────────
+
+def _legacy_conn(path: Path) -> sqlite3.Connection:
+    con = sqlite3.connect(str(path))
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA foreign_keys=ON")
+    return con
+
+
+def _legacy_persist(path: Path, snapshot: AnalysisSnapshot, bundles: List[Dict[str, Any]]) -> None:
+    con = _legacy_conn(path)
+    try:
+        con.execute(
+            event_store._UPSERT_RUN_SQL,
+            (snapshot["run_id"], snapshot["run_date"], snapshot["timestamp"], snapshot["scope"],
+             "[]", "{}", "[]", 0),
+        )
+        for ev in snapshot["signal_events"]:
+            con.execute(event_store._UPSERT_SIGNAL_SQL, event_store._signal_row(ev))
+        con.commit()
+    finally:
+        con.close()
+    for bundle in bundles:
+        con = _legacy_conn(path)
+        try:
+            con.execute(
+                event_store._UPSERT_BUNDLE_SQL,
+                (bundle["user_id"], bundle["run_id"], bundle["run_date"], json.dumps(bundle), snapshot["timestamp"]),
+            )
+            con.commit()
+        finally:
+            con.close()
+
+
+def _pooled_persist(snapshot: AnalysisSnapshot, bundles: List[Dict[str, Any]]) -> None:
+    event_store.persist_run(snapshot)
+    event_store.save_bundles(bundles)
+
+
+def run(n_events: int, n_bundles: int, repeats: int) -> Dict[str, Any]:
+    results: Dict[str, List[float]] = {"legacy_ms": [], "pooled_ms": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        original = event_store.DB_PATH
+        try:
+            for r in range(repeats):
+                legacy_db = Path(tmp) / f"legacy_{r}.db"
+                event_store.DB_PATH = legacy_db
+                event_store.init_db()
+                snapshot = _make_snapshot(f"legacy-{r}", n_events)
+                bundles = _make_bundles(f"legacy-{r}", n_bundles)
+                started = time.perf_counter()
+                _legacy_persist(legacy_db, snapshot, bundles)
+                results["legacy_ms"].append((time.perf_counter() - started) * 1000.0)
+
+                event_store.DB_PATH = Path(tmp) / f"pooled_{r}.db"
+                event_store.init_db()
+                snapshot = _make_snapshot(f"pooled-{r}", n_events)
+                bundles = _make_bundles(f"pooled-{r}", n_bundles)
+                started = time.perf_counter()
+                _pooled_persist(snapshot, bundles)
+                results["pooled_ms"].append((time.perf_counter() - started) * 1000.0)
+        finally:
+            event_store.close_connections()
+            event_store.DB_PATH = original
+
+    legacy = min(results["legacy_ms"])
+    pooled = min(results["pooled_ms"])
+    return {
+        "events": n_events,
+        "bundles": n_bundles,
+        "repeats": repeats,
+        "legacy_best_ms": round(legacy, 2),
+        "pooled_best_ms": round(pooled, 2),
+        "speedup": round(legacy / pooled, 2) if pooled else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark event_store write paths")
+    parser.add_argument("--events", type=int, default=10_000, help="Signal events per run")
+    parser.add_argument("--bundles", type=int, default=500, help="User bundles per run")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.events, args.bundles, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""
+bench_graph.py
+--------------
+Offline replay of the full compiled graph (graph_builder.compile_graph) over
+synthetic universes and user populations.
+
+Market/fundamentals/news come from mock_tools; universes larger than the mock
+file are padded with synthetic rows. The OpenAI client and the Pinecone RAG
+tool are replaced by deterministic local stubs, and webhooks are skipped, so
+a run touches nothing outside a temp directory.
+
+Each (tickers, users) scenario runs in a fresh process, so peak RSS is per
+scenario. Reported per scenario:
+  * run wall time (p50/p95) and per-node latency (p50/p95/p99 from the
+    metrics registry's quantile sketches) over --repeats runs
+  * peak RSS
+  * the critical path of the last run (graph_topology.critical_path): the
+    node that bounds each superstep and the time saved by parallel branches
+  * SQLite write statements and bytes written (main DB + WAL) per run
+
+--out writes the results as a JSON baseline; --baseline compares against one
+and lists nodes whose p95 regressed by more than --tolerance.
+
+Usage:
+    python -m benchmarks.bench_graph --tickers 10 100 1000 --users 1 100 10000 --out baseline.json
+    python -m benchmarks.bench_graph --baseline baseline.json --fail-on-regression
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+_RUN_DATE = "2026-03-06"
+_STUB_API_KEY = "bench-stub-key"
+_WRITE_VERBS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+# ---------------------------------------------------------------------------
+# Deterministic stand-ins for OpenAI and Pinecone
+# ---------------------------------------------------------------------------
+
+
+def _stable(text: str) -> int:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _stub_synthesis(bundle: Dict[str, Any]) -> Dict[str, Any]:
+    ticker = bundle.get("ticker", "")
+    headlines = bundle.get("headlines") or []
+    return {
+        "ticker": ticker,
+        "quality_narrative": f"{ticker} quality score {bundle.get('scores', {}).get('quality', 0)}.",
+        "momentum_narrative": f"{ticker} weekly return {bundle.get('market', {}).get('weekly_return_pct')}%.",
+        "news_catalyst": {
+            "present": bool(headlines),
+            "headline": headlines[0] if headlines else None,
+            "impact": ("positive", "neutral", "negative")[_stable(ticker) % 3],
+            "strength": "low",
+        },
+        "risk_factors": ["Synthetic risk factor"],
+    }
+
+
+class _StubResponses:
+    """Answers synthesis (single and batched) and planner prompts without a network call."""
+
+    def create(self, **kwargs: Any) -> Any:
+        body = json.loads(kwargs["input"][-1]["content"])
+        if "text" in kwargs:
+            payload: Dict[str, Any] = {"results": [_stub_synthesis(b) for b in body.get("tickers", [])]}
+        elif "pending_pairs" in body:
+            pending = body["pending_pairs"]
+            payload = dict(pending[0]) if pending else {"action": "compute"}
+            payload["reason"] = "stub planner"
+        else:
+            payload = _stub_synthesis(body)
+        text = json.dumps(payload)
+        usage = SimpleNamespace(input_tokens=len(kwargs["input"][-1]["content"]) // 4, output_tokens=len(text) // 4)
+        return SimpleNamespace(output_text=text, usage=usage)
+
+
+class _StubOpenAI:
+    def __init__(self) -> None:
+        self.responses = _StubResponses()
+
+    def close(self) -> None:
+        pass
+
+
+class _StubRAGTool:
+    def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        ticker = str(payload.get("ticker", "")).upper()
+        top_k = int(payload.get("top_k", 5))
+        return {
+            "ticker": ticker,
+            "query": payload.get("query", ""),
+            "matches": [
+                {
+                    "id": f"{ticker}-{i}",
+                    "score": round(0.9 - i * 0.05, 3),
+                    "text": f"{ticker} filing excerpt {i}",
+                    "source": "stub",
+                    "published_at": _RUN_DATE,
+                }
+                for i in range(top_k)
+            ],
+            "retrieved_count": top_k,
+            "enabled": True,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Scenario setup
+# ---------------------------------------------------------------------------
+
+
+def _universe(n: int) -> List[str]:
+    from app.mcp_tools import mock_tools
+
+    tickers = sorted(mock_tools._UNIVERSE_INDEX)[:n]
+    for i in range(n - len(tickers)):
+        ticker = f"SYN{i:04d}"
+        mock_tools._UNIVERSE_INDEX[ticker] = {
+            "ticker": ticker,
+            "name": f"Synthetic {i}",
+            "sector": ("Technology", "Healthcare", "Financials", "Energy")[i % 4],
+            "themes": ["synthetic"],
+            "mock_quality_score": round((_stable(ticker) % 1000) / 100.0, 2),
+            "mock_momentum_score": round((_stable(ticker[::-1]) % 1000) / 100.0, 2),
+        }
+        tickers.append(ticker)
+    return tickers
+
+
+def _seed_profiles(n: int, tickers: List[str]) -> None:
+    from app import event_store
+
+    with event_store.transaction():
+        for i in range(n):
+            user_id = f"user-{i:05d}"
+            event_store.save_user_profile(
+                user_id,
+                {
+                    "riskTolerance": ("low", "medium", "high")[i % 3],
+                    "riskTolerancePercent": (i * 37) % 100,
+                    "horizon": ("short", "medium", "long")[i % 3],
+                    "interests": [("Technology", "Healthcare", "Energy")[i % 3]],
+                    "preferredAssets": ["stocks"],
+                    "alertNotifications": True,
+                },
+            )
+            watchlist = [tickers[(i * 7 + k) % len(tickers)] for k in range(min(5, len(tickers)))]
+            event_store.set_watchlist(user_id, watchlist)
+
+
+class _WriteCounter:
+    """Counts write statements on every event_store connection opened after install()."""
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self._lock = threading.Lock()
+
+    def _trace(self, sql: str) -> None:
+        if sql.lstrip().upper().startswith(_WRITE_VERBS):
+            with self._lock:
+                self.statements += 1
+
+    def install(self) -> None:
+        from app import event_store
+
+        opener = event_store._open_connection
+
+        def _open(path: Path):
+            con = opener(path)
+            con.set_trace_callback(self._trace)
+            return con
+
+        event_store._open_connection = _open
+
+
+def _db_bytes(db_path: Path) -> int:
+    return sum(p.stat().st_size for p in (db_path, Path(f"{db_path}-wal")) if p.exists())
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux.
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def _quantiles(samples: List[float]) -> Dict[str, float]:
+    import numpy as np
+
+    return {
+        "count": len(samples),
+        "p50_ms": round(float(np.percentile(samples, 50)), 2),
+        "p95_ms": round(float(np.percentile(samples, 95)), 2),
+    }
+
+
+def run_scenario(
+    n_tickers: int, n_users: int, repeats: int, skip_synthesis: bool = False, warmup: int = 1
+) -> Dict[str, Any]:
+    """Run the compiled graph warmup + repeats times for one scenario; call in a fresh process.
+
+    Warm-up runs pay one-off import and first-connection costs and are not reported.
+    """
+    os.environ["USE_MOCK_DATA"] = "true"
+    os.environ.setdefault("RATE_LIMIT_OPENAI_PER_S", "0")
+
+    from app import event_store, llm_client, metrics
+    from app.graph import _timed_node, planner_router
+    from app.graph_builder import compile_graph
+    from app.graph_topology import critical_path
+    from app.nodes import delivery, evidence
+    from app.settings import get_settings
+
+    settings = get_settings()
+    settings.run.use_mock_data = True
+    settings.run.universe_cap = 0
+    settings.providers.openai_api_key = _STUB_API_KEY
+    llm_client._clients[_STUB_API_KEY] = _StubOpenAI()  # type: ignore[assignment]
+    evidence.get_rag_tool = lambda: _StubRAGTool()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        event_store.DB_PATH = root / "bench.db"
+        delivery.REPORT_DIR = root / "reports"
+        counter = _WriteCounter()
+        counter.install()
+        event_store.init_db()
+
+        tickers = _universe(n_tickers)
+        _seed_profiles(n_users, tickers)
+
+        app = compile_graph(timed_node=_timed_node, planner_router=planner_router)
+        run_ms: List[float] = []
+        writes: List[int] = []
+        written: List[int] = []
+        errors = 0
+        last_timings: Dict[str, float] = {}
+        for r in range(warmup + repeats):
+            # A cold synthesis cache per run, so every repeat does the same work.
+            evidence.SYNTHESIS_CACHE_DIR = str(root / f"cache-{r}")
+            if r == warmup:
+                metrics.reset_metrics()
+            writes_before, bytes_before = counter.statements, _db_bytes(event_store.DB_PATH)
+            started = time.perf_counter()
+            result = app.invoke(
+                {
+                    "tickers": list(tickers),
+                    "run_date": _RUN_DATE,
+                    "skip_synthesis": skip_synthesis,
+                    "skip_post": True,
+                    "scope": "full",
+                    "trigger_weekly_digest": False,
+                },
+                config={"recursion_limit": max(settings.run.graph_recursion_limit, 4 * n_tickers + 50)},
+            )
+            if r < warmup:
+                continue
+            run_ms.append((time.perf_counter() - started) * 1000.0)
+            writes.append(counter.statements - writes_before)
+            written.append(max(0, _db_bytes(event_store.DB_PATH) - bytes_before))
+            errors += len(result.get("errors", []))
+            last_timings = result.get("node_timings", {})
+
+        event_store.close_connections()
+        node_stats = metrics.snapshot_metrics()["node_timings"]
+
+    return {
+        "tickers": n_tickers,
+        "users": n_users,
+        "repeats": repeats,
+        "warmup": warmup,
+        "run": _quantiles(run_ms),
+        "nodes": {
+            name: {"count": t["count"], "p50_ms": t["p50_ms"], "p95_ms": t["p95_ms"], "p99_ms": t["p99_ms"]}
+            for name, t in sorted(node_stats.items())
+        },
+        "critical_path": {
+            k: v
+            for k, v in critical_path(last_timings).items()
+            if k in ("path", "critical_ms", "total_node_ms", "parallel_savings_ms", "bottleneck")
+        },
+        "peak_rss_mb": _peak_rss_mb(),
+        "sqlite": {
+            "write_statements_per_run": round(sum(writes) / len(writes), 1),
+            "bytes_written_per_run": int(sum(written) / len(written)),
+        },
+        "errors_per_run": round(errors / repeats, 2),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Baselines
+# ---------------------------------------------------------------------------
+
+
+def _scenario_key(result: Dict[str, Any]) -> str:
+    return f"t{result['tickers']}_u{result['users']}"
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, floor_ms: float) -> List[Dict[str, Any]]:
+    """Nodes (and whole runs) whose p95 grew by more than tolerance and floor_ms versus the baseline."""
+    regressions: List[Dict[str, Any]] = []
+    for key, scenario in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(key)
+        if base is None or "error" in base or "error" in scenario:
+            continue
+        pairs = [("<run>", scenario["run"], base["run"])]
+        pairs += [(n, s, base["nodes"][n]) for n, s in scenario["nodes"].items() if n in base["nodes"]]
+        for name, now, before in pairs:
+            delta = now["p95_ms"] - before["p95_ms"]
+            if delta > floor_ms and now["p95_ms"] > before["p95_ms"] * (1.0 + tolerance):
+                regressions.append(
+                    {
+                        "scenario": key,
+                        "node": name,
+                        "baseline_p95_ms": before["p95_ms"],
+                        "p95_ms": now["p95_ms"],
+                        "ratio": round(now["p95_ms"] / before["p95_ms"], 2) if before["p95_ms"] else None,
+                    }
+                )
+    return regressions
+
+
+def run(
+    tickers: List[int],
+    users: List[int],
+    repeats: int,
+    skip_synthesis: bool,
+    warmup: int = 1,
+    isolate: bool = True,
+) -> Dict[str, Any]:
+    scenarios: Dict[str, Any] = {}
+    for n_tickers in tickers:
+        for n_users in users:
+            if isolate:
+                ctx = multiprocessing.get_context("spawn")
+                try:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                        result = pool.submit(run_scenario, n_tickers, n_users, repeats, skip_synthesis, warmup).result()
+                except BrokenProcessPool:
+                    # Usually the OOM killer; keep the remaining scenarios running.
+                    result = {"tickers": n_tickers, "users": n_users, "error": "scenario process died (out of memory?)"}
+            else:
+                result = run_scenario(n_tickers, n_users, repeats, skip_synthesis, warmup)
+            scenarios[_scenario_key(result)] = result
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "skip_synthesis": skip_synthesis,
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay the compiled graph on synthetic universes")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1, help="unreported runs per scenario")
+    parser.add_argument("--skip-synthesis", action="store_true")
+    parser.add_argument("--in-process", action="store_true", help="run scenarios in this process (shared peak RSS)")
+    parser.add_argument("--out", type=Path, help="write results as a JSON baseline")
+    parser.add_argument("--baseline", type=Path, help="compare against a previous --out file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative p95 growth")
+    parser.add_argument("--floor-ms", type=float, default=5.0, help="ignore p95 growth below this many ms")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    results = run(
+        args.tickers, args.users, args.repeats, args.skip_synthesis, warmup=args.warmup, isolate=not args.in_process
+    )
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2) + "\n")
+
+    regressions: List[Dict[str, Any]] = []
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(results, baseline, args.tolerance, args.floor_ms)
+        results["comparison"] = {"baseline_commit": baseline.get("commit"), "regressions": regressions}
+
+    print(json.dumps(results, indent=2))
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+bench_rag_ingest.py
+-------------------
+RAG corpus ingestion against the in-memory FakeVectorIndex with simulated
+embedding and upsert latency (no API calls), on a temp SQLite checkpoint.
+
+  legacy     the old upload_to_pinecone flow: one embedding request per
+             article, then sequential upserts of 50
+  pipeline   app.rag_ingestion: chunked embedding, concurrent upserts
+  rerun      the pipeline again over the same articles plus --new-articles
+             fresh ones (checkpoint hit path)
+
+Usage:
+    python -m benchmarks.bench_rag_ingest --articles 2000 --embed-latency-ms 40 --upsert-latency-ms 60
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app import event_store
+from app.mcp_tools.mock_tools import FakeVectorIndex, fake_embed
+from app.rag_ingestion import IngestionPipeline, build_records
+
+
+def _articles(n: int, start: int = 0) -> List[Dict[str, Any]]:
+    tickers = ["AAPL", "AMZN", "GOOGL", "JPM", "MA", "META", "MSFT", "NVDA", "TSLA", "V"]
+    return [
+        {
+            "ticker": tickers[i % len(tickers)],
+            "title": f"Article {i} headline",
+            "description": f"Summary of article {i}. " * 8,
+            "date": "2026-03-01",
+        }
+        for i in range(start, start + n)
+    ]
+
+
+class _SlowEmbed:
+    def __init__(self, latency_s: float) -> None:
+        self.latency_s = latency_s
+        self.calls = 0
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        time.sleep(self.latency_s)
+        return fake_embed(texts)
+
+
+def bench_legacy(articles: List[Dict[str, Any]], embed_s: float, upsert_s: float) -> Dict[str, Any]:
+    index, embed = FakeVectorIndex(latency_s=upsert_s), _SlowEmbed(embed_s)
+    started = time.perf_counter()
+    vectors = [
+        {"id": r.vector_id, "values": embed([r.text])[0], "metadata": r.metadata} for r in build_records(articles)
+    ]
+    for i in range(0, len(vectors), 50):
+        index.upsert(vectors[i : i + 50])
+    elapsed = time.perf_counter() - started
+    return {"elapsed_s": round(elapsed, 3), "embed_calls": embed.calls, "upserts": index.counters["upserts"]}
+
+
+def bench_pipeline(args: argparse.Namespace, embed_s: float, upsert_s: float) -> Dict[str, Any]:
+    index, embed = FakeVectorIndex(latency_s=upsert_s), _SlowEmbed(embed_s)
+    options = {
+        "chunk_size": args.chunk_size,
+        "upsert_batch_size": args.upsert_batch_size,
+        "parallelism": args.parallelism,
+    }
+    first = IngestionPipeline(index, embed, **options).run(_articles(args.articles))
+    rerun = IngestionPipeline(index, embed, **options).run(_articles(args.articles + args.new_articles))
+    keep = ("elapsed_s", "embedded", "embed_calls", "upserted", "upsert_requests", "skipped_checkpoint")
+    return {
+        "pipeline": {**{k: first.as_dict()[k] for k in keep}, "peak_upsert_concurrency": index.peak_concurrency},
+        "rerun": {k: rerun.as_dict()[k] for k in keep},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--new-articles", type=int, default=50)
+    parser.add_argument("--embed-latency-ms", type=float, default=40.0, help="per embedding request")
+    parser.add_argument("--upsert-latency-ms", type=float, default=60.0, help="per upsert request")
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--upsert-batch-size", type=int, default=100)
+    parser.add_argument("--parallelism", type=int, default=4)
+    args = parser.parse_args()
+
+    embed_s, upsert_s = args.embed_latency_ms / 1000.0, args.upsert_latency_ms / 1000.0
+    with tempfile.TemporaryDirectory() as tmp:
+        event_store.DB_PATH = Path(tmp) / "bench.db"
+        event_store.init_db()
+        legacy = bench_legacy(_articles(args.articles), embed_s, upsert_s)
+        results = {"articles": args.articles, "legacy": legacy, **bench_pipeline(args, embed_s, upsert_s)}
+        event_store.close_connections()
+    results["speedup"] = round(legacy["elapsed_s"] / max(results["pipeline"]["elapsed_s"], 1e-9), 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
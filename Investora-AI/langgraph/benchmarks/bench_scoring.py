@@ -0,0 +1,80 @@
+"""
+bench_scoring.py
+----------------
+Compare the per-ticker scalar scoring loop with the vectorised
+compute_all_scores on synthetic universes, and check both give identical
+output.
+
+Usage:
+    python -m benchmarks.bench_scoring --sizes 50 500 5000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.scoring import _compute_all_scores_scalar, compute_all_scores
+
+
+def _make_universe(n: int, seed: int = 7) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(seed)
+    data: Dict[str, Dict[str, Any]] = {}
+    for i in range(n):
+        prices = [{"date": f"2026-03-{10 - d:02d}", "close": rng.uniform(5, 500)} for d in range(7)]
+        metrics = {
+            "roe": rng.uniform(-0.5, 0.6),
+            "operating_margin": rng.uniform(-0.2, 0.5),
+            "debt_to_equity": rng.uniform(0, 4),
+            "revenue_growth": rng.uniform(-0.3, 0.8) if rng.random() < 0.9 else None,
+            "eps_growth": rng.uniform(-0.5, 1.0),
+        }
+        data[f"T{i:05d}"] = {"market": {"prices": prices}, "fundamentals": {"metrics": metrics}, "news": {}}
+    return data
+
+
+def _best_ms(fn, data, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn(data)
+        best = min(best, (time.perf_counter() - started) * 1000.0)
+    return best
+
+
+def run(sizes: List[int], repeats: int) -> List[Dict[str, Any]]:
+    rows = []
+    for n in sizes:
+        data = _make_universe(n)
+        if compute_all_scores(data) != _compute_all_scores_scalar(data):
+            raise SystemExit(f"vectorised scores differ from scalar reference at n={n}")
+        scalar = _best_ms(_compute_all_scores_scalar, data, repeats)
+        vector = _best_ms(compute_all_scores, data, repeats)
+        rows.append(
+            {
+                "tickers": n,
+                "scalar_best_ms": round(scalar, 3),
+                "vectorized_best_ms": round(vector, 3),
+                "speedup": round(scalar / vector, 2) if vector else None,
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark scalar vs vectorised scoring")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
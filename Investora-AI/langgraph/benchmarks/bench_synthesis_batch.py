@@ -0,0 +1,149 @@
+"""
+bench_synthesis_batch.py
+------------------------
+Compare one-request-per-ticker synthesis with batched synthesis
+(SYNTHESIS_BATCH_SIZE > 1) on evidence built from the mock tools.
+
+The OpenAI client is replaced by a simulated endpoint whose latency is a
+fixed per-request overhead plus a per-output-token cost, and whose token
+usage is estimated from the request/response text. The synthesis cache
+points at a fresh temp directory for every mode, so every ticker is a miss.
+
+Usage:
+    python -m benchmarks.bench_synthesis_batch --tickers 40 --batch-sizes 1 5 10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+# The simulated endpoint has no rate limit; keep the local token bucket out of the timings.
+os.environ.setdefault("RATE_LIMIT_OPENAI_PER_S", "0")
+
+from app.mcp_tools import mock_tools
+from app.mcp_tools.cache import reset_tool_caches
+from app.nodes import evidence
+from app.scoring import compute_all_scores
+from app.settings import get_settings
+
+_OUTPUT_TOKENS_PER_TICKER = 180
+
+
+class _SimulatedResponses:
+    def __init__(self, request_ms: float, token_ms: float) -> None:
+        self.request_ms = request_ms
+        self.token_ms = token_ms
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs: Any) -> Any:
+        body = json.loads(kwargs["input"][1]["content"])
+        bundles = body["tickers"] if "text" in kwargs else [body]
+        results = [
+            {
+                "ticker": b["ticker"],
+                "quality_narrative": f"{b['ticker']} shows stable profitability.",
+                "momentum_narrative": "Price action is in line with the sector.",
+                "news_catalyst": {"present": False, "headline": None, "impact": "neutral", "strength": "low"},
+                "risk_factors": ["Macro rate sensitivity"],
+            }
+            for b in bundles
+        ]
+        output_tokens = _OUTPUT_TOKENS_PER_TICKER * len(results)
+        input_tokens = sum(evidence.estimate_tokens(m["content"]) for m in kwargs["input"])
+        time.sleep((self.request_ms + self.token_ms * output_tokens) / 1000.0)
+        with self._lock:
+            self.requests += 1
+        text = json.dumps({"results": results} if "text" in kwargs else results[0])
+        return SimpleNamespace(
+            output_text=text, usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens)
+        )
+
+
+def _make_state(n: int) -> Dict[str, Any]:
+    tickers = sorted(mock_tools._UNIVERSE_INDEX)[:n]
+    market, fundamentals, news = mock_tools.MockMarketDataTool(), mock_tools.MockFundamentalsTool(), mock_tools.MockNewsTool()
+    per_ticker_data = {
+        t: {
+            "market": market.run({"ticker": t}),
+            "fundamentals": fundamentals.run({"ticker": t}),
+            "news": news.run({"ticker": t}),
+        }
+        for t in tickers
+    }
+    scores, _ = compute_all_scores(per_ticker_data)
+    return {
+        "run_id": "bench",
+        "skip_synthesis": False,
+        "scores": scores,
+        "per_ticker_data": per_ticker_data,
+        "per_ticker_rag_context": {},
+        "user_profiles": [],
+        "errors": [],
+    }
+
+
+def run(n_tickers: int, batch_sizes: List[int], request_ms: float, token_ms: float) -> Dict[str, Any]:
+    settings = get_settings()
+    settings.providers.openai_api_key = settings.providers.openai_api_key or "bench-key"
+    settings.pipeline.evidence_top_n = n_tickers
+    results: Dict[str, Any] = {
+        "tickers": n_tickers,
+        "parallelism": settings.concurrency.synthesis_parallelism,
+        "simulated_request_ms": request_ms,
+        "simulated_ms_per_output_token": token_ms,
+        "modes": {},
+    }
+    for batch_size in batch_sizes:
+        settings.pipeline.synthesis_batch_size = batch_size
+        responses = _SimulatedResponses(request_ms, token_ms)
+        evidence.get_openai_client = lambda _key, r=responses: SimpleNamespace(responses=r)
+        with tempfile.TemporaryDirectory() as tmp:
+            evidence.SYNTHESIS_CACHE_DIR = tmp
+            state = _make_state(n_tickers)
+            started = time.perf_counter()
+            out = evidence.synthesize_evidence_node(state)
+            wall_ms = (time.perf_counter() - started) * 1000.0
+            reset_tool_caches()
+        stats = out["synthesis_stats"]
+        results["modes"][f"batch_{batch_size}"] = {
+            "wall_ms": round(wall_ms, 1),
+            "requests": responses.requests,
+            "input_tokens": stats["input_tokens"],
+            "output_tokens": stats["output_tokens"],
+            "individual_retries": stats["individual_retries"],
+            "synthesized": len(out["per_ticker_synthesis"]),
+        }
+    base = results["modes"].get("batch_1")
+    if base:
+        for mode in results["modes"].values():
+            mode["speedup_vs_single"] = round(base["wall_ms"] / mode["wall_ms"], 2) if mode["wall_ms"] else None
+            mode["input_token_ratio_vs_single"] = (
+                round(mode["input_tokens"] / base["input_tokens"], 3) if base["input_tokens"] else None
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-ticker vs batched LLM synthesis")
+    parser.add_argument("--tickers", type=int, default=40)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--request-ms", type=float, default=400.0, help="simulated per-request overhead")
+    parser.add_argument("--token-ms", type=float, default=0.5, help="simulated cost per output token")
+    args = parser.parse_args()
+    print(json.dumps(run(args.tickers, args.batch_sizes, args.request_ms, args.token_ms), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+bench_webhooks.py
+-----------------
+Fan-out delivery of per-user webhooks against a local stub receiver that
+answers after a fixed latency.
+
+  serial     one bare requests.post per message (new connection each time),
+             the delivery nodes' previous behaviour
+  dispatch   webhook_delivery.dispatch: pooled keep-alive session on
+             WEBHOOK_PARALLELISM workers
+
+Usage:
+    python -m benchmarks.bench_webhooks --messages 200 --latency-ms 50 --parallelism 8
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import requests
+
+from app import webhook_delivery
+from app.settings import get_settings
+from app.webhook_delivery import WebhookMessage, dispatch
+
+
+def _serve(latency_s: float) -> ThreadingHTTPServer:
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        connections = set()
+
+        def do_POST(self):  # noqa: N802
+            self.rfile.read(int(self.headers["Content-Length"]))
+            _Handler.connections.add(self.client_address)
+            time.sleep(latency_s)
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.handler_class = _Handler  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(n_messages: int, latency_ms: float, parallelism: int) -> Dict[str, Any]:
+    server = _serve(latency_ms / 1000.0)
+    handler = server.handler_class  # type: ignore[attr-defined]
+    url = f"http://127.0.0.1:{server.server_port}/alerts"
+    payloads = [{"user_id": f"u{i}", "alerts": [{"ticker": "AAPL", "severity": "high"}] * 5} for i in range(n_messages)]
+    results: Dict[str, Any] = {"messages": n_messages, "latency_ms": latency_ms, "parallelism": parallelism}
+
+    started = time.perf_counter()
+    for payload in payloads:
+        requests.post(url, json=payload, timeout=15)
+    results["serial"] = {"wall_ms": round((time.perf_counter() - started) * 1000.0, 1), "connections": len(handler.connections)}
+
+    handler.connections.clear()
+    get_settings().webhooks.parallelism = parallelism
+    webhook_delivery.reset_http_session()
+    started = time.perf_counter()
+    out = dispatch([WebhookMessage("alerts", url, p, key=p["user_id"]) for p in payloads], outbox=False)
+    results["dispatch"] = {
+        "wall_ms": round((time.perf_counter() - started) * 1000.0, 1),
+        "connections": len(handler.connections),
+        "sent": out.sent,
+    }
+    results["speedup"] = round(results["serial"]["wall_ms"] / results["dispatch"]["wall_ms"], 1)
+    server.shutdown()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark serial vs pooled concurrent webhook delivery")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--parallelism", type=int, default=8)
+    args = parser.parse_args()
+    print(json.dumps(run(args.messages, args.latency_ms, args.parallelism), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+bench_weekly_digest.py
+----------------------
+Compare the legacy weekly digest path (load_recent_runs + load_run for every
+run, repeated per user) with a shared WeeklyEventIndex built once and fanned
+out over a thread pool, and check both produce the same digests.
+
+The legacy path is timed on a sample of users and extrapolated, since running
+it for every user at 10k scale takes minutes.
+
+Usage:
+    python -m benchmarks.bench_weekly_digest --users 10000 --runs 7
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+if __package__ in (None, ""):
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app import event_store
+from app.models import AnalysisSnapshot, SignalEvent
+from app.weekly_digest import WeeklyEventIndex, build_weekly_user_digest
+
+_RUN_DATE = date(2026, 3, 8)
+
+
+def _make_snapshot(day: int, n_tickers: int, rng: random.Random) -> AnalysisSnapshot:
+    run_date = (_RUN_DATE - timedelta(days=day)).isoformat()
+    run_id = f"run-{run_date}"
+    events: List[SignalEvent] = []
+    for i in range(n_tickers):
+        for signal_type in ("quality", "momentum"):
+            events.append(
+                SignalEvent(
+                    id=f"{run_id}-{i:05d}-{signal_type}",
+                    run_id=run_id,
+                    run_date=run_date,
+                    timestamp=f"{run_date}T00:00:00+00:00",
+                    ticker=f"T{i:04d}",
+                    signal_type=signal_type,
+                    direction="up",
+                    severity=rng.choice(["low", "medium", "high", "critical"]),
+                    confidence=0.6,
+                    score=round(rng.uniform(0, 10), 2),
+                    narrative=None,
+                    route="ALERT_EVENT" if rng.random() < 0.01 else "UI_UPDATE",
+                )
+            )
+    return AnalysisSnapshot(
+        run_id=run_id,
+        run_date=run_date,
+        timestamp=f"{run_date}T00:00:00+00:00",
+        scope="full",
+        tickers=[],
+        scores={},
+        signal_events=events,
+        failed_tickers=[],
+        error_count=0,
+    )
+
+
+def _make_users(n_users: int, n_tickers: int, rng: random.Random) -> List[Dict[str, Any]]:
+    return [
+        {
+            "user_id": f"user-{i:05d}",
+            "email": f"user{i}@example.com",
+            "watchlist": [f"T{rng.randrange(n_tickers):04d}" for _ in range(rng.randint(1, 12))],
+        }
+        for i in range(n_users)
+    ]
+
+
+# ── Legacy path (pre-index behaviour, reproduced for comparison) ─────────────
+
+def _legacy_relevant_events(profile: Dict[str, Any], week_start: str, week_end: str) -> List[Dict[str, Any]]:
+    watchlist = {str(t).upper() for t in profile.get("watchlist", [])}
+    weekly_events: List[Dict[str, Any]] = []
+    for meta in event_store.load_recent_runs(limit=60):
+        d = str(meta.get("run_date", ""))
+        if not d or d < week_start or d > week_end:
+            continue
+        snap = event_store.load_run(str(meta.get("run_id", "")))
+        if snap:
+            weekly_events.extend(snap.get("signal_events", []))
+    return [
+        ev
+        for ev in weekly_events
+        if str(ev.get("ticker", "")).upper() in watchlist or str(ev.get("route", "")) == "ALERT_EVENT"
+    ]
+
+
+def run(n_users: int, n_runs: int, n_tickers: int, legacy_sample: int, workers: int) -> Dict[str, Any]:
+    rng = random.Random(7)
+    users = _make_users(n_users, n_tickers, rng)
+    bundle = {"run_id": "bench", "run_date": _RUN_DATE.isoformat()}
+    week_start = (_RUN_DATE - timedelta(days=6)).isoformat()
+    week_end = _RUN_DATE.isoformat()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original = event_store.DB_PATH
+        try:
+            event_store.DB_PATH = Path(tmp) / "digest_bench.db"
+            event_store.init_db()
+            for day in range(n_runs):
+                event_store.persist_run(_make_snapshot(day, n_tickers, rng))
+
+            sample = users[:legacy_sample]
+            started = time.perf_counter()
+            legacy = [_legacy_relevant_events(u, week_start, week_end) for u in sample]
+            legacy_ms = (time.perf_counter() - started) * 1000.0
+
+            started = time.perf_counter()
+            index = WeeklyEventIndex.load(week_start, week_end)
+            load_ms = (time.perf_counter() - started) * 1000.0
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                digests = list(pool.map(lambda u: build_weekly_user_digest(u, bundle, index=index), users))
+            indexed_ms = (time.perf_counter() - started) * 1000.0
+        finally:
+            event_store.close_connections()
+            event_store.DB_PATH = original
+
+    for profile, events, digest in zip(sample, legacy, digests):
+        expected = index.relevant_events({str(t).upper() for t in profile["watchlist"]})
+        if events != expected or digest["weekly_stats"]["total_signals"] != len(events):
+            raise SystemExit(f"indexed digest differs from legacy path for {profile['user_id']}")
+
+    legacy_per_user = legacy_ms / max(1, len(sample))
+    return {
+        "users": n_users,
+        "runs": n_runs,
+        "events_per_run": n_tickers * 2,
+        "legacy_sampled_users": len(sample),
+        "legacy_ms_per_user": round(legacy_per_user, 3),
+        "legacy_projected_ms": round(legacy_per_user * n_users, 1),
+        "index_load_ms": round(load_ms, 2),
+        "indexed_total_ms": round(indexed_ms, 2),
+        "speedup": round(legacy_per_user * n_users / indexed_ms, 1) if indexed_ms else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark weekly digest fan-out")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--tickers", type=int, default=500, help="Tickers per run (two signal events each)")
+    parser.add_argument("--legacy-sample", type=int, default=50, help="Users timed on the legacy path")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    print(json.dumps(run(args.users, args.runs, args.tickers, args.legacy_sample, args.workers), indent=2))
+
+
+if __name__ == "__main__":
+    main()
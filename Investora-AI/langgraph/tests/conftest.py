@@ -3,6 +3,20 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture()
+def temp_db(monkeypatch, tmp_path):
+    """A fresh SQLite event store for the test (event_store.DB_PATH points at it)."""
+    from app import event_store
+
+    db_path = tmp_path / "investora_test.db"
+    monkeypatch.setattr(event_store, "DB_PATH", db_path)
+    event_store.init_db()
+    yield db_path
+    event_store.close_connections()
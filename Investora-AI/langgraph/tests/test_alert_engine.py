@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import random
+
+from app import event_store
+from app.alert_checker import check_user_alerts, evaluate_price_alert
+from app.alert_engine import AlertIndex
+
+_CONDITIONS = ["price_above", "above", "price_below", "below", "daily_move", "change_pct_up", "change_pct_down"]
+
+
+def test_alert_index_matches_linear_evaluation():
+    rng = random.Random(7)
+    tickers = ["AAPL", "MSFT", "NVDA", "TSLA"]
+    alerts = [
+        {
+            "id": f"a{i}",
+            "user_id": f"u{i % 5}",
+            "ticker": rng.choice(tickers),
+            "condition": rng.choice(_CONDITIONS),
+            # Integer thresholds so some quotes land exactly on a boundary.
+            "value": float(rng.randint(90, 110)) if i % 3 else float(rng.randint(0, 5)),
+        }
+        for i in range(500)
+    ]
+    quotes = {t: {"price": float(rng.randint(90, 110)), "change_pct": float(rng.randint(-5, 5))} for t in tickers}
+
+    expected = [
+        a["id"]
+        for a in alerts
+        if evaluate_price_alert(a, quotes[a["ticker"]]["price"], quotes[a["ticker"]]["change_pct"])
+    ]
+    got = [t["alert_id"] for t in AlertIndex(alerts).evaluate_quotes(quotes)]
+    assert got == expected
+
+
+def test_alert_index_skips_unknown_conditions_and_missing_quotes():
+    alerts = [
+        {"id": "1", "user_id": "u", "ticker": "AAPL", "condition": "price_above", "value": 100.0},
+        {"id": "2", "user_id": "u", "ticker": "AAPL", "condition": "volume_spike", "value": 1.0},
+        {"id": "3", "user_id": "u", "ticker": "MSFT", "condition": "price_below", "value": 500.0},
+    ]
+    index = AlertIndex(alerts)
+    assert len(index) == 2
+    triggered = index.evaluate_quotes({"AAPL": {"price": 120.0, "change_pct": None}, "MSFT": {"error": "timeout"}})
+    assert [t["alert_id"] for t in triggered] == ["1"]
+    assert triggered[0]["daily_change_pct"] == 0.0
+
+
+def test_check_user_alerts_marks_triggered_in_bulk(temp_db, monkeypatch):
+    above = event_store.create_alert("u1", "AAPL", "price_above", 150.0)
+    below = event_store.create_alert("u2", "MSFT", "price_below", 300.0)
+    quiet = event_store.create_alert("u3", "AAPL", "price_above", 500.0)
+
+    class _FakeYFinance:
+        def get_quotes(self, tickers):
+            assert sorted(tickers) == ["AAPL", "MSFT"]
+            return {"AAPL": {"price": 180.0, "change_pct": 1.2}, "MSFT": {"price": 280.0, "change_pct": -0.4}}
+
+    monkeypatch.setattr("app.mcp_tools.yfinance_tool.YFinanceTool", _FakeYFinance)
+
+    triggered = check_user_alerts()
+
+    assert sorted(t["alert_id"] for t in triggered) == sorted([above["id"], below["id"]])
+    assert [a["id"] for a in event_store.get_active_alerts()] == [quiet["id"]]
+    assert event_store.mark_alerts_triggered([]) == []
+    assert event_store.mark_alerts_triggered([above["id"]]) == []
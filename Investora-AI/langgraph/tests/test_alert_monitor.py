@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from app import alert_monitor, event_store, webhook_delivery
+from app.alert_monitor import AlertMonitor
+from app.mcp_tools.mock_tools import MockQuoteTool
+from app.settings import get_settings
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Recorder:
+    def __init__(self, fail: int = 0) -> None:
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, triggered_alerts, run_id, run_date):
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("webhook down")
+        self.batches.append([a["alert_id"] for a in triggered_alerts])
+
+
+def _monitor(quotes, deliver, clock, **kwargs):
+    return AlertMonitor(quote_source=quotes, deliver=deliver, poll_interval_s=1.0, clock=clock, **kwargs)
+
+
+def test_monitor_polls_only_alerted_tickers_and_delivers_in_batches(temp_db):
+    quotes, deliver, clock = MockQuoteTool(), _Recorder(), _Clock()
+    ids = [event_store.create_alert(f"u{i}", "AAPL", "price_above", 190.0)["id"] for i in range(5)]
+    event_store.create_alert("u9", "MSFT", "price_below", 100.0)
+    monitor = _monitor(quotes, deliver, clock, batch_size=2)
+
+    assert monitor.poll_once()["claimed"] == 0  # AAPL mock close is 185
+
+    quotes.set_quote("AAPL", 195.0, 5.4)
+    clock.now += 1
+    summary = monitor.poll_once()
+    assert summary["claimed"] == 5 and summary["delivered"] == 5
+    assert [len(b) for b in deliver.batches] == [2, 2, 1]
+    assert sorted(aid for b in deliver.batches for aid in b) == sorted(ids)
+
+    # Same quote again: nothing re-evaluated, nothing re-delivered.
+    clock.now += 1
+    assert monitor.poll_once() == {"tickers": 2, "evaluated": 0, "claimed": 0, "delivered": 0}
+    assert monitor.stats()["counters"]["tickers_unchanged"] == 3  # MSFT on poll 2, both on poll 3
+
+
+def test_monitor_debounces_until_condition_holds(temp_db):
+    quotes, deliver, clock = MockQuoteTool(), _Recorder(), _Clock()
+    alert = event_store.create_alert("u1", "AAPL", "price_above", 190.0)
+    monitor = _monitor(quotes, deliver, clock, debounce_s=30.0)
+
+    quotes.set_quote("AAPL", 191.0)
+    monitor.poll_once()
+    clock.now += 20
+    quotes.set_quote("AAPL", 189.0)  # dips back under: debounce restarts
+    monitor.poll_once()
+    clock.now += 20
+    quotes.set_quote("AAPL", 192.0)
+    assert monitor.poll_once()["claimed"] == 0
+    clock.now += 29
+    assert monitor.poll_once()["claimed"] == 0
+    clock.now += 1
+    assert monitor.poll_once()["claimed"] == 1
+    assert deliver.batches == [[alert["id"]]]
+
+
+def test_monitor_skips_alerts_claimed_elsewhere_and_retries_delivery(temp_db):
+    quotes, deliver, clock = MockQuoteTool(), _Recorder(fail=1), _Clock()
+    taken = event_store.create_alert("u1", "AAPL", "price_above", 190.0)
+    mine = event_store.create_alert("u2", "AAPL", "price_above", 195.0)
+    monitor = _monitor(quotes, deliver, clock)
+    monitor.poll_once()  # load the index before the graph run claims one
+
+    assert event_store.mark_alerts_triggered([taken["id"]]) == [taken["id"]]
+    clock.now += 1
+    quotes.set_quote("AAPL", 200.0)
+    summary = monitor.poll_once()
+    assert summary["claimed"] == 1 and summary["delivered"] == 0
+    # The failed batch is handed to the durable webhook outbox, not kept in memory.
+    assert monitor.stats()["outbox"] == 0
+    assert monitor.stats()["counters"]["queued_for_retry"] == 1
+    (row,) = event_store.claim_due_webhooks("9999", lease_until_iso="9999")
+    assert row["kind"] == "user_alerts"
+    assert [a["alert_id"] for a in row["payload"]["alerts"]] == [mine["id"]]
+
+
+def test_monitor_holds_batches_in_memory_without_an_outbox(temp_db, monkeypatch):
+    monkeypatch.setattr(get_settings().webhooks, "outbox_enabled", False)
+    monkeypatch.setattr(alert_monitor, "_MAX_OUTBOX", 2)
+    quotes, deliver, clock = MockQuoteTool(), _Recorder(fail=1), _Clock()
+    ids = [event_store.create_alert(f"u{i}", "AAPL", "price_above", 190.0)["id"] for i in range(3)]
+    monitor = _monitor(quotes, deliver, clock)
+
+    quotes.set_quote("AAPL", 200.0)
+    summary = monitor.poll_once()
+    assert summary["claimed"] == 3 and summary["delivered"] == 0
+    stats = monitor.stats()
+    assert stats["outbox"] == 2 and stats["counters"]["dropped"] == 1
+
+    clock.now += 1
+    assert monitor.poll_once()["delivered"] == 2
+    assert deliver.batches == [ids[1:]]
+
+
+def test_monitor_reloads_alerts_after_invalidate(temp_db):
+    quotes, deliver, clock = MockQuoteTool(), _Recorder(), _Clock()
+    monitor = _monitor(quotes, deliver, clock)
+    assert monitor.poll_once()["tickers"] == 0
+
+    alert = event_store.create_alert("u1", "NVDA", "daily_move", 1.0)
+    monitor.invalidate()
+    clock.now += 1
+    assert monitor.poll_once()["claimed"] == 1  # NVDA mock close moved about 2%
+    assert deliver.batches == [[alert["id"]]]
+
+
+def test_batches_queued_by_dispatch_are_not_counted_as_delivered(temp_db, monkeypatch):
+    def _queue_everything(messages):
+        return webhook_delivery.DispatchResult(queued=len(messages), failures=[(m, "webhook down") for m in messages])
+
+    monkeypatch.setattr(webhook_delivery, "dispatch", _queue_everything)
+    quotes, clock = MockQuoteTool(), _Clock()
+    event_store.create_alert("u1", "AAPL", "price_above", 190.0)
+    monitor = _monitor(quotes, alert_monitor._dispatch_user_alerts, clock)
+
+    quotes.set_quote("AAPL", 200.0)
+    summary = monitor.poll_once()
+    assert summary["claimed"] == 1 and summary["delivered"] == 0
+    counters = monitor.stats()["counters"]
+    assert counters["delivered"] == 0
+    assert counters["queued_for_retry"] == 1
+    assert monitor.stats()["outbox"] == 0
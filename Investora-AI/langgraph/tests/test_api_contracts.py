@@ -24,7 +24,7 @@ class _FakeGraph:
 
 
 def test_run_analysis_stream_contract(monkeypatch):
-    monkeypatch.setattr(api_module.run_limiter, "acquire", lambda timeout_s=90.0: "acquired")
+    monkeypatch.setattr(api_module.run_limiter, "acquire", lambda timeout_s=90.0, cancel=None: "acquired")
     monkeypatch.setattr(api_module.run_limiter, "release", lambda: None)
 
     import app.graph as graph_module
@@ -45,11 +45,7 @@ def test_run_analysis_stream_contract(monkeypatch):
     assert any('"type": "done"' in line for line in lines)
 
 
-def test_dashboard_contract(monkeypatch, tmp_path):
-    db_path = tmp_path / "investora_test.db"
-    monkeypatch.setattr(event_store, "DB_PATH", db_path)
-    event_store.init_db()
-
+def test_dashboard_contract(temp_db):
     expected_bundle = _load_json("bundle_fixture.json")
     event_store.save_bundle(expected_bundle)
 
@@ -64,11 +60,7 @@ def test_dashboard_contract(monkeypatch, tmp_path):
     assert isinstance(payload["discovery_signals"], list)
 
 
-def test_personalized_signals_contract(monkeypatch, tmp_path):
-    db_path = tmp_path / "investora_test.db"
-    monkeypatch.setattr(event_store, "DB_PATH", db_path)
-    event_store.init_db()
-
+def test_personalized_signals_contract(temp_db):
     bundle = _load_json("bundle_fixture.json")
     event_store.save_bundle(bundle)
 
@@ -40,9 +40,13 @@ def test_debug_metrics_contract():
 
     assert response.status_code == 200
     payload = response.json()
-    assert set(payload.keys()) == {"node_timings", "provider_counters"}
+    assert set(payload.keys()) == {"node_timings", "provider_counters", "providers", "errors", "cache", "rate_limits"}
     assert isinstance(payload["node_timings"], dict)
     assert isinstance(payload["provider_counters"], dict)
+    assert isinstance(payload["providers"], dict)
+    assert isinstance(payload["errors"], dict)
+    assert isinstance(payload["cache"], dict)
+    assert isinstance(payload["rate_limits"], dict)
 
 
 def test_ai_view_contract(monkeypatch):
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import api as api_module
+from app import auth, event_store
+from app.settings import get_settings
+
+
+@pytest.fixture()
+def fast_kdf(monkeypatch):
+    monkeypatch.setattr(get_settings().auth, "pbkdf2_iterations", 1_000)
+    monkeypatch.setattr(auth.kdf_pool, "workers", 0)
+    auth.token_cache.clear()
+
+
+def test_token_cache_serves_verified_claims_until_expiry(fast_kdf):
+    token = auth.issue_token("u1", "alice@example.com", "secret-a")
+    before = auth.token_cache.stats()
+
+    assert auth.decode_token(token, "secret-a") == {"user_id": "u1", "username": "alice@example.com"}
+    assert auth.decode_token(token, "secret-a") == {"user_id": "u1", "username": "alice@example.com"}
+    assert auth.token_cache.stats()["hits"] == before["hits"] + 1
+
+    # A tampered signature, another secret or an expired token never hit the cache.
+    assert auth.decode_token(token[:-2] + "xx", "secret-a") is None
+    assert auth.decode_token(token, "secret-b") is None
+    expired = auth.issue_token("u1", "alice@example.com", "secret-a", expires_in_seconds=-5)
+    assert auth.decode_token(expired, "secret-a") is None
+
+    cache = auth.TokenCache(max_entries=2)
+    cache.get("t", "s", 0)
+    cache.put("t", "s", {"user_id": "u1", "username": "a"}, exp=100)
+    assert cache.get("t", "s", 100) is not None
+    assert cache.get("t", "s", 101) is None
+
+
+def test_kdf_pool_rejects_work_beyond_max_pending(fast_kdf):
+    slow_hash = auth.hash_password("correct horse", iterations=400_000)
+    pool = auth.KdfPool(workers=0, max_pending=1)
+
+    async def _storm():
+        first = asyncio.ensure_future(pool.verify("correct horse", slow_hash))
+        await asyncio.sleep(0)
+        with pytest.raises(auth.KdfBusy):
+            await pool.verify("correct horse", slow_hash)
+        return await first
+
+    assert asyncio.run(_storm()) is True
+    stats = pool.stats()
+    assert stats["counters"]["rejected"] == 1
+    assert stats["counters"]["verifies"] == 1
+    assert stats["pending"] == 0
+
+
+def test_process_pool_hashes_off_the_event_loop(fast_kdf):
+    pool = auth.KdfPool(workers=1, max_pending=4)
+    try:
+        encoded = asyncio.run(pool.hash("correct horse"))
+        assert encoded.startswith("pbkdf2_sha256$1000$")
+        assert asyncio.run(pool.verify("correct horse", encoded)) is True
+        assert asyncio.run(pool.verify("wrong", encoded)) is False
+    finally:
+        pool.shutdown()
+
+
+def test_login_flow_and_rehash_on_iteration_change(fast_kdf, temp_db, monkeypatch):
+    client = TestClient(api_module.app)
+    registered = client.post("/auth/register", json={"username": "Bob@Example.com", "password": "hunter2hunter2"})
+    assert registered.json()["ok"] is True
+    user = event_store.load_user_by_username("bob@example.com")
+    assert user["password_hash"].startswith("pbkdf2_sha256$1000$")
+
+    monkeypatch.setattr(get_settings().auth, "pbkdf2_iterations", 2_000)
+    login = client.post("/auth/login", json={"username": "bob@example.com", "password": "hunter2hunter2"})
+    assert login.json()["ok"] is True
+    assert event_store.load_user_by_username("bob@example.com")["password_hash"].startswith("pbkdf2_sha256$2000$")
+
+    bad = client.post("/auth/login", json={"username": "bob@example.com", "password": "wrong-password"})
+    assert bad.json()["ok"] is False
+
+    headers = {"Authorization": f"Bearer {login.json()['token']}"}
+    for _ in range(3):
+        me = client.get("/auth/me", headers=headers)
+        assert me.status_code == 200 and me.json()["userId"] == registered.json()["userId"]
+    assert client.get("/auth/me", headers={"Authorization": "Bearer nope.nope"}).status_code == 401
+    assert client.get("/debug/auth").json()["token_cache"]["hits"] >= 2
+
+
+def test_login_succeeds_when_the_rehash_fails(fast_kdf, temp_db, monkeypatch):
+    client = TestClient(api_module.app)
+    client.post("/auth/register", json={"username": "carol@example.com", "password": "hunter2hunter2"})
+
+    def _locked(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(event_store, "update_user_password_hash", _locked)
+    monkeypatch.setattr(get_settings().auth, "pbkdf2_iterations", 2_000)
+    login = client.post("/auth/login", json={"username": "carol@example.com", "password": "hunter2hunter2"})
+    assert login.status_code == 200 and login.json()["ok"] is True
+    assert event_store.load_user_by_username("carol@example.com")["password_hash"].startswith("pbkdf2_sha256$1000$")
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import api as api_module
+from app import event_store
+from app.dashboard_cache import dashboard_cache
+
+
+def _bundle(run_id: str, ticker: str) -> dict:
+    return {
+        "user_id": "u1",
+        "run_id": run_id,
+        "run_date": "2026-03-02",
+        "watchlist_signals": [{"ticker": ticker, "fit_score": 7.5}],
+        "discovery_signals": [{"ticker": "NVDA", "fit_score": 6.1}],
+        "top_conviction": [],
+    }
+
+
+@pytest.fixture(autouse=True)
+def _clear_dashboard_cache():
+    dashboard_cache.clear()
+
+
+def test_dashboard_is_served_from_cache_with_etag(temp_db):
+    event_store.save_bundle(_bundle("run-1", "AAPL"))
+    client = TestClient(api_module.app)
+    before = dashboard_cache.stats()
+
+    first = client.get("/user/u1/dashboard")
+    second = client.get("/user/u1/dashboard")
+    assert first.status_code == second.status_code == 200
+    assert first.json()["run_id"] == "run-1"
+    assert first.headers["etag"] == second.headers["etag"]
+    stats = dashboard_cache.stats()
+    assert stats["misses"] - before["misses"] == 1
+    assert stats["hits"] - before["hits"] == 1
+
+    etag = first.headers["etag"]
+    not_modified = client.get("/user/u1/dashboard", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    signals = client.get("/user/u1/personalized-signals")
+    assert signals.json() == {
+        "watchlist_signals": [{"ticker": "AAPL", "fit_score": 7.5}],
+        "discovery_signals": [{"ticker": "NVDA", "fit_score": 6.1}],
+    }
+
+
+def test_save_bundle_invalidates_cached_dashboard(temp_db):
+    event_store.save_bundle(_bundle("run-1", "AAPL"))
+    client = TestClient(api_module.app)
+    etag = client.get("/user/u1/dashboard").headers["etag"]
+
+    event_store.save_bundle(_bundle("run-2", "MSFT"))
+    assert dashboard_cache.stats()["invalidations"] >= 1
+
+    response = client.get("/user/u1/dashboard", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["watchlist_signals"][0]["ticker"] == "MSFT"
+
+
+def test_init_db_adds_signals_column_to_existing_bundle_table(monkeypatch, tmp_path):
+    db_path = tmp_path / "legacy.db"
+    con = sqlite3.connect(db_path)
+    con.execute(
+        "CREATE TABLE user_report_bundles (user_id TEXT NOT NULL, run_id TEXT NOT NULL, run_date TEXT NOT NULL, "
+        "bundle_json TEXT NOT NULL, created_at TEXT NOT NULL, PRIMARY KEY (user_id, run_id))"
+    )
+    con.execute(
+        "INSERT INTO user_report_bundles VALUES (?, ?, ?, ?, ?)",
+        ("u1", "run-0", "2026-02-23", json.dumps(_bundle("run-0", "TSLA")), "2026-02-23T00:00:00+00:00"),
+    )
+    con.commit()
+    con.close()
+
+    monkeypatch.setattr(event_store, "DB_PATH", db_path)
+    try:
+        event_store.init_db()
+        record = event_store.load_latest_bundle_record("u1")
+        assert json.loads(record["signals_json"])["watchlist_signals"][0]["ticker"] == "TSLA"
+    finally:
+        event_store.close_connections()
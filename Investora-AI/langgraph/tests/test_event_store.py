@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import pytest
+
+from app import event_store
+from app.models import AnalysisSnapshot, SignalEvent
+
+
+def _snapshot(run_id: str, n_events: int) -> AnalysisSnapshot:
+    events = [
+        SignalEvent(
+            id=f"{run_id}-{i}",
+            run_id=run_id,
+            run_date="2026-03-02",
+            timestamp="2026-03-02T00:00:00+00:00",
+            ticker="AAPL" if i % 2 else "MSFT",
+            signal_type="quality",
+            direction="up",
+            severity="medium",
+            confidence=0.6,
+            score=6.0,
+            narrative=None,
+            route="UI_UPDATE",
+        )
+        for i in range(n_events)
+    ]
+    return AnalysisSnapshot(
+        run_id=run_id,
+        run_date="2026-03-02",
+        timestamp="2026-03-02T00:00:00+00:00",
+        scope="full",
+        tickers=["AAPL", "MSFT"],
+        scores={"AAPL": {"quality": 6.0, "momentum": 5.0, "overall": 5.6}},
+        signal_events=events,
+        failed_tickers=[],
+        error_count=0,
+    )
+
+
+def test_connections_are_reused_per_thread(temp_db):
+    with event_store._conn() as first:
+        pass
+    with event_store._conn() as second:
+        pass
+    assert first is second
+
+
+def test_persist_run_bulk_inserts_all_signal_events(temp_db):
+    event_store.persist_run(_snapshot("run-1", 250))
+
+    snap = event_store.load_run("run-1")
+    assert snap is not None
+    assert len(snap["signal_events"]) == 250
+    assert event_store.load_recent_runs(limit=1)[0]["signal_count"] == 250
+
+
+def test_transaction_rolls_back_every_write(temp_db):
+    with pytest.raises(RuntimeError):
+        with event_store.transaction():
+            event_store.persist_run(_snapshot("run-2", 3))
+            event_store.save_bundles([{"user_id": "u1", "run_id": "run-2", "run_date": "2026-03-02"}])
+            raise RuntimeError("boom")
+
+    assert event_store.load_run("run-2") is None
+    assert event_store.load_latest_bundle("u1") is None
+
+
+def test_save_bundles_upserts_many_users(temp_db):
+    bundles = [{"user_id": f"u{i}", "run_id": "run-3", "run_date": "2026-03-02"} for i in range(20)]
+    assert event_store.save_bundles(bundles) == 20
+    assert event_store.load_latest_bundle("u7")["user_id"] == "u7"
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+
+from app.graph import _timed_node, planner_router
+from app.graph_builder import compile_graph
+from app.graph_topology import critical_path, phase_dependencies, supersteps
+from app.node_registry import NODE_REGISTRY
+
+
+def test_independent_nodes_share_a_superstep():
+    steps = supersteps("full")
+    step_of = {node: i for i, nodes in enumerate(steps) for node in nodes}
+
+    assert step_of["compute_scores"] == step_of["check_user_alerts"]
+    assert step_of["detect_anomalies"] == step_of["reuse_prior_artifacts"]
+    assert step_of["emit_signals"] > max(step_of["detect_anomalies"], step_of["synthesize_evidence"])
+    assert step_of["post_alerts"] == step_of["assemble_report_json"]
+    assert steps[-2:] == [["persist_snapshot"], ["post_monitor_event"]]
+    assert set(phase_dependencies("core")["persist_snapshot"]) == {"check_user_alerts", "personalize_signals"}
+
+
+def test_critical_path_follows_the_slowest_node_of_each_step():
+    timings = {
+        "init_state": 1.0,
+        "plan_next_action": 2.0,
+        "execute_tool_action": 10.0,
+        "compute_scores": 5.0,
+        "check_user_alerts": 40.0,
+        "reuse_prior_artifacts": 1.0,
+        "detect_anomalies": 3.0,
+        "retrieve_rag_context": 20.0,
+        "synthesize_evidence": 100.0,
+        "emit_signals": 1.0,
+        "personalize_signals": 2.0,
+        "persist_snapshot": 4.0,
+    }
+    report = critical_path(timings, phase="core")
+
+    assert report["path"] == [
+        "init_state",
+        "plan_next_action",
+        "execute_tool_action",
+        "check_user_alerts",
+        "detect_anomalies",
+        "retrieve_rag_context",
+        "synthesize_evidence",
+        "emit_signals",
+        "personalize_signals",
+        "persist_snapshot",
+    ]
+    assert report["critical_ms"] == 183.0
+    assert report["parallel_savings_ms"] == 6.0
+    assert report["bottleneck"] == "synthesize_evidence"
+    assert report["slack_ms"] == {"compute_scores": 35.0, "reuse_prior_artifacts": 2.0}
+
+
+def test_parallel_branches_run_concurrently_and_merge_errors(monkeypatch):
+    barrier = threading.Barrier(3, timeout=5)
+
+    def _branch(tool):
+        def _node(state):
+            barrier.wait()  # raises BrokenBarrierError unless all three branches run at once
+            state["errors"].append({"ticker": "*", "tool": tool, "error": "boom"})
+            state["delivery_stats"][tool] = {"sent": 1}
+            return state
+
+        return _node
+
+    for name in ("post_alerts", "post_candidates", "assemble_report_json"):
+        monkeypatch.setitem(NODE_REGISTRY, name, _branch(name))
+    for name in ("assemble_markdown", "post_to_n8n", "persist_report", "post_monitor_event"):
+        monkeypatch.setitem(NODE_REGISTRY, name, lambda state: state)
+
+    app = compile_graph(timed_node=_timed_node, planner_router=planner_router, phase="tail")
+    result = app.invoke(
+        {"run_id": "r1", "errors": [{"ticker": "*", "tool": "core", "error": "x"}], "delivery_stats": {}},
+        config={"recursion_limit": 50},
+    )
+
+    assert sorted(e["tool"] for e in result["errors"]) == [
+        "assemble_report_json",
+        "core",
+        "post_alerts",
+        "post_candidates",
+    ]
+    assert set(result["delivery_stats"]) == {"post_alerts", "post_candidates", "assemble_report_json"}
+    assert set(result["node_timings"]) == set(phase_dependencies("tail"))
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pytest
+
+from app import event_store, history_store
+from app.models import AnalysisSnapshot, SignalEvent
+from app.settings import get_settings
+
+
+def _snapshot(run_id: str, run_date: str, hour: int, aapl_overall: float) -> AnalysisSnapshot:
+    ts = f"{run_date}T{hour:02d}:00:00+00:00"
+    events = [
+        SignalEvent(
+            id=f"{run_id}-{ticker}-{signal_type}",
+            run_id=run_id,
+            run_date=run_date,
+            timestamp=ts,
+            ticker=ticker,
+            signal_type=signal_type,
+            direction="up",
+            severity="medium",
+            confidence=0.6,
+            score=score,
+            narrative=None,
+            route="UI_UPDATE",
+        )
+        for ticker, signal_type, score in (
+            ("AAPL", "quality", aapl_overall),
+            ("AAPL", "momentum", aapl_overall - 1.0),
+            ("MSFT", "quality", 4.0),
+        )
+    ]
+    return AnalysisSnapshot(
+        run_id=run_id,
+        run_date=run_date,
+        timestamp=ts,
+        scope="full",
+        tickers=["AAPL", "MSFT"],
+        scores={
+            "AAPL": {"quality": aapl_overall, "momentum": 5.0, "overall": aapl_overall},
+            "MSFT": {"quality": 4.0, "momentum": 4.0, "overall": 4.0},
+        },
+        signal_events=events,
+        failed_tickers=[],
+        error_count=0,
+    )
+
+
+@pytest.fixture()
+def columnar_db(temp_db, monkeypatch):
+    monkeypatch.setattr(get_settings().features, "columnar_history", True)
+    return history_store.get_history_store()
+
+
+def test_disabled_by_default_returns_none(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings().features, "columnar_history", False)
+    assert history_store.get_history_store() is None
+
+
+def test_persist_run_mirrors_and_matches_sqlite_history(columnar_db):
+    today = date.today()
+    older = (today - timedelta(days=7)).isoformat()
+    event_store.persist_run(_snapshot("run-1", older, 9, 6.0))
+    event_store.persist_run(_snapshot("run-2", today.isoformat(), 9, 7.5))
+
+    series = columnar_db.score_history("AAPL", lookback_weeks=4)
+    rows = event_store.load_history("AAPL", lookback_weeks=4)
+    assert series["score"].tolist() == [r["score"] for r in rows]
+    assert series["signal_type"].tolist() == [r["signal_type"] for r in rows]
+    assert series["run_date"].tolist() == [r["run_date"] for r in rows]
+
+    quality_only = columnar_db.score_history("AAPL", lookback_weeks=4, signal_type="quality")
+    assert quality_only["score"].tolist() == [7.5, 6.0]
+
+
+def test_latest_scores_and_deltas(columnar_db):
+    today = date.today()
+    event_store.persist_run(_snapshot("run-1", (today - timedelta(days=7)).isoformat(), 9, 6.0))
+    event_store.persist_run(_snapshot("run-2", today.isoformat(), 9, 7.5))
+
+    assert columnar_db.latest_run_scores(exclude_run_id="run-2")["AAPL"]["overall"] == 6.0
+
+    deltas = columnar_db.score_deltas("run-2")
+    by_ticker = dict(zip(deltas["ticker"].tolist(), deltas["overall_delta"].tolist()))
+    assert by_ticker == {"AAPL": pytest.approx(1.5), "MSFT": pytest.approx(0.0)}
+
+
+def test_rolled_back_run_is_not_mirrored(columnar_db):
+    with pytest.raises(RuntimeError):
+        with event_store.transaction():
+            event_store.persist_run(_snapshot("run-x", date.today().isoformat(), 9, 5.0))
+            raise RuntimeError("boom")
+    assert columnar_db.segments() == []
+
+
+def test_rebuild_from_sqlite(columnar_db):
+    event_store.persist_run(_snapshot("run-1", date.today().isoformat(), 9, 6.0))
+    assert columnar_db.rebuild_from_sqlite() == 1
+    assert [s.run_id for s in columnar_db.segments()] == ["run-1"]
+
+
+def test_segment_listing_is_cached_until_a_partition_changes(columnar_db, monkeypatch):
+    today = date.today().isoformat()
+    event_store.persist_run(_snapshot("run-1", today, 9, 6.0))
+    assert [s.run_id for s in columnar_db.segments()] == ["run-1"]
+
+    reads = []
+    real_loads = history_store.json.loads
+    monkeypatch.setattr(history_store.json, "loads", lambda raw: reads.append(raw) or real_loads(raw))
+    assert [s.run_id for s in columnar_db.segments()] == ["run-1"]
+    assert reads == []
+
+    event_store.persist_run(_snapshot("run-2", today, 10, 7.0))
+    assert [s.run_id for s in columnar_db.segments()] == ["run-2", "run-1"]
+
+
+def test_anomalies_fall_back_to_sqlite_when_prior_run_was_not_mirrored(columnar_db, monkeypatch):
+    from app.nodes import anomalies
+
+    today = date.today()
+    event_store.persist_run(_snapshot("run-1", (today - timedelta(days=7)).isoformat(), 9, 6.0))
+
+    def _mirror_fails(snapshot):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(columnar_db, "append_run", _mirror_fails)
+    event_store.persist_run(_snapshot("run-2", today.isoformat(), 9, 7.5))
+    assert columnar_db.run_scores("run-2") is None
+
+    priors = []
+
+    def _delta(ticker, current_scores, prior_scores):
+        priors.append((ticker, prior_scores["overall"]))
+        return None
+
+    monkeypatch.setattr(anomalies, "detect_score_delta", _delta)
+    state = {"run_id": "run-3", "run_date": today.isoformat(), "scores": {"AAPL": {"overall": 8.0}}, "errors": []}
+    anomalies.detect_anomalies_node(state)
+    assert priors == [("AAPL", 7.5)]
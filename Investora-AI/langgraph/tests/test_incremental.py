@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import pytest
+
+from app import event_store
+from app.nodes import evidence
+from app.nodes.incremental import reuse_prior_artifacts_node, ticker_artifacts
+
+
+def _state(run_id: str, headlines: dict, incremental: bool = True):
+    tickers = list(headlines)
+    return {
+        "run_id": run_id,
+        "run_date": "2026-03-06",
+        "incremental": incremental,
+        "skip_synthesis": False,
+        "tickers": tickers,
+        "per_ticker_data": {
+            t: {
+                "market": {"prices": [{"close": 10.0}]},
+                "fundamentals": {"metrics": {"roe": 0.1}},
+                "news": {"articles": [{"headline": headlines[t]}]},
+            }
+            for t in tickers
+        },
+        "scores": {t: {"quality": 5.0, "momentum": 5.0, "overall": 5.0} for t in tickers},
+        "per_ticker_rag_context": {},
+        "per_ticker_synthesis": {},
+        "user_profiles": [],
+        "errors": [],
+    }
+
+
+class _RagStub:
+    def __init__(self):
+        self.calls = []
+
+    def run(self, payload):
+        self.calls.append(payload["ticker"])
+        return {"matches": [{"id": f"fresh-{payload['ticker']}"}]}
+
+
+def test_unchanged_tickers_carry_forward_rag_and_synthesis(temp_db, monkeypatch):
+    first = reuse_prior_artifacts_node(_state("run-1", {"AAPL": "a", "MSFT": "m", "NVDA": "n"}))
+    assert first["reuse_stats"]["unchanged_inputs"] == 0
+    first["per_ticker_rag_context"] = {t: [{"id": f"old-{t}"}] for t in first["tickers"]}
+    first["per_ticker_synthesis"] = {t: {"ticker": t, "quality_narrative": "old"} for t in first["tickers"]}
+    first["errors"].append({"ticker": "NVDA", "tool": "synthesize_evidence", "error": "timeout"})
+    event_store.save_ticker_artifacts("run-1", "2026-03-06", ticker_artifacts(first))
+
+    second = reuse_prior_artifacts_node(_state("run-2", {"AAPL": "a", "MSFT": "new headline", "NVDA": "n"}))
+    stats = second["reuse_stats"]
+    assert stats["unchanged_inputs"] == 2
+    assert stats["input_reuse_ratio"] == pytest.approx(2 / 3, abs=1e-4)
+    assert set(second["carried_forward"]["rag"]) == {"AAPL", "NVDA"}
+    # NVDA's synthesis failed last run, so there is nothing to reuse.
+    assert set(second["carried_forward"]["synthesis"]) == {"AAPL"}
+
+    stub = _RagStub()
+    monkeypatch.setattr(evidence, "get_rag_tool", lambda: stub)
+    second = evidence.retrieve_rag_context_node(second)
+    assert stub.calls == ["MSFT"]
+    assert second["per_ticker_rag_context"]["AAPL"] == [{"id": "old-AAPL"}]
+    assert second["rag_stats"]["carried_forward"] == 2
+
+
+def test_full_runs_still_store_artifacts_but_reuse_nothing(temp_db):
+    first = reuse_prior_artifacts_node(_state("run-1", {"AAPL": "a"}, incremental=False))
+    first["per_ticker_synthesis"] = {"AAPL": {"ticker": "AAPL"}}
+    event_store.save_ticker_artifacts("run-1", "2026-03-06", ticker_artifacts(first))
+
+    fast = reuse_prior_artifacts_node(_state("run-2", {"AAPL": "a"}, incremental=False))
+    assert fast["reuse_stats"]["unchanged_inputs"] == 1
+    assert fast["carried_forward"] == {"rag": {}, "synthesis": {}}
+    # A run that did not synthesise keeps the last synthesis in storage.
+    event_store.save_ticker_artifacts("run-2", "2026-03-06", ticker_artifacts(fast))
+    assert event_store.load_latest_ticker_artifacts(["AAPL"])["AAPL"]["synthesis"] == {"ticker": "AAPL"}
+
+
+def test_synthesis_is_not_reused_when_the_score_moved(temp_db):
+    first = reuse_prior_artifacts_node(_state("run-1", {"AAPL": "a", "MSFT": "m"}))
+    first["per_ticker_synthesis"] = {t: {"ticker": t} for t in first["tickers"]}
+    event_store.save_ticker_artifacts("run-1", "2026-03-06", ticker_artifacts(first))
+
+    # Same inputs, but re-normalisation against the universe moved MSFT's score.
+    second = _state("run-2", {"AAPL": "a", "MSFT": "m"})
+    second["scores"]["MSFT"] = {"quality": 6.0, "momentum": 5.0, "overall": 5.5}
+    second = reuse_prior_artifacts_node(second)
+    assert second["reuse_stats"]["unchanged_inputs"] == 2
+    assert second["reuse_stats"]["scores_unchanged"] == 1
+    assert set(second["carried_forward"]["synthesis"]) == {"AAPL"}
+
+    # Nor is the stale narrative written back next to the new score.
+    second["per_ticker_synthesis"] = {}
+    event_store.save_ticker_artifacts("run-2", "2026-03-06", ticker_artifacts(second))
+    stored = event_store.load_latest_ticker_artifacts(["AAPL", "MSFT"])
+    assert stored["AAPL"]["synthesis"] == {"ticker": "AAPL"}
+    assert stored["MSFT"]["synthesis"] is None
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Dict
+
+import pytest
+
+from app import job_runner as job_runner_module
+from app.job_runner import JobRejected, JobRunner
+from app.run_limiter import RunLimiter
+
+
+class _GatedGraph:
+    """Fake compiled graph that blocks after the first node until released."""
+
+    def __init__(self) -> None:
+        self.gate = threading.Event()
+        self.first_node_done = threading.Event()
+
+    def stream(self, initial: Dict[str, Any], config: Dict[str, Any]):
+        yield {"init_state": {"run_id": initial["run_id"], "tickers": ["AAPL"], "errors": []}}
+        self.first_node_done.set()
+        self.gate.wait(timeout=5)
+        yield {"assemble_report_json": {"report_json": {"ok": True}, "run_date": "2026-03-02"}}
+
+
+@pytest.fixture()
+def graph(monkeypatch):
+    import app.graph as graph_module
+
+    fake = _GatedGraph()
+    monkeypatch.setattr(graph_module, "build_graph", lambda force_rebuild=False: fake)
+    monkeypatch.setattr(job_runner_module.run_limiter, "acquire", lambda timeout_s=90.0, cancel=None: "acquired")
+    monkeypatch.setattr(job_runner_module.run_limiter, "release", lambda: None)
+    return fake
+
+
+def test_job_runs_to_completion_with_result(graph):
+    runner = JobRunner(max_workers=1, max_pending=2)
+    graph.gate.set()
+    job = runner.submit({"skip_synthesis": True}, kind="analysis")
+    job.future.result(timeout=5)
+
+    polled = runner.get(job.job_id).to_dict()
+    assert polled["status"] == "succeeded"
+    assert polled["nodes_completed"] == ["init_state", "assemble_report_json"]
+    assert polled["result"]["report_json"] == {"ok": True}
+    assert polled["result"]["tickers"] == ["AAPL"]
+    assert runner.stats()["counters"]["succeeded"] == 1
+    runner.shutdown()
+
+
+def test_backpressure_rejects_and_queued_job_cancels(graph):
+    runner = JobRunner(max_workers=1, max_pending=2)
+    running = runner.submit({}, kind="analysis")
+    assert graph.first_node_done.wait(timeout=5)
+    queued = runner.submit({}, kind="analysis")
+
+    with pytest.raises(JobRejected):
+        runner.submit({}, kind="analysis")
+
+    assert runner.cancel(queued.job_id) is True
+    assert runner.get(queued.job_id).status == "cancelled"
+
+    assert runner.cancel(running.job_id) is True
+    graph.gate.set()
+    running.future.result(timeout=5)
+    assert runner.get(running.job_id).status == "cancelled"
+
+    counters = runner.stats()["counters"]
+    assert counters["rejected"] == 1
+    assert counters["cancelled"] == 2
+    runner.shutdown()
+
+
+def test_async_subscriber_receives_events_without_own_thread(graph):
+    runner = JobRunner(max_workers=1, max_pending=1)
+
+    async def follow():
+        job = runner.submit({}, kind="analysis")
+        queue = runner.subscribe(job.job_id, asyncio.get_running_loop())
+        graph.gate.set()
+        events = []
+        while True:
+            event = await asyncio.wait_for(queue.get(), timeout=5)
+            if event is None:
+                return job, events
+            events.append(event)
+
+    job, events = asyncio.run(follow())
+    assert [e["type"] for e in events] == ["started", "node_complete", "node_complete", "done"]
+
+    # A late subscriber replays history and is closed immediately.
+    late = runner.subscribe(job.job_id, asyncio.new_event_loop())
+    replay = []
+    while True:
+        event = late.get_nowait()
+        if event is None:
+            break
+        replay.append(event)
+    assert replay == events
+    runner.shutdown()
+
+
+def test_cancel_while_waiting_on_the_limiter_with_production_sizing(monkeypatch):
+    import app.graph as graph_module
+
+    limiter = RunLimiter(max_active=1, max_queued=4)
+    monkeypatch.setattr(job_runner_module, "run_limiter", limiter)
+    graphs = []
+
+    def _build_graph(force_rebuild=False):
+        graphs.append(_GatedGraph())
+        return graphs[-1]
+
+    monkeypatch.setattr(graph_module, "build_graph", _build_graph)
+    # Same sizing as the module-level runner: every admitted job has a worker.
+    runner = JobRunner(max_workers=limiter.max_active + limiter.max_queued, max_pending=5)
+    running = runner.submit({}, kind="analysis")
+    for _ in range(100):
+        if graphs:
+            break
+        threading.Event().wait(0.01)
+    assert graphs[0].first_node_done.wait(timeout=5)
+
+    waiting = runner.submit({}, kind="analysis")
+    for _ in range(100):
+        if limiter.stats()["queued"] == 1:
+            break
+        threading.Event().wait(0.01)
+    assert limiter.stats()["queued"] == 1
+
+    assert runner.cancel(waiting.job_id) is True
+    assert runner.get(waiting.job_id).status == "cancelled"
+    waiting.future.result(timeout=5)  # the worker left the limiter queue
+    assert limiter.stats()["queued"] == 0
+
+    graphs[0].gate.set()
+    running.future.result(timeout=5)
+    assert runner.get(running.job_id).status == "succeeded"
+    assert len(graphs) == 1  # the cancelled job never built or streamed a graph
+    assert limiter.stats()["active"] == 0
+    assert runner.stats()["counters"]["cancelled"] == 1
+    runner.shutdown()
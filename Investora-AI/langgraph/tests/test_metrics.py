@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import api as api_module
+from app import event_store, metrics
+from app.graph import _timed_node
+
+
+def test_quantile_sketch_tracks_exact_percentiles_in_bounded_memory():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(3.0, 1.2) for _ in range(50_000)]
+    sketch = metrics.QuantileSketch(relative_accuracy=0.01)
+    for v in values:
+        sketch.add(v)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.95, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+    assert len(sketch._buckets) < 1000
+    assert sketch.count == 50_000
+
+
+def test_timed_node_records_quantiles_and_error_counters():
+    metrics.reset_metrics()
+
+    def _node(state):
+        state["errors"].append({"ticker": "AAPL", "tool": "rag_retrieval", "error": "timeout"})
+        return state
+
+    wrapped = _timed_node("retrieve_rag_context", _node)
+    for _ in range(3):
+        wrapped({"run_id": "r", "errors": []})
+
+    def _boom(state):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        _timed_node("persist_snapshot", _boom)({"run_id": "r", "errors": []})
+
+    snap = metrics.snapshot_metrics()
+    assert snap["node_timings"]["retrieve_rag_context"]["count"] == 3
+    assert {"p50_ms", "p95_ms", "p99_ms"} <= set(snap["node_timings"]["retrieve_rag_context"])
+    assert snap["errors"] == {"tool:rag_retrieval": 3, "node:persist_snapshot": 1}
+
+
+def test_prometheus_endpoint_exposes_summaries_and_counters():
+    metrics.reset_metrics()
+    metrics.record_node_timing("compute_scores", 12.5)
+    metrics.record_provider_call("openai_synthesis")
+    with pytest.raises(ValueError):
+        with metrics.time_provider_call("openai_synthesis"):
+            raise ValueError("bad gateway")
+
+    response = TestClient(api_module.app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'investora_node_duration_ms{node="compute_scores",quantile="0.95"}' in body
+    assert 'investora_node_duration_ms_count{node="compute_scores"} 1' in body
+    assert 'investora_provider_calls_total{provider="openai_synthesis"} 1' in body
+    assert 'investora_errors_total{kind="provider",name="openai_synthesis"} 1' in body
+
+
+def test_run_metrics_round_trip(temp_db):
+    event_store.save_run_metrics("run-1", "2026-03-06", {"node_timings_ms": {"compute_scores": 4.2}})
+    client = TestClient(api_module.app)
+    ok = client.get("/run-history/run-1/metrics")
+    missing = client.get("/run-history/nope/metrics")
+
+    assert ok.status_code == 200
+    assert ok.json()["metrics"]["node_timings_ms"] == {"compute_scores": 4.2}
+    assert missing.status_code == 404
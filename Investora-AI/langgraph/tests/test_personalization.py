@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import random
+
+from app import personalization
+from app.personalization import PersonalizationEngine, build_user_bundle
+
+_UNIVERSE = {
+    "AAPL": {"sector": "Technology", "asset_class": "stocks", "themes": ["AI", "hardware"]},
+    "NVDA": {"sector": "Technology", "asset_class": "stocks", "themes": ["ai", "Technology", "chips"]},
+    "XOM": {"sector": "Energy", "asset_class": "stocks", "themes": ["oil"]},
+    "BTC-USD": {"sector": "", "asset_class": "crypto", "themes": ["crypto"]},
+    "GLD": {"sector": "Commodities", "asset_class": "etf", "themes": None},
+}
+_TICKERS = list(_UNIVERSE) + ["ZZZ", "ETH"]
+
+
+def _signals(n: int, rng: random.Random):
+    return [
+        {
+            "id": f"s{i}",
+            "run_id": "r1",
+            "run_date": "2026-03-06",
+            "timestamp": "2026-03-06T00:00:00+00:00",
+            "ticker": rng.choice(_TICKERS).lower() if rng.random() < 0.2 else rng.choice(_TICKERS),
+            "signal_type": rng.choice(["quality", "momentum", "momentum_breakout", "risk_flag", "news_catalyst"]),
+            "direction": rng.choice(["up", "down", "neutral"]),
+            "severity": rng.choice(["low", "medium", "high", "critical", "HIGH"]),
+            "confidence": rng.choice([0.2, 0.35, 0.6, 0.9]),
+            "score": rng.uniform(0, 10),
+            "narrative": None,
+            "route": "UI_UPDATE",
+        }
+        for i in range(n)
+    ]
+
+
+def _profiles(n: int, rng: random.Random):
+    tokens = ["technology", "ai", "AI", "energy", "oil", "chips", "crypto", "commodities"]
+    return [
+        {
+            "user_id": f"u{i}",
+            "watchlist": rng.sample(_TICKERS, rng.randint(0, 3)),
+            "interests": rng.sample(tokens, rng.randint(0, 4)),
+            "preferred_assets": rng.sample(["stocks", "ETF", "crypto"], rng.randint(0, 2)),
+            "constraints": rng.sample(["no_crypto", "esg"], rng.randint(0, 2)),
+            "horizon": rng.choice(["short", "medium", "long", "LONG"]),
+            "risk_tolerance": rng.choice(["low", "medium", "high", "Low"]),
+            "risk_tolerance_pct": rng.choice([20, 50, 80]),
+        }
+        for i in range(n)
+    ]
+
+
+def _strip(bundle):
+    return {k: v for k, v in bundle.items() if k != "generated_at"}
+
+
+def test_engine_bundles_match_reference(monkeypatch):
+    monkeypatch.setattr(personalization, "_load_universe_meta", lambda: _UNIVERSE)
+    rng = random.Random(5)
+    scores = {t: {"quality": rng.uniform(0, 10), "momentum": rng.uniform(0, 10), "overall": 6.5} for t in _TICKERS}
+
+    for n_signals, n_users in ((0, 3), (1, 1), (60, 40)):
+        signals = _signals(n_signals, rng)
+        profiles = _profiles(n_users, rng)
+        engine = PersonalizationEngine(profiles, signals, scores, "r1", "2026-03-06", {})
+        for j, profile in enumerate(profiles):
+            expected = build_user_bundle(profile, signals, scores, "r1", "2026-03-06", {})
+            assert _strip(engine.build_bundle(j)) == _strip(expected), profile
+
+
+def test_malformed_profile_only_fails_that_user():
+    signals = _signals(5, random.Random(1))
+    profiles = [{"user_id": "ok", "watchlist": ["AAPL"]}, {"user_id": "bad", "interests": None}]
+    engine = PersonalizationEngine(profiles, signals, {}, "r1", "2026-03-06", {}, universe_meta=_UNIVERSE)
+
+    assert engine.build_bundle(0)["user_id"] == "ok"
+    try:
+        engine.build_bundle(1)
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("malformed profile should raise")
+
+
+def test_unserializable_bundle_only_fails_that_user(temp_db, monkeypatch):
+    from app import event_store
+    from app.nodes import personalization as node
+
+    def _bundle(user_profile, run_id, run_date, **_):
+        extra = object() if user_profile["user_id"] == "u2" else "ok"
+        return {"user_id": user_profile["user_id"], "run_id": run_id, "run_date": run_date, "extra": extra}
+
+    def _no_engine(**_):
+        raise ValueError("compile failed")
+
+    monkeypatch.setattr(node, "PersonalizationEngine", _no_engine)
+    monkeypatch.setattr(node, "build_user_bundle", _bundle)
+    state = {
+        "run_id": "r1",
+        "run_date": "2026-03-06",
+        "user_profiles": [{"user_id": u} for u in ("u1", "u2", "u3")],
+        "errors": [],
+    }
+    out = node.personalize_signals_node(state)
+
+    assert set(out["personalized_bundles"]) == {"u1", "u3"}
+    assert [e["ticker"] for e in out["errors"]] == ["u2"]
+    assert event_store.load_latest_bundle("u1")["extra"] == "ok"
+    assert event_store.load_latest_bundle("u2") is None
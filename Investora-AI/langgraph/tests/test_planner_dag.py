@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from app.graph import planner_router
+from app.nodes import data_collection
+from app.settings import get_settings
+
+
+def _state(tickers):
+    return {
+        "run_id": "dag-test",
+        "run_date": "2026-03-10",
+        "tickers": tickers,
+        "per_ticker_data": {t: {} for t in tickers},
+        "failed_tickers": [],
+        "errors": [],
+        "react_history": [],
+        "sharded_collection_done": False,
+        "collection_stats": {},
+        "planner_stats": data_collection._new_planner_stats(),
+    }
+
+
+def test_dag_planner_fetches_everything_in_one_pass(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    monkeypatch.setattr(get_settings().run, "planner_mode", "dag")
+    tickers = ["AAPL", "MSFT", "NVDA"]
+
+    state = data_collection.plan_next_action(_state(tickers))
+    assert state["action"] == "fetch_all"
+    assert planner_router(state) == "execute_tool_action"
+
+    state = data_collection.execute_tool_action(state)
+    for ticker in tickers:
+        assert set(state["per_ticker_data"][ticker]) == {"market", "fundamentals", "news"}
+
+    state = data_collection.plan_next_action(state)
+    assert state["action"] == "compute"
+    stats = state["planner_stats"]
+    assert stats["iterations"] == 2
+    assert stats["dag_dispatches"] == 1
+    assert stats["iterations_saved"] == 2
+    assert stats["llm_calls"] == 0
+
+
+def test_leftovers_after_dag_pass_go_to_llm_planner(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    run = get_settings().run
+    monkeypatch.setattr(run, "planner_mode", "dag")
+    monkeypatch.setattr(run, "use_mock_data", False)
+    monkeypatch.setattr(get_settings().providers, "openai_api_key", "")
+
+    state = data_collection.plan_next_action(_state(["AAPL", "MSFT"]))
+    state = data_collection.execute_tool_action(state)
+    assert state["planner_stats"]["llm_calls_saved"] == 3
+
+    # Simulate a fetch that came back empty without failing the ticker.
+    del state["per_ticker_data"]["MSFT"]["news"]
+    state = data_collection.plan_next_action(state)
+
+    stats = state["planner_stats"]
+    assert stats["llm_calls"] == 1
+    assert (state["current_ticker"], state["action"]) == ("MSFT", "news")
+    assert any(e["tool"] == "planner" for e in state["errors"])
+
+
+def test_market_failure_skips_fundamentals_and_news(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    monkeypatch.setattr(get_settings().run, "planner_mode", "dag")
+    calls = []
+
+    class _Market:
+        def run_many(self, tickers):
+            return {t: {"ticker": t, "price": 1.0} for t in tickers if t != "BAD"}
+
+    class _Tool:
+        def __init__(self, action):
+            self.action = action
+
+        def run(self, payload):
+            calls.append((self.action, payload["ticker"]))
+            return {"ticker": payload["ticker"]}
+
+    monkeypatch.setattr(data_collection, "get_market_tool", _Market)
+    monkeypatch.setattr(data_collection, "get_fundamentals_tool", lambda: _Tool("fundamentals"))
+    monkeypatch.setattr(data_collection, "get_news_tool", lambda: _Tool("news"))
+
+    state = data_collection.plan_next_action(_state(["AAPL", "BAD"]))
+    state = data_collection.execute_tool_action(state)
+    assert state["failed_tickers"] == ["BAD"]
+    assert sorted(calls) == [("fundamentals", "AAPL"), ("news", "AAPL")]
+    assert set(state["per_ticker_data"]["AAPL"]) == {"market", "fundamentals", "news"}
@@ -1,7 +1,18 @@
 from __future__ import annotations
 
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
+
+from app import metrics
+from app.mcp_tools import cache as cache_module
+from app.mcp_tools import yfinance_tool
 from app.mcp_tools.fundamentals_tool import FundamentalsTool
 from app.mcp_tools.news_tool import NewsTool
+from app.mcp_tools.rag_tool import RAGRetrievalTool
+from app.mcp_tools.yfinance_tool import YFinanceTool
+from app.settings import get_settings
 
 
 class _FundamentalsToolStub(FundamentalsTool):
@@ -54,3 +65,136 @@ def test_news_tool_normalizes_articles():
     assert out["ticker"] == "MSFT"
     assert isinstance(out["articles"], list)
     assert out["articles"][0]["headline"] == "h1"
+
+
+class _FakeFastInfo:
+    last_price = 50.0
+    previous_close = 40.0
+    last_volume = 7
+    market_cap = 1_000
+
+
+class _FakeYF:
+    """Bulk download prices every ticker except those in ``unpriced``."""
+
+    def __init__(self, unpriced=()):
+        self.unpriced = set(unpriced)
+        self.download_calls = []
+        self.ticker_calls = []
+
+    def download(self, tickers, **kwargs):
+        self.download_calls.append(list(tickers))
+        columns = pd.MultiIndex.from_product([[t for t in tickers if t not in self.unpriced], ["Close", "Volume"]])
+        rows = [[v for _ in range(len(columns) // 2) for v in row] for row in ([100.0, 10], [110.0, 20])]
+        return pd.DataFrame(rows, columns=columns)
+
+    def Ticker(self, ticker):  # noqa: N802 - mirrors yfinance API
+        self.ticker_calls.append(ticker)
+        fake = type("T", (), {})()
+        fake.fast_info = _FakeFastInfo()
+        return fake
+
+
+def _reset_quote_caches():
+    YFinanceTool.wait_for_market_caps()
+    cache_module.reset_tool_caches()
+
+
+def test_yfinance_quotes_use_one_bulk_request_and_cache(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    fake = _FakeYF()
+    monkeypatch.setattr(yfinance_tool, "yf", fake)
+    _reset_quote_caches()
+
+    tickers = [f"T{i}" for i in range(100)]
+    quotes = YFinanceTool().get_quotes(tickers)
+
+    # Cold: one bulk request; market caps come from the background pool in time.
+    assert len(fake.download_calls) == 1
+    assert quotes["T0"] == {"price": 110.0, "change": 10.0, "change_pct": 10.0, "volume": 20, "mkt_cap": 1_000}
+    assert sorted(fake.ticker_calls) == sorted(tickers)
+
+    fake.ticker_calls.clear()
+    again = YFinanceTool().get_quotes(["t5", "T7"])
+    assert len(fake.download_calls) == 1
+    assert fake.ticker_calls == []
+    assert list(again) == ["T5", "T7"]
+    assert again["T5"]["mkt_cap"] == 1_000
+    _reset_quote_caches()
+
+
+class _SlowCapYF(_FakeYF):
+    """Market-cap lookups block until ``release`` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def Ticker(self, ticker):  # noqa: N802 - mirrors yfinance API
+        self.release.wait(5)
+        return super().Ticker(ticker)
+
+
+def test_yfinance_slow_market_cap_falls_back_to_none_after_a_short_wait(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(get_settings().concurrency, "yf_mkt_cap_wait_s", 0.05)
+    fake = _SlowCapYF()
+    monkeypatch.setattr(yfinance_tool, "yf", fake)
+    _reset_quote_caches()
+
+    quotes = YFinanceTool().get_quotes(["AAPL"])
+    assert quotes["AAPL"]["price"] == 110.0 and quotes["AAPL"]["mkt_cap"] is None
+
+    fake.release.set()
+    YFinanceTool.wait_for_market_caps()
+    assert YFinanceTool().get_quotes(["AAPL"])["AAPL"]["mkt_cap"] == 1_000
+    _reset_quote_caches()
+
+
+def test_yfinance_quotes_fall_back_per_ticker_when_bulk_misses(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    fake = _FakeYF(unpriced={"NEW"})
+    monkeypatch.setattr(yfinance_tool, "yf", fake)
+    _reset_quote_caches()
+
+    quotes = YFinanceTool().get_quotes(["AAPL", "NEW"])
+
+    assert quotes["AAPL"]["price"] == 110.0
+    assert quotes["NEW"] == {"price": 50.0, "change": 10.0, "change_pct": 25.0, "volume": 7, "mkt_cap": 1_000}
+    _reset_quote_caches()
+
+
+class _EmbeddingsStub:
+    def __init__(self):
+        self.requests = []
+
+    def create(self, model, input):
+        self.requests.append(list(input))
+        return SimpleNamespace(
+            data=[SimpleNamespace(index=i, embedding=[float(len(text)), float(i)]) for i, text in enumerate(input)]
+        )
+
+
+def test_rag_embeddings_are_batched_and_cached(monkeypatch, tmp_path):
+    monkeypatch.setenv("PINECONE_HOST", "https://pinecone.example")
+    monkeypatch.setenv("PINECONE_API_KEY", "pc-key")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(get_settings().pipeline, "rag_embed_batch_size", 2)
+    tool = RAGRetrievalTool()
+    tool.cache_dir = tmp_path
+    embeddings = _EmbeddingsStub()
+    tool._client = SimpleNamespace(embeddings=embeddings)
+    metrics.reset_metrics()
+
+    queries = ["AAPL  catalysts", "MSFT catalysts", "NVDA catalysts", "AAPL catalysts"]
+    assert tool.prime_embeddings(queries) == 3
+    assert embeddings.requests == [["AAPL catalysts", "MSFT catalysts"], ["NVDA catalysts"]]
+    # One cache lookup per distinct query, not a pre-check followed by embed_many's own.
+    assert metrics.snapshot_metrics()["cache"]["embeddings"]["misses"] == 3
+
+    # Same queries next week (and from a fresh process-level cache): no API calls.
+    cache_module.reset_tool_caches()
+    assert tool.prime_embeddings(queries) == 0
+    assert tool._embed("MSFT   catalysts") == [14.0, 1.0]
+    assert len(embeddings.requests) == 2
+    cache_module.reset_tool_caches()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from app import event_store
+from app.mcp_tools import cache as cache_module
+from app.mcp_tools.mock_tools import FakeVectorIndex, fake_embed
+from app.mcp_tools.rag_tool import RAGRetrievalTool
+from app.rag_ingestion import IngestionPipeline, build_records, default_embedder, ingest
+
+
+def _articles(n, ticker="NVDA", start=0):
+    return [
+        {"ticker": ticker, "title": f"Headline {i}", "description": f"Summary {i}", "date": "2026-03-01"}
+        for i in range(start, start + n)
+    ]
+
+
+class _CountingEmbed:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(len(texts))
+        return fake_embed(texts)
+
+
+def _pipeline(index, embed, **kwargs):
+    options = {"chunk_size": 20, "upsert_batch_size": 5, "parallelism": 4, "backoff_s": 0.0}
+    options.update(kwargs)
+    return IngestionPipeline(index, embed, **options)
+
+
+def test_reruns_only_embed_new_articles(temp_db):
+    index, embed = FakeVectorIndex(), _CountingEmbed()
+    duplicate = {"ticker": "nvda", "title": "  Headline 3 ", "description": "Summary 3"}
+    untitled = {"ticker": "NVDA", "title": ""}
+
+    first = _pipeline(index, embed).run(_articles(50) + [duplicate, untitled])
+    assert (first.articles, first.unique, first.embedded, first.upserted) == (52, 50, 50, 50)
+    assert embed.calls == [20, 20, 10]
+    assert first.upsert_requests == 10
+    assert index.count() == 50
+
+    second = _pipeline(index, embed).run(_articles(53))
+    assert (second.skipped_checkpoint, second.embedded, second.upserted) == (50, 3, 3)
+    assert embed.calls[-1] == 3
+    assert index.count() == 53
+
+    # Same ids for the same content, whatever the batch it arrived in.
+    assert {r.vector_id for r in build_records(_articles(53))} == set(index.vectors[""])
+
+
+def test_lost_checkpoint_is_rebuilt_from_the_index(temp_db):
+    index, embed = FakeVectorIndex(), _CountingEmbed()
+    _pipeline(index, embed).run(_articles(12))
+    event_store.clear_ingested_vectors("")
+
+    report = _pipeline(index, embed).run(_articles(12))
+    assert (report.skipped_indexed, report.embedded, report.upsert_requests) == (12, 0, 0)
+    assert len(event_store.load_ingested_ids("")) == 12
+
+    reset = _pipeline(index, embed).run(_articles(4), reset=True)
+    assert reset.embedded == 4 and index.count() == 4
+    assert len(event_store.load_ingested_ids("")) == 4
+
+
+def test_upserts_retry_with_backoff_and_failed_batches_resume(temp_db):
+    delays = []
+    index = FakeVectorIndex(fail_upserts=2, fail_status=503)
+    report = _pipeline(index, fake_embed, parallelism=1, backoff_s=0.5, sleep=delays.append).run(_articles(10))
+    assert (report.upserted, report.retries, report.failed) == (10, 2, 0)
+    assert delays[0] >= 0.5 and delays[1] >= 1.0
+
+    # A client error is not retried; the batch stays out of the checkpoint.
+    index.fail_upserts, index.fail_status = 1, 400
+    report = _pipeline(index, fake_embed, parallelism=1).run(_articles(20))
+    assert (report.upserted, report.failed, report.retries) == (5, 5, 0)
+    assert report.errors[0]["tool"] == "upsert"
+
+    report = _pipeline(index, fake_embed).run(_articles(20))
+    assert (report.embedded, report.upserted, report.failed) == (5, 5, 0)
+    assert index.count() == 20
+
+
+def test_uploads_are_bounded_and_checkpointed_while_embedding(temp_db):
+    index = FakeVectorIndex(latency_s=0.01)
+    checkpointed_at_embed = []
+
+    def embed(texts):
+        checkpointed_at_embed.append(len(event_store.load_ingested_ids("")))
+        return fake_embed(texts)
+
+    report = _pipeline(index, embed, chunk_size=5, parallelism=1).run(_articles(40))
+    assert report.upserted == 40 and report.peak_in_flight <= 2
+    # Later chunks are embedded after earlier batches were already checkpointed.
+    assert checkpointed_at_embed[0] == 0 and checkpointed_at_embed[-1] >= 20
+
+
+def test_default_embedder_keeps_corpus_vectors_out_of_the_tool_cache(temp_db, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    requests = []
+
+    def _create(model, input):
+        requests.append(len(input))
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[0.1, 0.2]) for i in range(len(input))])
+
+    client = SimpleNamespace(embeddings=SimpleNamespace(create=_create))
+    monkeypatch.setattr(RAGRetrievalTool, "_openai", lambda self: client)
+    cache_module.reset_tool_caches()
+
+    report = ingest(_articles(30), index=FakeVectorIndex(), embed=default_embedder(), chunk_size=10)
+    assert report.upserted == 30 and sum(requests) == 30
+
+    stats = cache_module.get_tool_cache(tmp_path / "data" / "cache").stats()
+    assert "embeddings" not in stats["namespaces"]
+    assert stats["memory_entries"] == 0
+    cache_module.reset_tool_caches()
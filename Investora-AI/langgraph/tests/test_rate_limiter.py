@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from app import metrics, rate_limiter
+from app.mcp_tools.base import HTTPCachedTool
+from app.rate_limiter import TokenBucket, get_rate_limiter
+from app.settings import get_settings
+
+
+def test_concurrent_acquires_are_paced_at_rate():
+    metrics.reset_metrics()
+    clock = {"now": 100.0}
+    slept = []
+    bucket = TokenBucket(
+        "test_provider", rate_per_s=50.0, burst=2.0, clock=lambda: clock["now"], sleep=slept.append
+    )
+
+    # Twelve callers arriving at the same instant: 2 tokens of burst, then each
+    # later caller is booked one refill interval (20 ms) behind the previous one.
+    waits = [bucket.acquire() for _ in range(12)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2:] == pytest.approx([0.02 * i for i in range(1, 11)])
+    assert slept == pytest.approx(waits[2:])
+
+    # Once the debt has been paid off the bucket refills up to its burst only.
+    clock["now"] += 10.0
+    assert [bucket.acquire() for _ in range(3)] == pytest.approx([0.0, 0.0, 0.02])
+
+    stats = metrics.snapshot_metrics()["rate_limits"]["test_provider"]
+    assert stats["acquired"] == 15
+    assert stats["throttled"] == 11
+    assert sum(stats["wait_histogram"].values()) == 15
+
+
+def test_concurrent_acquires_never_share_a_slot():
+    clock = {"now": 0.0}
+    bucket = TokenBucket("threads", rate_per_s=50.0, burst=2.0, clock=lambda: clock["now"], sleep=lambda s: None)
+    waits = []
+    lock = threading.Lock()
+
+    def worker():
+        wait_s = bucket.acquire()
+        with lock:
+            waits.append(wait_s)
+
+    threads = [threading.Thread(target=worker) for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(waits) == pytest.approx([0.0, 0.0] + [0.02 * i for i in range(1, 11)])
+
+
+def test_tools_share_a_bucket_per_provider(tmp_path, monkeypatch):
+    rate_limiter.reset_rate_limiters()
+    monkeypatch.setitem(get_settings().rate_limits.per_s, "acme", 3.0)
+    monkeypatch.setitem(get_settings().rate_limits.burst, "acme", 4.0)
+
+    a = HTTPCachedTool(cache_dir=str(tmp_path), provider="acme")
+    b = HTTPCachedTool(cache_dir=str(tmp_path), provider="acme")
+    a._respect_rate_limit()
+    b._respect_rate_limit()
+
+    bucket = get_rate_limiter("acme")
+    assert (bucket.rate_per_s, bucket.burst) == (3.0, 4.0)
+    assert bucket._tokens < 3.0
+    rate_limiter.reset_rate_limiters()
+
+
+def test_zero_rate_is_unlimited():
+    bucket = TokenBucket("unlimited", rate_per_s=0.0, burst=1.0)
+    assert all(bucket.acquire() == 0.0 for _ in range(100))
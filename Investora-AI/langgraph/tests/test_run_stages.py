@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import pytest
+
+from app import event_store
+from app.graph import build_graph
+from app.graph_builder import PHASE_SEQUENCES
+from app.run_stages import TailStageExecutor
+
+
+@pytest.fixture(autouse=True)
+def _mock_data(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+
+
+def _initial() -> Dict[str, Any]:
+    return {
+        "tickers": ["AAPL", "MSFT", "NVDA"],
+        "skip_synthesis": True,
+        "skip_post": True,
+        "scope": "fast",
+        "trigger_weekly_digest": False,
+        "split_phase": True,
+    }
+
+
+def test_core_and_tail_phases_cover_the_full_graph():
+    full = PHASE_SEQUENCES["full"]
+    core, tail = PHASE_SEQUENCES["core"], PHASE_SEQUENCES["tail"]
+    assert sorted(core + tail) == sorted(full)
+    assert core[-1] == "persist_snapshot"
+    assert "post_alerts" not in core and "persist_report" in tail
+
+
+def test_split_run_persists_core_then_runs_tail_in_background(temp_db):
+    executor = TailStageExecutor(max_workers=1)
+    core_state = build_graph(force_rebuild=True, phase="core").invoke(_initial(), config={"recursion_limit": 120})
+    run_id = core_state["run_id"]
+
+    assert core_state["split_phase"] is True
+    assert core_state["report_json"] is None
+    assert "post_alerts" not in core_state["node_timings"]
+    assert event_store.load_run(run_id) is not None
+
+    future = executor.complete_core(core_state)
+    final_state = future.result(timeout=30)
+    executor.shutdown(wait=True)
+
+    assert final_state["report_json"] is not None
+    assert core_state["report_json"] is None  # the caller's state is not touched by the tail
+    stages = {s["stage"]: s for s in event_store.load_run_stages(run_id)}
+    assert stages["core"]["status"] in ("ok", "error")
+    assert "persist_snapshot" in stages["core"]["node_timings"]
+    assert stages["tail"]["status"] == "ok"
+    assert set(stages["tail"]["node_timings"]) == set(PHASE_SEQUENCES["tail"])
+    assert stages["tail"]["started_at"] and stages["tail"]["finished_at"]
+    assert executor.stats()["counters"]["ok"] == 1
+
+
+def test_tail_failure_is_recorded_against_the_run(temp_db, monkeypatch):
+    import app.graph as graph_module
+
+    class _BrokenTail:
+        def invoke(self, state, config):
+            raise RuntimeError("n8n unreachable")
+
+    monkeypatch.setattr(graph_module, "build_graph", lambda force_rebuild=False, phase="full": _BrokenTail())
+    executor = TailStageExecutor(max_workers=1)
+    future = executor.complete_core({"run_id": "run-broken", "errors": [], "node_timings": {"compute_scores": 1.0}})
+    with pytest.raises(RuntimeError):
+        future.result(timeout=5)
+    executor.shutdown(wait=True)
+
+    stages = {s["stage"]: s for s in event_store.load_run_stages("run-broken")}
+    assert stages["core"]["status"] == "ok"
+    assert stages["tail"]["status"] == "failed"
+    assert stages["tail"]["errors"][-1]["tool"] == "tail_stage"
+    assert executor.stats()["counters"]["failed"] == 1
+
+
+def test_unfinished_tails_are_failed_on_startup(temp_db):
+    event_store.save_run_stage("r-queued", "tail", "queued")
+    event_store.save_run_stage("r-running", "tail", "running", started_at="2026-03-06T00:00:00+00:00")
+    event_store.save_run_stage("r-done", "tail", "ok")
+    event_store.save_run_stage("r-running", "core", "ok")
+
+    executor = TailStageExecutor(max_workers=1)
+    assert executor.recover_unfinished() == ["r-queued", "r-running"]
+    assert executor.recover_unfinished() == []
+
+    stages = {s["stage"]: s for s in event_store.load_run_stages("r-running")}
+    assert stages["core"]["status"] == "ok"
+    assert stages["tail"]["status"] == "failed" and stages["tail"]["finished_at"]
+    assert stages["tail"]["errors"][0]["tool"] == "tail_stage"
+    assert event_store.load_run_stages("r-done")[0]["status"] == "ok"
+    assert executor.stats()["counters"]["failed"] == 2
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import math
+import random
+
+import numpy as np
+
+from app.scoring import _compute_all_scores_scalar, _round_vec, compute_all_scores
+
+
+def _random_universe(n: int, seed: int):
+    rng = random.Random(seed)
+
+    def metric():
+        roll = rng.random()
+        if roll < 0.1:
+            return None
+        if roll < 0.15:
+            return "n/a"
+        if roll < 0.2:
+            return str(round(rng.uniform(-1, 1), 3))
+        if roll < 0.5:
+            return rng.uniform(-1.5, 1.5)
+        return rng.uniform(-50, 120)
+
+    data = {}
+    for i in range(n):
+        n_prices = rng.choice([0, 3, 5, 7, 7, 7])
+        prices = [{"date": f"2026-03-{10 - d:02d}", "close": rng.uniform(5, 500)} for d in range(n_prices)]
+        if prices and rng.random() < 0.05:
+            prices[min(4, n_prices - 1)]["close"] = 0
+        if prices and rng.random() < 0.05:
+            prices[0]["close"] = None
+        entry = {"market": {"prices": prices}, "news": {}}
+        if rng.random() < 0.9:
+            entry["fundamentals"] = {
+                "metrics": {
+                    k: metric()
+                    for k in ("roe", "operating_margin", "debt_to_equity", "revenue_growth", "eps_growth")
+                }
+            }
+        data[f"T{i:04d}"] = entry
+    return data
+
+
+def _assert_same(a, b):
+    assert a.keys() == b.keys()
+    for key in a:
+        left, right = a[key], b[key]
+        if isinstance(left, dict):
+            _assert_same(left, right)
+        elif isinstance(left, float) and math.isnan(left):
+            assert isinstance(right, float) and math.isnan(right)
+        else:
+            assert left == right, (key, left, right)
+
+
+def test_vectorized_scores_match_scalar_reference():
+    for seed, n in ((1, 1), (2, 7), (3, 50), (4, 500)):
+        data = _random_universe(n, seed)
+        _assert_same(compute_all_scores(data)[0], _compute_all_scores_scalar(data)[0])
+        _assert_same(compute_all_scores(data)[1], _compute_all_scores_scalar(data)[1])
+        _assert_same(
+            compute_all_scores(data, quality_weight=0.7, momentum_weight=0.3)[0],
+            _compute_all_scores_scalar(data, quality_weight=0.7, momentum_weight=0.3)[0],
+        )
+
+
+def test_edge_cases_match_scalar_reference():
+    flat = [{"close": 10.0}] * 5
+    data = {
+        "NAN": {"market": {"prices": [{"close": float("nan")}] + flat[1:]}, "fundamentals": {"metrics": {"roe": float("nan")}}},
+        "FLAT1": {"market": {"prices": flat}, "fundamentals": {"metrics": {}}},
+        "FLAT2": {"market": {"prices": flat}, "fundamentals": {"metrics": {}}},
+    }
+    _assert_same(compute_all_scores(data)[0], _compute_all_scores_scalar(data)[0])
+    _assert_same(compute_all_scores(data)[1], _compute_all_scores_scalar(data)[1])
+
+    assert compute_all_scores({}) == _compute_all_scores_scalar({})
+    only_flat = {k: v for k, v in data.items() if k != "NAN"}
+    assert compute_all_scores(only_flat)[0]["FLAT1"] == {"quality": 5.0, "momentum": 5.0, "overall": 5.0}
+
+
+def test_round_vec_matches_python_round():
+    rng = random.Random(11)
+    values = [rng.uniform(-100, 100) for _ in range(20_000)]
+    values += [k / 100 + 0.005 for k in range(-1000, 1000)] + [k / 20 for k in range(-400, 400)]
+    values += [0.05, 0.15, 0.25, 2.675, -0.0, float("inf"), float("-inf")]
+    arr = np.asarray(values, dtype=np.float64)
+    for ndigits in (1, 4):
+        assert _round_vec(arr, ndigits).tolist() == [round(v, ndigits) for v in values]
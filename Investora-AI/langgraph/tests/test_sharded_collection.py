@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+
+from app.budget_manager import BudgetManager
+from app.graph_constants import UNIVERSE_PATH
+from app.nodes import data_collection
+from app.nodes.sharded_collection import collect_sharded_node
+from app.settings import get_settings
+
+
+def _state(tickers):
+    return {
+        "run_id": "shard-test",
+        "run_date": "2026-03-10",
+        "tickers": tickers,
+        "per_ticker_data": {},
+        "failed_tickers": [],
+        "errors": [],
+        "react_history": [],
+        "sharded_collection_done": False,
+        "collection_stats": {},
+    }
+
+
+def _mock_universe(n: int):
+    path = UNIVERSE_PATH.parent / "universe_mock.json"
+    data = json.loads(path.read_text())
+    tickers = data if isinstance(data, list) else data.get("tickers", [])
+    return [t["ticker"] if isinstance(t, dict) else t for t in tickers][:n]
+
+
+def test_large_universe_is_collected_in_shards(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    settings = get_settings()
+    monkeypatch.setattr(settings.run, "sharded_collection_min_tickers", 10)
+    monkeypatch.setattr(settings.run, "shard_size", 4)
+    monkeypatch.setattr(settings.concurrency, "shard_parallelism", 3)
+
+    tickers = _mock_universe(18)
+    state = data_collection.plan_next_action(_state(tickers))
+    assert state["action"] == "collect_sharded"
+
+    state = collect_sharded_node(state)
+    stats = state["collection_stats"]
+    assert stats["shards"] == 5
+    assert stats["tickers"] == 18
+    for ticker in tickers:
+        assert ticker in state["failed_tickers"] or set(state["per_ticker_data"][ticker]) == {
+            "market",
+            "fundamentals",
+            "news",
+        }
+
+    # The sharded pass runs once; the planner goes straight to scoring.
+    state = data_collection.plan_next_action(state)
+    assert state["action"] == "compute"
+
+
+def test_small_universe_keeps_react_loop(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    monkeypatch.setattr(get_settings().run, "sharded_collection_min_tickers", 10)
+
+    monkeypatch.setattr(get_settings().run, "planner_mode", "react")
+    state = data_collection.plan_next_action(_state(["AAPL", "MSFT"]))
+    assert state["action"] == "market"
+
+
+def test_try_reserve_grants_up_to_remaining_budget(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "false")
+    monkeypatch.setenv("MAX_API_CALLS_PER_RUN", "5")
+    monkeypatch.setattr("app.event_store.record_api_call", lambda *args, **kwargs: None)
+    manager = BudgetManager()
+
+    assert manager.try_reserve("fundamentals", "r1", 3) == 3
+    assert manager.try_reserve("news", "r1", 4) == 2
+    assert manager.try_reserve("market", "r1", 1) == 0
+    assert not manager.can_call("market", "r1")
+
+
+class _BatchFailingMarket:
+    def run_many(self, tickers):
+        raise RuntimeError("bad symbol in batch")
+
+    def run(self, payload):
+        return {"ticker": payload["ticker"], "price": 1.0}
+
+
+class _EchoTool:
+    def run(self, payload):
+        return {"ticker": payload["ticker"]}
+
+
+def test_batch_fallback_reserves_budget_per_ticker(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "false")
+    monkeypatch.setenv("MAX_API_CALLS_PER_RUN", "3")
+    monkeypatch.setattr("app.event_store.record_api_call", lambda *args, **kwargs: None)
+    monkeypatch.setattr(get_settings().run, "shard_size", 10)
+    monkeypatch.setattr("app.nodes.sharded_collection.budget_manager", BudgetManager())
+    monkeypatch.setattr("app.nodes.sharded_collection.get_market_tool", _BatchFailingMarket)
+    monkeypatch.setattr("app.nodes.sharded_collection.get_fundamentals_tool", _EchoTool)
+    monkeypatch.setattr("app.nodes.sharded_collection.get_news_tool", _EchoTool)
+
+    state = collect_sharded_node(_state(["AAPL", "MSFT", "NVDA", "TSLA"]))
+    # One call for the failed batch leaves two for the per-ticker retry; the rest are skipped.
+    assert state["collection_stats"]["budget_skipped"]["market"] == 2
+    assert set(state["failed_tickers"]) == {"AAPL", "MSFT", "NVDA", "TSLA"}
+    assert set(state["per_ticker_data"]) == {"AAPL", "MSFT"}
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.mcp_tools.cache import reset_tool_caches
+from app.nodes import evidence
+from app.settings import get_settings
+
+
+def _answer(ticker: str) -> dict:
+    return {
+        "ticker": ticker,
+        "quality_narrative": f"{ticker} quality",
+        "momentum_narrative": "steady",
+        "news_catalyst": {"present": False, "headline": None, "impact": "neutral", "strength": "low"},
+        "risk_factors": ["rates"],
+    }
+
+
+class _FakeResponses:
+    def __init__(self, drop_from_batch: str = ""):
+        self.calls = 0
+        self.batch_sizes = []
+        self.drop_from_batch = drop_from_batch
+
+    def create(self, **kwargs):
+        self.calls += 1
+        body = json.loads(kwargs["input"][1]["content"])
+        usage = SimpleNamespace(input_tokens=100, output_tokens=50)
+        if "text" in kwargs:
+            tickers = [b["ticker"] for b in body["tickers"]]
+            self.batch_sizes.append(len(tickers))
+            results = [_answer(t) for t in tickers if t != self.drop_from_batch]
+            return SimpleNamespace(output_text=json.dumps({"results": results}), usage=usage)
+        return SimpleNamespace(output_text=json.dumps(_answer(body["ticker"])), usage=usage)
+
+
+@pytest.fixture()
+def fake_openai(monkeypatch, tmp_path):
+    responses = _FakeResponses()
+    monkeypatch.setattr(get_settings().providers, "openai_api_key", "test-key")
+    monkeypatch.setattr(evidence, "SYNTHESIS_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(evidence, "get_openai_client", lambda _key: SimpleNamespace(responses=responses))
+    yield responses
+    reset_tool_caches()
+
+
+def _state(headline: str = "Earnings beat", tickers=("AAPL", "MSFT")):
+    return {
+        "run_id": "run-1",
+        "skip_synthesis": False,
+        "scores": {t: {"overall": 5.0} for t in tickers},
+        "per_ticker_data": {t: {"news": {"articles": [{"headline": f"{t} {headline}"}]}} for t in tickers},
+        "per_ticker_rag_context": {},
+        "user_profiles": [],
+        "errors": [],
+    }
+
+
+def test_identical_evidence_is_served_from_the_synthesis_cache(fake_openai):
+    first = evidence.synthesize_evidence_node(_state())
+    assert fake_openai.calls == 2
+    assert first["synthesis_stats"]["api_calls"] == 2
+
+    second = evidence.synthesize_evidence_node(_state())
+    assert fake_openai.calls == 2
+    assert second["per_ticker_synthesis"] == first["per_ticker_synthesis"]
+    assert second["synthesis_stats"]["cache_hits"] == 2
+    assert second["synthesis_stats"]["cache_hit_ratio"] == 1.0
+
+    evidence.synthesize_evidence_node(_state(headline="Guidance cut"))
+    assert fake_openai.calls == 4
+
+
+def test_cache_key_covers_model_prompt_and_bundle():
+    bundle = {"ticker": "AAPL", "scores": {"overall": 5.0, "quality": 4.0}}
+    key = evidence.synthesis_cache_key("gpt-4o-mini", "prompt", bundle)
+    reordered = {"scores": {"quality": 4.0, "overall": 5.0}, "ticker": "AAPL"}
+    assert evidence.synthesis_cache_key("gpt-4o-mini", "prompt", reordered) == key
+    assert evidence.synthesis_cache_key("gpt-4o", "prompt", bundle) != key
+    assert evidence.synthesis_cache_key("gpt-4o-mini", "prompt v2", bundle) != key
+    assert evidence.synthesis_cache_key("gpt-4o-mini", "prompt", {**bundle, "ticker": "MSFT"}) != key
+
+
+def test_batch_mode_packs_tickers_and_retries_missing_answers_individually(fake_openai, monkeypatch):
+    monkeypatch.setattr(get_settings().pipeline, "synthesis_batch_size", 3)
+    fake_openai.drop_from_batch = "NVDA"
+    tickers = ("AAPL", "MSFT", "NVDA", "AMZN", "META")
+
+    out = evidence.synthesize_evidence_node(_state(tickers=tickers))
+
+    assert fake_openai.batch_sizes == [3, 2]
+    assert set(out["per_ticker_synthesis"]) == set(tickers)
+    assert out["per_ticker_synthesis"]["NVDA"]["quality_narrative"] == "NVDA quality"
+    stats = out["synthesis_stats"]
+    assert stats["mode"] == "batch"
+    assert (stats["batched_requests"], stats["individual_retries"], stats["api_calls"]) == (2, 1, 3)
+    assert stats["input_tokens"] == 300
+    assert not out["errors"]
+
+
+def test_pack_synthesis_batches_respects_token_budget():
+    bundles = {f"T{i}": {"ticker": f"T{i}", "pad": "x" * 400} for i in range(6)}
+    budget = evidence.estimate_tokens(evidence.SYNTHESIS_BATCH_SYSTEM_PROMPT) + 250
+    batches = evidence.pack_synthesis_batches(bundles, batch_size=10, token_budget=budget)
+    assert [len(b) for b in batches] == [2, 2, 2]
+    assert evidence.pack_synthesis_batches(bundles, batch_size=4, token_budget=100_000) == [
+        ["T0", "T1", "T2", "T3"],
+        ["T4", "T5"],
+    ]
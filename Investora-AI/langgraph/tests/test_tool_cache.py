@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import pytest
+
+from app import metrics
+from app.mcp_tools import cache as cache_module
+from app.mcp_tools.base import HTTPCachedTool
+from app.mcp_tools.cache import TieredCache
+from app.settings import get_settings
+
+
+@pytest.fixture()
+def tool(tmp_path):
+    metrics.reset_metrics()
+    yield HTTPCachedTool(cache_dir=str(tmp_path / "cache"), min_sleep_s=0.0)
+    cache_module.reset_tool_caches()
+
+
+def test_read_through_memory_then_disk(tool, tmp_path):
+    payload = {"tool": "news", "ticker": "AAPL"}
+    assert tool._read_cache("news", payload) is None
+    tool._write_cache("news", payload, {"articles": [1, 2]})
+    assert tool._read_cache("news", payload) == {"articles": [1, 2]}
+
+    # A fresh process-level cache on the same file serves it from disk.
+    cache_module.reset_tool_caches()
+    assert tool._read_cache("news", payload) == {"articles": [1, 2]}
+    assert tool._read_cache("news", payload) == {"articles": [1, 2]}
+
+    stats = metrics.snapshot_metrics()["cache"]["news"]
+    assert stats["misses"] == 1
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 2
+    assert stats["writes"] == 1
+    assert list((tmp_path / "cache").glob("*.json")) == []
+
+
+def test_namespace_ttl_expiry_and_env_override(tool, monkeypatch):
+    monkeypatch.setitem(get_settings().caches.tool_cache_ttls, "quotes_test", 0.05)
+    assert cache_module.namespace_ttl("quotes_test") == 0.05
+    assert cache_module.namespace_ttl("fundamentals") == 7 * 24 * 60 * 60
+
+    clock = {"now": 1_000.0}
+    monkeypatch.setattr(cache_module.time, "time", lambda: clock["now"])
+    tool._write_cache("quotes_test", {"t": "AAPL"}, {"price": 1})
+    assert tool._read_cache("quotes_test", {"t": "AAPL"}) == {"price": 1}
+    clock["now"] += 1
+    assert tool._read_cache("quotes_test", {"t": "AAPL"}) is None
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path):
+    cache = TieredCache(tmp_path / "c.sqlite3", max_bytes=1_000, memory_entries=2)
+    for i in range(20):
+        cache.set("news", f"k{i}", {"blob": "x" * 90})
+    stats = cache.stats()
+    assert stats["disk_bytes"] <= 1_000
+    assert cache.get("news", "k19") is not None
+    assert cache.get("news", "k0") is None
+    assert stats["memory_entries"] == 2
+
+    assert cache.prune(expired_only=False) > 0
+    assert cache.stats()["namespaces"] == {}
+    cache.close()
+
+
+def test_malformed_cache_env_falls_back_to_defaults(monkeypatch):
+    monkeypatch.setenv("TOOL_CACHE_MAX_MB", "lots")
+    monkeypatch.setenv("TOOL_CACHE_TTL_NEWS", "soon")
+    monkeypatch.setenv("TOOL_CACHE_TTL_QUOTES_TEST", "0.05")
+    get_settings.cache_clear()
+    try:
+        caches = get_settings().caches
+        assert caches.tool_cache_max_mb == 256.0
+        assert caches.tool_cache_ttls == {"quotes_test": 0.05}
+        assert cache_module.namespace_ttl("news") == cache_module.DEFAULT_TTLS["news"]
+    finally:
+        get_settings.cache_clear()
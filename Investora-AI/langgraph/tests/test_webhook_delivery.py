@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app import event_store, webhook_delivery
+from app.settings import get_settings
+from app.webhook_delivery import WebhookMessage, dispatch, drain_outbox
+
+
+class _StubReceiver:
+    """Local webhook receiver: records posts, can answer slowly or with an error status."""
+
+    def __init__(self) -> None:
+        self.received = []
+        self.idempotency_keys = []
+        self.client_ports = set()
+        self.status = 200
+        self.delay_s = 0.0
+        self._lock = threading.Lock()
+        receiver = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_POST(self):  # noqa: N802
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with receiver._lock:
+                    receiver.received.append((self.path, body))
+                    receiver.idempotency_keys.append(self.headers.get("Idempotency-Key"))
+                    receiver.client_ports.add(self.client_address[1])
+                    status = receiver.status
+                if receiver.delay_s:
+                    time.sleep(receiver.delay_s)
+                out = b'{"ok": true}'
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(out)))
+                    self.end_headers()
+                    self.wfile.write(out)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (read timeout)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture()
+def receiver(temp_db, monkeypatch):
+    cfg = get_settings().webhooks
+    monkeypatch.setattr(cfg, "parallelism", 8)
+    monkeypatch.setattr(cfg, "timeout_s", 5.0)
+    monkeypatch.setattr(cfg, "batch_kinds", [])
+    monkeypatch.setattr(cfg, "outbox_enabled", True)
+    monkeypatch.setattr(cfg, "outbox_retry_base_s", 0.0)  # retries are due immediately
+    webhook_delivery.reset_http_session()
+    stub = _StubReceiver()
+    yield stub
+    stub.close()
+    webhook_delivery.reset_http_session()
+
+
+def _messages(url: str, n: int, kind: str = "alerts"):
+    return [WebhookMessage(kind, f"{url}/{kind}", {"user_id": f"u{i}"}, key=f"u{i}") for i in range(n)]
+
+
+def test_dispatch_is_concurrent_over_pooled_connections(receiver):
+    receiver.delay_s = 0.2
+    started = time.perf_counter()
+    result = dispatch(_messages(receiver.url, 16))
+    elapsed = time.perf_counter() - started
+
+    assert result.sent == 16 and result.requests == 16 and not result.failures
+    assert elapsed < 16 * 0.2 / 2
+    # Two rounds of 8 on keep-alive connections: no more sockets than workers.
+    assert len(receiver.client_ports) <= 8
+
+
+def test_failed_sends_are_queued_and_drained_later(receiver):
+    receiver.status = 503
+    result = dispatch(_messages(receiver.url, 3))
+    assert result.sent == 0 and result.queued == 3
+    assert event_store.webhook_outbox_counts() == {"pending": 3}
+
+    receiver.status = 200
+    summary = drain_outbox()
+    assert summary == {"due": 3, "delivered": 3, "rescheduled": 0, "dead": 0}
+    assert event_store.webhook_outbox_counts() == {}
+    assert len(receiver.received) == 6
+
+
+def test_outbox_rows_are_claimed_once_until_the_lease_expires(temp_db):
+    event_store.enqueue_webhooks(
+        [
+            {"kind": "alerts", "url": "http://x", "delivery_key": f"u{i}", "payload": {}, "next_attempt_at": "2026-01-01"}
+            for i in range(3)
+        ]
+    )
+    first = event_store.claim_due_webhooks("2026-02-01", lease_until_iso="2026-02-02", limit=2)
+    second = event_store.claim_due_webhooks("2026-02-01", lease_until_iso="2026-02-02")
+    assert [r["delivery_key"] for r in first] == ["u0", "u1"]
+    assert [r["delivery_key"] for r in second] == ["u2"]
+    assert event_store.webhook_outbox_counts() == {"sending": 3}
+    assert event_store.claim_due_webhooks("2026-02-01", lease_until_iso="2026-02-02") == []
+
+    # The drainer holding u0/u1 died; once its lease runs out they are claimable again.
+    event_store.complete_webhooks([second[0]["id"]])
+    assert len(event_store.claim_due_webhooks("2026-02-03", lease_until_iso="2026-02-04")) == 2
+
+
+def test_report_has_its_own_timeout_and_is_not_reposted_after_a_read_timeout(receiver, monkeypatch):
+    cfg = get_settings().webhooks
+    monkeypatch.setattr(cfg, "timeout_s", 0.2)
+    monkeypatch.setattr(cfg, "report_timeout_s", 2.0)
+    receiver.delay_s = 0.5
+    report = WebhookMessage("report", f"{receiver.url}/report", {"run_id": "r1"})
+
+    result = dispatch([report, *_messages(receiver.url, 1)])
+    assert result.sent == 1 and result.queued == 1  # the alert timed out, the report did not
+    assert event_store.webhook_outbox_counts() == {"pending": 1}
+
+    # A slow receiver may have run the report workflow already: keep it, do not re-post.
+    monkeypatch.setattr(cfg, "report_timeout_s", 0.2)
+    assert dispatch([report]).queued == 1
+    assert event_store.webhook_outbox_counts() == {"pending": 1, "dead": 1}
+
+    report_keys = [k for (path, _), k in zip(receiver.received, receiver.idempotency_keys) if path == "/report"]
+    assert len(report_keys) == 2 and report_keys[0] == report_keys[1]
+
+
+def test_client_errors_are_not_retried(receiver):
+    receiver.status = 400
+    dispatch(_messages(receiver.url, 2))
+    assert event_store.webhook_outbox_counts() == {"dead": 2}
+    assert drain_outbox()["due"] == 0
+
+
+def test_batchable_kinds_are_merged_per_url(receiver, monkeypatch):
+    cfg = get_settings().webhooks
+    monkeypatch.setattr(cfg, "batch_kinds", ["alerts"])
+    monkeypatch.setattr(cfg, "batch_size", 3)
+
+    result = dispatch(_messages(receiver.url, 7) + _messages(receiver.url, 1, kind="report"))
+
+    assert result.sent == 8 and result.requests == 4
+    batches = sorted(body["count"] for path, body in receiver.received if path == "/alerts")
+    assert batches == [1, 3, 3]
+    assert [body for path, body in receiver.received if path == "/report"] == [{"user_id": "u0"}]
+
+
+def test_post_alerts_node_queues_failures_without_raising(receiver, monkeypatch):
+    from app.nodes.delivery import post_alerts_node
+
+    monkeypatch.setenv("ALERT_WEBHOOK_URL", f"{receiver.url}/alerts")
+    receiver.status = 502
+    signal = {"signal_id": "s1", "ticker": "AAPL", "signal_type": "quality", "direction": "up",
+              "severity": "high", "urgency": "High", "fit_score": 8.0}
+    state = {
+        "run_id": "run-1",
+        "run_date": "2026-03-02",
+        "skip_post": False,
+        "errors": [],
+        "user_profiles": [{"user_id": "u1", "telegram_chat_id": "42"}, {"user_id": "u2", "telegram_chat_id": "43"}],
+        "personalized_bundles": {"u1": {"watchlist_signals": [signal]}, "u2": {"discovery_signals": [signal]}},
+        "triggered_user_alerts": [],
+    }
+
+    out = post_alerts_node(state)
+
+    assert out["delivery_stats"]["post_alerts"] == {"sent": 0, "requests": 2, "queued": 2, "failed": 2}
+    assert sorted(e["ticker"] for e in out["errors"]) == ["u1", "u2"]
+    assert {e["tool"] for e in out["errors"]} == {"alert_webhook"}
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import pytest
+
+from app import event_store, weekly_digest
+from app.models import AnalysisSnapshot, SignalEvent
+from app.weekly_digest import WeeklyEventIndex, build_weekly_user_digest
+
+
+def _event(run_id: str, run_date: str, ticker: str, score: float, route: str = "UI_UPDATE") -> SignalEvent:
+    return SignalEvent(
+        id=f"{run_id}-{ticker}-{route}",
+        run_id=run_id,
+        run_date=run_date,
+        timestamp=f"{run_date}T00:00:00+00:00",
+        ticker=ticker,
+        signal_type="quality",
+        direction="up",
+        severity="high" if score > 7 else "low",
+        confidence=0.6,
+        score=score,
+        narrative=None,
+        route=route,
+    )
+
+
+def _persist(run_id: str, run_date: str, events):
+    event_store.persist_run(
+        AnalysisSnapshot(
+            run_id=run_id,
+            run_date=run_date,
+            timestamp=f"{run_date}T00:00:00+00:00",
+            scope="full",
+            tickers=[],
+            scores={},
+            signal_events=events,
+            failed_tickers=[],
+            error_count=0,
+        )
+    )
+
+
+@pytest.fixture()
+def weekly_db(temp_db):
+    _persist("old", "2026-02-20", [_event("old", "2026-02-20", "AAPL", 9.5)])
+    _persist(
+        "mon",
+        "2026-03-02",
+        [_event("mon", "2026-03-02", "AAPL", 8.0), _event("mon", "2026-03-02", "TSLA", 4.0, route="ALERT_EVENT")],
+    )
+    _persist(
+        "fri",
+        "2026-03-06",
+        [_event("fri", "2026-03-06", "AAPL", 6.0), _event("fri", "2026-03-06", "MSFT", 9.0)],
+    )
+
+
+def test_digest_uses_only_the_weeks_relevant_events(weekly_db):
+    digest = build_weekly_user_digest({"user_id": "u1", "watchlist": ["aapl"]}, {"run_date": "2026-03-06"})
+
+    assert (digest["week_start"], digest["week_end"]) == ("2026-02-28", "2026-03-06")
+    stats = digest["weekly_stats"]
+    assert stats["total_signals"] == 3  # AAPL on mon + fri, plus the TSLA alert
+    assert stats["alert_events"] == 1
+    assert stats["high_priority_signals"] == 1
+    assert stats["top_tickers"][0] == {"ticker": "AAPL", "count": 2}
+    assert [s["score"] for s in digest["top_weekly_signals"]] == [8.0, 6.0, 4.0]
+
+
+def test_shared_index_is_loaded_once_for_many_users(weekly_db, monkeypatch):
+    index = WeeklyEventIndex.load("2026-02-28", "2026-03-06")
+    assert [ev["run_id"] for ev in index.events] == ["fri", "fri", "mon", "mon"]
+
+    def _no_reload(*args, **kwargs):
+        raise AssertionError("index should be reused")
+
+    monkeypatch.setattr(weekly_digest, "load_signal_events_between", _no_reload)
+    bundle = {"run_date": "2026-03-06"}
+    msft = build_weekly_user_digest({"user_id": "u2", "watchlist": ["MSFT"]}, bundle, index=index)
+    none = build_weekly_user_digest({"user_id": "u3", "watchlist": []}, bundle, index=index)
+
+    assert msft["weekly_stats"]["total_signals"] == 2
+    assert none["weekly_stats"]["total_signals"] == 1